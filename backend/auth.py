@@ -2,19 +2,24 @@
 Authentication and authorization utilities for DocuFlow.
 Handles Auth0 JWT token validation and user management.
 """
-import requests
-from jose import jwt, JWTError
+import asyncio
+import httpx
+from jose import jwt, jwk, JWTError
 from fastapi import HTTPException, Security, Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from typing import Optional, Dict, Any
-from functools import lru_cache
+import hashlib
 import logging
+import time
 
 from config import settings
 from database import (
     get_user_by_auth0_id,
     create_user,
-    update_last_login
+    update_last_login,
+    tenant_cache,
+    user_scope,
+    org_scope
 )
 
 logger = logging.getLogger(__name__)
@@ -22,6 +27,15 @@ logger = logging.getLogger(__name__)
 # HTTP Bearer token security scheme
 security = HTTPBearer()
 
+# Tenant cache namespace for token hash -> user/org context
+AUTH_CONTEXT_NAMESPACE = "auth_context"
+
+# user_id -> monotonic time of the last last_login write from this worker
+_last_login_writes: Dict[int, float] = {}
+
+# auth0_user_id -> in-flight Auth0 userinfo request
+_userinfo_inflight: Dict[str, "asyncio.Future"] = {}
+
 
 class AuthError(Exception):
     """Custom exception for authentication errors."""
@@ -30,39 +44,136 @@ class AuthError(Exception):
         self.status_code = status_code
 
 
-@lru_cache()
-def get_auth0_public_key() -> Dict[str, Any]:
+class JWKSManager:
     """
-    Fetch Auth0 public keys for JWT verification.
-    Cached to avoid repeated requests.
-
-    Returns:
-        JWKS (JSON Web Key Set)
+    Async cache of Auth0 signing keys, indexed by kid.
 
-    Raises:
-        AuthError: If unable to fetch keys
+    Keys are parsed into jose key objects once per fetch rather than per request.
+    The key set is refetched after ttl_seconds, or early when a token arrives
+    with an unknown kid (key rotation). Refreshes are single-flight, and
+    unknown-kid refreshes are rate limited to one per min_refresh_interval_seconds
+    so garbage tokens can't hammer the JWKS endpoint.
     """
-    if not settings.auth0_domain:
-        raise AuthError(
-            {"code": "auth0_not_configured", "description": "Auth0 domain not configured"},
-            500
-        )
 
-    jwks_url = f"https://{settings.auth0_domain}/.well-known/jwks.json"
+    def __init__(self, ttl_seconds: float, min_refresh_interval_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_interval_seconds = min_refresh_interval_seconds
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at: Optional[float] = None
+        self._last_rotation_refresh: Optional[float] = None
+        self._refresh_lock = asyncio.Lock()
+
+    async def get_signing_key(self, kid: str) -> Optional[Any]:
+        """
+        Get the parsed public key for a kid, refreshing the key set if needed.
+
+        Args:
+            kid: Key ID from the token header
+
+        Returns:
+            jose key object, or None if Auth0 doesn't publish this kid
+
+        Raises:
+            AuthError: If keys can't be fetched and none are cached
+        """
+        if self._is_expired():
+            await self._refresh(kid, rotation=False)
+        elif kid not in self._keys:
+            await self._refresh(kid, rotation=True)
+
+        return self._keys.get(kid)
+
+    def clear(self) -> None:
+        """Forget all cached keys."""
+        self._keys = {}
+        self._fetched_at = None
+        self._last_rotation_refresh = None
+
+    def _is_expired(self) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at >= self.ttl_seconds
+
+    async def _refresh(self, kid: str, rotation: bool) -> None:
+        async with self._refresh_lock:
+            # Another request may have refreshed while we waited for the lock
+            if not self._is_expired() and (kid in self._keys or not rotation):
+                return
+
+            if rotation:
+                now = time.monotonic()
+                if (
+                    self._last_rotation_refresh is not None
+                    and now - self._last_rotation_refresh < self.min_refresh_interval_seconds
+                ):
+                    logger.debug(f"Skipping JWKS refresh for unknown kid {kid} (rate limited)")
+                    return
+                self._last_rotation_refresh = now
 
-    try:
-        response = requests.get(jwks_url, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        logger.error(f"Failed to fetch Auth0 public keys: {str(e)}")
-        raise AuthError(
-            {"code": "jwks_fetch_failed", "description": "Failed to fetch public keys"},
-            500
+            try:
+                jwks = await self._fetch_jwks()
+            except AuthError:
+                if self._keys:
+                    # Keep serving the previous key set rather than failing all requests
+                    logger.warning("JWKS refresh failed - continuing with cached keys")
+                    return
+                raise
+
+            keys = {}
+            for key in jwks.get("keys", []):
+                try:
+                    keys[key["kid"]] = jwk.construct(key, algorithm=key.get("alg", "RS256"))
+                except Exception as e:
+                    logger.warning(f"Skipping unusable JWKS key {key.get('kid')}: {str(e)}")
+
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+            logger.info(f"Loaded {len(keys)} Auth0 signing key(s)")
+
+    async def _fetch_jwks(self) -> Dict[str, Any]:
+        """
+        Fetch Auth0 public keys for JWT verification.
+
+        Returns:
+            JWKS (JSON Web Key Set)
+
+        Raises:
+            AuthError: If unable to fetch keys
+        """
+        if not settings.auth0_domain:
+            raise AuthError(
+                {"code": "auth0_not_configured", "description": "Auth0 domain not configured"},
+                500
+            )
+
+        jwks_url = f"https://{settings.auth0_domain}/.well-known/jwks.json"
+
+        try:
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.get(jwks_url)
+                response.raise_for_status()
+                return response.json()
+        except Exception as e:
+            logger.error(f"Failed to fetch Auth0 public keys: {str(e)}")
+            raise AuthError(
+                {"code": "jwks_fetch_failed", "description": "Failed to fetch public keys"},
+                500
+            )
+
+
+_jwks_manager: Optional[JWKSManager] = None
+
+
+def get_jwks_manager() -> JWKSManager:
+    """Get or create the JWKS manager singleton."""
+    global _jwks_manager
+    if _jwks_manager is None:
+        _jwks_manager = JWKSManager(
+            ttl_seconds=settings.jwks_cache_ttl_seconds,
+            min_refresh_interval_seconds=settings.jwks_min_refresh_interval_seconds
         )
+    return _jwks_manager
 
 
-def verify_token(token: str) -> Dict[str, Any]:
+async def verify_token(token: str) -> Dict[str, Any]:
     """
     Verify and decode Auth0 JWT token.
 
@@ -81,18 +192,6 @@ def verify_token(token: str) -> Dict[str, Any]:
             500
         )
 
-    # Get JWKS (public keys)
-    try:
-        jwks = get_auth0_public_key()
-    except AuthError:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting public keys: {str(e)}")
-        raise AuthError(
-            {"code": "public_key_error", "description": "Error fetching public keys"},
-            500
-        )
-
     # Decode token header to get key ID
     try:
         unverified_header = jwt.get_unverified_header(token)
@@ -113,19 +212,18 @@ def verify_token(token: str) -> Dict[str, Any]:
         )
 
     # Find the key with matching key ID
-    rsa_key = {}
-    for key in jwks.get("keys", []):
-        if key["kid"] == unverified_header["kid"]:
-            rsa_key = {
-                "kty": key["kty"],
-                "kid": key["kid"],
-                "use": key["use"],
-                "n": key["n"],
-                "e": key["e"]
-            }
-            break
-
-    if not rsa_key:
+    try:
+        rsa_key = await get_jwks_manager().get_signing_key(unverified_header["kid"])
+    except AuthError:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting public keys: {str(e)}")
+        raise AuthError(
+            {"code": "public_key_error", "description": "Error fetching public keys"},
+            500
+        )
+
+    if rsa_key is None:
         logger.error(f"No matching key found for kid: {unverified_header['kid']}")
         raise AuthError(
             {"code": "invalid_header", "description": "Unable to find appropriate key"},
@@ -173,6 +271,80 @@ def verify_token(token: str) -> Dict[str, Any]:
         )
 
 
+async def _request_userinfo(token: str) -> Optional[Dict[str, Any]]:
+    """Call the Auth0 /userinfo endpoint without blocking the event loop."""
+    userinfo_url = f"https://{settings.auth0_domain}/userinfo"
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        async with httpx.AsyncClient(timeout=10) as client:
+            response = await client.get(userinfo_url, headers=headers)
+
+        if response.is_success:
+            return response.json()
+        logger.error(f"Failed to fetch userinfo from Auth0: {response.status_code}")
+    except Exception as e:
+        logger.error(f"Error fetching userinfo from Auth0: {str(e)}")
+    return None
+
+
+async def _fetch_userinfo(auth0_user_id: str, token: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch Auth0 userinfo for a user, sharing one in-flight request between
+    concurrent first-login requests for the same user.
+
+    Args:
+        auth0_user_id: Auth0 user ID (dedup key)
+        token: Access token to call /userinfo with
+
+    Returns:
+        Userinfo dict or None if unavailable
+    """
+    task = _userinfo_inflight.get(auth0_user_id)
+    if task is None:
+        task = asyncio.ensure_future(_request_userinfo(token))
+        _userinfo_inflight[auth0_user_id] = task
+        task.add_done_callback(lambda _: _userinfo_inflight.pop(auth0_user_id, None))
+    return await asyncio.shield(task)
+
+
+def _token_cache_key(token: str) -> str:
+    """Hash a bearer token for use as a cache key (raw tokens are never stored)."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _cache_user_context(token_key: str, payload: Dict[str, Any], user: Dict[str, Any], generation: int) -> None:
+    """
+    Cache the resolved user context for a verified token.
+    Expires at the token's exp claim or after auth_cache_ttl_seconds, whichever is first,
+    and is dropped when the user's or organization's cache scope is invalidated. Not cached
+    if either scope was invalidated after generation (taken before loading the context).
+    """
+    ttl = settings.auth_cache_ttl_seconds
+    if payload.get("exp"):
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl <= 0:
+        return
+
+    scopes = [user_scope(user["id"])]
+    if user.get("organization_id"):
+        scopes.append(org_scope(user["organization_id"]))
+
+    tenant_cache.set_if_unchanged(AUTH_CONTEXT_NAMESPACE, token_key, user, tuple(scopes), generation, ttl=ttl)
+
+
+async def _touch_last_login(user_id: int) -> None:
+    """
+    Update last_login at most once per user every last_login_update_interval_minutes.
+    """
+    now = time.monotonic()
+    last_write = _last_login_writes.get(user_id)
+    if last_write is not None and now - last_write < settings.last_login_update_interval_minutes * 60:
+        return
+
+    _last_login_writes[user_id] = now
+    await update_last_login(user_id)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Security(security)
 ) -> Dict[str, Any]:
@@ -180,6 +352,9 @@ async def get_current_user(
     Get current authenticated user from JWT token with organization context.
     This is a FastAPI dependency that can be used in route handlers.
 
+    Verified tokens are cached (by hash) together with the user/org context,
+    so repeat calls from the same client skip verification and DB lookups.
+
     Args:
         credentials: HTTP Bearer credentials from request header
 
@@ -192,102 +367,18 @@ async def get_current_user(
     token = credentials.credentials
 
     try:
-        # Verify token
-        payload = verify_token(token)
-
-        # Extract user info from token
-        auth0_user_id = payload.get("sub")  # Auth0 user ID
-        email = payload.get("email")
-        name = payload.get("name")
-
-        if not auth0_user_id:
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid token: missing user ID"
-            )
-
-        # CRITICAL: Email is required
-        # Strategy: If not in token, fetch from database (user already created)
-        # Only fetch from Auth0 if user doesn't exist yet
-        if not email:
-            # Check if user exists in database first
-            existing_user = await get_user_by_auth0_id(auth0_user_id)
-            if existing_user:
-                # User exists, use email from database (already fetched on first login)
-                email = existing_user["email"]
-                if not name:
-                    name = existing_user["name"]
-                logger.debug(f"Using email from database for returning user: {email}")
-            else:
-                # New user - fetch from Auth0 once
-                logger.warning(f"Email not in token for NEW user {auth0_user_id}, fetching from Auth0")
-                try:
-                    import requests
-                    userinfo_url = f"https://{settings.auth0_domain}/userinfo"
-                    headers = {"Authorization": f"Bearer {token}"}
-                    response = requests.get(userinfo_url, headers=headers, timeout=10)
-
-                    if response.ok:
-                        userinfo = response.json()
-                        email = userinfo.get("email")
-                        if not name:
-                            name = userinfo.get("name")
-                        logger.info(f"Fetched email from Auth0 for new user: {email}")
-                    else:
-                        logger.error(f"Failed to fetch userinfo from Auth0: {response.status_code}")
-                except Exception as e:
-                    logger.error(f"Error fetching userinfo from Auth0: {str(e)}")
-
-        # Email is absolutely required
-        if not email:
-            logger.error(f"Cannot get email for user {auth0_user_id}")
-            raise HTTPException(
-                status_code=401,
-                detail="Email not available. Please contact support."
-            )
+        token_key = _token_cache_key(token)
+        await tenant_cache.sync_versions()
+        found, user = tenant_cache.get(AUTH_CONTEXT_NAMESPACE, token_key)
+        if found:
+            return user
 
-        # Look up user in database
-        user = await get_user_by_auth0_id(auth0_user_id)
-
-        # Create user if first login
-        if not user:
-            try:
-                user_id = await create_user(auth0_user_id, email, name)
-                user = await get_user_by_auth0_id(auth0_user_id)
-                logger.info(f"Created new user {user_id} for {email}")
-            except Exception as create_error:
-                # If user creation fails due to duplicate email, it's a critical error
-                # Don't allow fallback to prevent account hijacking
-                logger.error(f"Failed to create user: {str(create_error)}")
-
-                # Check if it's specifically a duplicate email error
-                if "UNIQUE constraint failed: users.email" in str(create_error):
-                    raise HTTPException(
-                        status_code=409,
-                        detail=f"A user with email {email} already exists but with different Auth0 ID. This may indicate a misconfigured Auth0 connection or an attempt to access another user's account."
-                    )
-                else:
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Failed to create user: {str(create_error)}"
-                    )
-        else:
-            # Update last login
-            await update_last_login(user["id"])
-
-        # Load organization context if user has one
-        if user.get("organization_id"):
-            from database import get_organization
-            organization = await get_organization(user["organization_id"])
-            if organization:
-                user["organization"] = organization
-                logger.debug(f"Loaded organization {organization['id']} for user {user['id']}")
-            else:
-                logger.warning(f"User {user['id']} has organization_id {user['organization_id']} but organization not found")
-        else:
-            user["organization"] = None
-            logger.debug(f"User {user['id']} has no organization - needs onboarding")
+        # Verify token
+        generation = tenant_cache.generation()
+        payload = await verify_token(token)
 
+        user = await _load_user_context(token, payload)
+        _cache_user_context(token_key, payload, user, generation)
         return user
 
     except AuthError as e:
@@ -306,6 +397,103 @@ async def get_current_user(
         )
 
 
+async def _load_user_context(token: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Resolve (and create on first login) the user for a verified token payload.
+
+    Args:
+        token: Raw JWT (used for the Auth0 userinfo fallback)
+        payload: Verified token claims
+
+    Returns:
+        User dict with organization context
+    """
+    # Extract user info from token
+    auth0_user_id = payload.get("sub")  # Auth0 user ID
+    email = payload.get("email")
+    name = payload.get("name")
+
+    if not auth0_user_id:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid token: missing user ID"
+        )
+
+    # CRITICAL: Email is required
+    # Strategy: If not in token, fetch from database (user already created)
+    # Only fetch from Auth0 if user doesn't exist yet
+    if not email:
+        # Check if user exists in database first
+        existing_user = await get_user_by_auth0_id(auth0_user_id)
+        if existing_user:
+            # User exists, use email from database (already fetched on first login)
+            email = existing_user["email"]
+            if not name:
+                name = existing_user["name"]
+            logger.debug(f"Using email from database for returning user: {email}")
+        else:
+            # New user - fetch from Auth0 once
+            logger.warning(f"Email not in token for NEW user {auth0_user_id}, fetching from Auth0")
+            userinfo = await _fetch_userinfo(auth0_user_id, token)
+            if userinfo:
+                email = userinfo.get("email")
+                if not name:
+                    name = userinfo.get("name")
+                logger.info(f"Fetched email from Auth0 for new user: {email}")
+
+    # Email is absolutely required
+    if not email:
+        logger.error(f"Cannot get email for user {auth0_user_id}")
+        raise HTTPException(
+            status_code=401,
+            detail="Email not available. Please contact support."
+        )
+
+    # Look up user in database
+    user = await get_user_by_auth0_id(auth0_user_id)
+
+    # Create user if first login
+    if not user:
+        try:
+            user_id = await create_user(auth0_user_id, email, name)
+            user = await get_user_by_auth0_id(auth0_user_id)
+            logger.info(f"Created new user {user_id} for {email}")
+        except Exception as create_error:
+            # If user creation fails due to duplicate email, it's a critical error
+            # Don't allow fallback to prevent account hijacking
+            logger.error(f"Failed to create user: {str(create_error)}")
+
+            # Check if it's specifically a duplicate email error
+            if "UNIQUE constraint failed: users.email" in str(create_error):
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"A user with email {email} already exists but with different Auth0 ID. This may indicate a misconfigured Auth0 connection or an attempt to access another user's account."
+                )
+            else:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Failed to create user: {str(create_error)}"
+                )
+    else:
+        # Update last login (coalesced)
+        await _touch_last_login(user["id"])
+
+    # Load organization context if user has one
+    if user.get("organization_id"):
+        from database import get_organization
+        organization = await get_organization(user["organization_id"])
+        if organization:
+            user["organization"] = organization
+            logger.debug(f"Loaded organization {organization['id']} for user {user['id']}")
+        else:
+            logger.warning(f"User {user['id']} has organization_id {user['organization_id']} but organization not found")
+    else:
+        user["organization"] = None
+        logger.debug(f"User {user['id']} has no organization - needs onboarding")
+
+    return user
+
+
 def require_auth():
     """
     Dependency that requires authentication.
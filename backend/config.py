@@ -30,7 +30,86 @@ class Settings(BaseSettings):
     # File Settings
     max_file_size: int = 50  # MB
     allowed_extensions: List[str] = ["pdf"]
-    max_concurrent_processing: int = 5
+    max_concurrent_processing: int = 5  # Claude extraction calls at once per worker
+
+    # Batch progress events (SSE)
+    batch_events_heartbeat_seconds: int = 15  # Keep-alive comment interval on idle streams
+    batch_events_history_size: int = 1000  # Events kept per batch for Last-Event-ID resume
+    batch_events_retention_seconds: int = 600  # Keep finished batches' and idle upload channels' history this long
+
+    # Processing job queue (see worker.py)
+    embedded_worker: bool = True  # Run a worker inside the API process; disable when running standalone workers
+    job_lease_seconds: int = 120  # A job is reclaimed if its worker stops heartbeating for this long
+    job_heartbeat_seconds: int = 20  # Lease renewal interval
+    job_max_attempts: int = 3  # Tries per job before it is marked failed
+    job_retry_base_seconds: float = 5.0  # First retry delay; doubles per attempt
+    job_retry_max_seconds: float = 300.0  # Cap on the retry delay
+    job_poll_interval_seconds: float = 1.0  # Idle workers check for new jobs this often
+    max_global_running_jobs: int = 0  # Cap on jobs running across all workers (0 = only per-worker limits)
+    scheduler_wait_sample_size: int = 500  # Recent queue waits kept per organization for metrics
+    sjf_aging_seconds_per_second: float = 0.1  # Within an org, each second queued makes a job look this much shorter
+    preflight_base_seconds: float = 4.0  # Expected per-document cost outside OCR (Claude call, saving)
+    preflight_page_seconds: float = 2.5  # Expected OCR time per page with a text layer
+    preflight_scanned_page_factor: float = 1.5  # Scanned pages OCR this much slower
+
+    # Connector upload outbox (approved documents are uploaded in the background, see upload_worker.py)
+    upload_max_attempts: int = 5  # Tries per upload before it is dead-lettered and the document marked failed
+    upload_retry_base_seconds: float = 10.0  # First retry delay; doubles per attempt
+    upload_retry_max_seconds: float = 600.0  # Cap on the retry delay
+    upload_lease_seconds: int = 300  # An upload is reclaimed if its uploader stops heartbeating for this long
+    upload_docuware_concurrency: int = 4  # DocuWare uploads in flight per uploader
+    upload_google_drive_concurrency: int = 8  # Google Drive uploads in flight per uploader
+    upload_default_concurrency: int = 2  # Uploads in flight per uploader for any other connector type
+
+    # Review queue
+    review_bulk_max_documents: int = 500  # Documents per bulk-approve/bulk-correct request
+
+    # Pipeline stages within a worker: OCR -> extract -> learn -> persist -> route
+    pipeline_ocr_concurrency: int = 2  # Tesseract is CPU-bound; about one per core
+    pipeline_learn_concurrency: int = 2  # Correction-history lookups
+    pipeline_persist_concurrency: int = 2  # Document inserts
+    pipeline_route_concurrency: int = 4  # Review decisions (auto-approved uploads are queued in the outbox)
+    pipeline_queue_size: int = 5  # Jobs waiting in front of each stage before the stage ahead blocks
+    pipeline_latency_sample_size: int = 500  # Recent handler latencies kept per stage for metrics
+
+    # Admission control (load shedding on uploads, readiness at /api/ready)
+    admission_max_queued_documents: int = 2000  # Queued document jobs (all workers) before uploads get 429
+    admission_max_uploads_in_flight: int = 300  # Files being saved by this API process before 503
+    admission_min_free_disk_mb: int = 1024  # Free space under upload_dir below which uploads get 503
+    admission_max_llm_waiting: int = 50  # Requests queued for the LLM limiter before uploads get 429
+    admission_retry_after_seconds: int = 30  # Retry-After floor for shed requests
+    admission_max_retry_after_seconds: int = 600  # Retry-After cap
+
+    # Claude API limiter (per process)
+    llm_max_concurrent_requests: int = 10
+    llm_rate_limit_cooldown_seconds: float = 20.0  # Pause after a 429 without Retry-After
+
+    # DocuWare session pool (one logged-in client per server URL + username)
+    docuware_max_sessions: int = 50  # Least recently used accounts are logged off beyond this
+    docuware_session_ttl_seconds: int = 3600  # Treat a login as expired after this long
+    docuware_session_refresh_margin_seconds: int = 300  # Log in again this long before the TTL runs out
+    docuware_min_login_interval_seconds: float = 2.0  # Per account; protects against lockout from rapid retries
+    docuware_max_login_failures: int = 3  # Consecutive failures before logins for the account are blocked
+    docuware_login_lockout_seconds: int = 900  # How long logins stay blocked
+    docuware_field_schema_ttl_seconds: int = 86400  # Rediscover a dialog's index fields after this long
+    docuware_field_probe_concurrency: int = 5  # Parallel document fetches during field discovery
+    docuware_field_discovery_retry_seconds: int = 300  # Uploads don't retry a failed field discovery sooner
+    docuware_upload_key_field: str = ""  # Text index field storing each upload's idempotency key, so a retry finds the document already stored; empty disables
+
+    # Google Drive clients (one authenticated service per connected account)
+    google_drive_max_clients: int = 50  # Least recently used accounts are dropped beyond this
+    google_drive_max_workers: int = 16  # Threads running Drive API calls, shared by all accounts
+    google_drive_name_cache_ttl_seconds: int = 300  # Re-list a folder's same-named files after this long
+
+    # Resumable uploads to Google Drive (sessions are stored, so restarts resume where they stopped)
+    google_drive_upload_chunk_size: int = 8 * 1024 * 1024  # Bytes per request; rounded down to a multiple of 256 KiB
+    google_drive_upload_max_retries: int = 5  # Retries per chunk on 5xx/429 or a dropped connection
+    google_drive_upload_retry_base_seconds: float = 1.0  # Backoff doubles from here per consecutive failure
+    google_drive_upload_retry_max_seconds: float = 32.0
+    google_drive_upload_session_ttl_seconds: int = 6 * 86400  # Drive expires upload sessions after a week
+
+    # Bulk uploads to DocuWare/Google Drive (ConnectorManager.upload_documents)
+    connector_upload_concurrency: int = 4  # Uploads in flight per batch; keep at or below the DMS's per-account limits
 
     # Server
     host: str = "0.0.0.0"
@@ -46,6 +125,10 @@ class Settings(BaseSettings):
     auth0_client_id: str | None = None
     auth0_client_secret: str | None = None
     auth0_audience: str = "https://docuflow-api"
+    auth_cache_ttl_seconds: int = 60  # Max lifetime of a cached token -> user context
+    last_login_update_interval_minutes: int = 5  # Coalesce last_login writes per user
+    jwks_cache_ttl_seconds: int = 3600  # Refetch Auth0 signing keys after this long
+    jwks_min_refresh_interval_seconds: int = 30  # Rate limit for unknown-kid refreshes
 
     # Database
     database_url: str = "sqlite:///./docuflow.db"
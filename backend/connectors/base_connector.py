@@ -3,8 +3,46 @@ Base connector interface for Document Management System integrations.
 All connectors must implement this interface.
 """
 from __future__ import annotations
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional, Callable, Awaitable
+
+# Uploads in flight per upload_documents call when the caller doesn't say
+DEFAULT_UPLOAD_CONCURRENCY = 4
+
+
+async def run_bounded_uploads(
+    items: List[Any],
+    upload: Callable[[Any], Awaitable[Dict[str, Any]]],
+    concurrency: int = DEFAULT_UPLOAD_CONCURRENCY
+) -> List[Dict[str, Any]]:
+    """
+    Run an upload coroutine for each item with at most `concurrency` in flight.
+
+    A failing item never aborts the others: exceptions become failed results.
+
+    Args:
+        items: Items to upload
+        upload: Coroutine function uploading one item and returning its result dict
+        concurrency: Maximum uploads in flight
+
+    Returns:
+        One result dict per item, in the order of items
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item: Any) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await upload(item)
+            except Exception as e:
+                return {
+                    "success": False,
+                    "message": "Upload error",
+                    "error": str(e)
+                }
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
 
 
 class BaseConnector(ABC):
@@ -70,6 +108,37 @@ class BaseConnector(ABC):
         """
         pass
 
+    async def upload_documents(
+        self,
+        documents: List[Dict[str, Any]],
+        credentials: Dict[str, str],
+        storage_config: Dict[str, str],
+        concurrency: int = DEFAULT_UPLOAD_CONCURRENCY
+    ) -> List[Dict[str, Any]]:
+        """
+        Upload several documents to the same storage location.
+
+        The default runs upload_document for each document with bounded concurrency.
+        Connectors override it to share authentication and HTTP connections across
+        the batch.
+
+        Args:
+            documents: List of {"file_path": ..., "metadata": {...}}
+            credentials: Authentication credentials
+            storage_config: Storage location and configuration
+            concurrency: Maximum uploads in flight
+
+        Returns:
+            One upload result per document, in order (same shape as upload_document).
+            Failed documents get success False; the rest of the batch still uploads.
+        """
+        async def upload(document: Dict[str, Any]) -> Dict[str, Any]:
+            return await self.upload_document(
+                document["file_path"], document["metadata"], credentials, storage_config
+            )
+
+        return await run_bounded_uploads(documents, upload, concurrency)
+
     @abstractmethod
     async def validate_metadata(
         self,
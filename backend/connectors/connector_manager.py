@@ -2,32 +2,150 @@
 Connector Manager for orchestrating document uploads to different DMS systems.
 Handles connector selection and upload coordination.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
 from pathlib import Path
+import importlib
 import sys
 import logging
+import time
 
 sys.path.append(str(Path(__file__).parent.parent))
 
+from config import settings
 from models import ConnectorType, ConnectorConfig, ExtractedData, UploadResult, DocumentCategory
-from connectors.docuware_connector import DocuWareConnector
-from connectors.google_drive_connector import GoogleDriveConnector
+
+if TYPE_CHECKING:
+    from connectors.docuware_connector import DocuWareConnector
+    from connectors.google_drive_connector import GoogleDriveConnector
+    from connectors.google_drive_client_pool import GoogleDriveClientPool
 
 logger = logging.getLogger(__name__)
 
+# Connector plugins by type, as "module:factory". A plugin's module (and the DocuWare
+# or Google API client library behind it) is imported the first time it's used, so
+# starting the API doesn't pay for connectors no organization has configured.
+CONNECTOR_PLUGINS: Dict[ConnectorType, str] = {
+    ConnectorType.DOCUWARE: "connectors.docuware_connector:DocuWareConnector",
+    ConnectorType.GOOGLE_DRIVE: "connectors.google_drive_client_pool:get_google_drive_client_pool",
+}
+
+
+def load_connector_plugin(connector_type: ConnectorType) -> Any:
+    """
+    Import a connector plugin's module and create the plugin.
+
+    Args:
+        connector_type: Connector type registered in CONNECTOR_PLUGINS
+
+    Returns:
+        The plugin (DocuWareConnector, or the GoogleDriveClientPool of per-account connectors)
+
+    Raises:
+        ValueError: If no plugin is registered for the connector type
+    """
+    if connector_type not in CONNECTOR_PLUGINS:
+        raise ValueError(f"Connector type '{connector_type}' not supported")
+    module_name, factory_name = CONNECTOR_PLUGINS[connector_type].split(":")
+    return getattr(importlib.import_module(module_name), factory_name)()
+
+
+class LazyPlugin:
+    """
+    Stand-in for a ConnectorManager plugin that loads it on first attribute access,
+    for modules that keep a module-level reference to a connector.
+    """
+
+    def __init__(self, manager: "ConnectorManager", connector_type: ConnectorType):
+        self._manager = manager
+        self._connector_type = connector_type
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._manager.get_plugin(self._connector_type), name)
+
+
+def google_drive_credentials(google_drive_config) -> Dict[str, str]:
+    """
+    Build Google Drive OAuth credentials from a saved configuration.
+
+    Args:
+        google_drive_config: GoogleDriveConfig model or its dict form
+
+    Returns:
+        Dict with refresh_token, client_id and client_secret
+    """
+    if not isinstance(google_drive_config, dict):
+        google_drive_config = google_drive_config.dict()
+    return {
+        "refresh_token": google_drive_config.get("refresh_token"),
+        "client_id": google_drive_config.get("client_id"),
+        "client_secret": google_drive_config.get("client_secret")
+    }
+
 
 class ConnectorManager:
     """
     Manager for coordinating document uploads across different connectors.
     Handles connector instantiation and upload orchestration.
+    Connector plugins are created on first use (see CONNECTOR_PLUGINS).
     """
 
-    def __init__(self):
-        """Initialize connector manager with available connectors."""
-        self.docuware_connector = DocuWareConnector()
-        self.google_drive_connector = GoogleDriveConnector()
-        # Future connectors:
-        # self.onedrive_connector = OneDriveConnector()
+    def __init__(self, google_drive_pool: Optional["GoogleDriveClientPool"] = None):
+        """
+        Initialize connector manager. No connector is loaded until it's used.
+
+        Args:
+            google_drive_pool: Per-account Drive connectors (defaults to the process-wide pool)
+        """
+        self._plugins: Dict[ConnectorType, Any] = {}
+        if google_drive_pool is not None:
+            self._plugins[ConnectorType.GOOGLE_DRIVE] = google_drive_pool
+        # Future connectors register in CONNECTOR_PLUGINS:
+        # ConnectorType.ONEDRIVE: "connectors.onedrive_connector:OneDriveConnector"
+
+    def get_plugin(self, connector_type: ConnectorType) -> Any:
+        """
+        Get a connector plugin, importing and creating it on first use.
+
+        Args:
+            connector_type: Connector type registered in CONNECTOR_PLUGINS
+
+        Returns:
+            The connector plugin
+
+        Raises:
+            ValueError: If no plugin is registered for the connector type
+        """
+        plugin = self._plugins.get(connector_type)
+        if plugin is None:
+            start = time.perf_counter()
+            plugin = load_connector_plugin(connector_type)
+            self._plugins[connector_type] = plugin
+            logger.info(f"Loaded {connector_type.value} connector in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return plugin
+
+    def is_loaded(self, connector_type: ConnectorType) -> bool:
+        """Whether the connector plugin has been created in this process."""
+        return connector_type in self._plugins
+
+    def loaded_connectors(self) -> List[str]:
+        """Connector types whose plugins have been loaded in this process."""
+        return sorted(connector_type.value for connector_type in self._plugins)
+
+    @property
+    def docuware_connector(self) -> "DocuWareConnector":
+        return self.get_plugin(ConnectorType.DOCUWARE)
+
+    @docuware_connector.setter
+    def docuware_connector(self, connector: "DocuWareConnector") -> None:
+        self._plugins[ConnectorType.DOCUWARE] = connector
+
+    @property
+    def google_drive_pool(self) -> "GoogleDriveClientPool":
+        return self.get_plugin(ConnectorType.GOOGLE_DRIVE)
+
+    @google_drive_pool.setter
+    def google_drive_pool(self, pool: "GoogleDriveClientPool") -> None:
+        self._plugins[ConnectorType.GOOGLE_DRIVE] = pool
 
     async def upload_document(
         self,
@@ -116,33 +234,8 @@ class ConnectorManager:
             UploadResult
         """
         try:
-            # Prepare credentials
-            credentials = {
-                "server_url": docuware_config.server_url,
-                "username": docuware_config.username,
-                "password": decrypted_password or docuware_config.encrypted_password
-            }
-
-            # Prepare storage config
-            storage_config = {
-                "cabinet_id": docuware_config.cabinet_id,
-                "dialog_id": docuware_config.dialog_id,
-                "selected_fields": docuware_config.selected_fields,
-                "selected_table_columns": docuware_config.selected_table_columns or {}
-            }
-
-            # Extract metadata - use other_data if available (dynamic extraction)
-            # Otherwise fall back to standard fields
-            if extracted_data and extracted_data.other_data:
-                # Dynamic extraction - data is already in DocuWare field names
-                metadata = extracted_data.other_data.copy()
-
-                # Add line items if present (convert from LineItem objects to dicts)
-                if extracted_data.line_items:
-                    metadata['line_items'] = [item.dict() for item in extracted_data.line_items]
-            else:
-                # Legacy fallback - use standard extracted data
-                metadata = extracted_data.dict(exclude_none=True) if extracted_data else {}
+            credentials, storage_config = self._docuware_settings(docuware_config, decrypted_password)
+            metadata = self._docuware_metadata(extracted_data)
 
             # Validate metadata before upload
             is_valid, errors = await self.docuware_connector.validate_metadata(
@@ -167,13 +260,7 @@ class ConnectorManager:
             )
 
             # Convert to UploadResult model
-            return UploadResult(
-                success=upload_result.get('success', False),
-                document_id=upload_result.get('document_id'),
-                url=upload_result.get('url'),
-                message=upload_result.get('message', ''),
-                error=upload_result.get('error')
-            )
+            return self._docuware_result(upload_result)
 
         except Exception as e:
             return UploadResult(
@@ -204,40 +291,15 @@ class ConnectorManager:
             UploadResult
         """
         try:
-            # Prepare credentials
-            credentials = {
-                "refresh_token": google_drive_config.refresh_token,
-                "client_id": google_drive_config.client_id,
-                "client_secret": google_drive_config.client_secret
-            }
-
-            # Authenticate if not already
-            if not self.google_drive_connector.service:
-                authenticated = await self.google_drive_connector.authenticate(credentials)
-                if not authenticated:
-                    return UploadResult(
-                        success=False,
-                        message="Google Drive authentication failed",
-                        error="Failed to authenticate with Google Drive"
-                    )
+            # This account's connector, authenticated on first use
+            connector = await self.get_google_drive_connector(google_drive_config)
+            if connector is None:
+                return self._google_drive_auth_failure()
 
-            # Prepare storage config (use user's configured folder organization from frontend)
-            # Extract folder organization levels - handle both Enum and string values
-            primary = google_drive_config.primary_level
-            secondary = google_drive_config.secondary_level
-            tertiary = google_drive_config.tertiary_level
-
-            storage_config = {
-                "root_folder_name": google_drive_config.root_folder_name or "DocuFlow",
-                "primary_level": primary.value if hasattr(primary, 'value') else primary,
-                "secondary_level": secondary.value if hasattr(secondary, 'value') else secondary,
-                "tertiary_level": tertiary.value if hasattr(tertiary, 'value') else tertiary
-            }
-
-            logger.info(f"Google Drive folder structure: {storage_config['primary_level']} → {storage_config['secondary_level']} → {storage_config['tertiary_level']}")
+            storage_config = self._google_drive_storage_config(google_drive_config)
 
             # Upload document
-            result = await self.google_drive_connector.upload_document(
+            result = await connector.upload_document(
                 pdf_path=Path(file_path),
                 extracted_data=extracted_data,
                 category=category,
@@ -245,12 +307,7 @@ class ConnectorManager:
             )
 
             if result:
-                return UploadResult(
-                    success=True,
-                    document_id=result['file_id'],
-                    url=result.get('web_view_link'),
-                    message=f"Uploaded to Google Drive: {result['folder_path']}{result['filename']}"
-                )
+                return self._google_drive_result({"success": True, **result})
             else:
                 return UploadResult(
                     success=False,
@@ -265,6 +322,252 @@ class ConnectorManager:
                 error=str(e)
             )
 
+    async def upload_documents(
+        self,
+        documents: List[Dict[str, Any]],
+        config: ConnectorConfig,
+        decrypted_password: Optional[str] = None,
+        concurrency: Optional[int] = None
+    ) -> List[UploadResult]:
+        """
+        Upload several documents to the configured connector at once.
+
+        Authentication and HTTP connections are shared across the batch and up to
+        `concurrency` uploads run in parallel. Each document gets its own result; a
+        failed document doesn't stop the others.
+
+        Args:
+            documents: List of {"file_path": ..., "extracted_data": ExtractedData, "category": DocumentCategory,
+                "idempotency_key": optional; lets the DMS recognize a retried upload}
+            config: Connector configuration
+            decrypted_password: Decrypted password (if applicable)
+            concurrency: Maximum uploads in flight (defaults to settings.connector_upload_concurrency)
+
+        Returns:
+            One UploadResult per document, in order
+        """
+        concurrency = concurrency or settings.connector_upload_concurrency
+
+        try:
+            if config.connector_type == ConnectorType.NONE:
+                return [
+                    UploadResult(success=True, message="No connector configured (local only)")
+                    for _ in documents
+                ]
+
+            elif config.connector_type == ConnectorType.DOCUWARE:
+                return await self._upload_many_to_docuware(
+                    documents, config.docuware, decrypted_password, concurrency
+                )
+
+            elif config.connector_type == ConnectorType.GOOGLE_DRIVE:
+                return await self._upload_many_to_google_drive(documents, config.google_drive, concurrency)
+
+            else:
+                # Connectors without a bulk path upload one document at a time
+                return [
+                    await self.upload_document(
+                        document['file_path'],
+                        document['extracted_data'],
+                        config,
+                        decrypted_password,
+                        document.get('category', DocumentCategory.OTHER)
+                    )
+                    for document in documents
+                ]
+
+        except Exception as e:
+            return [
+                UploadResult(success=False, message="Upload failed", error=str(e))
+                for _ in documents
+            ]
+
+    async def _upload_many_to_docuware(
+        self,
+        documents: List[Dict[str, Any]],
+        docuware_config,
+        decrypted_password: Optional[str],
+        concurrency: int
+    ) -> List[UploadResult]:
+        """
+        Validate and upload several documents to DocuWare.
+
+        Args:
+            documents: Documents to upload
+            docuware_config: DocuWare configuration
+            decrypted_password: Decrypted password
+            concurrency: Maximum uploads in flight
+
+        Returns:
+            One UploadResult per document, in order
+        """
+        credentials, storage_config = self._docuware_settings(docuware_config, decrypted_password)
+
+        results: List[Optional[UploadResult]] = [None] * len(documents)
+        to_upload = []
+        for index, document in enumerate(documents):
+            metadata = self._docuware_metadata(document['extracted_data'])
+            is_valid, errors = await self.docuware_connector.validate_metadata(
+                metadata,
+                storage_config,
+                credentials
+            )
+            if not is_valid:
+                results[index] = UploadResult(
+                    success=False,
+                    message="Validation failed",
+                    error=f"Missing required fields: {', '.join(errors)}"
+                )
+            else:
+                to_upload.append((index, {
+                    "file_path": document['file_path'],
+                    "metadata": metadata,
+                    "idempotency_key": document.get('idempotency_key')
+                }))
+
+        uploaded = await self.docuware_connector.upload_documents(
+            [item for _, item in to_upload],
+            credentials,
+            storage_config,
+            concurrency
+        )
+        for (index, _), upload_result in zip(to_upload, uploaded):
+            results[index] = self._docuware_result(upload_result)
+
+        return results
+
+    async def _upload_many_to_google_drive(
+        self,
+        documents: List[Dict[str, Any]],
+        google_drive_config,
+        concurrency: int
+    ) -> List[UploadResult]:
+        """
+        Upload several documents to Google Drive.
+
+        Args:
+            documents: Documents to upload
+            google_drive_config: Google Drive configuration
+            concurrency: Maximum uploads in flight
+
+        Returns:
+            One UploadResult per document, in order
+        """
+        connector = await self.get_google_drive_connector(google_drive_config)
+        if connector is None:
+            return [self._google_drive_auth_failure() for _ in documents]
+
+        uploaded = await connector.upload_documents(
+            [
+                {
+                    "pdf_path": Path(document['file_path']),
+                    "extracted_data": document['extracted_data'],
+                    "category": document.get('category', DocumentCategory.OTHER),
+                    "idempotency_key": document.get('idempotency_key')
+                }
+                for document in documents
+            ],
+            self._google_drive_storage_config(google_drive_config),
+            concurrency
+        )
+        return [self._google_drive_result(result) for result in uploaded]
+
+    # ==================== Request helpers ====================
+
+    def _docuware_settings(self, docuware_config, decrypted_password: Optional[str]) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """Build DocuWare credentials and storage config from the saved configuration."""
+        credentials = {
+            "server_url": docuware_config.server_url,
+            "username": docuware_config.username,
+            "password": decrypted_password or docuware_config.encrypted_password
+        }
+
+        storage_config = {
+            "cabinet_id": docuware_config.cabinet_id,
+            "dialog_id": docuware_config.dialog_id,
+            "selected_fields": docuware_config.selected_fields,
+            "selected_table_columns": docuware_config.selected_table_columns or {}
+        }
+        return credentials, storage_config
+
+    def _docuware_metadata(self, extracted_data: ExtractedData) -> Dict[str, Any]:
+        """Build the DocuWare upload metadata for a document."""
+        # Extract metadata - use other_data if available (dynamic extraction)
+        # Otherwise fall back to standard fields
+        if extracted_data and extracted_data.other_data:
+            # Dynamic extraction - data is already in DocuWare field names
+            metadata = extracted_data.other_data.copy()
+
+            # Add line items if present (convert from LineItem objects to dicts)
+            if extracted_data.line_items:
+                metadata['line_items'] = [item.dict() for item in extracted_data.line_items]
+        else:
+            # Legacy fallback - use standard extracted data
+            metadata = extracted_data.dict(exclude_none=True) if extracted_data else {}
+        return metadata
+
+    def _docuware_result(self, upload_result: Dict[str, Any]) -> UploadResult:
+        """Convert a DocuWare connector result to an UploadResult."""
+        return UploadResult(
+            success=upload_result.get('success', False),
+            document_id=upload_result.get('document_id'),
+            url=upload_result.get('url'),
+            message=upload_result.get('message', ''),
+            error=upload_result.get('error')
+        )
+
+    async def get_google_drive_connector(self, google_drive_config) -> Optional["GoogleDriveConnector"]:
+        """
+        Get the authenticated connector for a Google Drive account.
+
+        Args:
+            google_drive_config: Google Drive configuration (model or dict)
+
+        Returns:
+            GoogleDriveConnector, or None if authentication failed
+        """
+        return await self.google_drive_pool.acquire(google_drive_credentials(google_drive_config))
+
+    def _google_drive_auth_failure(self) -> UploadResult:
+        return UploadResult(
+            success=False,
+            message="Google Drive authentication failed",
+            error="Failed to authenticate with Google Drive"
+        )
+
+    def _google_drive_storage_config(self, google_drive_config) -> Dict[str, Any]:
+        """Build the Google Drive storage config from the saved configuration."""
+        # Use user's configured folder organization from frontend
+        # Extract folder organization levels - handle both Enum and string values
+        primary = google_drive_config.primary_level
+        secondary = google_drive_config.secondary_level
+        tertiary = google_drive_config.tertiary_level
+
+        storage_config = {
+            "root_folder_name": google_drive_config.root_folder_name or "DocuFlow",
+            "primary_level": primary.value if hasattr(primary, 'value') else primary,
+            "secondary_level": secondary.value if hasattr(secondary, 'value') else secondary,
+            "tertiary_level": tertiary.value if hasattr(tertiary, 'value') else tertiary
+        }
+
+        logger.info(f"Google Drive folder structure: {storage_config['primary_level']} → {storage_config['secondary_level']} → {storage_config['tertiary_level']}")
+        return storage_config
+
+    def _google_drive_result(self, result: Dict[str, Any]) -> UploadResult:
+        """Convert a Google Drive connector result to an UploadResult."""
+        if not result.get('success'):
+            return UploadResult(
+                success=False,
+                message=result.get('message', 'Google Drive upload failed'),
+                error=result.get('error')
+            )
+        return UploadResult(
+            success=True,
+            document_id=result['file_id'],
+            url=result.get('web_view_link'),
+            message=f"Uploaded to Google Drive: {result['folder_path']}{result['filename']}"
+        )
+
 
 # Singleton instance
 _connector_manager = None
@@ -2,15 +2,21 @@
 DocuWare Connector for uploading documents with dynamic discovery.
 Uses the official docuware-client library with OAuth2 authentication.
 """
-import docuware
 from typing import Dict, Any, List, Tuple, Optional
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import sys
 import asyncio
 import logging
+import time
 sys.path.append(str(Path(__file__).parent.parent))
 
-from connectors.base_connector import BaseConnector
+from connectors.base_connector import BaseConnector, DEFAULT_UPLOAD_CONCURRENCY, run_bounded_uploads
+from connectors.docuware_session_pool import (
+    DocuWareSession, DocuWareSessionPool, DocuWareLoginBlocked, get_docuware_session_pool
+)
+from connectors.docuware_schema_cache import DocuWareSchemaCache, SchemaKey, get_docuware_schema_cache
+from config import settings
 from models import FileCabinet, StorageDialog, IndexField, TableColumn
 from services.field_mapping_service import get_field_mapping_service
 
@@ -23,44 +29,40 @@ class DocuWareConnector(BaseConnector):
     Supports OAuth2 authentication and dynamic discovery.
     """
 
-    def __init__(self):
-        """Initialize DocuWare connector."""
-        self.client = None
-        self.session = None
-        self.field_mapping_service = get_field_mapping_service()
-        self.cabinet_cache = {}  # Cache cabinet objects by ID
-        self.field_definitions_cache = {}  # Cache field definitions by cabinet_id
-        self.current_credentials_key = None  # Track current account (server_url + username)
-        self.last_auth_attempt = None  # Track last authentication attempt time
-        self.auth_failure_count = 0  # Track consecutive auth failures
-
-    def _has_valid_session(self) -> bool:
+    def __init__(
+        self,
+        session_pool: Optional[DocuWareSessionPool] = None,
+        schema_cache: Optional[DocuWareSchemaCache] = None
+    ):
         """
-        Check if we have a valid session.
+        Initialize DocuWare connector.
 
-        Returns:
-            True if session exists and is valid
+        Args:
+            session_pool: Pool of logged-in clients (defaults to the process-wide pool)
+            schema_cache: Index field definitions cache (defaults to the process-wide cache)
         """
-        return self.session is not None and self.client is not None
+        self.session_pool = session_pool or get_docuware_session_pool()
+        self.schema_cache = schema_cache or get_docuware_schema_cache()
+        self.field_mapping_service = get_field_mapping_service()
+        self._discoveries: Dict[SchemaKey, asyncio.Task] = {}  # Field discoveries in progress
+        self._failed_discoveries: Dict[SchemaKey, float] = {}  # When a dialog's discovery last failed
 
-    def clear_cache(self):
+    def clear_cache(self, server_url: Optional[str] = None, username: Optional[str] = None):
         """
-        Clear all cached data (cabinets, session, credentials).
+        Clear cached sessions and data (cabinets, login failures).
+        Stored field definitions are kept; they describe the server, not the account.
         Called when configuration is cleared or account changes.
-        """
-        print(f"\n🗑️  Clearing DocuWare connector cache")
-        print(f"   Clearing session, client, and all cached data")
-        logger.info("Clearing DocuWare connector cache")
-
-        self.cabinet_cache = {}
-        self.field_definitions_cache = {}
-        self.current_credentials_key = None
-        self.client = None
-        self.session = None
-        self.last_auth_attempt = None
-        self.auth_failure_count = 0
 
-        print(f"   ✅ Cache cleared - ready for new configuration\n")
+        Args:
+            server_url: Account's server URL; with username, clears only that account
+            username: Account's username
+        """
+        if server_url and username:
+            logger.info(f"Clearing DocuWare session for {username}")
+            self.session_pool.invalidate(self._normalize_server_url(server_url), username)
+        else:
+            logger.info("Clearing all DocuWare sessions")
+            self.session_pool.clear()
 
     def _is_system_field(self, field_name: str) -> bool:
         """
@@ -196,17 +198,14 @@ class DocuWareConnector(BaseConnector):
 
             logger.info(f"Testing connection to: {server_url}")
 
-            # Run synchronous docuware client in thread pool
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                self._test_connection_sync,
-                server_url,
-                username,
-                password
-            )
+            # Always log in for a test; the session is kept for reuse by later calls
+            await self.session_pool.acquire(server_url, username, password, force_login=True)
+            logger.info("✓ Connected successfully with OAuth2")
+            return True, "Connected successfully"
 
-            return result
+        except DocuWareLoginBlocked as e:
+            logger.error(str(e))
+            return False, str(e)
 
         except Exception as e:
             error_msg = str(e)
@@ -221,156 +220,24 @@ class DocuWareConnector(BaseConnector):
             else:
                 return False, f"Connection failed: {error_msg}"
 
-    def _test_connection_sync(self, server_url: str, username: str, password: str) -> Tuple[bool, str]:
-        """
-        Synchronous connection test.
-        IMPORTANT: Stores the authenticated session so it can be reused later!
-        """
-        try:
-            import time
-
-            # Create credentials key to track account changes
-            credentials_key = f"{server_url}|{username}"
-
-            # If credentials changed, clear the cache and reset auth tracking
-            if self.current_credentials_key != credentials_key:
-                logger.info("Credentials changed, clearing cabinet cache")
-                self.cabinet_cache = {}
-                self.current_credentials_key = credentials_key
-                self.auth_failure_count = 0
-
-            # Add delay if test was called too recently (prevent rapid-fire testing)
-            if self.last_auth_attempt:
-                time_since_last = time.time() - self.last_auth_attempt
-                if time_since_last < 3.0:  # Minimum 3 seconds between test attempts
-                    sleep_time = 3.0 - time_since_last
-                    print(f"⏳ Waiting {sleep_time:.1f}s before testing (prevents account lockout)")
-                    logger.warning(f"Throttling test connection (sleeping {sleep_time:.1f}s)")
-                    time.sleep(sleep_time)
-
-            self.last_auth_attempt = time.time()
-
-            # Create client and store it so we can reuse the session
-            print(f"🔐 Testing connection to DocuWare...")
-            logger.info("Testing connection to DocuWare")
-            self.client = docuware.DocuwareClient(server_url)
-
-            # Attempt login (OAuth2 by default) and store the session
-            self.session = self.client.login(username, password)
-
-            if self.session:
-                print(f"   ✅ Connected successfully - session saved for reuse")
-                logger.info("✓ Connected successfully with OAuth2")
-                self.auth_failure_count = 0  # Reset on success
-                return True, "Connected successfully"
-            else:
-                self.auth_failure_count += 1
-                print(f"   ❌ Login failed")
-                return False, "Login failed"
-
-        except Exception as e:
-            raise
-
-    async def authenticate(self, credentials: Dict[str, str]) -> Optional[Any]:
+    async def authenticate(self, credentials: Dict[str, str]) -> Optional[DocuWareSession]:
         """
-        Authenticate with DocuWare and return session.
+        Get a logged-in session for the account, reusing the pooled one when possible.
 
         Args:
             credentials: Server URL, username, password
 
         Returns:
-            DocuWare session object or None
+            DocuWareSession or None
         """
         try:
             server_url = self._normalize_server_url(credentials['server_url'])
-            username = credentials['username']
-            password = credentials['password']
-
-            # Run in thread pool
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                self._authenticate_sync,
-                server_url,
-                username,
-                password
-            )
-
-            return result
+            return await self.session_pool.acquire(server_url, credentials['username'], credentials['password'])
 
         except Exception as e:
             logger.error(f"Authentication failed: {e}")
             return None
 
-    def _authenticate_sync(self, server_url: str, username: str, password: str) -> Optional[Any]:
-        """Synchronous authentication."""
-        try:
-            import time
-
-            # Create credentials key to track account changes
-            credentials_key = f"{server_url}|{username}"
-
-            # Check if credentials changed
-            credentials_changed = self.current_credentials_key != credentials_key
-
-            # DEBUG: Log credential comparison
-            logger.debug(f"[AUTH DEBUG] Current key: '{self.current_credentials_key}'")
-            logger.debug(f"[AUTH DEBUG] New key: '{credentials_key}'")
-            logger.debug(f"[AUTH DEBUG] Credentials changed: {credentials_changed}")
-            logger.debug(f"[AUTH DEBUG] Has valid session: {self._has_valid_session()}")
-
-            # If we have a valid session and credentials haven't changed, reuse it!
-            if self._has_valid_session() and not credentials_changed:
-                logger.info("♻️  Reusing existing authenticated session")
-                print(f"   ♻️  Reusing existing authenticated session")
-                return self.session
-
-            # If credentials changed, clear the cache and reset failure counter
-            if credentials_changed:
-                logger.warning(f"Credentials changed from '{self.current_credentials_key}' to '{credentials_key}' - clearing cabinet cache")
-                self.cabinet_cache = {}
-                self.current_credentials_key = credentials_key
-                self.auth_failure_count = 0
-
-            # Check if we've had too many recent failures (possible account lockout)
-            if self.auth_failure_count >= 3:
-                print(f"⛔ Authentication blocked after {self.auth_failure_count} consecutive failures - your DocuWare account may be locked!")
-                logger.error(f"Authentication blocked after {self.auth_failure_count} consecutive failures - account may be locked")
-                return None
-
-            # Add delay between authentication attempts to prevent rapid retries
-            if self.last_auth_attempt:
-                time_since_last = time.time() - self.last_auth_attempt
-                if time_since_last < 2.0:  # Minimum 2 seconds between auth attempts
-                    sleep_time = 2.0 - time_since_last
-                    logger.warning(f"Throttling authentication attempt (sleeping {sleep_time:.1f}s)")
-                    time.sleep(sleep_time)
-
-            self.last_auth_attempt = time.time()
-            print(f"🔐 Authenticating to DocuWare (attempt {self.auth_failure_count + 1})...")
-            logger.info(f"Authenticating to DocuWare (attempt {self.auth_failure_count + 1})")
-
-            # Only create a new client if we don't have one or credentials changed
-            if not self.client or credentials_changed:
-                logger.debug(f"[AUTH DEBUG] Creating new DocuWare client for {server_url}")
-                self.client = docuware.DocuwareClient(server_url)
-            else:
-                logger.debug(f"[AUTH DEBUG] Reusing existing DocuWare client")
-
-            self.session = self.client.login(username, password)
-
-            # Reset failure counter on success
-            self.auth_failure_count = 0
-            print(f"   ✅ Authentication successful")
-            logger.info("Authentication successful")
-            return self.session
-
-        except Exception as e:
-            self.auth_failure_count += 1
-            print(f"   ❌ Auth error (failure #{self.auth_failure_count}): {e}")
-            logger.error(f"Auth error (failure #{self.auth_failure_count}): {e}")
-            return None
-
     async def get_file_cabinets(self, credentials: Dict[str, str]) -> List[FileCabinet]:
         """
         Get list of file cabinets available to the user.
@@ -382,17 +249,16 @@ class DocuWareConnector(BaseConnector):
             List of FileCabinet objects
         """
         try:
-            # Only authenticate if we don't have a valid session
-            if not self._has_valid_session():
-                session = await self.authenticate(credentials)
-                if not session:
-                    return []
+            session = await self.authenticate(credentials)
+            if not session:
+                return []
 
             # Run in thread pool
             loop = asyncio.get_event_loop()
             cabinets = await loop.run_in_executor(
                 None,
-                self._get_cabinets_sync
+                self._get_cabinets_sync,
+                session
             )
 
             return cabinets
@@ -401,15 +267,33 @@ class DocuWareConnector(BaseConnector):
             logger.error(f"Failed to get file cabinets: {e}")
             return []
 
-    def _get_cabinets_sync(self) -> List[FileCabinet]:
+    def _get_cabinet(self, session: DocuWareSession, cabinet_id: str) -> Optional[Any]:
+        """
+        Get a cabinet object from the session's cache, loading the cabinet list if needed.
+
+        Args:
+            session: Logged-in session
+            cabinet_id: File cabinet ID
+
+        Returns:
+            Cabinet object or None if the account has no such cabinet
+        """
+        if cabinet_id not in session.cabinet_cache:
+            logger.debug(f"Cabinet {cabinet_id} not in cache, populating...")
+            for org in session.client.organizations:
+                for cabinet in org.file_cabinets:
+                    session.cabinet_cache[cabinet.id] = cabinet
+        return session.cabinet_cache.get(cabinet_id)
+
+    def _get_cabinets_sync(self, session: DocuWareSession) -> List[FileCabinet]:
         """Synchronous cabinet retrieval."""
         try:
             cabinets = []
             # Iterate through organizations and their file cabinets
-            for org in self.client.organizations:
+            for org in session.client.organizations:
                 for cabinet in org.file_cabinets:
                     # Cache the cabinet object for later use
-                    self.cabinet_cache[cabinet.id] = cabinet
+                    session.cabinet_cache[cabinet.id] = cabinet
 
                     cabinets.append(FileCabinet(
                         id=cabinet.id,
@@ -438,16 +322,15 @@ class DocuWareConnector(BaseConnector):
             List of StorageDialog objects
         """
         try:
-            # Only authenticate if we don't have a valid session
-            if not self._has_valid_session():
-                session = await self.authenticate(credentials)
-                if not session:
-                    return []
+            session = await self.authenticate(credentials)
+            if not session:
+                return []
 
             loop = asyncio.get_event_loop()
             dialogs = await loop.run_in_executor(
                 None,
                 self._get_dialogs_sync,
+                session,
                 cabinet_id
             )
 
@@ -457,18 +340,16 @@ class DocuWareConnector(BaseConnector):
             logger.error(f"Failed to get storage dialogs: {e}")
             return []
 
-    def _get_dialogs_sync(self, cabinet_id: str) -> List[StorageDialog]:
+    def _get_dialogs_sync(self, session: DocuWareSession, cabinet_id: str) -> List[StorageDialog]:
         """Synchronous dialog retrieval."""
         try:
             dialogs = []
 
-            # Get cabinet from cache
-            if cabinet_id not in self.cabinet_cache:
-                logger.warning(f"Cabinet {cabinet_id} not in cache")
+            cabinet = self._get_cabinet(session, cabinet_id)
+            if cabinet is None:
+                logger.warning(f"Cabinet {cabinet_id} not found")
                 return []
 
-            cabinet = self.cabinet_cache[cabinet_id]
-
             # Try to get dialogs - the library might have a dialogs attribute
             if hasattr(cabinet, 'dialogs'):
                 for dialog in cabinet.dialogs:
@@ -500,130 +381,165 @@ class DocuWareConnector(BaseConnector):
         self,
         credentials: Dict[str, str],
         cabinet_id: str,
-        dialog_id: str
+        dialog_id: str,
+        refresh: bool = False
     ) -> List[IndexField]:
         """
         Get index fields for a storage dialog.
+        Served from the schema cache while fresh; otherwise discovered from sample documents.
 
         Args:
             credentials: Server URL, username, password
             cabinet_id: File cabinet ID
             dialog_id: Storage dialog ID
+            refresh: Rediscover even if cached definitions are still fresh
 
         Returns:
             List of IndexField objects
         """
         try:
-            # Only authenticate if we don't have a valid session
-            if not self._has_valid_session():
-                session = await self.authenticate(credentials)
-                if not session:
-                    return []
+            server_url = self._normalize_server_url(credentials['server_url'])
+            if not refresh:
+                cached = await self.schema_cache.get(server_url, cabinet_id, dialog_id)
+                if cached and not cached["expired"]:
+                    return cached["fields"]
 
-            loop = asyncio.get_event_loop()
-            fields = await loop.run_in_executor(
-                None,
-                self._get_fields_sync,
-                cabinet_id,
-                dialog_id
-            )
+                # A discovery may have finished while the cache was being read
+                fresh = self.schema_cache.peek(server_url, cabinet_id, dialog_id)
+                if fresh is not None:
+                    return fresh
 
-            return fields
+            return await asyncio.shield(self._discovery(credentials, server_url, cabinet_id, dialog_id))
 
         except Exception as e:
             logger.error(f"Failed to get index fields: {e}")
             return []
 
-    def _get_fields_sync(self, cabinet_id: str, dialog_id: str) -> List[IndexField]:
+    async def _cached_index_fields(
+        self,
+        credentials: Dict[str, str],
+        cabinet_id: str,
+        dialog_id: str
+    ) -> List[IndexField]:
         """
-        Synchronous field retrieval using GET document by docID=1.
-        This approach retrieves fields from an actual document, which includes table field definitions.
+        Get index fields for the upload path without waiting on discovery.
+        Missing or expired definitions are rediscovered in the background; until then
+        uploads use whatever is cached (or no type information). After a failed discovery
+        (empty cabinet, bad credentials) uploads wait docuware_field_discovery_retry_seconds
+        before starting another, so they don't keep probing the server or count logins
+        toward the account's lockout.
+
+        Args:
+            credentials: Server URL, username, password
+            cabinet_id: File cabinet ID
+            dialog_id: Storage dialog ID
+
+        Returns:
+            List of IndexField objects (empty if never discovered)
         """
         try:
-            fields = []
+            server_url = self._normalize_server_url(credentials['server_url'])
+            cached = await self.schema_cache.get(server_url, cabinet_id, dialog_id)
+            if cached is None or cached["expired"]:
+                # A discovery may have finished while the cache was being read
+                fresh = self.schema_cache.peek(server_url, cabinet_id, dialog_id)
+                if fresh is not None:
+                    return fresh
+                failed_at = self._failed_discoveries.get((server_url, cabinet_id, dialog_id))
+                if failed_at is None or time.monotonic() - failed_at > settings.docuware_field_discovery_retry_seconds:
+                    self._discovery(credentials, server_url, cabinet_id, dialog_id)
+            return cached["fields"] if cached else []
 
-            # Get cabinet from cache, or populate cache if empty
-            if cabinet_id not in self.cabinet_cache:
-                logger.debug(f"Cabinet {cabinet_id} not in cache, populating...")
-                # Populate cache by iterating organizations
-                for org in self.client.organizations:
-                    for cabinet in org.file_cabinets:
-                        self.cabinet_cache[cabinet.id] = cabinet
-                        if cabinet.id == cabinet_id:
-                            break
-
-            # Get cabinet from cache
-            if cabinet_id not in self.cabinet_cache:
-                logger.error(f"Cabinet {cabinet_id} not found after populating cache")
-                return []
+        except Exception as e:
+            logger.warning(f"Could not read cached index fields: {e}")
+            return []
 
-            cabinet = self.cabinet_cache[cabinet_id]
+    def _discovery(
+        self,
+        credentials: Dict[str, str],
+        server_url: str,
+        cabinet_id: str,
+        dialog_id: str
+    ) -> asyncio.Task:
+        """Start field discovery for a dialog, or join the one already running."""
+        key = (server_url, cabinet_id, dialog_id)
+        task = self._discoveries.get(key)
+        if task is None:
+            task = asyncio.create_task(self._discover_index_fields(credentials, server_url, cabinet_id, dialog_id))
+            self._discoveries[key] = task
+            task.add_done_callback(lambda _: self._discoveries.pop(key, None))
+        return task
+
+    async def _discover_index_fields(
+        self,
+        credentials: Dict[str, str],
+        server_url: str,
+        cabinet_id: str,
+        dialog_id: str
+    ) -> List[IndexField]:
+        """
+        Discover a dialog's index fields from sample documents and store them.
+        Failures are remembered so the upload path backs off (see _cached_index_fields).
+        """
+        fields: List[IndexField] = []
+        try:
+            session = await self.authenticate(credentials)
+            if session:
+                loop = asyncio.get_event_loop()
+                fields = await loop.run_in_executor(
+                    None,
+                    self._get_fields_sync,
+                    session,
+                    cabinet_id,
+                    dialog_id
+                )
 
-            # Build URL to get document by ID
-            base_url = self.client.conn.base_url
-            import requests
+                # An empty result is a failed discovery, not a schema
+                if fields:
+                    await self.schema_cache.put(server_url, cabinet_id, dialog_id, fields)
 
-            # Try to find a document with table field data
-            # We'll try document IDs 1-10, looking for one with populated table fields
-            doc_data = None
-            doc_ids_to_try = list(range(1, 11))  # Try IDs 1-10
+        except Exception as e:
+            logger.error(f"Failed to discover index fields: {e}")
+            fields = []
 
-            # First, try document ID 1
-            for doc_id in doc_ids_to_try:
-                doc_url = f"{base_url}/DocuWare/Platform/FileCabinets/{cabinet_id}/Documents/{doc_id}"
-                try:
-                    response = self.client.conn.session.get(
-                        doc_url,
-                        headers={"Accept": "application/json"}
-                    )
+        key = (server_url, cabinet_id, dialog_id)
+        if fields:
+            self._failed_discoveries.pop(key, None)
+        else:
+            self._failed_discoveries[key] = time.monotonic()
+        return fields
+
+    def _get_fields_sync(self, session: DocuWareSession, cabinet_id: str, dialog_id: str) -> List[IndexField]:
+        """
+        Synchronous field retrieval from sample documents.
+        This approach retrieves fields from an actual document, which includes table field definitions.
+        """
+        try:
+            fields = []
 
-                    if response.status_code == 200:
-                        doc_data = response.json()
-                        logger.debug(f"Successfully retrieved document ID {doc_id}")
+            if self._get_cabinet(session, cabinet_id) is None:
+                logger.error(f"Cabinet {cabinet_id} not found after populating cache")
+                return []
 
-                        # Check if this document has table fields with data
-                        has_table_data = self._document_has_table_data(doc_data)
-                        if has_table_data:
-                            logger.debug(f"Document {doc_id} has table field data, using it for field discovery")
-                            break
-                        else:
-                            logger.debug(f"Document {doc_id} has no table data, trying next...")
+            conn = session.client.conn
+            documents_url = f"{conn.base_url}/DocuWare/Platform/FileCabinets/{cabinet_id}/Documents"
 
-                except Exception as e:
-                    logger.debug(f"Could not retrieve document ID {doc_id}: {e}")
-                    continue
+            # Look for a document with populated table fields among IDs 1-10
+            doc_data = self._probe_documents(conn, documents_url, list(range(1, 11)))
 
-            # If none of the first 10 worked, try searching for any document
+            # If none of the first 10 worked, try the first documents the cabinet lists
             if not doc_data:
                 logger.debug("No documents found in IDs 1-10, searching for first available document...")
-                search_url = f"{base_url}/DocuWare/Platform/FileCabinets/{cabinet_id}/Documents"
-                search_response = self.client.conn.session.get(
-                    search_url,
+                search_response = conn.session.get(
+                    documents_url,
                     headers={"Accept": "application/json"},
                     params={"count": 20}  # Get first 20 documents
                 )
 
                 if search_response.status_code == 200:
-                    search_data = search_response.json()
-                    items = search_data.get('Items', [])
-
-                    # Try each document until we find one with table data
-                    for item in items:
-                        doc_id = item.get('Id')
-                        try:
-                            doc_url = f"{base_url}/DocuWare/Platform/FileCabinets/{cabinet_id}/Documents/{doc_id}"
-                            response = self.client.conn.session.get(
-                                doc_url,
-                                headers={"Accept": "application/json"}
-                            )
-
-                            if response.status_code == 200:
-                                doc_data = response.json()
-                                if self._document_has_table_data(doc_data):
-                                    logger.debug(f"Found document {doc_id} with table data")
-                                    break
-                        except:
-                            continue
+                    items = search_response.json().get('Items', [])
+                    doc_ids = [item.get('Id') for item in items if item.get('Id') is not None]
+                    doc_data = self._probe_documents(conn, documents_url, doc_ids)
 
             if not doc_data:
                 raise Exception("Could not find any documents in the file cabinet")
@@ -668,6 +584,50 @@ class DocuWareConnector(BaseConnector):
             logger.error(f"Error getting fields from document: {e}", exc_info=True)
             return []
 
+    def _probe_documents(self, conn: Any, documents_url: str, doc_ids: List[Any]) -> Optional[Dict[str, Any]]:
+        """
+        Fetch documents concurrently and return the first one with table data.
+        Requests share the client's keep-alive connection pool; once a hit comes back,
+        probes that haven't started are cancelled.
+
+        Args:
+            conn: DocuWare client connection (its session is thread-safe)
+            documents_url: Cabinet's documents URL
+            doc_ids: Document IDs to try, in order of preference
+
+        Returns:
+            Document data with table rows, else the earliest-listed document found, else None
+        """
+        def fetch(doc_id: Any) -> Optional[Dict[str, Any]]:
+            try:
+                response = conn.session.get(f"{documents_url}/{doc_id}", headers={"Accept": "application/json"})
+                if response.status_code == 200:
+                    return response.json()
+            except Exception as e:
+                logger.debug(f"Could not retrieve document ID {doc_id}: {e}")
+            return None
+
+        if not doc_ids:
+            return None
+
+        fallback = None  # (position in doc_ids, document data)
+        executor = ThreadPoolExecutor(max_workers=max(1, settings.docuware_field_probe_concurrency))
+        try:
+            futures = {executor.submit(fetch, doc_id): position for position, doc_id in enumerate(doc_ids)}
+            for future in as_completed(futures):
+                doc_data = future.result()
+                if not doc_data:
+                    continue
+                if self._document_has_table_data(doc_data):
+                    logger.debug(f"Document {doc_ids[futures[future]]} has table field data, using it for field discovery")
+                    return doc_data
+                if fallback is None or futures[future] < fallback[0]:
+                    fallback = (futures[future], doc_data)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return fallback[1] if fallback else None
+
     def _document_has_table_data(self, doc_data: Dict[str, Any]) -> bool:
         """
         Check if a document has table fields with populated data.
@@ -898,74 +858,206 @@ class DocuWareConnector(BaseConnector):
             Upload result with status and document ID
         """
         try:
-            cabinet_id = storage_config['cabinet_id']
-            dialog_id = storage_config['dialog_id']
-            selected_fields = storage_config.get('selected_fields', [])
-            selected_table_columns = storage_config.get('selected_table_columns', {})
-
-            # Only authenticate if we don't have a valid session
-            if not self._has_valid_session():
-                session = await self.authenticate(credentials)
-                if not session:
-                    return {
-                        "success": False,
-                        "message": "Authentication failed",
-                        "error": "Could not authenticate with DocuWare"
-                    }
+            session = await self.authenticate(credentials)
+            if not session:
+                return self._authentication_failure()
 
-            # Get field definitions to sanitize data (use cache to avoid repeated API calls)
-            cache_key = f"{cabinet_id}_{dialog_id}"
-            if cache_key in self.field_definitions_cache:
-                field_definitions = self.field_definitions_cache[cache_key]
-                logger.debug("Using cached field definitions")
-            else:
-                field_definitions = await self.get_index_fields(credentials, cabinet_id, dialog_id)
-                self.field_definitions_cache[cache_key] = field_definitions
-                logger.debug("Cached field definitions for future uploads")
+            # Get field definitions to sanitize data (cached; never discovered during an upload)
+            field_definitions = await self._cached_index_fields(
+                credentials, storage_config['cabinet_id'], storage_config['dialog_id']
+            )
 
-            field_types = {field.name: field.type for field in field_definitions}
+            return await self._upload_with_session(session, file_path, metadata, storage_config, field_definitions)
 
-            # Metadata is already in DocuWare field format - filter to selected fields and sanitize
-            index_data = {}
+        except Exception as e:
+            return {
+                "success": False,
+                "message": "Upload error",
+                "error": str(e)
+            }
 
-            for field, value in metadata.items():
-                # Skip line_items - they'll be handled separately for table fields
-                if field == 'line_items':
-                    continue
+    async def upload_documents(
+        self,
+        documents: List[Dict[str, Any]],
+        credentials: Dict[str, str],
+        storage_config: Dict[str, str],
+        concurrency: int = DEFAULT_UPLOAD_CONCURRENCY
+    ) -> List[Dict[str, Any]]:
+        """
+        Upload several documents to one cabinet with bounded concurrency.
 
-                if field in selected_fields and value is not None and value != "":
-                    # Sanitize value based on field type
-                    sanitized_value = self._sanitize_field_value(value, field_types.get(field, 'Text'))
-                    if sanitized_value is not None and sanitized_value != "":
-                        index_data[field] = sanitized_value
+        The batch logs in and looks up field definitions once, then every upload
+        goes through the session's keep-alive HTTP client.
 
-            # Extract line_items for table fields
-            line_items = metadata.get('line_items', [])
-            logger.debug(f"Preparing upload with {len(line_items)} line items")
+        When settings.docuware_upload_key_field is set, a document's "idempotency_key" is
+        stored in that index field, and a document already stored with the key (by an
+        attempt whose outcome was lost) is returned instead of uploading it again.
 
-            # Upload document in thread pool
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                self._upload_document_sync,
-                file_path,
-                cabinet_id,
-                index_data,
-                line_items,
-                selected_table_columns
+        Args:
+            documents: List of {"file_path": ..., "metadata": {...}, "idempotency_key": optional}
+                (metadata in DocuWare field names)
+            credentials: Server URL, username, password
+            storage_config: Same as upload_document
+            concurrency: Maximum uploads in flight
+
+        Returns:
+            One upload result per document, in order
+        """
+        session = await self.authenticate(credentials)
+        if not session:
+            return [self._authentication_failure() for _ in documents]
+
+        try:
+            field_definitions = await self._cached_index_fields(
+                credentials, storage_config['cabinet_id'], storage_config['dialog_id']
             )
+        except Exception as e:
+            logger.warning(f"Field definitions unavailable for bulk upload: {e}")
+            field_definitions = []
 
-            return result
+        # Load the cabinet list once instead of in every upload thread
+        try:
+            await asyncio.to_thread(self._get_cabinet, session, storage_config['cabinet_id'])
+        except Exception as e:
+            logger.warning(f"Could not load cabinets before bulk upload: {e}")
+
+        # One thread per upload in flight; the shared default executor may have fewer
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="docuware-upload")
+
+        async def upload(document: Dict[str, Any]) -> Dict[str, Any]:
+            return await self._upload_with_session(
+                session, document['file_path'], document['metadata'], storage_config, field_definitions, executor,
+                document.get('idempotency_key')
+            )
+
+        try:
+            results = await run_bounded_uploads(documents, upload, concurrency)
+        finally:
+            executor.shutdown(wait=False)
+        uploaded = sum(1 for result in results if result.get('success'))
+        logger.info(f"DocuWare bulk upload: {uploaded}/{len(documents)} documents uploaded")
+        return results
+
+    def _authentication_failure(self) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "message": "Authentication failed",
+            "error": "Could not authenticate with DocuWare"
+        }
+
+    async def _upload_with_session(
+        self,
+        session: DocuWareSession,
+        file_path: str,
+        metadata: Dict[str, Any],
+        storage_config: Dict[str, str],
+        field_definitions: List[IndexField],
+        executor: Optional[ThreadPoolExecutor] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Upload one document with an already logged-in session.
+
+        Args:
+            session: Logged-in session
+            file_path: Path to document file
+            metadata: Extracted metadata (already in DocuWare field names)
+            storage_config: Cabinet, selected fields and table columns
+            field_definitions: Index field definitions used to sanitize values
+            executor: Thread pool for the blocking HTTP calls (default executor if None)
+            idempotency_key: Upload's idempotency key (see upload_documents)
+
+        Returns:
+            Upload result with status and document ID
+        """
+        cabinet_id = storage_config['cabinet_id']
+        selected_fields = storage_config.get('selected_fields', [])
+        selected_table_columns = storage_config.get('selected_table_columns', {})
+
+        field_types = {field.name: field.type for field in field_definitions}
+
+        # Metadata is already in DocuWare field format - filter to selected fields and sanitize
+        index_data = {}
 
+        for field, value in metadata.items():
+            # Skip line_items - they'll be handled separately for table fields
+            if field == 'line_items':
+                continue
+
+            if field in selected_fields and value is not None and value != "":
+                # Sanitize value based on field type
+                sanitized_value = self._sanitize_field_value(value, field_types.get(field, 'Text'))
+                if sanitized_value is not None and sanitized_value != "":
+                    index_data[field] = sanitized_value
+
+        # Extract line_items for table fields
+        line_items = metadata.get('line_items', [])
+        logger.debug(f"Preparing upload with {len(line_items)} line items")
+
+        loop = asyncio.get_event_loop()
+        key_field = settings.docuware_upload_key_field
+        if idempotency_key and key_field:
+            existing = await loop.run_in_executor(
+                executor, self._find_uploaded_sync, session, cabinet_id, key_field, idempotency_key
+            )
+            if existing:
+                logger.info(f"DocuWare already has upload {idempotency_key}: document {existing}")
+                return {
+                    "success": True,
+                    "document_id": existing,
+                    "url": f"{session.client.conn.base_url}/DocuWare/Platform/WebClient/#{cabinet_id}/{existing}",
+                    "message": "Already uploaded"
+                }
+            index_data[key_field] = idempotency_key
+
+        # Upload document in thread pool
+        result = await loop.run_in_executor(
+            executor,
+            self._upload_document_sync,
+            session,
+            file_path,
+            cabinet_id,
+            index_data,
+            line_items,
+            selected_table_columns
+        )
+
+        # The server no longer accepts this login: log in again on the next call
+        if not result.get("success") and "401" in str(result.get("error", "")):
+            session.expire()
+
+        return result
+
+    def _find_uploaded_sync(
+        self,
+        session: DocuWareSession,
+        cabinet_id: str,
+        key_field: str,
+        idempotency_key: str
+    ) -> Optional[str]:
+        """
+        Search the cabinet for a document stored with an upload's idempotency key.
+
+        Returns:
+            DocuWare document ID, or None if not found (or the search failed; the upload
+            then goes ahead)
+        """
+        try:
+            cabinet = self._get_cabinet(session, cabinet_id)
+            dialog = cabinet.search_dialog() if cabinet is not None else None
+            if dialog is None:
+                logger.warning(f"No search dialog in cabinet {cabinet_id}, can't check for earlier uploads")
+                return None
+            for item in dialog.search({key_field: idempotency_key}):
+                return str(item.id)
+            return None
         except Exception as e:
-            return {
-                "success": False,
-                "message": "Upload error",
-                "error": str(e)
-            }
+            logger.warning(f"Could not search cabinet {cabinet_id} for upload {idempotency_key}: {e}")
+            return None
 
     def _upload_document_sync(
         self,
+        session: DocuWareSession,
         file_path: str,
         cabinet_id: str,
         index_data: Dict[str, Any],
@@ -976,6 +1068,7 @@ class DocuWareConnector(BaseConnector):
         Synchronous document upload using DocuWare REST API.
 
         Args:
+            session: Logged-in session to upload with
             file_path: Path to PDF file to upload
             cabinet_id: DocuWare cabinet ID
             index_data: Index field data (field_name -> value)
@@ -987,21 +1080,11 @@ class DocuWareConnector(BaseConnector):
                 line_items = []
             if selected_table_columns is None:
                 selected_table_columns = {}
-            # Get cabinet from cache, or populate cache if empty
-            if cabinet_id not in self.cabinet_cache:
-                logger.debug(f"Cabinet {cabinet_id} not in cache, populating...")
-                # Populate cache by iterating organizations
-                for org in self.client.organizations:
-                    for cabinet in org.file_cabinets:
-                        self.cabinet_cache[cabinet.id] = cabinet
-                        if cabinet.id == cabinet_id:
-                            break
-
-            # Get cabinet from cache
-            if cabinet_id not in self.cabinet_cache:
-                raise Exception(f"Cabinet {cabinet_id} not found")
 
-            cabinet = self.cabinet_cache[cabinet_id]
+            cabinet = self._get_cabinet(session, cabinet_id)
+            if cabinet is None:
+                raise Exception(f"Cabinet {cabinet_id} not found")
+            conn = session.client.conn
 
             # Step 1: Upload document file first (without index data)
             import requests
@@ -1014,7 +1097,7 @@ class DocuWareConnector(BaseConnector):
             # Build full URL (endpoint is relative, need to add base URL)
             if not documents_endpoint.startswith('http'):
                 # Get base URL from client connection
-                base_url = self.client.conn.base_url
+                base_url = conn.base_url
                 full_url = f"{base_url}{documents_endpoint}"
             else:
                 full_url = documents_endpoint
@@ -1024,7 +1107,7 @@ class DocuWareConnector(BaseConnector):
                 files = {'file': (Path(file_path).name, f, 'application/pdf')}
 
                 # Upload file
-                response = self.client.conn.session.post(
+                response = conn.session.post(
                     full_url,
                     files=files
                 )
@@ -1096,7 +1179,7 @@ class DocuWareConnector(BaseConnector):
                     "Content-Type": "application/json"
                 }
 
-                update_response = self.client.conn.session.put(
+                update_response = conn.session.put(
                     update_url,
                     headers=headers,
                     json=fields_payload
@@ -1113,7 +1196,7 @@ class DocuWareConnector(BaseConnector):
             return {
                 "success": True,
                 "document_id": str(document_id),
-                "url": f"{self.client.conn.base_url}/DocuWare/Platform/WebClient/#{cabinet_id}/{document_id}",
+                "url": f"{conn.base_url}/DocuWare/Platform/WebClient/#{cabinet_id}/{document_id}",
                 "message": "Uploaded successfully"
             }
 
@@ -1196,17 +1279,14 @@ class DocuWareConnector(BaseConnector):
 
         selected_fields = storage_config['selected_fields']
 
-        # If credentials provided, get index fields to check requirements
+        # If credentials provided, get cached index fields to check requirements
         index_fields = []
         if credentials and 'cabinet_id' in storage_config and 'dialog_id' in storage_config:
-            try:
-                index_fields = await self.get_index_fields(
-                    credentials,
-                    storage_config['cabinet_id'],
-                    storage_config['dialog_id']
-                )
-            except Exception as e:
-                logger.warning(f"Could not fetch index fields for validation: {e}")
+            index_fields = await self._cached_index_fields(
+                credentials,
+                storage_config['cabinet_id'],
+                storage_config['dialog_id']
+            )
 
         # Build a map of field names to their definitions
         field_defs = {field.name: field for field in index_fields}
@@ -0,0 +1,142 @@
+"""
+Cache of DocuWare index field definitions per (server_url, cabinet_id, dialog_id).
+Discovering fields means fetching sample documents, so definitions are kept in memory
+and in SQLite (shared by workers and restarts) and only rediscovered after a TTL or
+an explicit refresh.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from database import get_docuware_field_schema, save_docuware_field_schema
+from models import IndexField
+
+logger = logging.getLogger(__name__)
+
+SchemaKey = Tuple[str, str, str]
+
+
+class DocuWareSchemaCache:
+    """
+    Two-level (memory, then database) cache of index field definitions.
+
+    Entries are dicts with fields (List[IndexField]), discovered_at and expired. Expired
+    entries are still returned so hot paths can use them while a refresh runs elsewhere.
+    """
+
+    def __init__(self):
+        self._memory: Dict[SchemaKey, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+
+    def _expired(self, discovered_at: datetime) -> bool:
+        return datetime.utcnow() - discovered_at > timedelta(seconds=settings.docuware_field_schema_ttl_seconds)
+
+    def _entry(self, fields: List[IndexField], discovered_at: datetime) -> Dict[str, Any]:
+        return {"fields": fields, "discovered_at": discovered_at, "expired": self._expired(discovered_at)}
+
+    async def get(self, server_url: str, cabinet_id: str, dialog_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get cached field definitions, from memory or the database.
+
+        Args:
+            server_url: Normalized DocuWare server URL
+            cabinet_id: File cabinet ID
+            dialog_id: Storage dialog ID
+
+        Returns:
+            Dict with fields, discovered_at and expired, or None if never discovered
+        """
+        key = (server_url, cabinet_id, dialog_id)
+        entry = self._memory.get(key)
+        if entry is not None and not self._expired(entry["discovered_at"]):
+            self.hits += 1
+            return self._entry(entry["fields"], entry["discovered_at"])
+
+        # Missing or expired here; another worker may have stored a newer copy
+        stored = await get_docuware_field_schema(server_url, cabinet_id, dialog_id)
+        if stored is not None and (entry is None or stored["discovered_at"] > entry["discovered_at"]):
+            entry = {
+                "fields": [IndexField(**field) for field in stored["fields"]],
+                "discovered_at": stored["discovered_at"]
+            }
+            self._memory[key] = entry
+
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._entry(entry["fields"], entry["discovered_at"])
+
+    def peek(self, server_url: str, cabinet_id: str, dialog_id: str) -> Optional[List[IndexField]]:
+        """
+        Get fresh definitions from memory only (no database read, no await).
+
+        Args:
+            server_url: Normalized DocuWare server URL
+            cabinet_id: File cabinet ID
+            dialog_id: Storage dialog ID
+
+        Returns:
+            Fields if held in memory and not expired, else None
+        """
+        entry = self._memory.get((server_url, cabinet_id, dialog_id))
+        if entry is None or self._expired(entry["discovered_at"]):
+            return None
+        return entry["fields"]
+
+    async def put(self, server_url: str, cabinet_id: str, dialog_id: str, fields: List[IndexField]) -> None:
+        """
+        Store newly discovered field definitions.
+
+        Args:
+            server_url: Normalized DocuWare server URL
+            cabinet_id: File cabinet ID
+            dialog_id: Storage dialog ID
+            fields: Discovered index fields
+        """
+        discovered_at = datetime.utcnow()
+        await save_docuware_field_schema(
+            server_url, cabinet_id, dialog_id, [field.dict() for field in fields], discovered_at
+        )
+        self._memory[(server_url, cabinet_id, dialog_id)] = {"fields": fields, "discovered_at": discovered_at}
+        self.stored += 1
+        logger.info(f"Stored {len(fields)} DocuWare field definitions for cabinet {cabinet_id} / dialog {dialog_id}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters for the metrics endpoint.
+
+        Returns:
+            Dict with entries (in memory), hits, misses and stored
+        """
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored": self.stored
+        }
+
+
+# Singleton instance
+_docuware_schema_cache = None
+
+
+def get_docuware_schema_cache() -> DocuWareSchemaCache:
+    """
+    Get singleton instance of the DocuWare schema cache.
+
+    Returns:
+        DocuWareSchemaCache instance
+    """
+    global _docuware_schema_cache
+    if _docuware_schema_cache is None:
+        _docuware_schema_cache = DocuWareSchemaCache()
+    return _docuware_schema_cache
@@ -0,0 +1,279 @@
+"""
+Pool of logged-in DocuWare clients, one per (server_url, username).
+Lets uploads for different organizations interleave without logging each other out,
+refreshes logins before they expire, and throttles logins per account on the event
+loop so rapid retries can't lock a DocuWare account.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import docuware
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SessionKey = Tuple[str, str]
+
+
+class DocuWareLoginBlocked(Exception):
+    """Raised when logins for an account are paused after repeated failures."""
+
+
+class DocuWareSession:
+    """
+    One account's logged-in client plus the data cached for it.
+    Cabinet objects belong to the client they were loaded with, so they live here
+    rather than on the connector.
+    """
+
+    def __init__(self, server_url: str, username: str):
+        self.server_url = server_url
+        self.username = username
+        self.client = None
+        self.logged_in_at = 0.0
+        self.last_used = 0.0
+        self.cabinet_cache: Dict[str, Any] = {}  # Cabinet objects by ID
+        self.password_fingerprint: Optional[str] = None
+        self.lock = asyncio.Lock()  # Serializes logins for this account
+        self.last_login_attempt = 0.0
+        self.auth_failure_count = 0
+        self.blocked_until = 0.0
+
+    @property
+    def key(self) -> SessionKey:
+        return (self.server_url, self.username)
+
+    @property
+    def age(self) -> float:
+        """Seconds since the last successful login."""
+        return time.monotonic() - self.logged_in_at
+
+    @property
+    def is_logged_in(self) -> bool:
+        return self.client is not None and self.age < settings.docuware_session_ttl_seconds
+
+    def needs_refresh(self) -> bool:
+        """True once the login is within the refresh margin of its TTL."""
+        refresh_after = settings.docuware_session_ttl_seconds - settings.docuware_session_refresh_margin_seconds
+        return self.client is None or self.age >= refresh_after
+
+    def expire(self) -> None:
+        """Make the next acquire log in again (the server rejected this login)."""
+        self.logged_in_at = 0.0
+
+
+def _password_login(server_url: str, username: str, password: str) -> Any:
+    """Log in with the password grant; blocking, run on a worker thread."""
+    client = docuware.DocuwareClient(server_url)
+    client.login(username, password)
+    return client
+
+
+def _fingerprint(password: str) -> str:
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+class DocuWareSessionPool:
+    """
+    LRU pool of DocuWare sessions keyed by (server_url, username).
+
+    Each account has its own lock, so concurrent uploads for the same account share one
+    login while other accounts proceed independently. Login waits (throttling, refresh)
+    use asyncio.sleep; only the blocking HTTP login itself runs on a worker thread.
+    """
+
+    def __init__(
+        self,
+        max_sessions: Optional[int] = None,
+        login_func: Optional[Callable[[str, str, str], Any]] = None
+    ):
+        self.max_sessions = max_sessions or settings.docuware_max_sessions
+        self._login_func = login_func or _password_login
+        self._sessions: "OrderedDict[SessionKey, DocuWareSession]" = OrderedDict()
+        self.logins = 0
+        self.reused = 0
+        self.refreshed = 0
+        self.evicted = 0
+        self.failed_logins = 0
+        self.throttled_seconds = 0.0
+
+    async def acquire(
+        self,
+        server_url: str,
+        username: str,
+        password: str,
+        force_login: bool = False
+    ) -> DocuWareSession:
+        """
+        Get a logged-in session for an account, logging in only when needed.
+
+        Args:
+            server_url: Normalized DocuWare server URL
+            username: DocuWare username
+            password: Decrypted password
+            force_login: Log in even if a valid session exists (connection tests)
+
+        Returns:
+            DocuWareSession with a logged-in client
+
+        Raises:
+            DocuWareLoginBlocked: If logins for this account are paused after repeated failures
+            Exception: Whatever the DocuWare login raised
+        """
+        session = self._get_or_create(server_url, username)
+        fingerprint = _fingerprint(password)
+
+        async with session.lock:
+            reusable = session.client is not None and session.password_fingerprint == fingerprint
+            if reusable and not force_login and not session.needs_refresh():
+                self.reused += 1
+                session.last_used = time.monotonic()
+                return session
+
+            try:
+                await self._login(session, password, fingerprint)
+            except Exception as e:
+                # A failed early refresh keeps using the login that is still valid
+                if reusable and not force_login and session.is_logged_in:
+                    logger.warning(f"DocuWare session refresh failed for {username}, keeping current login: {e}")
+                    session.last_used = time.monotonic()
+                    return session
+                raise
+
+            session.last_used = time.monotonic()
+            return session
+
+    def _get_or_create(self, server_url: str, username: str) -> DocuWareSession:
+        key = (server_url, username)
+        session = self._sessions.get(key)
+        if session is None:
+            session = DocuWareSession(server_url, username)
+            self._sessions[key] = session
+            self._evict()
+        self._sessions.move_to_end(key)
+        return session
+
+    async def _login(self, session: DocuWareSession, password: str, fingerprint: str) -> None:
+        """Log in for a session's account, honouring the lockout and per-account throttle."""
+        now = time.monotonic()
+        if session.blocked_until > now:
+            raise DocuWareLoginBlocked(
+                f"DocuWare logins for {session.username} are paused for {session.blocked_until - now:.0f}s "
+                f"after {session.auth_failure_count} failed attempts"
+            )
+
+        wait = session.last_login_attempt + settings.docuware_min_login_interval_seconds - now
+        if session.last_login_attempt and wait > 0:
+            logger.info(f"Throttling DocuWare login for {session.username} ({wait:.1f}s)")
+            self.throttled_seconds += wait
+            await asyncio.sleep(wait)
+
+        session.last_login_attempt = time.monotonic()
+        logger.info(f"Logging in to DocuWare as {session.username} (attempt {session.auth_failure_count + 1})")
+        try:
+            client = await asyncio.to_thread(self._login_func, session.server_url, session.username, password)
+        except Exception as e:
+            self.failed_logins += 1
+            session.auth_failure_count += 1
+            logger.error(f"DocuWare login failed for {session.username} (failure #{session.auth_failure_count}): {e}")
+            if session.auth_failure_count >= settings.docuware_max_login_failures:
+                session.blocked_until = time.monotonic() + settings.docuware_login_lockout_seconds
+                logger.error(
+                    f"Pausing DocuWare logins for {session.username} for "
+                    f"{settings.docuware_login_lockout_seconds}s - the account may be locked"
+                )
+            raise
+
+        if session.client is not None:
+            # Cabinet objects hold the old client's connection.
+            # Requests in flight may still use the old client, so it is dropped, not closed.
+            self.refreshed += 1
+            session.cabinet_cache = {}
+        session.client = client
+        self.logins += 1
+        session.logged_in_at = time.monotonic()
+        session.password_fingerprint = fingerprint
+        session.auth_failure_count = 0
+        session.blocked_until = 0.0
+
+    def _evict(self) -> None:
+        """Drop least recently used sessions beyond max_sessions (skipping busy or locked-out ones)."""
+        now = time.monotonic()
+        for key in list(self._sessions):
+            if len(self._sessions) <= self.max_sessions:
+                break
+            session = self._sessions[key]
+            if session.lock.locked() or session.blocked_until > now:
+                continue
+            del self._sessions[key]
+            self.evicted += 1
+            logger.debug(f"Evicted DocuWare session for {session.username}")
+
+    def get(self, server_url: str, username: str) -> Optional[DocuWareSession]:
+        """Get an account's session without logging in."""
+        return self._sessions.get((server_url, username))
+
+    def invalidate(self, server_url: str, username: str) -> bool:
+        """
+        Forget an account's session, caches and failure count.
+        Called when the account's configuration is cleared or replaced.
+
+        Args:
+            server_url: Normalized DocuWare server URL
+            username: DocuWare username
+
+        Returns:
+            True if the account had a session
+        """
+        return self._sessions.pop((server_url, username), None) is not None
+
+    def clear(self) -> None:
+        """Forget every session."""
+        for key in list(self._sessions):
+            self.invalidate(*key)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pool counters for the metrics endpoint.
+
+        Returns:
+            Dict with sessions, logged_in, logins, reused, refreshed, evicted,
+            failed_logins and throttled_seconds
+        """
+        return {
+            "sessions": len(self._sessions),
+            "logged_in": sum(1 for session in self._sessions.values() if session.is_logged_in),
+            "logins": self.logins,
+            "reused": self.reused,
+            "refreshed": self.refreshed,
+            "evicted": self.evicted,
+            "failed_logins": self.failed_logins,
+            "throttled_seconds": round(self.throttled_seconds, 1)
+        }
+
+
+# Singleton instance
+_docuware_session_pool = None
+
+
+def get_docuware_session_pool() -> DocuWareSessionPool:
+    """
+    Get singleton instance of the DocuWare session pool.
+
+    Returns:
+        DocuWareSessionPool instance
+    """
+    global _docuware_session_pool
+    if _docuware_session_pool is None:
+        _docuware_session_pool = DocuWareSessionPool()
+    return _docuware_session_pool
@@ -0,0 +1,153 @@
+"""
+Pool of authenticated Google Drive connectors, one per connected Drive account.
+Each organization's uploads use its own credentials, service and folder cache instead
+of whichever account authenticated the shared connector first.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+from connectors.google_drive_connector import GoogleDriveConnector
+from connectors.google_drive_folder_cache import account_key
+
+logger = logging.getLogger(__name__)
+
+
+class GoogleDriveClientPool:
+    """
+    LRU cache of authenticated GoogleDriveConnector instances keyed by account.
+
+    Access tokens are refreshed by the connectors themselves when they expire;
+    the pool only authenticates new accounts and evicts idle ones.
+    """
+
+    def __init__(
+        self,
+        max_clients: Optional[int] = None,
+        connector_factory: Optional[Callable[[], GoogleDriveConnector]] = None
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            max_clients: Accounts kept authenticated (defaults to settings.google_drive_max_clients)
+            connector_factory: Creates unauthenticated connectors (tests pass fakes)
+        """
+        self.max_clients = max_clients or settings.google_drive_max_clients
+        self.connector_factory = connector_factory or GoogleDriveConnector
+        self._clients: "OrderedDict[str, GoogleDriveConnector]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self.failed = 0
+
+    async def acquire(self, credentials: Dict[str, str]) -> Optional[GoogleDriveConnector]:
+        """
+        Get the account's authenticated connector, authenticating it on first use.
+
+        Concurrent callers for the same account wait for a single authentication.
+
+        Args:
+            credentials: refresh_token, client_id, client_secret
+
+        Returns:
+            Authenticated connector, or None if authentication failed
+        """
+        key = account_key(credentials)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            connector = self._clients.get(key)
+            if connector is not None and connector.service is not None:
+                self._clients.move_to_end(key)
+                self.reused += 1
+                return connector
+
+            connector = self.connector_factory()
+            if not await connector.authenticate(credentials):
+                self.failed += 1
+                return None
+
+            self._clients[key] = connector
+            self.created += 1
+            self._evict()
+            return connector
+
+    def get(self, credentials: Dict[str, str]) -> Optional[GoogleDriveConnector]:
+        """Get the account's connector if it is pooled (no authentication)."""
+        return self._clients.get(account_key(credentials))
+
+    def invalidate(self, credentials: Dict[str, str]) -> bool:
+        """
+        Drop an account's connector (its config was cleared or replaced).
+
+        Args:
+            credentials: refresh_token, client_id, client_secret
+
+        Returns:
+            True if the account was pooled
+        """
+        key = account_key(credentials)
+        self._locks.pop(key, None)
+        return self._clients.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Drop every pooled connector."""
+        self._clients.clear()
+        self._locks.clear()
+
+    def _evict(self) -> None:
+        """Drop least recently used accounts beyond max_clients."""
+        while len(self._clients) > self.max_clients:
+            key, _ = self._clients.popitem(last=False)
+            lock = self._locks.get(key)
+            if lock is not None and not lock.locked():
+                del self._locks[key]
+            self.evicted += 1
+            logger.info("Evicted least recently used Google Drive account from the pool")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pool counters for the metrics endpoint.
+
+        Returns:
+            Dict with clients, created, reused, evicted, failed and the pooled
+            connectors' folder cache totals (folders, folder_hits, folder_misses)
+        """
+        folders = [connector.folder_tree.stats() for connector in self._clients.values()
+                   if hasattr(connector, 'folder_tree')]
+        return {
+            "clients": len(self._clients),
+            "created": self.created,
+            "reused": self.reused,
+            "evicted": self.evicted,
+            "failed": self.failed,
+            "folders": sum(stats["folders"] for stats in folders),
+            "folder_hits": sum(stats["hits"] for stats in folders),
+            "folder_misses": sum(stats["misses"] for stats in folders)
+        }
+
+
+# Singleton instance
+_google_drive_client_pool = None
+
+
+def get_google_drive_client_pool() -> GoogleDriveClientPool:
+    """
+    Get singleton instance of the Google Drive client pool.
+
+    Returns:
+        GoogleDriveClientPool instance
+    """
+    global _google_drive_client_pool
+    if _google_drive_client_pool is None:
+        _google_drive_client_pool = GoogleDriveClientPool()
+    return _google_drive_client_pool
@@ -4,21 +4,37 @@ Handles OAuth2 authentication, folder management, and file uploads to Google Dri
 """
 import os
 import re
+import asyncio
+import hashlib
+import random
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple, Any
+from typing import Optional, Dict, List, Set, Tuple, Any
 from datetime import datetime
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, build_http
 from googleapiclient.errors import HttpError
+from google_auth_httplib2 import AuthorizedHttp
+import httplib2
 
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
+from config import settings
+from database import (
+    delete_google_drive_upload_session,
+    get_google_drive_upload_session,
+    save_google_drive_upload_session
+)
 from models import ExtractedData, DocumentCategory
+from connectors.base_connector import DEFAULT_UPLOAD_CONCURRENCY, run_bounded_uploads
+from connectors.google_drive_folder_cache import GoogleDriveFolderCache, account_key, folder_path_key
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +54,9 @@ CATEGORY_FOLDERS = {
     DocumentCategory.OTHER: "Other"
 }
 
+# App property holding an upload's idempotency key, so a retried upload finds the file it already created
+UPLOAD_KEY_PROPERTY = 'docuflow_upload_key'
+
 
 def escape_drive_query_value(value: str) -> str:
     """
@@ -55,20 +74,140 @@ def escape_drive_query_value(value: str) -> str:
     return value.replace("'", "\\'")
 
 
+# Resumable upload chunks must be a multiple of 256 KiB
+UPLOAD_CHUNK_GRANULARITY = 256 * 1024
+
+# Upload responses worth retrying (the session survives them)
+RETRYABLE_UPLOAD_STATUSES = {429, 500, 502, 503, 504}
+
+
+def upload_chunk_size() -> int:
+    """
+    Get the configured upload chunk size, rounded down to what Drive accepts.
+
+    Returns:
+        Chunk size in bytes (at least 256 KiB)
+    """
+    chunks = max(settings.google_drive_upload_chunk_size // UPLOAD_CHUNK_GRANULARITY, 1)
+    return chunks * UPLOAD_CHUNK_GRANULARITY
+
+
+def upload_retry_delay(failures: int, retry_after: Optional[str] = None) -> float:
+    """
+    Exponential backoff with jitter before retrying a failed upload chunk.
+
+    Args:
+        failures: Consecutive failures so far (1 after the first)
+        retry_after: Retry-After header of a 429/503 response, if any
+
+    Returns:
+        Delay in seconds
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), settings.google_drive_upload_retry_max_seconds)
+        except ValueError:
+            pass
+    delay = min(
+        settings.google_drive_upload_retry_base_seconds * (2 ** (failures - 1)),
+        settings.google_drive_upload_retry_max_seconds
+    )
+    return delay * random.uniform(0.8, 1.2)
+
+
+# Singleton instance
+_drive_executor = None
+
+
+def get_drive_executor() -> ThreadPoolExecutor:
+    """
+    Get the thread pool that runs blocking Drive API calls for all connectors.
+
+    Returns:
+        ThreadPoolExecutor sized by settings.google_drive_max_workers
+    """
+    global _drive_executor
+    if _drive_executor is None:
+        _drive_executor = ThreadPoolExecutor(
+            max_workers=settings.google_drive_max_workers,
+            thread_name_prefix="google-drive"
+        )
+    return _drive_executor
+
+
 class GoogleDriveConnector:
     """
     Connector for Google Drive integration.
     Handles OAuth2, folder creation, and file uploads with metadata.
+
+    One instance holds one account's credentials, service and folder cache (see
+    GoogleDriveClientPool). API calls run on the Drive executor, each thread with
+    its own HTTP connection, so they never block the event loop.
     """
 
-    def __init__(self):
-        """Initialize Google Drive connector."""
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None):
+        """
+        Initialize Google Drive connector.
+
+        Args:
+            executor: Thread pool for API calls (defaults to the shared Drive executor)
+        """
         self.service = None
         self.credentials = None
         self.root_folder_id = None
         self.folder_cache = {}  # Cache folder IDs to avoid repeated API calls
+        self.account_key = None
+        self.folder_tree = GoogleDriveFolderCache()  # Folder path -> ID, stored once authenticated
+        self.folder_file_names: Dict[str, Set[str]] = {}  # Folder ID -> names known to be taken
+        self._listed_names: Dict[Tuple[str, str], float] = {}  # (folder ID, base name) -> when listed
+        self._name_listings: Dict[Tuple[str, str], asyncio.Task] = {}  # Listings in flight
+        self.executor = executor
+        self._thread_local = threading.local()  # One AuthorizedHttp per executor thread
+        self._refresh_lock = threading.Lock()
         logger.info("[OK] Google Drive Connector initialized")
 
+    async def _run(self, func, *args) -> Any:
+        """Run a blocking call on the Drive executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor or get_drive_executor(), func, *args)
+
+    async def _execute(self, request) -> Any:
+        """
+        Execute a Drive API request off the event loop.
+
+        Args:
+            request: googleapiclient HttpRequest (e.g. service.files().list(...))
+
+        Returns:
+            Parsed response
+        """
+        return await self._run(self._execute_sync, request)
+
+    def _execute_sync(self, request) -> Any:
+        return request.execute(http=self._thread_http())
+
+    def _thread_http(self) -> Any:
+        """
+        Get this thread's authorized transport (httplib2 is not thread-safe).
+
+        Returns:
+            AuthorizedHttp, or None to use the service's own (no credentials set)
+        """
+        if self.credentials is None:
+            return None
+
+        # Refresh once for all threads instead of each thread racing on an expired token
+        with self._refresh_lock:
+            if not self.credentials.valid:
+                self.credentials.refresh(Request())
+
+        http = getattr(self._thread_local, 'http', None)
+        if http is None:
+            # build_http, not httplib2.Http: resumable uploads need 308 left alone, not followed
+            http = AuthorizedHttp(self.credentials, http=build_http())
+            self._thread_local.http = http
+        return http
+
     async def authenticate(self, credentials_dict: Dict[str, str]) -> bool:
         """
         Authenticate with Google Drive using OAuth2.
@@ -92,9 +231,9 @@ class GoogleDriveConnector:
                     scopes=SCOPES
                 )
 
-                # Refresh the token
-                if self.credentials.expired:
-                    self.credentials.refresh(Request())
+                # Folder IDs found by earlier processes for this account
+                self.account_key = account_key(credentials_dict)
+                self.folder_tree = GoogleDriveFolderCache(self.account_key)
 
             else:
                 # Need to do OAuth flow (would be done via frontend redirect)
@@ -102,10 +241,10 @@ class GoogleDriveConnector:
                 return False
 
             # Build Drive service
-            self.service = build('drive', 'v3', credentials=self.credentials)
+            self.service = await self._run(lambda: build('drive', 'v3', credentials=self.credentials))
 
-            # Test connection
-            about = self.service.about().get(fields='user').execute()
+            # Test connection (also fetches the first access token)
+            about = await self._execute(self.service.about().get(fields='user'))
             logger.info(f"✓ Authenticated as: {about['user']['emailAddress']}")
 
             return True
@@ -129,7 +268,7 @@ class GoogleDriveConnector:
 
             if success:
                 # Get user info
-                about = self.service.about().get(fields='user,storageQuota').execute()
+                about = await self._execute(self.service.about().get(fields='user,storageQuota'))
                 email = about['user']['emailAddress']
 
                 # Get storage info
@@ -170,11 +309,11 @@ class GoogleDriveConnector:
             # Search for existing folder (escape single quotes in folder name)
             escaped_name = escape_drive_query_value(folder_name)
             query = f"name='{escaped_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
-            results = self.service.files().list(
+            results = await self._execute(self.service.files().list(
                 q=query,
                 spaces='drive',
                 fields='files(id, name)'
-            ).execute()
+            ))
 
             files = results.get('files', [])
 
@@ -191,10 +330,10 @@ class GoogleDriveConnector:
                 'mimeType': 'application/vnd.google-apps.folder'
             }
 
-            folder = self.service.files().create(
+            folder = await self._execute(self.service.files().create(
                 body=file_metadata,
                 fields='id'
-            ).execute()
+            ))
 
             folder_id = folder['id']
             logger.info(f"✓ Created new folder '{folder_name}': {folder_id}")
@@ -237,11 +376,11 @@ class GoogleDriveConnector:
             # Search for existing subfolder (escape single quotes in folder name)
             escaped_name = escape_drive_query_value(folder_name)
             query = f"name='{escaped_name}' and '{self.root_folder_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false"
-            results = self.service.files().list(
+            results = await self._execute(self.service.files().list(
                 q=query,
                 spaces='drive',
                 fields='files(id, name)'
-            ).execute()
+            ))
 
             files = results.get('files', [])
 
@@ -259,10 +398,10 @@ class GoogleDriveConnector:
                 'parents': [self.root_folder_id]
             }
 
-            folder = self.service.files().create(
+            folder = await self._execute(self.service.files().create(
                 body=file_metadata,
                 fields='id'
-            ).execute()
+            ))
 
             folder_id = folder['id']
             logger.info(f"✓ Created category folder '{folder_name}': {folder_id}")
@@ -512,128 +651,216 @@ class GoogleDriveConnector:
             Final folder ID or None if failed
         """
         try:
-            # Get folder structure configuration (from user's frontend settings)
-            primary_level = storage_config.get('primary_level')
-            primary_custom_field = storage_config.get('primary_custom_field')
-            secondary_level = storage_config.get('secondary_level')
-            secondary_custom_field = storage_config.get('secondary_custom_field')
-            tertiary_level = storage_config.get('tertiary_level')
-            tertiary_custom_field = storage_config.get('tertiary_custom_field')
-
-            logger.info(f"Building folder path with user config: primary={primary_level}, secondary={secondary_level}, tertiary={tertiary_level}")
-
-            # Build list of folder levels
-            levels = []
-            level_configs = [
-                (primary_level, primary_custom_field),
-                (secondary_level, secondary_custom_field),
-                (tertiary_level, tertiary_custom_field)
-            ]
-
-            for level, custom_field in level_configs:
-                if level and level != 'none':
-                    # Extract string value from enum if needed
-                    level_value = level.value if hasattr(level, 'value') else level
-
-                    # Use custom field name if level is 'custom'
-                    level_key = custom_field if level_value == 'custom' and custom_field else level_value
-
-                    folder_name = self._extract_folder_value(level_key, extracted_data, category)
-                    if folder_name:
-                        # Sanitize folder name
-                        folder_name = self._sanitize_filename_part(folder_name)
-                        levels.append(folder_name)
-                        logger.debug(f"Extracted folder from '{level_value}' (field: {level_key}): {folder_name}")
-                    else:
-                        logger.warning(f"Could not extract folder value for level '{level_value}' (field: {level_key}) - no data available")
-
-            # If no levels extracted, fallback to category only
-            if not levels:
-                levels.append(CATEGORY_FOLDERS.get(category, "Other"))
-
-            # Create nested folders starting from root
-            # First, validate that root_folder_id still exists
-            if self.root_folder_id:
-                try:
-                    self.service.files().get(fileId=self.root_folder_id, fields='id').execute()
-                    logger.debug(f"Root folder ID validated: {self.root_folder_id}")
-                except HttpError as e:
-                    if e.resp.status == 404:
-                        # Root folder no longer exists, clear it
-                        logger.warning(f"Cached root folder ID {self.root_folder_id} no longer exists, will recreate")
-                        self.root_folder_id = None
-                        self.folder_cache.clear()  # Clear all cached folders too
-                    else:
-                        raise
+            return await self._build_folder_path(self._folder_names(extracted_data, category, storage_config))
+        except Exception as e:
+            logger.error(f"Failed to build dynamic folder path: {e}")
+            return None
 
-            # If root_folder_id is None or was cleared, recreate it
-            if not self.root_folder_id:
-                root_folder_name = storage_config.get('root_folder_name', 'DocuFlow')
-                self.root_folder_id = await self._ensure_root_folder(root_folder_name)
-
-            current_folder_id = self.root_folder_id
-            folder_path_parts = []
-
-            for folder_name in levels:
-                # Check cache
-                cache_key = f"{current_folder_id}_{folder_name}"
-                if cache_key in self.folder_cache:
-                    cached_folder_id = self.folder_cache[cache_key]
-                    # Validate cached folder still exists
-                    try:
-                        self.service.files().get(fileId=cached_folder_id, fields='id').execute()
-                        current_folder_id = cached_folder_id
-                        folder_path_parts.append(folder_name)
-                        logger.debug(f"Using cached folder ID for '{folder_name}'")
-                        continue
-                    except HttpError as e:
-                        if e.resp.status == 404:
-                            # Cached folder no longer exists, remove from cache
-                            logger.warning(f"Cached folder '{folder_name}' no longer exists, clearing cache")
-                            del self.folder_cache[cache_key]
-                        else:
-                            raise
-
-                # Search for existing folder (escape single quotes in folder name)
-                escaped_name = escape_drive_query_value(folder_name)
-                query = f"name='{escaped_name}' and '{current_folder_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false"
-                results = self.service.files().list(
-                    q=query,
-                    spaces='drive',
-                    fields='files(id, name)'
-                ).execute()
-
-                files = results.get('files', [])
-
-                if files:
-                    # Folder exists
-                    current_folder_id = files[0]['id']
+    async def _build_folder_path(self, folder_names: List[str]) -> str:
+        """
+        Resolve a folder path, recovering once if a cached folder was deleted in Drive.
+
+        Args:
+            folder_names: Folder names, root folder first
+
+        Returns:
+            Folder ID
+        """
+        try:
+            folder_id = await self._resolve_folder_path(folder_names)
+        except HttpError as e:
+            if not self._is_missing_parent(e):
+                raise
+            await self._revalidate_folder_path(folder_names)
+            folder_id = await self._resolve_folder_path(folder_names)
+
+        logger.info(f"✓ Dynamic folder path: {'/'.join(folder_names[1:])}/")
+        return folder_id
+
+    def _folder_names(
+        self,
+        extracted_data: ExtractedData,
+        category: DocumentCategory,
+        storage_config: Dict[str, Any]
+    ) -> List[str]:
+        """
+        Get the folder names for a document, root folder first.
+
+        Args:
+            extracted_data: Extracted document data
+            category: Document category
+            storage_config: Google Drive configuration with folder structure settings
+
+        Returns:
+            Folder names, e.g. ["DocuFlow", "Invoices", "Acme"]
+        """
+        # Get folder structure configuration (from user's frontend settings)
+        primary_level = storage_config.get('primary_level')
+        primary_custom_field = storage_config.get('primary_custom_field')
+        secondary_level = storage_config.get('secondary_level')
+        secondary_custom_field = storage_config.get('secondary_custom_field')
+        tertiary_level = storage_config.get('tertiary_level')
+        tertiary_custom_field = storage_config.get('tertiary_custom_field')
+
+        logger.info(f"Building folder path with user config: primary={primary_level}, secondary={secondary_level}, tertiary={tertiary_level}")
+
+        # Build list of folder levels
+        levels = []
+        level_configs = [
+            (primary_level, primary_custom_field),
+            (secondary_level, secondary_custom_field),
+            (tertiary_level, tertiary_custom_field)
+        ]
+
+        for level, custom_field in level_configs:
+            if level and level != 'none':
+                # Extract string value from enum if needed
+                level_value = level.value if hasattr(level, 'value') else level
+
+                # Use custom field name if level is 'custom'
+                level_key = custom_field if level_value == 'custom' and custom_field else level_value
+
+                folder_name = self._extract_folder_value(level_key, extracted_data, category)
+                if folder_name:
+                    # Sanitize folder name
+                    folder_name = self._sanitize_filename_part(folder_name)
+                    levels.append(folder_name)
+                    logger.debug(f"Extracted folder from '{level_value}' (field: {level_key}): {folder_name}")
                 else:
-                    # Create new folder
-                    file_metadata = {
-                        'name': folder_name,
-                        'mimeType': 'application/vnd.google-apps.folder',
-                        'parents': [current_folder_id]
-                    }
+                    logger.warning(f"Could not extract folder value for level '{level_value}' (field: {level_key}) - no data available")
+
+        # If no levels extracted, fallback to category only
+        if not levels:
+            levels.append(CATEGORY_FOLDERS.get(category, "Other"))
+
+        return [storage_config.get('root_folder_name') or 'DocuFlow'] + levels
+
+    async def _resolve_folder_path(self, folder_names: List[str]) -> str:
+        """
+        Get the ID of the innermost folder, finding or creating each level.
+
+        Cached IDs are used without asking Drive. Each uncached path is looked up
+        by one caller at a time, so concurrent uploads never create it twice. Other
+        worker processes are reconciled through the stored folder map: it is re-read
+        before creating, and a folder created at the same time as another process's
+        is deleted in favor of the one stored first.
+
+        Args:
+            folder_names: Folder names, root folder first
+
+        Returns:
+            Folder ID
+        """
+        await self.folder_tree.load()
+
+        folder_id = None
+        for depth, folder_name in enumerate(folder_names, start=1):
+            path = folder_path_key(folder_names[:depth])
+            parent_id = folder_id
+
+            folder_id = self.folder_tree.get(path)
+            if folder_id is None:
+                async with self.folder_tree.lock(path):
+                    # Another upload, here or in another worker process, may have created it while we waited
+                    folder_id = self.folder_tree.peek(path) or await self.folder_tree.refresh(path)
+                    if folder_id is None:
+                        folder_id, created = await self._find_or_create_folder(folder_name, parent_id)
+                        stored_id = await self.folder_tree.put(path, folder_id)
+                        if stored_id != folder_id:
+                            logger.info(f"Folder '{path}' was resolved by another worker, using its ID")
+                            if created:
+                                await self._delete_duplicate_folder(folder_id)
+                            folder_id = stored_id
+
+            if depth == 1:
+                self.root_folder_id = folder_id
+
+        return folder_id
+
+    async def _find_or_create_folder(self, folder_name: str, parent_id: Optional[str]) -> Tuple[str, bool]:
+        """
+        Find a folder by name under a parent, creating it if missing.
 
-                    folder = self.service.files().create(
-                        body=file_metadata,
-                        fields='id'
-                    ).execute()
+        Args:
+            folder_name: Folder name
+            parent_id: Parent folder ID (None for the root folder, found anywhere)
 
-                    current_folder_id = folder['id']
-                    logger.info(f"✓ Created folder: {folder_name}")
+        Returns:
+            Tuple of (folder ID, whether it was created)
+        """
+        # Search for existing folder (escape single quotes in folder name)
+        escaped_name = escape_drive_query_value(folder_name)
+        query = f"name='{escaped_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
+        if parent_id:
+            query += f" and '{parent_id}' in parents"
+        results = await self._execute(self.service.files().list(
+            q=query,
+            spaces='drive',
+            fields='files(id, name)'
+        ))
+
+        files = results.get('files', [])
+        if files:
+            return files[0]['id'], False
+
+        # Create new folder
+        file_metadata = {
+            'name': folder_name,
+            'mimeType': 'application/vnd.google-apps.folder'
+        }
+        if parent_id:
+            file_metadata['parents'] = [parent_id]
 
-                # Cache the folder ID
-                self.folder_cache[cache_key] = current_folder_id
-                folder_path_parts.append(folder_name)
+        folder = await self._execute(self.service.files().create(
+            body=file_metadata,
+            fields='id'
+        ))
 
-            logger.info(f"✓ Dynamic folder path: {'/'.join(folder_path_parts)}/")
-            return current_folder_id
+        logger.info(f"✓ Created folder: {folder_name}")
+        return folder['id'], True
 
+    async def _delete_duplicate_folder(self, folder_id: str) -> None:
+        """Delete a folder this upload just created that lost to another worker's (still empty)."""
+        try:
+            await self._execute(self.service.files().delete(fileId=folder_id))
         except Exception as e:
-            logger.error(f"Failed to build dynamic folder path: {e}")
-            return None
+            logger.warning(f"Could not delete duplicate Google Drive folder {folder_id}: {e}")
+
+    async def _revalidate_folder_path(self, folder_names: List[str]) -> None:
+        """
+        Check cached folders from the root down and forget the first one that is gone.
+
+        Called only after Drive rejected a cached folder as a parent.
+
+        Args:
+            folder_names: Folder names, root folder first
+        """
+        for depth in range(1, len(folder_names) + 1):
+            path = folder_path_key(folder_names[:depth])
+            folder_id = self.folder_tree.peek(path)
+            if folder_id is not None:
+                try:
+                    folder = await self._execute(self.service.files().get(fileId=folder_id, fields='id, trashed'))
+                    if not folder.get('trashed'):
+                        continue
+                except HttpError as e:
+                    if e.resp.status != 404:
+                        raise
+
+            # Missing (or never cached): forget it and everything below it
+            logger.warning(f"Cached Google Drive folder '{path}' no longer exists, will recreate")
+            await self.folder_tree.evict(path)
+            if depth == 1:
+                self.root_folder_id = None
+            return
+
+    @staticmethod
+    def _is_missing_parent(error: HttpError) -> bool:
+        """Whether Drive rejected a request because its parent folder doesn't exist."""
+        if error.resp.status == 404:
+            return True
+        content = error.content.decode(errors='ignore') if isinstance(error.content, bytes) else str(error.content)
+        return error.resp.status == 400 and 'parent' in content.lower()
 
     async def upload_document(
         self,
@@ -655,140 +882,459 @@ class GoogleDriveConnector:
             Dict with file_id, web_view_link, and folder_path, or None if failed
         """
         try:
-            # Handle both enum and string values for category
-            if isinstance(category, str):
-                try:
-                    category = DocumentCategory(category)
-                except ValueError:
-                    category = DocumentCategory.OTHER
-
-            if not self.service:
-                logger.error("Not authenticated to Google Drive")
+            plan = await self._plan_upload(pdf_path, extracted_data, category, storage_config)
+            if not plan:
                 return None
 
-            # Ensure root folder exists
-            if not self.root_folder_id:
-                root_folder = storage_config.get('root_folder_name', 'DocuFlow')
-                self.root_folder_id = await self.get_or_create_root_folder(root_folder)
-
-            if not self.root_folder_id:
-                logger.error("Failed to get/create root folder")
-                return None
+            file_metadata, folder_names = plan
+            return await self._send_file(pdf_path, file_metadata, folder_names)
 
-            # Build dynamic folder path based on configuration
-            folder_id = await self.build_dynamic_folder_path(extracted_data, category, storage_config)
+        except HttpError as e:
+            logger.error(f"Drive upload failed: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Upload error: {e}")
+            return None
 
-            if not folder_id:
-                logger.error("Failed to build dynamic folder path")
-                return None
+    async def upload_documents(
+        self,
+        documents: List[Dict[str, Any]],
+        storage_config: Dict[str, Any],
+        concurrency: int = DEFAULT_UPLOAD_CONCURRENCY
+    ) -> List[Dict[str, Any]]:
+        """
+        Upload several documents with bounded concurrency.
 
-            # Generate filename
-            original_filename = pdf_path.name
-            new_filename = self.generate_filename(extracted_data, original_filename)
+        Folders are resolved concurrently (each new folder is created once, by
+        whichever upload needs it first) and filenames are reserved per folder, so
+        same-named documents get distinct names; file bodies upload in parallel on
+        the Drive executor.
 
-            # Check for duplicates and handle
-            final_filename = await self._handle_duplicate_filename(new_filename, folder_id)
+        A document with an "idempotency_key" is tagged with it (UPLOAD_KEY_PROPERTY), and
+        if a file with that key already exists, e.g. uploaded by an attempt whose outcome
+        was lost, that file is returned instead of uploading a duplicate.
 
-            # Prepare metadata
-            file_metadata = {
-                'name': final_filename,
-                'parents': [folder_id],
-                'appProperties': self._build_metadata(extracted_data, category)
-            }
+        Args:
+            documents: List of {"pdf_path": ..., "extracted_data": ExtractedData, "category": ...,
+                "idempotency_key": optional}
+            storage_config: Google Drive configuration
+            concurrency: Maximum uploads in flight
 
-            # Upload file
-            media = MediaFileUpload(
-                str(pdf_path),
-                mimetype='application/pdf',
-                resumable=True
+        Returns:
+            One result per document, in order: success plus the upload_document fields,
+            or success False with an error. Failures don't stop the rest of the batch.
+        """
+        if not self.service:
+            return [{
+                "success": False,
+                "message": "Google Drive upload failed",
+                "error": "Not authenticated to Google Drive"
+            } for _ in documents]
+
+        async def upload(document: Dict[str, Any]) -> Dict[str, Any]:
+            idempotency_key = document.get('idempotency_key')
+            if idempotency_key:
+                existing = await self._find_uploaded_file(idempotency_key)
+                if existing:
+                    logger.info(f"Drive already has upload {idempotency_key}: {existing['filename']}")
+                    return {"success": True, **existing}
+
+            pdf_path = Path(document['pdf_path'])
+            plan = await self._plan_upload(
+                pdf_path, document['extracted_data'], document['category'], storage_config
             )
+            if not plan:
+                return {
+                    "success": False,
+                    "message": "Google Drive upload failed",
+                    "error": "Could not prepare folder for upload"
+                }
+
+            file_metadata, folder_names = plan
+            if idempotency_key:
+                file_metadata['appProperties'][UPLOAD_KEY_PROPERTY] = idempotency_key
+            result = await self._send_file(pdf_path, file_metadata, folder_names)
+            return {"success": True, **result}
+
+        results = await run_bounded_uploads(documents, upload, concurrency)
+        uploaded = sum(1 for result in results if result.get('success'))
+        logger.info(f"Google Drive bulk upload: {uploaded}/{len(documents)} documents uploaded")
+        return results
+
+    async def _find_uploaded_file(self, idempotency_key: str) -> Optional[Dict[str, str]]:
+        """
+        Find a file an earlier attempt uploaded with this idempotency key.
 
-            file = self.service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id,webViewLink,name'
-            ).execute()
+        Args:
+            idempotency_key: Upload's idempotency key
 
-            logger.info(f"✓ Uploaded to Drive: {file['name']} (ID: {file['id']})")
+        Returns:
+            Dict with file_id, web_view_link, filename and folder_path, or None if not found
+        """
+        query = (
+            f"appProperties has {{ key='{UPLOAD_KEY_PROPERTY}' and value='{escape_drive_query_value(idempotency_key)}' }}"
+            " and trashed=false"
+        )
+        results = await self._execute(self.service.files().list(
+            q=query,
+            spaces='drive',
+            fields='files(id, name, webViewLink, appProperties)',
+            pageSize=1
+        ))
+        files = results.get('files', [])
+        if not files:
+            return None
 
-            category_folder_name = CATEGORY_FOLDERS.get(category, "Other")
+        file = files[0]
+        try:
+            category = DocumentCategory((file.get('appProperties') or {}).get('category'))
+        except ValueError:
+            category = DocumentCategory.OTHER
+        return {
+            'file_id': file['id'],
+            'web_view_link': file.get('webViewLink'),
+            'filename': file['name'],
+            'folder_path': f"/DocuFlow/{CATEGORY_FOLDERS[category]}/"
+        }
 
-            return {
-                'file_id': file['id'],
-                'web_view_link': file.get('webViewLink'),
-                'filename': file['name'],
-                'folder_path': f"/DocuFlow/{category_folder_name}/"
-            }
+    async def _plan_upload(
+        self,
+        pdf_path: Path,
+        extracted_data: ExtractedData,
+        category: DocumentCategory,
+        storage_config: Dict[str, Any]
+    ) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+        """
+        Resolve the target folder and filename for an upload.
 
-        except HttpError as e:
-            logger.error(f"Drive upload failed: {e}")
+        Args:
+            pdf_path: Path to PDF file
+            extracted_data: Extracted document data
+            category: Document category
+            storage_config: Google Drive configuration
+
+        Returns:
+            Tuple of (file metadata for files().create, folder names root first),
+            or None if failed
+        """
+        # Handle both enum and string values for category
+        if isinstance(category, str):
+            try:
+                category = DocumentCategory(category)
+            except ValueError:
+                category = DocumentCategory.OTHER
+
+        if not self.service:
+            logger.error("Not authenticated to Google Drive")
             return None
+
+        # Build dynamic folder path based on configuration (root folder included)
+        folder_names = self._folder_names(extracted_data, category, storage_config)
+        try:
+            folder_id = await self._build_folder_path(folder_names)
         except Exception as e:
-            logger.error(f"Upload error: {e}")
+            logger.error(f"Failed to build dynamic folder path: {e}")
             return None
 
-    async def _handle_duplicate_filename(self, filename: str, folder_id: str) -> str:
+        # Generate filename, numbered if the folder already has one like it
+        new_filename = self.generate_filename(extracted_data, pdf_path.name)
+        final_filename = await self._handle_duplicate_filename(new_filename, folder_id)
+
+        # Prepare metadata
+        file_metadata = {
+            'name': final_filename,
+            'parents': [folder_id],
+            'appProperties': self._build_metadata(extracted_data, category)
+        }
+        return file_metadata, folder_names
+
+    async def _send_file(
+        self,
+        pdf_path: Path,
+        file_metadata: Dict[str, Any],
+        folder_names: List[str]
+    ) -> Dict[str, str]:
         """
-        Handle duplicate filenames by adding (1), (2), etc.
+        Upload the file, re-resolving its folder once if Drive says it no longer exists.
 
         Args:
-            filename: Proposed filename
-            folder_id: Parent folder ID
+            pdf_path: Path to PDF file
+            file_metadata: Name, parent folder and app properties from _plan_upload
+            folder_names: Folder names of the parent, root folder first
 
         Returns:
-            Final filename (potentially with number suffix)
+            Dict with file_id, web_view_link, filename and folder_path
         """
         try:
-            # Check if file exists
-            query = f"name='{filename}' and '{folder_id}' in parents and trashed=false"
-            results = self.service.files().list(
-                q=query,
-                spaces='drive',
-                fields='files(id, name)'
-            ).execute()
+            try:
+                return await self._create_file(pdf_path, file_metadata)
+            except HttpError as e:
+                if not self._is_missing_parent(e):
+                    raise
+                logger.warning(f"Drive rejected cached folder for {file_metadata['name']}, re-validating folder path")
+
+            await self._revalidate_folder_path(folder_names)
+            self._release_filename(file_metadata['parents'][0], file_metadata['name'])
+            file_metadata['parents'] = [await self._resolve_folder_path(folder_names)]
+            file_metadata['name'] = await self._handle_duplicate_filename(
+                file_metadata['name'], file_metadata['parents'][0]
+            )
+            return await self._create_file(pdf_path, file_metadata)
+        except BaseException:
+            # The name was never used; let the next upload have it
+            self._release_filename(file_metadata['parents'][0], file_metadata['name'])
+            raise
 
-            files = results.get('files', [])
+    async def _create_file(self, pdf_path: Path, file_metadata: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Send the file body to Drive in resumable chunks.
 
-            if not files:
-                # No duplicate, use original name
-                return filename
+        Each chunk runs on the Drive executor. Failed chunks (5xx, 429, dropped
+        connection) are retried with backoff from the last byte Drive acknowledged.
+        For authenticated accounts the session is stored after every chunk, so an
+        upload interrupted here, or in a worker that restarted, resumes instead of
+        starting over.
 
-            # File exists, add number suffix
-            base_name = Path(filename).stem
-            extension = Path(filename).suffix
+        Args:
+            pdf_path: Path to PDF file
+            file_metadata: Name, parent folder and app properties from _plan_upload
+
+        Returns:
+            Dict with file_id, web_view_link, filename and folder_path
+        """
+        media = MediaFileUpload(
+            str(pdf_path),
+            mimetype='application/pdf',
+            chunksize=upload_chunk_size(),
+            resumable=True
+        )
+        request = self.service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields='id,webViewLink,name'
+        )
+
+        upload_key = self._upload_key(pdf_path, file_metadata, media.size()) if self.account_key else None
+        stored_uri = await self._resume_upload_session(request, upload_key)
+
+        file = None
+        failures = 0
+        while file is None:
+            try:
+                _, file = await self._run(self._next_chunk, request)
+                failures = 0
+            except HttpError as e:
+                if stored_uri and request.resumable_uri == stored_uri and e.resp.status in (404, 410):
+                    # Drive no longer knows the stored session; start a new one
+                    logger.warning(f"Stored Drive upload session for {file_metadata['name']} expired, starting over")
+                    await self._forget_upload_session(upload_key)
+                    request.resumable_uri = None
+                    request.resumable_progress = 0
+                    request._in_error_state = False
+                    stored_uri = None
+                    continue
+                failures += 1
+                if e.resp.status not in RETRYABLE_UPLOAD_STATUSES or failures > settings.google_drive_upload_max_retries:
+                    raise
+                delay = upload_retry_delay(failures, e.resp.get('retry-after'))
+                reason = f"HTTP {e.resp.status}"
+            except (httplib2.HttpLib2Error, ConnectionError, TimeoutError) as e:
+                failures += 1
+                if failures > settings.google_drive_upload_max_retries:
+                    raise
+                # Ask Drive how much arrived before sending more
+                request._in_error_state = request.resumable_uri is not None
+                delay = upload_retry_delay(failures)
+                reason = str(e) or type(e).__name__
+
+            if upload_key and request.resumable_uri and file is None:
+                stored_uri = request.resumable_uri
+                await self._store_upload_session(upload_key, request, pdf_path, media.size())
+
+            if failures:
+                logger.warning(
+                    f"Drive upload of {file_metadata['name']} failed at byte {request.resumable_progress} "
+                    f"({reason}); retry {failures}/{settings.google_drive_upload_max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+        if upload_key and stored_uri:
+            await self._forget_upload_session(upload_key)
+
+        logger.info(f"✓ Uploaded to Drive: {file['name']} (ID: {file['id']})")
 
-            counter = 1
-            while True:
-                new_filename = f"{base_name} ({counter}){extension}"
+        category_folder_name = CATEGORY_FOLDERS.get(
+            DocumentCategory(file_metadata['appProperties']['category']), "Other"
+        )
 
-                # Check if this numbered version exists
-                query = f"name='{new_filename}' and '{folder_id}' in parents and trashed=false"
-                results = self.service.files().list(
-                    q=query,
-                    spaces='drive',
-                    fields='files(id)'
-                ).execute()
+        return {
+            'file_id': file['id'],
+            'web_view_link': file.get('webViewLink'),
+            'filename': file['name'],
+            'folder_path': f"/DocuFlow/{category_folder_name}/"
+        }
+
+    def _next_chunk(self, request) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        return request.next_chunk(http=self._thread_http())
 
-                if not results.get('files'):
-                    logger.info(f"Renamed duplicate: {filename} → {new_filename}")
-                    return new_filename
+    def _upload_key(self, pdf_path: Path, file_metadata: Dict[str, Any], size: int) -> str:
+        """Identify an upload by account, target folder, filename and local file."""
+        raw = "|".join([
+            self.account_key, file_metadata['parents'][0], file_metadata['name'],
+            str(Path(pdf_path).resolve()), str(size)
+        ])
+        return hashlib.sha256(raw.encode()).hexdigest()
 
-                counter += 1
+    async def _resume_upload_session(self, request, upload_key: Optional[str]) -> Optional[str]:
+        """
+        Point a new upload request at a stored session for the same upload, if any.
 
-                # Safety limit
-                if counter > 100:
-                    # Fallback: add timestamp
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    return f"{base_name}_{timestamp}{extension}"
+        Args:
+            request: files().create request with resumable media
+            upload_key: _upload_key() of the upload, or None if sessions aren't stored
 
+        Returns:
+            The stored session URI, or None if the upload starts a new session
+        """
+        if not upload_key:
+            return None
+        try:
+            session = await get_google_drive_upload_session(upload_key)
+        except Exception as e:
+            logger.warning(f"Could not read stored Drive upload session: {e}")
+            return None
+        if session is None:
+            return None
+
+        age = (datetime.utcnow() - session['created_at']).total_seconds()
+        if age > settings.google_drive_upload_session_ttl_seconds:
+            await self._forget_upload_session(upload_key)
+            return None
+
+        request.resumable_uri = session['session_uri']
+        # The next chunk first asks Drive for the last byte it acknowledged
+        request._in_error_state = True
+        logger.info(f"Resuming Drive upload of {session['file_path']} after byte {session['bytes_sent']}")
+        return session['session_uri']
+
+    async def _store_upload_session(self, upload_key: str, request, pdf_path: Path, size: int) -> None:
+        try:
+            await save_google_drive_upload_session(
+                upload_key, request.resumable_uri, str(pdf_path), size, request.resumable_progress
+            )
+        except Exception as e:
+            logger.warning(f"Could not store Drive upload session: {e}")
+
+    async def _forget_upload_session(self, upload_key: str) -> None:
+        try:
+            await delete_google_drive_upload_session(upload_key)
+        except Exception as e:
+            logger.warning(f"Could not delete stored Drive upload session: {e}")
+
+    async def _handle_duplicate_filename(self, filename: str, folder_id: str) -> str:
+        """
+        Handle duplicate filenames by adding (1), (2), etc.
+
+        Names in the folder starting with the base name are listed once and the
+        next free number is picked locally. The chosen name is reserved in the
+        folder's name set, so concurrent uploads never pick the same one.
+
+        Args:
+            filename: Proposed filename
+            folder_id: Parent folder ID
+
+        Returns:
+            Final filename (potentially with number suffix)
+        """
+        base_name = Path(filename).stem
+        extension = Path(filename).suffix
+
+        try:
+            taken = await self._names_in_folder(folder_id, base_name)
         except Exception as e:
             logger.error(f"Error checking duplicates: {e}")
             # If check fails, add timestamp to be safe
-            base_name = Path(filename).stem
-            extension = Path(filename).suffix
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             return f"{base_name}_{timestamp}{extension}"
 
+        # No awaits from here on, so two uploads can't pick the same free name
+        final_filename = filename
+        counter = 1
+        while final_filename in taken:
+            final_filename = f"{base_name} ({counter}){extension}"
+            counter += 1
+
+        if final_filename != filename:
+            logger.info(f"Renamed duplicate: {filename} → {final_filename}")
+        taken.add(final_filename)
+        return final_filename
+
+    async def _names_in_folder(self, folder_id: str, base_name: str) -> Set[str]:
+        """
+        Get the names taken in a folder, listing those that start with base_name once.
+
+        Concurrent callers for the same folder and base name share one listing.
+
+        Args:
+            folder_id: Folder ID
+            base_name: Filename without extension
+
+        Returns:
+            The folder's name set (shared; add reserved names to it)
+        """
+        key = (folder_id, base_name)
+        listed_at = self._listed_names.get(key)
+        if listed_at is not None and time.monotonic() - listed_at < settings.google_drive_name_cache_ttl_seconds:
+            return self.folder_file_names.setdefault(folder_id, set())
+
+        listing = self._name_listings.get(key)
+        if listing is None:
+            listing = asyncio.ensure_future(self._list_names(folder_id, base_name))
+            self._name_listings[key] = listing
+            listing.add_done_callback(lambda _: self._name_listings.pop(key, None))
+        await asyncio.shield(listing)
+        return self.folder_file_names.setdefault(folder_id, set())
+
+    async def _list_names(self, folder_id: str, base_name: str) -> None:
+        """
+        List a folder's names starting with base_name into its name set.
+
+        Args:
+            folder_id: Folder ID
+            base_name: Filename without extension
+        """
+        # "contains" matches name prefixes, so this also finds "name (1).pdf", "name (2).pdf", ...
+        query = f"name contains '{escape_drive_query_value(base_name)}' and '{folder_id}' in parents and trashed=false"
+        found = set()
+        page_token = None
+        while True:
+            results = await self._execute(self.service.files().list(
+                q=query,
+                spaces='drive',
+                fields='nextPageToken, files(name)',
+                pageSize=1000,
+                pageToken=page_token
+            ))
+            found.update(file['name'] for file in results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+        self.folder_file_names.setdefault(folder_id, set()).update(found)
+
+        # Forget listings that have expired so the map doesn't grow with every document
+        now = time.monotonic()
+        ttl = settings.google_drive_name_cache_ttl_seconds
+        if len(self._listed_names) > 1000:
+            self._listed_names = {k: t for k, t in self._listed_names.items() if now - t < ttl}
+        self._listed_names[(folder_id, base_name)] = now
+
+    def _release_filename(self, folder_id: str, filename: str) -> None:
+        """Forget a reserved name whose upload failed."""
+        names = self.folder_file_names.get(folder_id)
+        if names is not None:
+            names.discard(filename)
+
     def _build_metadata(self, extracted_data: ExtractedData, category: DocumentCategory) -> Dict[str, str]:
         """
         Build custom metadata properties for Drive file.
@@ -840,6 +1386,10 @@ class GoogleDriveConnector:
         return metadata
 
     def clear_cache(self):
-        """Clear cached folder IDs."""
+        """Clear cached folder IDs (stored ones are reloaded on next use)."""
+        self.root_folder_id = None
         self.folder_cache = {}
+        self.folder_tree.clear()
+        self.folder_file_names = {}
+        self._listed_names = {}
         logger.info("Google Drive cache cleared")
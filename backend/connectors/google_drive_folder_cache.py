@@ -0,0 +1,195 @@
+"""
+Cache of Google Drive folder IDs per account, keyed by folder path
+(e.g. "DocuFlow/Invoices/Acme"). Cached IDs are trusted without checking Drive and
+are kept in SQLite so they survive restarts; a path is only re-validated when an
+upload reports its parent folder is gone.
+
+The stored map is shared by every worker process: a path missing in memory is re-read
+from it before a folder is created, and the first ID stored for a path wins.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+from database import (
+    claim_google_drive_folder, delete_google_drive_folders, get_google_drive_folder, get_google_drive_folders
+)
+
+logger = logging.getLogger(__name__)
+
+
+def account_key(credentials: Dict[str, str]) -> str:
+    """
+    Identify a Drive account by its OAuth client and refresh token.
+
+    Args:
+        credentials: refresh_token, client_id, client_secret
+
+    Returns:
+        Hex digest (the refresh token itself is never kept as a key)
+    """
+    raw = f"{credentials.get('client_id') or ''}:{credentials.get('refresh_token') or ''}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def folder_path_key(names: List[str]) -> str:
+    """Join folder names (root first) into a cache key."""
+    return "/".join(names)
+
+
+class GoogleDriveFolderCache:
+    """
+    Two-level (memory, then database) map of folder path -> Drive folder ID for one account.
+
+    The database copy is read once, on first use, and a path is re-read on a miss (see
+    refresh()). Without an account key (connectors built directly in tests) the cache is
+    memory only.
+    """
+
+    def __init__(self, account: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            account: account_key() of the Drive account, or None for memory only
+        """
+        self.account = account
+        self._folders: Dict[str, str] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._load_lock = asyncio.Lock()
+        self._loaded = account is None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def load(self) -> None:
+        """Read the account's stored folders into memory (once)."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                stored = await get_google_drive_folders(self.account)
+            except Exception as e:
+                logger.warning(f"Could not load stored Google Drive folders: {e}")
+                stored = {}
+            self._loaded = True
+            # Folders resolved before the load finished win over stored ones
+            self._folders = {**stored, **self._folders}
+            logger.debug(f"Loaded {len(stored)} stored Google Drive folders")
+
+    def get(self, path: str) -> Optional[str]:
+        """
+        Get a cached folder ID (no API call, no database read).
+
+        Args:
+            path: Folder path key
+
+        Returns:
+            Folder ID, or None if not cached
+        """
+        folder_id = self._folders.get(path)
+        if folder_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return folder_id
+
+    def peek(self, path: str) -> Optional[str]:
+        """Get a cached folder ID without counting a hit or miss."""
+        return self._folders.get(path)
+
+    def lock(self, path: str) -> asyncio.Lock:
+        """
+        Lock held while a path is looked up or created, so this process creates it only
+        once. Other processes are reconciled through the stored map (refresh(), put()).
+        """
+        return self._locks.setdefault(path, asyncio.Lock())
+
+    async def refresh(self, path: str) -> Optional[str]:
+        """
+        Re-read a path missing in memory from the stored map, in case another worker
+        process resolved it since the map was loaded.
+
+        Args:
+            path: Folder path key
+
+        Returns:
+            Folder ID, or None if no process stored one
+        """
+        if self.account is None:
+            return self._folders.get(path)
+        try:
+            folder_id = await get_google_drive_folder(self.account, path)
+        except Exception as e:
+            logger.warning(f"Could not read stored Google Drive folder '{path}': {e}")
+            return None
+        if folder_id is not None:
+            self._folders[path] = folder_id
+        return folder_id
+
+    async def put(self, path: str, folder_id: str) -> str:
+        """
+        Remember a resolved folder. If another worker process stored a folder for the
+        path first, that one is kept and returned instead.
+
+        Args:
+            path: Folder path key
+            folder_id: Drive folder ID
+
+        Returns:
+            Folder ID to use for the path
+        """
+        if self.account is not None:
+            try:
+                folder_id = await claim_google_drive_folder(self.account, path, folder_id)
+            except Exception as e:
+                logger.warning(f"Could not store Google Drive folder '{path}': {e}")
+        self._folders[path] = folder_id
+        return folder_id
+
+    async def evict(self, path: str) -> None:
+        """
+        Forget a folder and every folder below it.
+
+        Args:
+            path: Folder path key
+        """
+        prefix = path + "/"
+        stale = [key for key in self._folders if key == path or key.startswith(prefix)]
+        for key in stale:
+            del self._folders[key]
+        self.evictions += len(stale)
+        if self.account is None:
+            return
+        try:
+            await delete_google_drive_folders(self.account, path)
+        except Exception as e:
+            logger.warning(f"Could not delete stored Google Drive folder '{path}': {e}")
+
+    def clear(self) -> None:
+        """Forget every folder in memory; the next use reloads the stored copy."""
+        self._folders.clear()
+        self._locks.clear()
+        self._loaded = self.account is None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict with folders (in memory), hits, misses and evictions
+        """
+        return {
+            "folders": len(self._folders),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
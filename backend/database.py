@@ -7,9 +7,14 @@ try:
     import aiosqlite
 except ImportError:
     aiosqlite = None  # Allow synchronous operations if aiosqlite not installed
+import copy
 import json
 import logging
-from typing import Optional, List, Dict, Any
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple, Set, Callable, Awaitable
 from datetime import datetime
 from pathlib import Path
 
@@ -19,19 +24,273 @@ logger = logging.getLogger(__name__)
 DB_PATH = Path(__file__).parent.parent / "docuflow.db"
 
 
+# ============================================================================
+# Connection Pooling
+# ============================================================================
+
+# Idle connections kept open per database file (async and sync pooled separately).
+# Set to 0 to close every connection on release (no pooling).
+DB_POOL_MAX_IDLE = 8
+
+# Per-connection statement cache (sqlite3 reuses prepared statements by SQL text)
+DB_STATEMENT_CACHE_SIZE = 256
+
+# Applied once when a pooled connection is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",        # Safe with WAL, avoids fsync per commit
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA busy_timeout=30000",        # 30 second lock wait
+    "PRAGMA cache_size=-16000",         # ~16 MB page cache
+    "PRAGMA mmap_size=268435456",       # 256 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _db_file_id(path: str) -> Optional[Tuple[int, int]]:
+    """Identify the database file so connections to a replaced file aren't reused."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+class ConnectionPool:
+    """
+    Pool of open SQLite connections, keyed by database file path.
+
+    Connections are checked out exclusively and returned on close(). PRAGMAs
+    are applied once per connection and each connection keeps its prepared
+    statement cache across checkouts. Any open transaction is rolled back on
+    release. Idle connections whose file has been deleted or replaced are
+    discarded on the next checkout.
+    """
+
+    def __init__(self, max_idle: int = DB_POOL_MAX_IDLE):
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        # kind ("async"/"sync") -> path -> [(connection, file_id)]
+        self._idle: Dict[str, Dict[str, List[Tuple[Any, Any]]]] = {"async": {}, "sync": {}}
+        self._in_use = {"async": 0, "sync": 0}
+        self._counters = {
+            "async_opened": 0,
+            "async_reused": 0,
+            "sync_opened": 0,
+            "sync_reused": 0,
+            "discarded": 0
+        }
+
+    def _take_idle(self, kind: str, path: str) -> Tuple[Optional[Any], List[Any]]:
+        """Pop a reusable idle connection; also return stale ones for closing."""
+        file_id = _db_file_id(path)
+        stale = []
+        with self._lock:
+            idle = self._idle[kind].get(path, [])
+            while idle:
+                conn, conn_file_id = idle.pop()
+                if conn_file_id == file_id:
+                    self._counters[f"{kind}_reused"] += 1
+                    self._in_use[kind] += 1
+                    return conn, stale
+                stale.append(conn)
+            self._counters["discarded"] += len(stale)
+        return None, stale
+
+    def _keep_idle(self, kind: str, path: str, conn: Any, file_id: Any) -> bool:
+        with self._lock:
+            self._in_use[kind] -= 1
+            idle = self._idle[kind].setdefault(path, [])
+            if len(idle) < self.max_idle and file_id is not None and file_id == _db_file_id(path):
+                idle.append((conn, file_id))
+                return True
+            return False
+
+    async def acquire_async(self, path: str) -> "PooledAsyncConnection":
+        """Check out an aiosqlite connection for path."""
+        conn, stale = self._take_idle("async", path)
+        for stale_conn in stale:
+            await _close_quietly(stale_conn)
+
+        if conn is None:
+            pending = aiosqlite.connect(path, timeout=30.0, cached_statements=DB_STATEMENT_CACHE_SIZE)
+            # Idle pooled connections must not keep the interpreter alive at exit
+            pending.daemon = True
+            conn = await pending
+            for pragma in CONNECTION_PRAGMAS:
+                await conn.execute(pragma)
+            with self._lock:
+                self._counters["async_opened"] += 1
+                self._in_use["async"] += 1
+
+        conn.row_factory = aiosqlite.Row
+        return PooledAsyncConnection(self, conn, path)
+
+    async def release_async(self, conn: Any, path: str) -> None:
+        """Return an aiosqlite connection to the pool (or close it)."""
+        try:
+            if conn.in_transaction:
+                await conn.rollback()
+            file_id = _db_file_id(path)
+        except Exception as e:
+            logger.warning(f"Discarding pooled connection after error: {e}")
+            file_id = None
+
+        if not self._keep_idle("async", path, conn, file_id):
+            await _close_quietly(conn)
+
+    def acquire_sync(self, path: str) -> "PooledSyncConnection":
+        """Check out a sqlite3 connection for path."""
+        conn, stale = self._take_idle("sync", path)
+        for stale_conn in stale:
+            stale_conn.close()
+
+        if conn is None:
+            conn = sqlite3.connect(
+                path,
+                timeout=30.0,  # 30 second timeout
+                check_same_thread=False,  # Checked out by one thread at a time
+                cached_statements=DB_STATEMENT_CACHE_SIZE
+            )
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            with self._lock:
+                self._counters["sync_opened"] += 1
+                self._in_use["sync"] += 1
+
+        conn.row_factory = sqlite3.Row
+        return PooledSyncConnection(self, conn, path)
+
+    def release_sync(self, conn: sqlite3.Connection, path: str) -> None:
+        """Return a sqlite3 connection to the pool (or close it)."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            file_id = _db_file_id(path)
+        except Exception as e:
+            logger.warning(f"Discarding pooled connection after error: {e}")
+            file_id = None
+
+        if not self._keep_idle("sync", path, conn, file_id):
+            conn.close()
+
+    async def close_all(self) -> None:
+        """Close every idle connection (on shutdown, or before a database file is replaced)."""
+        with self._lock:
+            async_conns = [conn for idle in self._idle["async"].values() for conn, _ in idle]
+            sync_conns = [conn for idle in self._idle["sync"].values() for conn, _ in idle]
+            self._idle = {"async": {}, "sync": {}}
+
+        for conn in async_conns:
+            await _close_quietly(conn)
+        for conn in sync_conns:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool counters and current sizes."""
+        with self._lock:
+            return {
+                **self._counters,
+                "async_in_use": self._in_use["async"],
+                "sync_in_use": self._in_use["sync"],
+                "async_idle": sum(len(idle) for idle in self._idle["async"].values()),
+                "sync_idle": sum(len(idle) for idle in self._idle["sync"].values()),
+                "max_idle": self.max_idle
+            }
+
+
+async def _close_quietly(conn: Any) -> None:
+    try:
+        await conn.close()
+    except Exception as e:
+        logger.debug(f"Error closing pooled connection: {e}")
+
+
+class PooledAsyncConnection:
+    """
+    aiosqlite connection checked out of the pool.
+    Behaves like the underlying connection; close() returns it to the pool.
+    """
+
+    def __init__(self, pool: ConnectionPool, conn: Any, path: str):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_path", path)
+        object.__setattr__(self, "_released", False)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._conn, name, value)
+
+    async def close(self) -> None:
+        if self._released:
+            return
+        object.__setattr__(self, "_released", True)
+        await self._pool.release_async(self._conn, self._path)
+
+    async def __aenter__(self) -> "PooledAsyncConnection":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+
+class PooledSyncConnection:
+    """
+    sqlite3 connection checked out of the pool.
+    Behaves like the underlying connection; close() returns it to the pool.
+    """
+
+    def __init__(self, pool: ConnectionPool, conn: sqlite3.Connection, path: str):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_path", path)
+        object.__setattr__(self, "_released", False)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._conn, name, value)
+
+    def close(self) -> None:
+        if self._released:
+            return
+        object.__setattr__(self, "_released", True)
+        self._pool.release_sync(self._conn, self._path)
+
+    def __enter__(self) -> "PooledSyncConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+db_pool = ConnectionPool()
+
+
+def get_db_pool_stats() -> Dict[str, Any]:
+    """Get connection pool metrics."""
+    return db_pool.stats()
+
+
+async def close_db_pool() -> None:
+    """Close all idle pooled connections."""
+    await db_pool.close_all()
+
+
 def get_db_connection():
     """
-    Get a synchronous SQLite database connection.
+    Get a synchronous SQLite database connection from the pool.
     Used for non-async code paths like the review workflow.
+    Call close() to return it to the pool.
 
     Returns:
-        sqlite3.Connection: Database connection with row factory enabled
+        Pooled sqlite3 connection with row factory enabled
     """
-    conn = sqlite3.connect(str(DB_PATH), timeout=30.0)  # 30 second timeout
-    conn.row_factory = sqlite3.Row
-    # Enable WAL mode for better concurrent access
-    conn.execute("PRAGMA journal_mode=WAL")
-    return conn
+    return db_pool.acquire_sync(str(DB_PATH))
 
 
 async def init_database():
@@ -89,6 +348,7 @@ async def init_database():
                 processed_files INTEGER DEFAULT 0,
                 successful INTEGER DEFAULT 0,
                 failed INTEGER DEFAULT 0,
+                last_seq INTEGER DEFAULT 0,
                 results_json TEXT,
                 processing_summary_json TEXT,
                 download_url VARCHAR(500),
@@ -99,6 +359,56 @@ async def init_database():
             )
         """)
 
+        # ====================================================================
+        # BATCH DOCUMENTS TABLE (one result row per processed document)
+        # ====================================================================
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS batch_documents (
+                batch_id VARCHAR(36) NOT NULL,
+                seq INTEGER NOT NULL,
+                document_id INTEGER,
+                filename TEXT NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                result_json TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (batch_id, seq),
+                FOREIGN KEY (batch_id) REFERENCES batches(id) ON DELETE CASCADE
+            )
+        """)
+
+        # ====================================================================
+        # PROCESSING JOBS TABLE (durable work queue with stage checkpoints)
+        # ====================================================================
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS processing_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                batch_id VARCHAR(36) NOT NULL,
+                user_id INTEGER NOT NULL,
+                organization_id INTEGER,
+                plan_type VARCHAR(50),
+                job_type VARCHAR(20) NOT NULL DEFAULT 'document',
+                file_path TEXT,
+                filename TEXT,
+                page_count INTEGER,
+                has_text_layer BOOLEAN,
+                image_dpi INTEGER,
+                estimated_seconds REAL,
+                status VARCHAR(20) NOT NULL DEFAULT 'queued',
+                stage VARCHAR(20) NOT NULL DEFAULT 'uploaded',
+                checkpoint_json TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                run_after REAL NOT NULL,
+                started_at REAL,
+                lease_owner VARCHAR(100),
+                lease_expires_at REAL,
+                last_error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (batch_id) REFERENCES batches(id) ON DELETE CASCADE
+            )
+        """)
+
         # ====================================================================
         # ORGANIZATION SETTINGS TABLE
         # ====================================================================
@@ -195,6 +505,141 @@ async def init_database():
             )
         """)
 
+        # DocuWare index field definitions, discovered per cabinet/dialog and shared by
+        # every account on the same server (see connectors/docuware_schema_cache.py)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS docuware_field_schemas (
+                server_url TEXT NOT NULL,
+                cabinet_id TEXT NOT NULL,
+                dialog_id TEXT NOT NULL,
+                fields_json TEXT NOT NULL,
+                discovered_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (server_url, cabinet_id, dialog_id)
+            )
+        """)
+
+        # Google Drive folder IDs per connected account, keyed by folder path
+        # (see connectors/google_drive_folder_cache.py)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS google_drive_folders (
+                account_key TEXT NOT NULL,
+                path TEXT NOT NULL,
+                folder_id TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (account_key, path)
+            )
+        """)
+
+        # In-progress resumable Google Drive uploads, so an interrupted upload
+        # (or a restarted worker) continues from the last acknowledged byte
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS google_drive_upload_sessions (
+                upload_key TEXT PRIMARY KEY,
+                session_uri TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                bytes_sent INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP NOT NULL,
+                updated_at TIMESTAMP NOT NULL
+            )
+        """)
+
+        # ====================================================================
+        # REVIEW WORKFLOW TABLES
+        # ====================================================================
+
+        # Processed documents awaiting review / upload
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS document_metadata (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                organization_id INTEGER NOT NULL,
+                batch_id TEXT,
+                filename TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                category TEXT,
+                extracted_data TEXT,
+                status TEXT DEFAULT 'pending_review',
+                confidence_score REAL DEFAULT 0.0,
+                connector_type TEXT,
+                connector_config_snapshot TEXT,
+                uploaded_to_connector BOOLEAN DEFAULT 0,
+                connector_result TEXT,
+                error_message TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                processed_at TIMESTAMP,
+                approved_at TIMESTAMP,
+                FOREIGN KEY (organization_id) REFERENCES organizations(id)
+            )
+        """)
+
+        # User corrections to extracted fields (AI learning)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS field_corrections (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                organization_id INTEGER NOT NULL,
+                document_id INTEGER NOT NULL,
+                field_name TEXT NOT NULL,
+                original_value TEXT,
+                corrected_value TEXT NOT NULL,
+                original_confidence REAL,
+                correction_method TEXT DEFAULT 'manual',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                created_by TEXT,
+                FOREIGN KEY (organization_id) REFERENCES organizations(id),
+                FOREIGN KEY (document_id) REFERENCES document_metadata(id) ON DELETE CASCADE
+            )
+        """)
+
+        # ====================================================================
+        # UPLOAD OUTBOX TABLE (connector uploads of approved documents, see upload_outbox.py)
+        # ====================================================================
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS upload_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                document_id INTEGER NOT NULL,
+                organization_id INTEGER NOT NULL,
+                batch_id TEXT,
+                filename TEXT,
+                connector_type VARCHAR(20) NOT NULL DEFAULT 'none',
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 5,
+                run_after REAL NOT NULL,
+                lease_owner VARCHAR(100),
+                lease_expires_at REAL,
+                last_error TEXT,
+                upload_result TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (document_id) REFERENCES document_metadata(id) ON DELETE CASCADE
+            )
+        """)
+
+        # ====================================================================
+        # CACHE VERSIONS TABLE (cross-worker tenant cache invalidation)
+        # ====================================================================
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS cache_versions (
+                scope TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # ====================================================================
+        # LLM LIMITER STATE TABLE (each process's limiter headroom, see services/llm_limiter.py)
+        # ====================================================================
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS llm_limiter_state (
+                process_id VARCHAR(100) PRIMARY KEY,
+                in_flight INTEGER NOT NULL DEFAULT 0,
+                waiting INTEGER NOT NULL DEFAULT 0,
+                cooldown_until REAL NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )
+        """)
+
         # ====================================================================
         # INDEXES
         # ====================================================================
@@ -211,6 +656,16 @@ async def init_database():
         await db.execute("CREATE INDEX IF NOT EXISTS idx_batches_user_id ON batches(user_id)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_batches_org_id ON batches(organization_id)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_batches_created_at ON batches(created_at)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_batch_documents_document_id ON batch_documents(batch_id, document_id)")
+
+        # Processing job indexes
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_processing_jobs_claim ON processing_jobs(status, run_after)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_processing_jobs_batch ON processing_jobs(batch_id, status)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_processing_jobs_org ON processing_jobs(organization_id, status, run_after)")
+
+        # Upload outbox indexes
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_upload_outbox_claim ON upload_outbox(status, run_after)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_upload_outbox_document ON upload_outbox(document_id)")
 
         # Organization settings indexes
         await db.execute("CREATE INDEX IF NOT EXISTS idx_org_settings_org_id ON organization_settings(organization_id)")
@@ -233,19 +688,302 @@ async def init_database():
         await db.execute("CREATE INDEX IF NOT EXISTS idx_connector_configs_type ON connector_configs(connector_type)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_field_mappings_config_id ON field_mappings(connector_config_id)")
 
+        # Review workflow indexes
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_document_status ON document_metadata(status)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_document_org_status ON document_metadata(organization_id, status)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_document_batch ON document_metadata(batch_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_corrections_doc ON field_corrections(document_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_corrections_org ON field_corrections(organization_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_corrections_field ON field_corrections(field_name)")
+
+        # Cache version indexes
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_cache_versions_version ON cache_versions(version)")
+
         await db.commit()
         logger.info("Database initialized successfully with multi-tenant support")
 
 
 async def get_db() -> Any:
-    """Get database connection."""
+    """
+    Get database connection from the pool.
+    Call close() (or use async with) to return it to the pool.
+    """
     if aiosqlite is None:
         raise RuntimeError("aiosqlite is not installed. Please install it to use async database operations.")
-    db = await aiosqlite.connect(DB_PATH, timeout=30.0)
-    db.row_factory = aiosqlite.Row
-    await db.execute("PRAGMA foreign_keys = ON")
-    await db.execute("PRAGMA journal_mode=WAL")
-    return db
+    return await db_pool.acquire_async(str(DB_PATH))
+
+
+# ============================================================================
+# Tenant Cache
+# ============================================================================
+
+# Default lifetimes for cached tenant rows (seconds)
+TENANT_CACHE_TTL_SECONDS = 60
+TENANT_CACHE_SECRET_TTL_SECONDS = 300
+TENANT_CACHE_SYNC_INTERVAL_SECONDS = 2
+TENANT_CACHE_MAX_ENTRIES = 5000
+
+
+class TenantCache:
+    """
+    Process-wide TTL cache for slowly changing tenant rows
+    (organizations, subscriptions, organization settings, review settings
+    and decrypted connector configs).
+
+    Every entry is tagged with one or more scopes ("org:<id>", "user:<id>").
+    Write paths bump the scope's version in the cache_versions table inside
+    their own transaction and drop local entries after commit. Other worker
+    processes pick the bump up the next time they sync (at most every
+    sync_interval seconds), so staleness across workers is bounded.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = TENANT_CACHE_TTL_SECONDS,
+        secret_ttl_seconds: float = TENANT_CACHE_SECRET_TTL_SECONDS,
+        sync_interval_seconds: float = TENANT_CACHE_SYNC_INTERVAL_SECONDS,
+        max_entries: int = TENANT_CACHE_MAX_ENTRIES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.secret_ttl_seconds = secret_ttl_seconds
+        self.sync_interval_seconds = sync_interval_seconds
+        self.max_entries = max_entries
+
+        # (namespace, key) -> (expires_at, value, scopes)
+        self._entries: "OrderedDict[Tuple[str, Any], Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._scope_index: Dict[str, Set[Tuple[str, Any]]] = {}
+        # Bumped on every invalidation, so loads that raced one can tell (see set_if_unchanged)
+        self._generation = 0
+        self._scope_generations: Dict[str, int] = {}  # Scope -> generation of its last invalidation
+        self._cleared_generation = 0
+        self._version_watermark = 0
+        self._last_sync = 0.0
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "evictions": 0,
+            "version_syncs": 0
+        }
+
+    def get(self, namespace: str, key: Any) -> Tuple[bool, Any]:
+        """
+        Look up a cached value.
+
+        Returns:
+            Tuple of (found, value). The value is a copy, so callers may mutate it.
+        """
+        cache_key = (namespace, key)
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            self._counters["misses"] += 1
+            return False, None
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._drop(cache_key)
+            self._counters["misses"] += 1
+            return False, None
+
+        self._entries.move_to_end(cache_key)
+        self._counters["hits"] += 1
+        return True, copy.deepcopy(value)
+
+    def set(
+        self,
+        namespace: str,
+        key: Any,
+        value: Any,
+        scopes: Tuple[str, ...],
+        secret: bool = False,
+        ttl: Optional[float] = None
+    ) -> None:
+        """
+        Store a value tagged with the scopes that invalidate it.
+
+        Args:
+            namespace: Kind of row being cached (e.g. "organization")
+            key: Lookup key within the namespace
+            value: Value to cache (a copy is stored)
+            scopes: Invalidation scopes, e.g. ("org:1",)
+            secret: Use the shorter secret TTL (decrypted credentials)
+            ttl: Explicit lifetime in seconds, overriding the defaults
+        """
+        cache_key = (namespace, key)
+        if cache_key in self._entries:
+            self._drop(cache_key)
+
+        if ttl is None:
+            ttl = self.secret_ttl_seconds if secret else self.ttl_seconds
+        self._entries[cache_key] = (time.monotonic() + ttl, copy.deepcopy(value), tuple(scopes))
+        for scope in scopes:
+            self._scope_index.setdefault(scope, set()).add(cache_key)
+
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._drop(oldest_key)
+            self._counters["evictions"] += 1
+
+    def invalidate(self, *scopes: str) -> None:
+        """Drop every local entry tagged with any of the given scopes."""
+        for scope in scopes:
+            self._generation += 1
+            self._scope_generations[scope] = self._generation
+            for cache_key in list(self._scope_index.pop(scope, ())):
+                if cache_key in self._entries:
+                    self._drop(cache_key)
+                    self._counters["invalidations"] += 1
+
+    def clear(self) -> None:
+        """Drop all entries and forget the version watermark."""
+        self._entries.clear()
+        self._scope_index.clear()
+        self._generation += 1
+        self._cleared_generation = self._generation
+        self._scope_generations.clear()
+        self._version_watermark = 0
+        self._last_sync = 0.0
+
+    async def sync_versions(self, force: bool = False) -> None:
+        """
+        Apply invalidations written by other workers since the last sync.
+
+        Args:
+            force: Sync even if sync_interval has not elapsed
+        """
+        now = time.monotonic()
+        if not force and now - self._last_sync < self.sync_interval_seconds:
+            return
+        self._last_sync = now
+
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                "SELECT scope, version FROM cache_versions WHERE version > ?",
+                (self._version_watermark,)
+            )
+            rows = await cursor.fetchall()
+        except sqlite3.OperationalError as e:
+            # cache_versions missing (database not initialized yet)
+            logger.debug(f"Tenant cache version sync skipped: {e}")
+            return
+        finally:
+            await db.close()
+
+        self._counters["version_syncs"] += 1
+        for scope, version in rows:
+            self.invalidate(scope)
+            self._version_watermark = max(self._version_watermark, version)
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: Any,
+        loader: Callable[[], Awaitable[Any]],
+        scopes: Tuple[str, ...],
+        secret: bool = False
+    ) -> Any:
+        """
+        Return a cached value, calling loader() and caching its result on a miss.
+        None results are cached too, so missing rows don't hit the database.
+        A result is not cached if its scopes were invalidated while it loaded,
+        since it may predate the write.
+        """
+        await self.sync_versions()
+
+        found, value = self.get(namespace, key)
+        if found:
+            return value
+
+        generation = self.generation()
+        value = await loader()
+        self.set_if_unchanged(namespace, key, value, scopes, generation, secret=secret)
+        return value
+
+    def generation(self) -> int:
+        """Current invalidation generation; take it before loading a value to pass to set_if_unchanged."""
+        return self._generation
+
+    def set_if_unchanged(
+        self,
+        namespace: str,
+        key: Any,
+        value: Any,
+        scopes: Tuple[str, ...],
+        generation: int,
+        secret: bool = False,
+        ttl: Optional[float] = None
+    ) -> bool:
+        """
+        Store a value unless any of its scopes was invalidated after generation was taken,
+        since the value may then predate the write. Takes the same arguments as set().
+
+        Returns:
+            True if the value was stored
+        """
+        if self._cleared_generation > generation:
+            return False
+        if any(self._scope_generations.get(scope, 0) > generation for scope in scopes):
+            return False
+        self.set(namespace, key, value, scopes, secret=secret, ttl=ttl)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "entries": len(self._entries),
+            "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            "version_watermark": self._version_watermark
+        }
+
+    def _drop(self, cache_key: Tuple[str, Any]) -> None:
+        _, _, scopes = self._entries.pop(cache_key)
+        for scope in scopes:
+            keys = self._scope_index.get(scope)
+            if keys is not None:
+                keys.discard(cache_key)
+                if not keys:
+                    del self._scope_index[scope]
+
+
+tenant_cache = TenantCache()
+
+
+def org_scope(org_id: int) -> str:
+    """Cache invalidation scope for an organization."""
+    return f"org:{org_id}"
+
+
+def user_scope(user_id: int) -> str:
+    """Cache invalidation scope for a user."""
+    return f"user:{user_id}"
+
+
+async def bump_cache_versions(db: Any, *scopes: str) -> None:
+    """
+    Record a change to the given scopes so other workers invalidate them.
+    Call inside the write transaction, then tenant_cache.invalidate() after commit.
+
+    Args:
+        db: Open aiosqlite connection (caller commits)
+        scopes: Scopes whose cached entries are now stale
+    """
+    for scope in scopes:
+        await db.execute(
+            """INSERT INTO cache_versions (scope, version, updated_at)
+               VALUES (?, (SELECT COALESCE(MAX(version), 0) + 1 FROM cache_versions), ?)
+               ON CONFLICT(scope) DO UPDATE SET
+                   version = excluded.version,
+                   updated_at = excluded.updated_at""",
+            (scope, datetime.utcnow().isoformat())
+        )
+
+
+def get_tenant_cache_stats() -> Dict[str, Any]:
+    """Get tenant cache hit/miss metrics."""
+    return tenant_cache.stats()
 
 
 # ============================================================================
@@ -351,7 +1089,7 @@ async def update_last_login(user_id: int):
 # Batch Management Functions
 # ============================================================================
 
-async def create_batch(batch_id: str, user_id: int, total_files: int) -> None:
+async def create_batch(batch_id: str, user_id: int, total_files: int, status: str = "processing") -> None:
     """
     Create a new batch record.
 
@@ -359,12 +1097,13 @@ async def create_batch(batch_id: str, user_id: int, total_files: int) -> None:
         batch_id: Unique batch ID (UUID)
         user_id: User who created the batch
         total_files: Number of files in the batch
+        status: Initial status ("uploading" for batches uploaded file by file)
     """
     db = await get_db()
     try:
         await db.execute(
             "INSERT INTO batches (id, user_id, status, total_files) VALUES (?, ?, ?, ?)",
-            (batch_id, user_id, "processing", total_files)
+            (batch_id, user_id, status, total_files)
         )
         await db.commit()
         logger.info(f"Created batch {batch_id} for user {user_id}")
@@ -372,52 +1111,131 @@ async def create_batch(batch_id: str, user_id: int, total_files: int) -> None:
         await db.close()
 
 
-async def update_batch(
+async def add_batch_document(batch_id: str, result: Dict[str, Any], document_id: Optional[int] = None) -> int:
+    """
+    Append one processed document to a batch and bump the batch counters atomically.
+    Replaces rewriting the whole results blob after every document.
+
+    Args:
+        batch_id: Batch ID
+        result: DocumentResult dict
+        document_id: document_metadata ID, if the document was saved for review
+
+    Returns:
+        Sequence number of the result within the batch (1-based, arrival order)
+    """
+    db = await get_db()
+    try:
+        seq, _, _ = await append_batch_document(db, batch_id, result, document_id)
+        await db.commit()
+        return seq
+    finally:
+        await db.close()
+
+
+async def append_batch_document(
+    db: Any,
+    batch_id: str,
+    result: Dict[str, Any],
+    document_id: Optional[int] = None
+) -> Tuple[int, int, int]:
+    """
+    Insert a batch result row and bump the counters on an open connection, without committing.
+    Lets callers (e.g. the job queue) record the result in the same transaction as their own writes.
+
+    Args:
+        db: Open database connection
+        batch_id: Batch ID
+        result: DocumentResult dict
+        document_id: document_metadata ID, if the document was saved for review
+
+    Returns:
+        Tuple of (sequence number, batch processed_files, batch total_files)
+    """
+    failed = 1 if result.get('error') else 0
+
+    # The UPDATE takes the write lock, so seq is assigned without races. last_seq only
+    # grows (retried failures' rows are deleted), so polling cursors stay valid
+    cursor = await db.execute(
+        """UPDATE batches
+           SET processed_files = processed_files + 1,
+               successful = successful + ?,
+               failed = failed + ?,
+               last_seq = last_seq + 1
+           WHERE id = ?
+           RETURNING last_seq, processed_files, total_files""",
+        (1 - failed, failed, batch_id)
+    )
+    row = await cursor.fetchone()
+    if not row:
+        raise ValueError(f"Batch {batch_id} not found")
+    seq = row['last_seq']
+
+    await db.execute(
+        """INSERT INTO batch_documents (batch_id, seq, document_id, filename, status, result_json)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        (batch_id, seq, document_id, result.get('filename'),
+         'failed' if failed else 'completed', json.dumps(result))
+    )
+    return seq, row['processed_files'], row['total_files']
+
+
+async def finish_batch(
     batch_id: str,
     status: str,
-    processed_files: int,
-    successful: int,
-    failed: int,
-    results: Optional[List[Dict]] = None,
     processing_summary: Optional[Dict] = None,
     download_url: Optional[str] = None
-) -> None:
+) -> bool:
     """
-    Update batch with processing results.
+    Mark a batch finished. Counters are already maintained by add_batch_document.
+    A batch that already finished (e.g. cancelled while it was being finalized) is left alone.
 
     Args:
         batch_id: Batch ID
-        status: New status (processing, completed, failed)
-        processed_files: Number of processed files
-        successful: Number of successful files
-        failed: Number of failed files
-        results: List of DocumentResult dicts
+        status: Final status (completed, failed)
         processing_summary: Category summary dict
         download_url: URL for downloading results
+
+    Returns:
+        True if the batch was marked, False if it had already finished
     """
     db = await get_db()
     try:
-        results_json = json.dumps(results) if results else None
         summary_json = json.dumps(processing_summary) if processing_summary else None
         completed_at = datetime.utcnow().isoformat() if status == "completed" else None
 
-        await db.execute(
+        cursor = await db.execute(
             """UPDATE batches
-               SET status = ?, processed_files = ?, successful = ?, failed = ?,
-                   results_json = ?, processing_summary_json = ?, download_url = ?,
-                   completed_at = ?
-               WHERE id = ?""",
-            (status, processed_files, successful, failed, results_json,
-             summary_json, download_url, completed_at, batch_id)
+               SET status = ?, processing_summary_json = ?, download_url = ?, completed_at = ?
+               WHERE id = ? AND status NOT IN ('completed', 'failed', 'cancelled')""",
+            (status, summary_json, download_url, completed_at, batch_id)
         )
         await db.commit()
+        return cursor.rowcount > 0
     finally:
         await db.close()
 
 
+# Batch columns returned by the status/history projection (everything except the legacy results blob)
+BATCH_PROJECTION_COLUMNS = """
+    id, user_id, organization_id, status, total_files, processed_files,
+    successful, failed, processing_summary_json, download_url, created_at, completed_at
+"""
+
+
+def _batch_from_row(row: Any) -> Dict[str, Any]:
+    """Convert a projected batch row to a dict, deserializing the summary."""
+    batch = dict(row)
+    summary_json = batch.pop('processing_summary_json')
+    if summary_json:
+        batch['processing_summary'] = json.loads(summary_json)
+    return batch
+
+
 async def get_batch(batch_id: str, user_id: int) -> Optional[Dict[str, Any]]:
     """
-    Get batch by ID (with user isolation).
+    Get batch status and counters by ID (with user isolation).
+    Per-document results are loaded separately with get_batch_with_results.
 
     Args:
         batch_id: Batch ID
@@ -429,26 +1247,99 @@ async def get_batch(batch_id: str, user_id: int) -> Optional[Dict[str, Any]]:
     db = await get_db()
     try:
         cursor = await db.execute(
-            "SELECT * FROM batches WHERE id = ? AND user_id = ?",
+            f"SELECT {BATCH_PROJECTION_COLUMNS} FROM batches WHERE id = ? AND user_id = ?",
             (batch_id, user_id)
         )
         row = await cursor.fetchone()
-        if row:
-            batch = dict(row)
-            # Deserialize JSON fields
-            if batch['results_json']:
-                batch['results'] = json.loads(batch['results_json'])
-            if batch['processing_summary_json']:
-                batch['processing_summary'] = json.loads(batch['processing_summary_json'])
-            return batch
-        return None
+        return _batch_from_row(row) if row else None
     finally:
         await db.close()
 
 
+async def get_batch_with_results(batch_id: str, user_id: int, since: int = 0) -> Optional[Dict[str, Any]]:
+    """
+    Get batch status plus the results that arrived after a cursor, in one query.
+
+    Args:
+        batch_id: Batch ID
+        user_id: User ID (for isolation)
+        since: Only include results with a sequence number greater than this
+
+    Returns:
+        Batch dict with 'results' (arrival order, with document IDs) and 'cursor'
+        (sequence number of the last included result), or None
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT b.id, b.user_id, b.organization_id, b.status, b.total_files, b.processed_files,
+                      b.successful, b.failed, b.processing_summary_json, b.download_url,
+                      b.created_at, b.completed_at,
+                      d.seq AS result_seq, d.document_id AS result_document_id, d.result_json
+               FROM batches b
+               LEFT JOIN batch_documents d ON d.batch_id = b.id AND d.seq > ?
+               WHERE b.id = ? AND b.user_id = ?
+               ORDER BY d.seq""",
+            (since, batch_id, user_id)
+        )
+        rows = await cursor.fetchall()
+        if not rows:
+            return None
+
+        batch = _batch_from_row({
+            key: rows[0][key] for key in rows[0].keys()
+            if key not in ('result_seq', 'result_document_id', 'result_json')
+        })
+
+        results = []
+        last_seq = since
+        for row in rows:
+            if row['result_json'] is None:
+                continue
+            result = json.loads(row['result_json'])
+            if row['result_document_id'] is not None:
+                result['id'] = row['result_document_id']
+            results.append(result)
+            last_seq = row['result_seq']
+
+        # Batches processed before batch_documents existed keep their results in results_json
+        if not results and since == 0 and batch['processed_files']:
+            results = await _get_legacy_batch_results(db, batch_id)
+            last_seq = len(results)
+
+        batch['results'] = results
+        batch['cursor'] = last_seq
+        return batch
+    finally:
+        await db.close()
+
+
+async def _get_legacy_batch_results(db: Any, batch_id: str) -> List[Dict[str, Any]]:
+    """Read results from the legacy results_json blob, resolving document IDs in one query."""
+    cursor = await db.execute("SELECT results_json FROM batches WHERE id = ?", (batch_id,))
+    row = await cursor.fetchone()
+    if not row or not row['results_json']:
+        return []
+
+    results = json.loads(row['results_json'])
+
+    # Oldest first so the newest row wins for repeated filenames
+    cursor = await db.execute(
+        "SELECT id, filename FROM document_metadata WHERE batch_id = ? ORDER BY created_at, id",
+        (batch_id,)
+    )
+    document_ids = {doc['filename']: doc['id'] for doc in await cursor.fetchall()}
+    for result in results:
+        doc_id = document_ids.get(result.get('filename'))
+        if doc_id:
+            result['id'] = doc_id
+
+    return results
+
+
 async def get_user_batches(user_id: int, limit: int = 50) -> List[Dict[str, Any]]:
     """
-    Get all batches for a user.
+    Get recent batches for a user (status and counters, without per-document results).
 
     Args:
         user_id: User ID
@@ -460,19 +1351,11 @@ async def get_user_batches(user_id: int, limit: int = 50) -> List[Dict[str, Any]
     db = await get_db()
     try:
         cursor = await db.execute(
-            "SELECT * FROM batches WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
+            f"""SELECT {BATCH_PROJECTION_COLUMNS} FROM batches
+                WHERE user_id = ? ORDER BY created_at DESC LIMIT ?""",
             (user_id, limit)
         )
-        rows = await cursor.fetchall()
-        batches = []
-        for row in rows:
-            batch = dict(row)
-            if batch['results_json']:
-                batch['results'] = json.loads(batch['results_json'])
-            if batch['processing_summary_json']:
-                batch['processing_summary'] = json.loads(batch['processing_summary_json'])
-            batches.append(batch)
-        return batches
+        return [_batch_from_row(row) for row in await cursor.fetchall()]
     finally:
         await db.close()
 
@@ -542,7 +1425,9 @@ async def save_connector_config(
             (organization_id, connector_type, config_json, user_id)
         )
 
+        await bump_cache_versions(db, user_scope(user_id), org_scope(organization_id))
         await db.commit()
+        tenant_cache.invalidate(user_scope(user_id), org_scope(organization_id))
         logger.info(f"Saved {connector_type} config {config_id} for user {user_id} and organization {organization_id} (set as active connector)")
         return config_id
     finally:
@@ -612,13 +1497,17 @@ async def delete_connector_config(user_id: int, connector_type: str):
         )
 
         # Delete from organization_settings (org-level)
+        scopes = [user_scope(user_id)]
         if organization_id:
             await db.execute(
                 "DELETE FROM organization_settings WHERE organization_id = ? AND connector_type = ?",
                 (organization_id, connector_type)
             )
+            scopes.append(org_scope(organization_id))
 
+        await bump_cache_versions(db, *scopes)
         await db.commit()
+        tenant_cache.invalidate(*scopes)
         logger.info(f"Deleted {connector_type} config for user {user_id} and organization {organization_id}")
     finally:
         await db.close()
@@ -693,6 +1582,253 @@ async def delete_field_mappings(config_id: int):
         await db.close()
 
 
+# ============================================================================
+# DocuWare Field Schema Functions
+# ============================================================================
+
+async def get_docuware_field_schema(
+    server_url: str,
+    cabinet_id: str,
+    dialog_id: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Get stored index field definitions for a DocuWare storage dialog.
+
+    Args:
+        server_url: Normalized DocuWare server URL
+        cabinet_id: File cabinet ID
+        dialog_id: Storage dialog ID
+
+    Returns:
+        Dict with fields (list of field dicts) and discovered_at (datetime), or None
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT fields_json, discovered_at FROM docuware_field_schemas
+               WHERE server_url = ? AND cabinet_id = ? AND dialog_id = ?""",
+            (server_url, cabinet_id, dialog_id)
+        )
+        row = await cursor.fetchone()
+        if not row:
+            return None
+        return {"fields": json.loads(row[0]), "discovered_at": datetime.fromisoformat(row[1])}
+    finally:
+        await db.close()
+
+
+async def save_docuware_field_schema(
+    server_url: str,
+    cabinet_id: str,
+    dialog_id: str,
+    fields: List[Dict[str, Any]],
+    discovered_at: datetime
+):
+    """
+    Store (or replace) index field definitions for a DocuWare storage dialog.
+
+    Args:
+        server_url: Normalized DocuWare server URL
+        cabinet_id: File cabinet ID
+        dialog_id: Storage dialog ID
+        fields: Field definitions as dicts
+        discovered_at: When the fields were discovered
+    """
+    db = await get_db()
+    try:
+        await db.execute(
+            """INSERT OR REPLACE INTO docuware_field_schemas
+               (server_url, cabinet_id, dialog_id, fields_json, discovered_at)
+               VALUES (?, ?, ?, ?, ?)""",
+            (server_url, cabinet_id, dialog_id, json.dumps(fields), discovered_at.isoformat())
+        )
+        await db.commit()
+    finally:
+        await db.close()
+
+
+# ============================================================================
+# Google Drive Folder Functions
+# ============================================================================
+
+async def get_google_drive_folders(account_key: str) -> Dict[str, str]:
+    """
+    Get stored folder IDs for a Google Drive account.
+
+    Args:
+        account_key: Hashed account identifier
+
+    Returns:
+        Dict mapping folder paths to folder IDs
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT path, folder_id FROM google_drive_folders WHERE account_key = ?",
+            (account_key,)
+        )
+        rows = await cursor.fetchall()
+        return {row[0]: row[1] for row in rows}
+    finally:
+        await db.close()
+
+
+async def get_google_drive_folder(account_key: str, path: str) -> Optional[str]:
+    """
+    Get the stored folder ID for one path.
+
+    Args:
+        account_key: Hashed account identifier
+        path: Folder path (root folder name first, "/"-separated)
+
+    Returns:
+        Folder ID, or None if none is stored
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT folder_id FROM google_drive_folders WHERE account_key = ? AND path = ?",
+            (account_key, path)
+        )
+        row = await cursor.fetchone()
+        return row[0] if row else None
+    finally:
+        await db.close()
+
+
+async def claim_google_drive_folder(account_key: str, path: str, folder_id: str) -> str:
+    """
+    Store a folder ID for a path unless one is stored already, e.g. by another worker
+    process that created the same folder at the same time.
+
+    Args:
+        account_key: Hashed account identifier
+        path: Folder path (root folder name first, "/"-separated)
+        folder_id: Drive folder ID
+
+    Returns:
+        The stored folder ID: folder_id, or the one stored first
+    """
+    db = await get_db()
+    try:
+        await db.execute(
+            """INSERT INTO google_drive_folders (account_key, path, folder_id, updated_at)
+               VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+               ON CONFLICT(account_key, path) DO NOTHING""",
+            (account_key, path, folder_id)
+        )
+        cursor = await db.execute(
+            "SELECT folder_id FROM google_drive_folders WHERE account_key = ? AND path = ?",
+            (account_key, path)
+        )
+        row = await cursor.fetchone()
+        await db.commit()
+        return row[0]
+    finally:
+        await db.close()
+
+
+async def delete_google_drive_folders(account_key: str, path: Optional[str] = None):
+    """
+    Delete stored folder IDs for an account.
+
+    Args:
+        account_key: Hashed account identifier
+        path: Delete only this folder and the folders below it (default: all)
+    """
+    db = await get_db()
+    try:
+        if path is None:
+            await db.execute("DELETE FROM google_drive_folders WHERE account_key = ?", (account_key,))
+        else:
+            await db.execute(
+                """DELETE FROM google_drive_folders
+                   WHERE account_key = ? AND (path = ? OR substr(path, 1, length(?) + 1) = ? || '/')""",
+                (account_key, path, path, path)
+            )
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def get_google_drive_upload_session(upload_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a stored resumable upload session.
+
+    Args:
+        upload_key: Identifies the account, target folder, filename and local file
+
+    Returns:
+        Dict with session_uri, file_path, file_size, bytes_sent and created_at (datetime), or None
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT session_uri, file_path, file_size, bytes_sent, created_at
+               FROM google_drive_upload_sessions WHERE upload_key = ?""",
+            (upload_key,)
+        )
+        row = await cursor.fetchone()
+        if not row:
+            return None
+        return {
+            "session_uri": row[0],
+            "file_path": row[1],
+            "file_size": row[2],
+            "bytes_sent": row[3],
+            "created_at": datetime.fromisoformat(row[4])
+        }
+    finally:
+        await db.close()
+
+
+async def save_google_drive_upload_session(
+    upload_key: str,
+    session_uri: str,
+    file_path: str,
+    file_size: int,
+    bytes_sent: int
+):
+    """
+    Store a resumable upload session, or update its progress.
+
+    Args:
+        upload_key: Identifies the account, target folder, filename and local file
+        session_uri: Drive resumable session URI
+        file_path: Local file being uploaded
+        file_size: File size in bytes
+        bytes_sent: Bytes Drive has acknowledged
+    """
+    now = datetime.utcnow().isoformat()
+    db = await get_db()
+    try:
+        await db.execute(
+            """INSERT INTO google_drive_upload_sessions
+               (upload_key, session_uri, file_path, file_size, bytes_sent, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(upload_key) DO UPDATE SET
+                   created_at = CASE WHEN session_uri = excluded.session_uri
+                                     THEN created_at ELSE excluded.created_at END,
+                   session_uri = excluded.session_uri,
+                   bytes_sent = excluded.bytes_sent,
+                   updated_at = excluded.updated_at""",
+            (upload_key, session_uri, file_path, file_size, bytes_sent, now, now)
+        )
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def delete_google_drive_upload_session(upload_key: str):
+    """Delete a resumable upload session (finished or expired)."""
+    db = await get_db()
+    try:
+        await db.execute("DELETE FROM google_drive_upload_sessions WHERE upload_key = ?", (upload_key,))
+        await db.commit()
+    finally:
+        await db.close()
+
+
 # ============================================================================
 # Organization Management Functions
 # ============================================================================
@@ -744,21 +1880,24 @@ async def get_organization(org_id: int) -> Optional[Dict[str, Any]]:
     Returns:
         Organization dict or None
     """
-    db = await get_db()
-    try:
-        cursor = await db.execute(
-            "SELECT * FROM organizations WHERE id = ?",
-            (org_id,)
-        )
-        row = await cursor.fetchone()
-        if row:
-            org = dict(row)
-            if org.get('metadata'):
-                org['metadata'] = json.loads(org['metadata'])
-            return org
-        return None
-    finally:
-        await db.close()
+    async def load():
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                "SELECT * FROM organizations WHERE id = ?",
+                (org_id,)
+            )
+            row = await cursor.fetchone()
+            if row:
+                org = dict(row)
+                if org.get('metadata'):
+                    org['metadata'] = json.loads(org['metadata'])
+                return org
+            return None
+        finally:
+            await db.close()
+
+    return await tenant_cache.get_or_load("organization", org_id, load, (org_scope(org_id),))
 
 
 async def get_organization_by_user(user_id: int) -> Optional[Dict[str, Any]]:
@@ -840,7 +1979,9 @@ async def update_organization(
         query = f"UPDATE organizations SET {', '.join(updates)} WHERE id = ?"
 
         await db.execute(query, params)
+        await bump_cache_versions(db, org_scope(org_id))
         await db.commit()
+        tenant_cache.invalidate(org_scope(org_id))
         logger.info(f"Updated organization {org_id}")
         return True
     finally:
@@ -884,7 +2025,9 @@ async def update_user_organization(user_id: int, org_id: int, role: str = "membe
             "UPDATE users SET organization_id = ?, role = ? WHERE id = ?",
             (org_id, role, user_id)
         )
+        await bump_cache_versions(db, user_scope(user_id))
         await db.commit()
+        tenant_cache.invalidate(user_scope(user_id))
         logger.info(f"Updated user {user_id} to organization {org_id} with role {role}")
     finally:
         await db.close()
@@ -942,7 +2085,9 @@ async def save_organization_setting(
             setting_id = cursor.lastrowid
             logger.info(f"Created {connector_type} setting for organization {org_id}")
 
+        await bump_cache_versions(db, org_scope(org_id))
         await db.commit()
+        tenant_cache.invalidate(org_scope(org_id))
         return setting_id
     finally:
         await db.close()
@@ -959,19 +2104,24 @@ async def get_organization_setting(org_id: int, connector_type: str) -> Optional
     Returns:
         Setting dict or None
     """
-    db = await get_db()
-    try:
-        cursor = await db.execute(
-            """SELECT * FROM organization_settings
-               WHERE organization_id = ? AND connector_type = ? AND is_active = TRUE""",
-            (org_id, connector_type)
-        )
-        row = await cursor.fetchone()
-        if row:
-            return dict(row)
-        return None
-    finally:
-        await db.close()
+    async def load():
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """SELECT * FROM organization_settings
+                   WHERE organization_id = ? AND connector_type = ? AND is_active = TRUE""",
+                (org_id, connector_type)
+            )
+            row = await cursor.fetchone()
+            if row:
+                return dict(row)
+            return None
+        finally:
+            await db.close()
+
+    return await tenant_cache.get_or_load(
+        "organization_setting", (org_id, connector_type), load, (org_scope(org_id),)
+    )
 
 
 async def delete_organization_setting(org_id: int, connector_type: str):
@@ -982,12 +2132,92 @@ async def delete_organization_setting(org_id: int, connector_type: str):
             "DELETE FROM organization_settings WHERE organization_id = ? AND connector_type = ?",
             (org_id, connector_type)
         )
+        await bump_cache_versions(db, org_scope(org_id))
         await db.commit()
+        tenant_cache.invalidate(org_scope(org_id))
         logger.info(f"Deleted {connector_type} setting for organization {org_id}")
     finally:
         await db.close()
 
 
+async def get_review_settings(org_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Get review workflow settings for an organization.
+
+    Args:
+        org_id: Organization ID
+
+    Returns:
+        Dict with review_mode, confidence_threshold, auto_upload_enabled,
+        or None if the organization doesn't exist
+    """
+    async def load():
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """SELECT review_mode, confidence_threshold, auto_upload_enabled
+                   FROM organizations
+                   WHERE id = ?""",
+                (org_id,)
+            )
+            row = await cursor.fetchone()
+            if not row:
+                return None
+            return {
+                'review_mode': row['review_mode'] or 'review_all',
+                'confidence_threshold': row['confidence_threshold'] or 0.90,
+                'auto_upload_enabled': bool(row['auto_upload_enabled'])
+            }
+        finally:
+            await db.close()
+
+    return await tenant_cache.get_or_load("review_settings", org_id, load, (org_scope(org_id),))
+
+
+async def update_review_settings(
+    org_id: int,
+    review_mode: Optional[str] = None,
+    confidence_threshold: Optional[float] = None
+) -> bool:
+    """
+    Update review workflow settings for an organization.
+
+    Args:
+        org_id: Organization ID
+        review_mode: New review mode (optional)
+        confidence_threshold: New confidence threshold (optional)
+
+    Returns:
+        True if updated, False if nothing to update
+    """
+    updates = []
+    params = []
+
+    if review_mode is not None:
+        updates.append("review_mode = ?")
+        params.append(review_mode)
+    if confidence_threshold is not None:
+        updates.append("confidence_threshold = ?")
+        params.append(confidence_threshold)
+
+    if not updates:
+        return False
+
+    db = await get_db()
+    try:
+        params.append(org_id)
+        query = f"UPDATE organizations SET {', '.join(updates)} WHERE id = ?"
+
+        await db.execute(query, params)
+        await bump_cache_versions(db, org_scope(org_id))
+        await db.commit()
+        tenant_cache.invalidate(org_scope(org_id))
+        logger.info(f"Updated review settings for organization {org_id}")
+        return True
+    finally:
+        await db.close()
+
+
 # ============================================================================
 # Usage Logging Functions
 # ============================================================================
@@ -1034,6 +2264,31 @@ async def log_usage(
         await db.close()
 
 
+async def get_batch_billed_documents(org_id: int, batch_id: str) -> int:
+    """
+    Count the documents already logged as processed for a batch.
+    Lets a batch finalized again (after retrying failed documents) bill only the new ones.
+
+    Args:
+        org_id: Organization ID
+        batch_id: Batch ID
+
+    Returns:
+        Number of documents billed for the batch so far
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT COALESCE(SUM(document_count), 0) AS billed FROM usage_logs
+               WHERE organization_id = ? AND action_type = 'document_processed'
+                 AND json_extract(metadata, '$.batch_id') = ?""",
+            (org_id, batch_id)
+        )
+        return (await cursor.fetchone())['billed']
+    finally:
+        await db.close()
+
+
 async def get_usage_stats(org_id: int, billing_period: Optional[str] = None) -> Dict[str, Any]:
     """
     Get aggregated usage statistics for an organization.
@@ -1185,8 +2440,10 @@ async def create_subscription(
              monthly_document_limit, overage_price_per_document, trial_end_date,
              today, today, today, 'active')
         )
-        await db.commit()
         sub_id = cursor.lastrowid
+        await bump_cache_versions(db, org_scope(org_id))
+        await db.commit()
+        tenant_cache.invalidate(org_scope(org_id))
         logger.info(f"Created subscription {sub_id} for organization {org_id} with plan {plan_type}")
         return sub_id
     finally:
@@ -1203,18 +2460,21 @@ async def get_subscription(org_id: int) -> Optional[Dict[str, Any]]:
     Returns:
         Subscription dict or None
     """
-    db = await get_db()
-    try:
-        cursor = await db.execute(
-            "SELECT * FROM subscriptions WHERE organization_id = ?",
-            (org_id,)
-        )
-        row = await cursor.fetchone()
-        if row:
-            return dict(row)
-        return None
-    finally:
-        await db.close()
+    async def load():
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                "SELECT * FROM subscriptions WHERE organization_id = ?",
+                (org_id,)
+            )
+            row = await cursor.fetchone()
+            if row:
+                return dict(row)
+            return None
+        finally:
+            await db.close()
+
+    return await tenant_cache.get_or_load("subscription", org_id, load, (org_scope(org_id),))
 
 
 async def update_subscription(
@@ -1260,7 +2520,9 @@ async def update_subscription(
         query = f"UPDATE subscriptions SET {', '.join(updates)} WHERE organization_id = ?"
 
         await db.execute(query, params)
+        await bump_cache_versions(db, org_scope(org_id))
         await db.commit()
+        tenant_cache.invalidate(org_scope(org_id))
         logger.info(f"Updated subscription for organization {org_id}")
         return True
     finally:
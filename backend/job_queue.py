@@ -0,0 +1,901 @@
+"""
+Durable SQLite-backed queue for document processing jobs.
+Workers lease jobs, renew the lease with heartbeats and checkpoint each stage,
+so a job picked up after a crash resumes from its last completed stage.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from database import get_db, append_batch_document
+
+logger = logging.getLogger(__name__)
+
+# Job types
+JOB_TYPE_DOCUMENT = "document"  # Process one uploaded file
+JOB_TYPE_FINALIZE = "finalize"  # Organize/ZIP a batch once all its documents are done
+
+# Job statuses
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_PAUSED = "paused"  # Batch paused by its owner; requeued on resume
+JOB_CANCELLED = "cancelled"  # Batch cancelled by its owner
+
+# Document stages, in order. A job's stage is the last one it completed.
+STAGE_UPLOADED = "uploaded"
+STAGE_OCR_DONE = "ocr_done"
+STAGE_EXTRACTED = "extracted"
+STAGE_LEARNED = "learned"
+STAGE_SAVED = "saved"
+STAGE_ROUTED = "routed"
+STAGES = (STAGE_UPLOADED, STAGE_OCR_DONE, STAGE_EXTRACTED, STAGE_LEARNED, STAGE_SAVED, STAGE_ROUTED)
+
+
+class LeaseLostError(Exception):
+    """The job's lease expired and another worker may have claimed it."""
+
+
+class PermanentJobError(Exception):
+    """A failure that retrying will not fix (e.g. unreadable document)."""
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Exponential backoff with jitter for the next try of a job.
+
+    Args:
+        attempts: Number of attempts made so far (1 after the first failure)
+
+    Returns:
+        Delay in seconds
+    """
+    delay = min(settings.job_retry_base_seconds * (2 ** max(attempts - 1, 0)), settings.job_retry_max_seconds)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _job_from_row(row: Any) -> Dict[str, Any]:
+    """Convert a job row to a dict, deserializing the checkpoint."""
+    job = dict(row)
+    checkpoint_json = job.pop('checkpoint_json', None)
+    job['checkpoint'] = json.loads(checkpoint_json) if checkpoint_json else {}
+    return job
+
+
+class JobQueue:
+    """
+    Processing jobs stored in the processing_jobs table.
+    Safe to use from several worker processes: claims are a single UPDATE, and
+    every write by a worker is fenced on it still holding the job's lease.
+    """
+
+    def __init__(self):
+        # Wakes idle workers in this process when jobs are enqueued here
+        self._enqueued = asyncio.Event()
+
+    # ========================================================================
+    # Producers
+    # ========================================================================
+
+    async def enqueue_documents(
+        self,
+        batch_id: str,
+        user_id: int,
+        organization_id: Optional[int],
+        file_paths: List[str],
+        plan_type: Optional[str] = None,
+        preflights: Optional[List[Dict[str, Any]]] = None
+    ) -> int:
+        """
+        Queue one document job per uploaded file.
+
+        Args:
+            batch_id: Batch the files belong to
+            user_id: User who uploaded the batch
+            organization_id: User's organization
+            file_paths: Paths of the saved uploads
+            plan_type: Organization's plan (sets its fair-share scheduling weight)
+            preflights: Preflight report per file, in file_paths order (page_count,
+                has_text_layer, image_dpi, estimated_seconds)
+
+        Returns:
+            Number of jobs queued
+        """
+        now = time.time()
+        preflights = preflights or [{} for _ in file_paths]
+        db = await get_db()
+        try:
+            await db.executemany(
+                """INSERT INTO processing_jobs
+                   (batch_id, user_id, organization_id, plan_type, job_type, file_path, filename,
+                    page_count, has_text_layer, image_dpi, estimated_seconds, max_attempts, run_after)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                [
+                    (batch_id, user_id, organization_id, plan_type, JOB_TYPE_DOCUMENT, path,
+                     os.path.basename(path), preflight.get('page_count'), preflight.get('has_text_layer'),
+                     preflight.get('image_dpi'), preflight.get('estimated_seconds'),
+                     settings.job_max_attempts, now)
+                    for path, preflight in zip(file_paths, preflights)
+                ]
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+        self._enqueued.set()
+        logger.info(f"Queued {len(file_paths)} jobs for batch {batch_id}")
+        return len(file_paths)
+
+    async def enqueue_batch_file(
+        self,
+        batch_id: str,
+        user_id: int,
+        organization_id: Optional[int],
+        file_path: str,
+        plan_type: Optional[str] = None,
+        preflight: Optional[Dict[str, Any]] = None
+    ) -> Optional[int]:
+        """
+        Queue the job for one file of an uploading batch.
+        The job is only inserted while the batch is still uploading and has fewer than
+        total_files files, checked in the same statement, so a concurrent complete,
+        cancel or upload can't slip a job into a sealed batch or overfill it.
+
+        Args:
+            batch_id: Uploading batch
+            user_id: Batch owner
+            organization_id: Owner's organization
+            file_path: Path of the saved upload
+            plan_type: Organization's plan (sets its fair-share scheduling weight)
+            preflight: Preflight report for the file
+
+        Returns:
+            Files received by the batch including this one, or None if it wasn't queued
+        """
+        preflight = preflight or {}
+        db = await get_db()
+        try:
+            await db.execute("BEGIN IMMEDIATE")
+            cursor = await db.execute(
+                """INSERT INTO processing_jobs
+                   (batch_id, user_id, organization_id, plan_type, job_type, file_path, filename,
+                    page_count, has_text_layer, image_dpi, estimated_seconds, max_attempts, run_after)
+                   SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+                   FROM batches
+                   WHERE batches.id = ? AND batches.user_id = ? AND batches.status = 'uploading'
+                     AND (SELECT COUNT(*) FROM processing_jobs
+                          WHERE batch_id = batches.id AND job_type = ?) < batches.total_files""",
+                (batch_id, user_id, organization_id, plan_type, JOB_TYPE_DOCUMENT, file_path,
+                 os.path.basename(file_path), preflight.get('page_count'), preflight.get('has_text_layer'),
+                 preflight.get('image_dpi'), preflight.get('estimated_seconds'), settings.job_max_attempts,
+                 time.time(), batch_id, user_id, JOB_TYPE_DOCUMENT)
+            )
+            if cursor.rowcount == 0:
+                await db.rollback()
+                return None
+
+            cursor = await db.execute(
+                "SELECT COUNT(*) AS files FROM processing_jobs WHERE batch_id = ? AND job_type = ?",
+                (batch_id, JOB_TYPE_DOCUMENT)
+            )
+            received = (await cursor.fetchone())['files']
+            await db.commit()
+        finally:
+            await db.close()
+
+        self._enqueued.set()
+        return received
+
+    async def wait_for_jobs(self, timeout: float) -> None:
+        """
+        Sleep until jobs are enqueued in this process or the timeout passes.
+        Jobs enqueued by other processes are picked up on the next poll.
+        """
+        try:
+            await asyncio.wait_for(self._enqueued.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._enqueued.clear()
+
+    # ========================================================================
+    # Workers
+    # ========================================================================
+
+    async def claim(
+        self,
+        worker_id: str,
+        limit: int = 1,
+        organization_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Lease up to `limit` runnable jobs: queued jobs whose backoff has passed,
+        and running jobs whose worker stopped renewing the lease.
+        Shortest expected job first (from preflight), with waiting jobs aging toward
+        the front so long documents still get their turn.
+        Never lets more than settings.max_global_running_jobs run across all workers.
+
+        Args:
+            worker_id: Unique ID of the claiming worker
+            limit: Maximum number of jobs to claim
+            organization_id: Only claim this organization's jobs (0 = jobs without an organization)
+
+        Returns:
+            Claimed job dicts (attempts already incremented)
+        """
+        if limit <= 0:
+            return []
+
+        now = time.time()
+        org_filter = ""
+        params: List[Any] = [JOB_QUEUED, now, JOB_RUNNING, now]
+        if organization_id is not None:
+            org_filter = "AND COALESCE(organization_id, 0) = ?"
+            params.append(organization_id)
+
+        db = await get_db()
+        try:
+            # Take the write lock up front so the global running count can't change under us
+            await db.execute("BEGIN IMMEDIATE")
+
+            if settings.max_global_running_jobs > 0:
+                cursor = await db.execute(
+                    "SELECT COUNT(*) AS running FROM processing_jobs WHERE status = ? AND lease_expires_at >= ?",
+                    (JOB_RUNNING, now)
+                )
+                running = (await cursor.fetchone())['running']
+                limit = min(limit, settings.max_global_running_jobs - running)
+                if limit <= 0:
+                    await db.rollback()
+                    return []
+
+            cursor = await db.execute(
+                f"""UPDATE processing_jobs
+                    SET status = ?, lease_owner = ?, lease_expires_at = ?, started_at = ?,
+                        attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN (
+                        SELECT id FROM processing_jobs
+                        WHERE ((status = ? AND run_after <= ?)
+                           OR (status = ? AND lease_expires_at < ?))
+                          {org_filter}
+                        ORDER BY COALESCE(estimated_seconds, 0) - (? - run_after) * ?, id
+                        LIMIT ?
+                    )
+                    RETURNING *""",
+                (JOB_RUNNING, worker_id, now + settings.job_lease_seconds, now, *params,
+                 now, settings.sjf_aging_seconds_per_second, limit)
+            )
+            rows = await cursor.fetchall()
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            await db.close()
+
+        jobs = sorted((_job_from_row(row) for row in rows), key=lambda job: job['id'])
+        for job in jobs:
+            if job['attempts'] > 1:
+                logger.info(f"Worker {worker_id} resumed job {job['id']} at stage {job['stage']} (attempt {job['attempts']})")
+        return jobs
+
+    async def runnable_by_organization(self) -> List[Dict[str, Any]]:
+        """
+        Count claimable jobs per organization, for the fair-share scheduler.
+
+        Returns:
+            List of dicts with organization_id (0 = none), plan_type and runnable count
+        """
+        now = time.time()
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """SELECT COALESCE(organization_id, 0) AS organization_id,
+                          MAX(plan_type) AS plan_type,
+                          COUNT(*) AS runnable
+                   FROM processing_jobs
+                   WHERE (status = ? AND run_after <= ?)
+                      OR (status = ? AND lease_expires_at < ?)
+                   GROUP BY COALESCE(organization_id, 0)""",
+                (JOB_QUEUED, now, JOB_RUNNING, now)
+            )
+            return [dict(row) for row in await cursor.fetchall()]
+        finally:
+            await db.close()
+
+    async def heartbeat(self, worker_id: str, job_ids: List[int]) -> List[int]:
+        """
+        Extend the leases a worker holds.
+
+        Returns:
+            IDs of jobs whose lease was renewed (missing IDs were lost to another worker)
+        """
+        if not job_ids:
+            return []
+
+        placeholders = ",".join("?" for _ in job_ids)
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                f"""UPDATE processing_jobs
+                    SET lease_expires_at = ?
+                    WHERE lease_owner = ? AND status = ? AND id IN ({placeholders})
+                    RETURNING id""",
+                (time.time() + settings.job_lease_seconds, worker_id, JOB_RUNNING, *job_ids)
+            )
+            renewed = [row['id'] for row in await cursor.fetchall()]
+            await db.commit()
+            return renewed
+        finally:
+            await db.close()
+
+    async def save_checkpoint(self, job_id: int, worker_id: str, stage: str, checkpoint: Dict[str, Any]) -> None:
+        """
+        Record that a job completed a stage, with the outputs later stages need.
+
+        Raises:
+            LeaseLostError: If the worker no longer holds the job
+        """
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """UPDATE processing_jobs
+                   SET stage = ?, checkpoint_json = ?, lease_expires_at = ?, updated_at = CURRENT_TIMESTAMP
+                   WHERE id = ? AND lease_owner = ? AND status = ?""",
+                (stage, json.dumps(checkpoint, default=str),
+                 time.time() + settings.job_lease_seconds, job_id, worker_id, JOB_RUNNING)
+            )
+            await db.commit()
+            if cursor.rowcount == 0:
+                raise LeaseLostError(f"Job {job_id} is no longer leased by {worker_id}")
+        finally:
+            await db.close()
+
+    async def finish_document(
+        self,
+        job: Dict[str, Any],
+        worker_id: str,
+        result: Dict[str, Any],
+        document_id: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Complete a document job and append its batch result in one transaction.
+        Queues the batch's finalize job once no document jobs remain.
+
+        Args:
+            job: Claimed job
+            worker_id: Worker holding the lease
+            result: DocumentResult dict (a failed job carries its error here)
+            document_id: document_metadata ID, if the document was saved for review
+
+        Returns:
+            Dict with the result's seq and the batch's processed_files and total_files
+
+        Raises:
+            LeaseLostError: If the worker no longer holds the job (also when its batch was
+                paused or cancelled meanwhile)
+        """
+        status = JOB_FAILED if result.get('error') else JOB_COMPLETED
+
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """UPDATE processing_jobs
+                   SET status = ?, last_error = ?, lease_owner = NULL, lease_expires_at = NULL,
+                       updated_at = CURRENT_TIMESTAMP
+                   WHERE id = ? AND lease_owner = ? AND status = ?""",
+                (status, result.get('error'), job['id'], worker_id, JOB_RUNNING)
+            )
+            if cursor.rowcount == 0:
+                await db.rollback()
+                raise LeaseLostError(f"Job {job['id']} is no longer leased by {worker_id}")
+
+            seq, processed_files, total_files = await append_batch_document(db, job['batch_id'], result, document_id)
+
+            # Last document of the batch: hand off to a finalize job
+            finalize_queued = await self._queue_finalize(
+                db, job['batch_id'], job['user_id'], job['organization_id'], job['plan_type']
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+        if finalize_queued:
+            self._enqueued.set()
+        return {'seq': seq, 'processed_files': processed_files, 'total_files': total_files}
+
+    async def _queue_finalize(
+        self,
+        db: Any,
+        batch_id: str,
+        user_id: int,
+        organization_id: Optional[int],
+        plan_type: Optional[str]
+    ) -> bool:
+        """
+        Insert the batch's finalize job if no document jobs are pending, the upload is
+        complete and the batch isn't paused or cancelled. At most one finalize job per batch.
+        Runs in the caller's transaction.
+
+        Returns:
+            True if the finalize job was queued
+        """
+        cursor = await db.execute(
+            """INSERT INTO processing_jobs
+               (batch_id, user_id, organization_id, plan_type, job_type, max_attempts, run_after)
+               SELECT ?, ?, ?, ?, ?, ?, ?
+               WHERE NOT EXISTS (
+                   SELECT 1 FROM processing_jobs
+                   WHERE batch_id = ? AND (
+                       (job_type = ? AND status IN (?, ?)) OR job_type = ?
+                   )
+               )
+               AND NOT EXISTS (
+                   SELECT 1 FROM batches WHERE id = ? AND status IN ('uploading', 'paused', 'cancelled')
+               )""",
+            (batch_id, user_id, organization_id, plan_type, JOB_TYPE_FINALIZE,
+             settings.job_max_attempts, time.time(),
+             batch_id, JOB_TYPE_DOCUMENT, JOB_QUEUED, JOB_RUNNING, JOB_TYPE_FINALIZE,
+             batch_id)
+        )
+        return cursor.rowcount == 1
+
+    async def seal_batch(
+        self,
+        batch_id: str,
+        user_id: int,
+        organization_id: Optional[int],
+        plan_type: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Mark an uploading batch's upload complete: it moves to processing with total_files
+        set to the files actually received, and is finalized once they are all processed
+        (right away if they already are).
+
+        Args:
+            batch_id: Uploading batch
+            user_id: Batch owner
+            organization_id: Owner's organization
+            plan_type: Organization's plan (scheduling weight of the finalize job)
+
+        Returns:
+            The batch's final file count, or None if the batch wasn't uploading
+        """
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """UPDATE batches
+                   SET status = 'processing',
+                       total_files = (SELECT COUNT(*) FROM processing_jobs WHERE batch_id = ? AND job_type = ?)
+                   WHERE id = ? AND user_id = ? AND status = 'uploading'
+                   RETURNING total_files""",
+                (batch_id, JOB_TYPE_DOCUMENT, batch_id, user_id)
+            )
+            row = await cursor.fetchone()
+            if row is None:
+                await db.rollback()
+                return None
+
+            finalize_queued = await self._queue_finalize(db, batch_id, user_id, organization_id, plan_type)
+            await db.commit()
+        finally:
+            await db.close()
+
+        if finalize_queued:
+            self._enqueued.set()
+        return row['total_files']
+
+    async def batch_upload_totals(self, batch_id: str) -> Dict[str, int]:
+        """
+        Count the files and preflight pages queued for a batch so far.
+
+        Returns:
+            Dict with files and pages
+        """
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """SELECT COUNT(*) AS files, COALESCE(SUM(page_count), 0) AS pages
+                   FROM processing_jobs WHERE batch_id = ? AND job_type = ?""",
+                (batch_id, JOB_TYPE_DOCUMENT)
+            )
+            row = await cursor.fetchone()
+            return {'files': row['files'], 'pages': row['pages']}
+        finally:
+            await db.close()
+
+    async def finish(self, job: Dict[str, Any], worker_id: str, error: Optional[str] = None) -> None:
+        """
+        Complete (or permanently fail) a job that has no batch result row, e.g. a finalize job.
+
+        Raises:
+            LeaseLostError: If the worker no longer holds the job
+        """
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """UPDATE processing_jobs
+                   SET status = ?, last_error = ?, lease_owner = NULL, lease_expires_at = NULL,
+                       updated_at = CURRENT_TIMESTAMP
+                   WHERE id = ? AND lease_owner = ? AND status = ?""",
+                (JOB_FAILED if error else JOB_COMPLETED, error, job['id'], worker_id, JOB_RUNNING)
+            )
+            await db.commit()
+            if cursor.rowcount == 0:
+                raise LeaseLostError(f"Job {job['id']} is no longer leased by {worker_id}")
+        finally:
+            await db.close()
+
+    async def retry(self, job: Dict[str, Any], worker_id: str, error: str, delay: Optional[float] = None) -> bool:
+        """
+        Put a failed job back in the queue after a backoff delay.
+        The job keeps its checkpoint, so the next attempt resumes at the failed stage.
+
+        Args:
+            job: Claimed job
+            worker_id: Worker holding the lease
+            error: Error message of the failed attempt
+            delay: Seconds to wait before the next attempt (default: exponential backoff)
+
+        Returns:
+            True if requeued, False if the lease was already lost
+        """
+        if delay is None:
+            delay = retry_delay(job['attempts'])
+
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """UPDATE processing_jobs
+                   SET status = ?, run_after = ?, last_error = ?, lease_owner = NULL,
+                       lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                   WHERE id = ? AND lease_owner = ? AND status = ?""",
+                (JOB_QUEUED, time.time() + delay, error, job['id'], worker_id, JOB_RUNNING)
+            )
+            await db.commit()
+            return cursor.rowcount == 1
+        finally:
+            await db.close()
+
+    async def release(self, worker_id: str, job_ids: List[int]) -> int:
+        """
+        Hand leased jobs back on graceful shutdown, without counting the interrupted attempt.
+
+        Returns:
+            Number of jobs released
+        """
+        if not job_ids:
+            return 0
+
+        placeholders = ",".join("?" for _ in job_ids)
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                f"""UPDATE processing_jobs
+                    SET status = ?, run_after = ?, attempts = MAX(attempts - 1, 0),
+                        lease_owner = NULL, lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE lease_owner = ? AND status = ? AND id IN ({placeholders})""",
+                (JOB_QUEUED, time.time(), worker_id, JOB_RUNNING, *job_ids)
+            )
+            await db.commit()
+            return cursor.rowcount
+        finally:
+            await db.close()
+
+    # ========================================================================
+    # Batch control (owner actions)
+    # ========================================================================
+
+    async def cancel_batch(self, batch_id: str, user_id: int) -> Optional[int]:
+        """
+        Cancel an unfinished batch: its queued and paused jobs never run, and running jobs
+        lose their lease, so workers drop them at the next stage boundary (heartbeat or
+        checkpoint) instead of spending OCR and AI calls on them.
+
+        Args:
+            batch_id: Batch to cancel
+            user_id: Batch owner
+
+        Returns:
+            Number of jobs cancelled, or None if the batch isn't uploading, processing or paused
+        """
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """UPDATE batches SET status = 'cancelled'
+                   WHERE id = ? AND user_id = ? AND status IN ('uploading', 'processing', 'paused')
+                   RETURNING id""",
+                (batch_id, user_id)
+            )
+            if await cursor.fetchone() is None:
+                await db.rollback()
+                return None
+
+            cursor = await db.execute(
+                """UPDATE processing_jobs
+                   SET status = ?, last_error = ?, lease_owner = NULL, lease_expires_at = NULL,
+                       updated_at = CURRENT_TIMESTAMP
+                   WHERE batch_id = ? AND status IN (?, ?, ?)""",
+                (JOB_CANCELLED, "Cancelled by user", batch_id, JOB_QUEUED, JOB_RUNNING, JOB_PAUSED)
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+        logger.info(f"Cancelled batch {batch_id} ({cursor.rowcount} jobs)")
+        return cursor.rowcount
+
+    async def pause_batch(self, batch_id: str, user_id: int) -> Optional[int]:
+        """
+        Pause a processing batch. Queued document jobs stop being claimed, and running ones
+        are taken from their workers at the next stage boundary. Paused jobs keep their
+        checkpoints, so resuming continues from the last completed stage.
+
+        Args:
+            batch_id: Batch to pause
+            user_id: Batch owner
+
+        Returns:
+            Number of document jobs paused, or None if the batch isn't processing
+        """
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """UPDATE batches SET status = 'paused'
+                   WHERE id = ? AND user_id = ? AND status = 'processing'
+                   RETURNING id""",
+                (batch_id, user_id)
+            )
+            if await cursor.fetchone() is None:
+                await db.rollback()
+                return None
+
+            # An interrupted attempt doesn't count against the job's retries
+            cursor = await db.execute(
+                """UPDATE processing_jobs
+                   SET status = ?, attempts = CASE WHEN status = ? THEN MAX(attempts - 1, 0) ELSE attempts END,
+                       lease_owner = NULL, lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                   WHERE batch_id = ? AND job_type = ? AND status IN (?, ?)""",
+                (JOB_PAUSED, JOB_RUNNING, batch_id, JOB_TYPE_DOCUMENT, JOB_QUEUED, JOB_RUNNING)
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+        logger.info(f"Paused batch {batch_id} ({cursor.rowcount} jobs)")
+        return cursor.rowcount
+
+    async def resume_batch(
+        self,
+        batch_id: str,
+        user_id: int,
+        organization_id: Optional[int],
+        plan_type: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Resume a paused batch: its paused jobs are queued again at their checkpoints
+        (finalized right away if nothing was left to process).
+
+        Args:
+            batch_id: Paused batch
+            user_id: Batch owner
+            organization_id: Owner's organization
+            plan_type: Organization's plan (scheduling weight of the finalize job)
+
+        Returns:
+            Number of document jobs requeued, or None if the batch isn't paused
+        """
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """UPDATE batches SET status = 'processing'
+                   WHERE id = ? AND user_id = ? AND status = 'paused'
+                   RETURNING id""",
+                (batch_id, user_id)
+            )
+            if await cursor.fetchone() is None:
+                await db.rollback()
+                return None
+
+            cursor = await db.execute(
+                """UPDATE processing_jobs
+                   SET status = ?, run_after = ?, updated_at = CURRENT_TIMESTAMP
+                   WHERE batch_id = ? AND status = ?""",
+                (JOB_QUEUED, time.time(), batch_id, JOB_PAUSED)
+            )
+            resumed = cursor.rowcount
+            await self._queue_finalize(db, batch_id, user_id, organization_id, plan_type)
+            await db.commit()
+        finally:
+            await db.close()
+
+        self._enqueued.set()
+        logger.info(f"Resumed batch {batch_id} ({resumed} jobs)")
+        return resumed
+
+    async def retry_failed(self, batch_id: str, user_id: int) -> Optional[int]:
+        """
+        Requeue only the failed documents of a finished batch.
+        Each job starts over from its stored upload with a fresh set of attempts but keeps its
+        checkpoint, so stages that succeeded before (e.g. OCR) aren't run again. The failed
+        result rows are removed and the batch is finalized again once the retries finish.
+
+        Args:
+            batch_id: Completed or failed batch
+            user_id: Batch owner
+
+        Returns:
+            Number of documents requeued (0 if none failed), or None if the batch isn't finished
+        """
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """UPDATE batches SET status = 'processing', completed_at = NULL
+                   WHERE id = ? AND user_id = ? AND status IN ('completed', 'failed')
+                   RETURNING id""",
+                (batch_id, user_id)
+            )
+            if await cursor.fetchone() is None:
+                await db.rollback()
+                return None
+
+            cursor = await db.execute(
+                """UPDATE processing_jobs
+                   SET status = ?, attempts = 0, last_error = NULL, run_after = ?,
+                       lease_owner = NULL, lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                   WHERE batch_id = ? AND job_type = ? AND status = ?
+                   RETURNING filename""",
+                (JOB_QUEUED, time.time(), batch_id, JOB_TYPE_DOCUMENT, JOB_FAILED)
+            )
+            filenames = [row['filename'] for row in await cursor.fetchall()]
+            if not filenames:
+                await db.rollback()
+                return 0
+
+            # Uploads are stored by filename, so it identifies the document within its batch
+            placeholders = ",".join("?" for _ in filenames)
+            cursor = await db.execute(
+                f"""DELETE FROM batch_documents
+                    WHERE batch_id = ? AND status = 'failed' AND filename IN ({placeholders})""",
+                (batch_id, *filenames)
+            )
+            await db.execute(
+                """UPDATE batches
+                   SET processed_files = processed_files - ?, failed = failed - ?
+                   WHERE id = ?""",
+                (cursor.rowcount, cursor.rowcount, batch_id)
+            )
+            await db.execute(
+                "DELETE FROM processing_jobs WHERE batch_id = ? AND job_type = ?",
+                (batch_id, JOB_TYPE_FINALIZE)
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+        self._enqueued.set()
+        logger.info(f"Retrying {len(filenames)} failed documents of batch {batch_id}")
+        return len(filenames)
+
+    # ========================================================================
+    # Introspection
+    # ========================================================================
+
+    async def get_batch_jobs(self, batch_id: str) -> List[Dict[str, Any]]:
+        """Get all jobs of a batch in creation order."""
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                "SELECT * FROM processing_jobs WHERE batch_id = ? ORDER BY id",
+                (batch_id,)
+            )
+            return [_job_from_row(row) for row in await cursor.fetchall()]
+        finally:
+            await db.close()
+
+    async def estimate_batch(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Estimate the remaining processing time of a batch from its jobs' preflight costs.
+        Assumes the batch gets up to max_concurrent_processing jobs in parallel.
+
+        Returns:
+            Dict with remaining_seconds (work left) and eta_seconds (wall clock)
+        """
+        now = time.time()
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """SELECT status, estimated_seconds, started_at FROM processing_jobs
+                   WHERE batch_id = ? AND job_type = ? AND status IN (?, ?)""",
+                (batch_id, JOB_TYPE_DOCUMENT, JOB_QUEUED, JOB_RUNNING)
+            )
+            rows = await cursor.fetchall()
+        finally:
+            await db.close()
+
+        remaining = 0.0
+        for row in rows:
+            estimate = row['estimated_seconds'] or settings.preflight_base_seconds
+            if row['status'] == JOB_RUNNING and row['started_at']:
+                estimate = max(estimate - (now - row['started_at']), 0.0)
+            remaining += estimate
+
+        parallelism = max(1, min(settings.max_concurrent_processing, len(rows)))
+        return {
+            "remaining_seconds": round(remaining, 1),
+            "eta_seconds": round(remaining / parallelism, 1)
+        }
+
+    async def backlog(self) -> Dict[str, Any]:
+        """
+        Get the document work waiting across all workers, for admission control.
+
+        Returns:
+            Dict with queued and running document job counts, and queued_seconds
+            (sum of the queued jobs' preflight estimates)
+        """
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """SELECT status, COUNT(*) AS count, COALESCE(SUM(estimated_seconds), 0) AS seconds
+                   FROM processing_jobs
+                   WHERE status IN (?, ?) AND job_type = ?
+                   GROUP BY status""",
+                (JOB_QUEUED, JOB_RUNNING, JOB_TYPE_DOCUMENT)
+            )
+            rows = {row['status']: row for row in await cursor.fetchall()}
+        finally:
+            await db.close()
+
+        queued = rows.get(JOB_QUEUED)
+        running = rows.get(JOB_RUNNING)
+        return {
+            "queued": queued['count'] if queued else 0,
+            "running": running['count'] if running else 0,
+            "queued_seconds": round(queued['seconds'], 1) if queued else 0.0
+        }
+
+    async def stats(self) -> Dict[str, Any]:
+        """Get job counts by status for the metrics endpoint."""
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                "SELECT status, COUNT(*) AS count FROM processing_jobs GROUP BY status"
+            )
+            counts = {row['status']: row['count'] for row in await cursor.fetchall()}
+            cursor = await db.execute(
+                "SELECT MIN(created_at) AS oldest FROM processing_jobs WHERE status = ?",
+                (JOB_QUEUED,)
+            )
+            row = await cursor.fetchone()
+            return {
+                "queued": counts.get(JOB_QUEUED, 0),
+                "running": counts.get(JOB_RUNNING, 0),
+                "completed": counts.get(JOB_COMPLETED, 0),
+                "failed": counts.get(JOB_FAILED, 0),
+                "oldest_queued_at": row['oldest'] if row else None
+            }
+        finally:
+            await db.close()
+
+
+# Singleton instance
+_job_queue = None
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Get singleton instance of the job queue.
+
+    Returns:
+        JobQueue instance
+    """
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
@@ -2,6 +2,25 @@
 Main FastAPI application entry point.
 Configures the web server, middleware, and routes.
 """
+from backend.utils.startup_profile import StartupProfile
+
+# Import the heavy modules one at a time so the startup profile can attribute their cost.
+# Connector plugins (DocuWare, Google Drive) aren't among them: they load on first use.
+startup_profile = StartupProfile()
+startup_profile.time_imports([
+    "fastapi",
+    "backend.config",
+    "backend.database",
+    "backend.routes.upload",
+    "backend.routes.connector_routes",
+    "backend.routes.auth_routes",
+    "backend.routes.organization_routes",
+    "backend.routes.document_routes",
+    "backend.routes.metrics_routes",
+    "backend.worker",
+    "backend.upload_worker",
+])
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -10,8 +29,11 @@ from backend.routes import connector_routes
 from backend.routes import auth_routes
 from backend.routes import organization_routes
 from backend.routes import document_routes
+from backend.routes import metrics_routes
 from backend.config import settings
 from backend.database import init_database
+from backend.worker import JobWorker
+from backend.upload_worker import UploadWorker
 import os
 import logging
 import sys
@@ -24,6 +46,7 @@ app = FastAPI(
     docs_url="/docs",  # Swagger UI at /docs
     redoc_url="/redoc"  # ReDoc at /redoc
 )
+app.state.startup_profile = startup_profile
 
 # CORS middleware - allows frontend to call API
 app.add_middleware(
@@ -44,6 +67,8 @@ app.include_router(organization_routes.router, tags=["organizations"])
 app.include_router(upload.router, prefix="/api", tags=["documents"])
 app.include_router(connector_routes.router, tags=["connectors"])
 app.include_router(document_routes.router, tags=["documents"])
+app.include_router(metrics_routes.router, tags=["metrics"])
+app.include_router(metrics_routes.readiness_router, tags=["health"])
 
 # Serve frontend static files (HTML, CSS, JS)
 # This must come LAST to avoid overriding API routes
@@ -98,7 +123,8 @@ async def startup_event():
 
     # Initialize database
     try:
-        await init_database()
+        with startup_profile.phase("init_database"):
+            await init_database()
         print("[OK] Database initialized")
     except Exception as e:
         print(f"[ERROR] Failed to initialize database: {str(e)}")
@@ -116,15 +142,33 @@ async def startup_event():
     print(f"Concurrent processing: {settings.max_concurrent_processing}")
     print(f"Database: {settings.database_url}")
     print(f"Logging: INFO level enabled")
+    print(f"Worker: {'embedded' if settings.embedded_worker else 'standalone (python backend/worker.py)'}")
     print("=" * 60 + "\n")
 
+    # Process queued jobs and uploads in this process unless dedicated workers are deployed
+    if settings.embedded_worker:
+        app.state.worker = JobWorker()
+        app.state.worker.start()
+        app.state.uploader = UploadWorker()
+        app.state.uploader.start()
+
+    startup_profile.mark_ready()
+    print(f"Startup: ready in {startup_profile.summary()}")
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """
     Run on application shutdown.
-    Clean up resources if needed.
+    Stops the embedded worker and uploader; their in-flight jobs and uploads go back to the queue.
     """
+    worker = getattr(app.state, "worker", None)
+    if worker is not None:
+        await worker.stop()
+    uploader = getattr(app.state, "uploader", None)
+    if uploader is not None:
+        await uploader.stop()
+
     print("\n[SHUTDOWN] Shutting down Document Digitization Service...")
 
 
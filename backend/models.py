@@ -262,14 +262,28 @@ class ExtractedData(BaseModel):
 class ProcessingStatus(str, Enum):
     """
     Status of a document processing batch.
-    Tracks the lifecycle: pending -> processing -> completed/failed
+    Tracks the lifecycle: (uploading ->) processing -> completed/failed.
+    Batches uploaded file by file stay "uploading" until the client completes the upload;
+    their files are processed as they arrive. A processing batch can be paused (and resumed)
+    or cancelled by its owner; retrying failed documents moves it back to processing.
     """
     PENDING = "pending"
+    UPLOADING = "uploading"
     PROCESSING = "processing"
+    PAUSED = "paused"
+    CANCELLED = "cancelled"
     COMPLETED = "completed"
     FAILED = "failed"
 
 
+# Batch statuses nothing moves a batch out of, except an explicit retry or resume
+TERMINAL_BATCH_STATUSES = frozenset({
+    ProcessingStatus.COMPLETED.value,
+    ProcessingStatus.FAILED.value,
+    ProcessingStatus.CANCELLED.value
+})
+
+
 class DocumentResult(BaseModel):
     """
     Result of processing a single document.
@@ -303,12 +317,37 @@ class BatchUploadResponse(BaseModel):
     total_files: int
     status: ProcessingStatus
     started_at: datetime
+    total_pages: Optional[int] = None  # From upload preflight
+    eta_seconds: Optional[float] = None  # Estimated time until the batch is processed
 
     class Config:
         """Allow enum values in JSON responses"""
         use_enum_values = True
 
 
+class BatchFileResponse(BaseModel):
+    """
+    Response for one file added to an uploading batch.
+    The file is already queued for processing when this is returned.
+    """
+    batch_id: str
+    filename: str
+    received_files: int  # Files received so far, including this one
+    total_files: int  # Files the client announced when opening the batch
+    page_count: int
+    estimated_seconds: float
+
+
+class BatchActionResponse(BaseModel):
+    """Response for cancelling, pausing, resuming or retrying a batch."""
+    batch_id: str
+    status: ProcessingStatus  # Batch status after the action
+    affected_documents: int  # Document jobs cancelled, paused, resumed or requeued
+
+    class Config:
+        use_enum_values = True
+
+
 class BatchResultResponse(BaseModel):
     """
     Complete result of a batch processing job.
@@ -320,9 +359,11 @@ class BatchResultResponse(BaseModel):
     processed_files: int
     successful: int
     failed: int
-    results: List[DocumentResult]
+    results: List[DocumentResult]  # Only results after `since` when polling with a cursor
     processing_summary: dict  # Category -> count mapping
     download_url: Optional[str] = None
+    cursor: int = 0  # Sequence number of the last result included; pass back as `since`
+    eta_seconds: Optional[float] = None  # Estimated time left while processing (from preflight costs)
 
     class Config:
         """Allow enum values in JSON responses"""
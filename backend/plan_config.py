@@ -20,7 +20,9 @@ PLAN_TIERS = {
             "Basic field extraction",
             "14-day trial period"
         ],
-        "is_trial": True
+        "is_trial": True,
+        "scheduling_weight": 1,  # Share of worker capacity relative to other plans
+        "max_pages_per_batch": 100  # Pages accepted per upload (None = unlimited)
     },
     "starter": {
         "name": "Starter Plan",
@@ -36,7 +38,9 @@ PLAN_TIERS = {
             "Email support",
             "$0.10 per document over limit"
         ],
-        "is_trial": False
+        "is_trial": False,
+        "scheduling_weight": 2,  # Share of worker capacity relative to other plans
+        "max_pages_per_batch": 1000  # Pages accepted per upload (None = unlimited)
     },
     "professional": {
         "name": "Professional Plan",
@@ -53,7 +57,9 @@ PLAN_TIERS = {
             "Priority support",
             "$0.08 per document over limit"
         ],
-        "is_trial": False
+        "is_trial": False,
+        "scheduling_weight": 4,  # Share of worker capacity relative to other plans
+        "max_pages_per_batch": 5000  # Pages accepted per upload (None = unlimited)
     },
     "enterprise": {
         "name": "Enterprise Plan",
@@ -71,7 +77,9 @@ PLAN_TIERS = {
             "SSO & advanced security",
             "$0.05 per document over limit"
         ],
-        "is_trial": False
+        "is_trial": False,
+        "scheduling_weight": 8,  # Share of worker capacity relative to other plans
+        "max_pages_per_batch": None  # Pages accepted per upload (None = unlimited)
     }
 }
 
@@ -157,6 +165,51 @@ def is_trial_expired(trial_end_date) -> bool:
     return datetime.utcnow() > trial_end_date
 
 
+def get_scheduling_weight(plan_name: str) -> int:
+    """
+    Get the fair-share scheduling weight for a plan.
+    Organizations with queued documents get worker capacity in proportion to their weights.
+
+    Args:
+        plan_name: Plan identifier (unknown plans get the lowest weight)
+
+    Returns:
+        Scheduling weight (>= 1)
+    """
+    config = PLAN_TIERS.get(plan_name) or PLAN_TIERS["trial"]
+    return max(1, config.get("scheduling_weight", 1))
+
+
+def check_batch_pages(plan_name: str, total_pages: int) -> Dict[str, Any]:
+    """
+    Check a batch's preflight page count against the plan's per-upload page limit.
+
+    Args:
+        plan_name: Plan identifier
+        total_pages: Total pages across the batch's files
+
+    Returns:
+        Dict with allowed (bool), reason (str), limit (int), pages (int)
+    """
+    config = PLAN_TIERS.get(plan_name) or PLAN_TIERS["trial"]
+    limit = config.get("max_pages_per_batch")
+
+    if limit is not None and total_pages > limit:
+        return {
+            "allowed": False,
+            "reason": f"Batch has {total_pages} pages; {config['display_name']} allows {limit} pages per upload",
+            "limit": limit,
+            "pages": total_pages
+        }
+
+    return {
+        "allowed": True,
+        "reason": "Within limit",
+        "limit": limit,
+        "pages": total_pages
+    }
+
+
 def get_usage_limit(plan_name: str) -> int:
     """
     Get document limit for a plan.
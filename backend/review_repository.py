@@ -0,0 +1,670 @@
+"""
+Async repository for the review workflow tables (document_metadata, field_corrections).
+All access goes through pooled aiosqlite connections so coroutines never block the event loop.
+"""
+import json
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from database import get_db
+from upload_outbox import get_upload_outbox
+
+logger = logging.getLogger(__name__)
+
+# Documents a reviewer can approve: awaiting review, or failed (a dead upload is retried by approving again)
+APPROVABLE_STATUSES = ('pending_review', 'failed')
+
+
+class ReviewRepository:
+    """
+    Data access for reviewed documents and their field corrections.
+    """
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Any]:
+        """
+        Open a pooled connection and run the block in one transaction.
+        Commits on success, rolls back on error.
+        """
+        db = await get_db()
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            await db.close()
+
+    # ========================================================================
+    # Documents
+    # ========================================================================
+
+    async def create_document(
+        self,
+        organization_id: int,
+        batch_id: str,
+        filename: str,
+        file_path: str,
+        category: Optional[str],
+        extracted_data: Dict[str, Any],
+        confidence_score: float,
+        connector_type: Optional[str] = None,
+        connector_config_snapshot: Optional[str] = None,
+        status: str = 'pending_review'
+    ) -> int:
+        """
+        Insert a processed document awaiting review.
+
+        Returns:
+            New document ID
+        """
+        async with self.transaction() as db:
+            cursor = await db.execute('''
+                INSERT INTO document_metadata
+                (organization_id, batch_id, filename, file_path, category,
+                 extracted_data, status, confidence_score, connector_type, connector_config_snapshot, processed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                organization_id,
+                batch_id,
+                filename,
+                file_path,
+                category,
+                json.dumps(extracted_data),
+                status,
+                confidence_score,
+                connector_type,
+                connector_config_snapshot,
+                datetime.utcnow()
+            ))
+            return cursor.lastrowid
+
+    async def get_document(self, doc_id: int, organization_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get a document row.
+
+        Args:
+            doc_id: Document ID
+            organization_id: If given, only return the document if it belongs to this organization
+
+        Returns:
+            Document dict (extracted_data still JSON-encoded) or None
+        """
+        db = await get_db()
+        try:
+            if organization_id is None:
+                cursor = await db.execute(
+                    'SELECT * FROM document_metadata WHERE id = ?',
+                    (doc_id,)
+                )
+            else:
+                cursor = await db.execute(
+                    'SELECT * FROM document_metadata WHERE id = ? AND organization_id = ?',
+                    (doc_id, organization_id)
+                )
+            row = await cursor.fetchone()
+            return dict(row) if row else None
+        finally:
+            await db.close()
+
+    async def get_extracted_data_for_documents(
+        self,
+        organization_id: int,
+        doc_ids: List[int]
+    ) -> Dict[int, Optional[str]]:
+        """
+        Get several documents' extracted data in one query.
+
+        Returns:
+            Dict of document ID -> extracted_data (still JSON-encoded); documents of other
+            organizations and unknown IDs are missing
+        """
+        if not doc_ids:
+            return {}
+        placeholders = ', '.join('?' for _ in doc_ids)
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                f'SELECT id, extracted_data FROM document_metadata WHERE organization_id = ? AND id IN ({placeholders})',
+                [organization_id] + list(doc_ids)
+            )
+            return {row['id']: row['extracted_data'] for row in await cursor.fetchall()}
+        finally:
+            await db.close()
+
+    async def find_document_id(self, batch_id: str, file_path: str) -> Optional[int]:
+        """
+        Look up the document already saved for an uploaded file.
+        Lets a retried processing job reuse its row instead of inserting a duplicate.
+
+        Returns:
+            Document ID or None
+        """
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                'SELECT id FROM document_metadata WHERE batch_id = ? AND file_path = ? ORDER BY id LIMIT 1',
+                (batch_id, file_path)
+            )
+            row = await cursor.fetchone()
+            return row['id'] if row else None
+        finally:
+            await db.close()
+
+    async def list_pending_documents(self, organization_id: int) -> List[Dict[str, Any]]:
+        """Get documents awaiting review for an organization, newest first."""
+        db = await get_db()
+        try:
+            cursor = await db.execute('''
+                SELECT id, filename, category, confidence_score, created_at
+                FROM document_metadata
+                WHERE organization_id = ? AND status = 'pending_review'
+                ORDER BY created_at DESC
+            ''', (organization_id,))
+            return [dict(row) for row in await cursor.fetchall()]
+        finally:
+            await db.close()
+
+    async def list_documents(
+        self,
+        organization_id: int,
+        status: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get a page of documents for an organization.
+
+        Returns:
+            Tuple of (documents, total matching count)
+        """
+        where = 'WHERE organization_id = ?'
+        params: List[Any] = [organization_id]
+        if status:
+            where += ' AND status = ?'
+            params.append(status)
+
+        db = await get_db()
+        try:
+            cursor = await db.execute(f'''
+                SELECT id, filename, category, status, confidence_score,
+                       created_at, approved_at, connector_type
+                FROM document_metadata
+                {where}
+                ORDER BY created_at DESC LIMIT ? OFFSET ?
+            ''', params + [limit, offset])
+            documents = [dict(row) for row in await cursor.fetchall()]
+
+            cursor = await db.execute(
+                f'SELECT COUNT(*) as count FROM document_metadata {where}',
+                params
+            )
+            total = (await cursor.fetchone())['count']
+
+            return documents, total
+        finally:
+            await db.close()
+
+    async def set_document_status(
+        self,
+        doc_id: int,
+        status: str,
+        organization_id: Optional[int] = None,
+        approved: bool = False,
+        uploaded_to_connector: Optional[bool] = None,
+        error_message: Optional[str] = None
+    ) -> bool:
+        """
+        Update a document's workflow status.
+
+        Args:
+            doc_id: Document ID
+            status: New status (approved, completed, failed, skipped, ...)
+            organization_id: If given, only update the document if it belongs to this organization
+            approved: Also stamp approved_at
+            uploaded_to_connector: Also set the uploaded flag
+            error_message: Also record an error message
+
+        Returns:
+            True if a row was updated
+        """
+        updates = ['status = ?']
+        params: List[Any] = [status]
+
+        if approved:
+            updates.append('approved_at = ?')
+            params.append(datetime.utcnow())
+        if uploaded_to_connector is not None:
+            updates.append('uploaded_to_connector = ?')
+            params.append(1 if uploaded_to_connector else 0)
+        if error_message is not None:
+            updates.append('error_message = ?')
+            params.append(error_message)
+
+        query = f"UPDATE document_metadata SET {', '.join(updates)} WHERE id = ?"
+        params.append(doc_id)
+        if organization_id is not None:
+            query += ' AND organization_id = ?'
+            params.append(organization_id)
+
+        async with self.transaction() as db:
+            cursor = await db.execute(query, params)
+            return cursor.rowcount > 0
+
+    async def approve_document(
+        self,
+        doc_id: int,
+        organization_id: int,
+        corrections: List[Dict[str, Any]],
+        created_by: Optional[str],
+        extracted_data: Dict[str, Any]
+    ) -> Tuple[bool, bool]:
+        """
+        Save corrections, store the corrected data, mark the document approved and
+        queue its connector upload, all in one transaction.
+
+        Returns:
+            (whether the document was approved, False if it isn't awaiting approval (see
+            APPROVABLE_STATUSES); whether its upload was queued, i.e. not already pending)
+        """
+        approved, queued = await self.approve_documents(
+            organization_id,
+            [{'doc_id': doc_id, 'corrections': corrections, 'extracted_data': extracted_data}],
+            created_by
+        )
+        return doc_id in approved, doc_id in queued
+
+    async def approve_documents(
+        self,
+        organization_id: int,
+        approvals: List[Dict[str, Any]],
+        created_by: Optional[str]
+    ) -> Tuple[Set[int], Set[int]]:
+        """
+        Approve several documents in one transaction: the status change in one update,
+        all corrections in one batched insert, all data updates in another, and their
+        connector uploads queued. Only documents in APPROVABLE_STATUSES are approved, so a
+        completed, skipped or already approved document is never uploaded again.
+
+        Args:
+            organization_id: Documents' organization
+            approvals: Dicts with doc_id, corrections and extracted_data (corrected data to store)
+            created_by: Reviewer's email
+
+        Returns:
+            (IDs of the documents approved, IDs of those whose upload was queued, i.e. not
+            already pending)
+        """
+        if not approvals:
+            return set(), set()
+
+        doc_ids = [approval['doc_id'] for approval in approvals]
+        placeholders = ', '.join('?' for _ in doc_ids)
+        statuses = ', '.join('?' for _ in APPROVABLE_STATUSES)
+        outbox = get_upload_outbox()
+        async with self.transaction() as db:
+            cursor = await db.execute(f'''
+                UPDATE document_metadata
+                SET status = 'approved',
+                    approved_at = ?,
+                    error_message = NULL
+                WHERE organization_id = ? AND id IN ({placeholders}) AND status IN ({statuses})
+                RETURNING id
+            ''', [datetime.utcnow(), organization_id] + doc_ids + list(APPROVABLE_STATUSES))
+            approved = {row['id'] for row in await cursor.fetchall()}
+            approvals = [approval for approval in approvals if approval['doc_id'] in approved]
+            if not approvals:
+                return set(), set()
+
+            await db.executemany(self._INSERT_CORRECTION, [
+                self._correction_params(organization_id, approval['doc_id'], correction, created_by)
+                for approval in approvals
+                for correction in approval['corrections']
+            ])
+            await db.executemany(
+                'UPDATE document_metadata SET extracted_data = ? WHERE id = ?',
+                [(json.dumps(approval['extracted_data']), approval['doc_id']) for approval in approvals]
+            )
+            queued = await outbox.add_many(db, [approval['doc_id'] for approval in approvals], organization_id)
+        outbox.notify()
+        return approved, queued
+
+    async def auto_approve_document(self, doc_id: int, organization_id: int) -> bool:
+        """
+        Mark a document approved without review and queue its connector upload,
+        in one transaction. Only documents still pending review are approved, so a
+        retried processing job doesn't upload the document twice.
+
+        Returns:
+            True if an upload was queued, False if the document was already approved
+        """
+        outbox = get_upload_outbox()
+        async with self.transaction() as db:
+            cursor = await db.execute('''
+                UPDATE document_metadata SET status = 'approved', approved_at = ?
+                WHERE id = ? AND organization_id = ? AND status = 'pending_review'
+            ''', (datetime.utcnow(), doc_id, organization_id))
+            if cursor.rowcount == 0:
+                return False
+            queued = await outbox.add(db, doc_id, organization_id)
+        outbox.notify()
+        return queued
+
+    async def get_review_stats(self, organization_id: int) -> Dict[str, Any]:
+        """Get document counts by status and approval totals for an organization."""
+        db = await get_db()
+        try:
+            cursor = await db.execute('''
+                SELECT
+                    status,
+                    COUNT(*) as count,
+                    AVG(confidence_score) as avg_confidence
+                FROM document_metadata
+                WHERE organization_id = ?
+                GROUP BY status
+            ''', (organization_id,))
+
+            status_counts = {}
+            for row in await cursor.fetchall():
+                status_counts[row['status']] = {
+                    'count': row['count'],
+                    'avg_confidence': round(row['avg_confidence'] or 0, 2)
+                }
+
+            cursor = await db.execute('''
+                SELECT
+                    COUNT(CASE WHEN status IN ('completed', 'approved')
+                               AND approved_at IS NOT NULL THEN 1 END) as total_approved,
+                    COUNT(CASE WHEN status = 'pending_review' THEN 1 END) as pending_review
+                FROM document_metadata
+                WHERE organization_id = ?
+            ''', (organization_id,))
+            totals = await cursor.fetchone()
+
+            return {
+                'by_status': status_counts,
+                'total_approved': totals['total_approved'],
+                'pending_review': totals['pending_review']
+            }
+        finally:
+            await db.close()
+
+    # ========================================================================
+    # Field Corrections
+    # ========================================================================
+
+    async def add_correction(
+        self,
+        organization_id: int,
+        doc_id: int,
+        correction: Dict[str, Any],
+        created_by: Optional[str]
+    ) -> int:
+        """
+        Save a single field correction.
+
+        Args:
+            correction: Dict with field_name, original_value, corrected_value,
+                original_confidence and method
+
+        Returns:
+            New correction ID
+        """
+        async with self.transaction() as db:
+            cursor = await db.execute(
+                self._INSERT_CORRECTION,
+                self._correction_params(organization_id, doc_id, correction, created_by)
+            )
+            return cursor.lastrowid
+
+    async def add_corrections(
+        self,
+        organization_id: int,
+        doc_id: int,
+        corrections: List[Dict[str, Any]],
+        created_by: Optional[str]
+    ) -> None:
+        """Save several field corrections in one batched write."""
+        if not corrections:
+            return
+        async with self.transaction() as db:
+            await self._insert_corrections(db, organization_id, doc_id, corrections, created_by)
+
+    async def add_corrections_for_documents(
+        self,
+        organization_id: int,
+        corrections_by_document: Dict[int, List[Dict[str, Any]]],
+        created_by: Optional[str]
+    ) -> int:
+        """
+        Save field corrections for several documents in one batched write.
+
+        Returns:
+            Number of corrections saved
+        """
+        rows = [
+            self._correction_params(organization_id, doc_id, correction, created_by)
+            for doc_id, corrections in corrections_by_document.items()
+            for correction in corrections
+        ]
+        if not rows:
+            return 0
+        async with self.transaction() as db:
+            await db.executemany(self._INSERT_CORRECTION, rows)
+        return len(rows)
+
+    async def get_corrections(self, doc_id: int, newest_first: bool = False) -> List[Dict[str, Any]]:
+        """Get all corrections for a document."""
+        order = 'DESC' if newest_first else 'ASC'
+        db = await get_db()
+        try:
+            cursor = await db.execute(f'''
+                SELECT * FROM field_corrections
+                WHERE document_id = ?
+                ORDER BY created_at {order}
+            ''', (doc_id,))
+            return [dict(row) for row in await cursor.fetchall()]
+        finally:
+            await db.close()
+
+    async def get_corrections_for_documents(
+        self,
+        organization_id: int,
+        doc_ids: List[int]
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """Get corrections for several documents in one query, keyed by document ID."""
+        if not doc_ids:
+            return {}
+        placeholders = ', '.join('?' for _ in doc_ids)
+        db = await get_db()
+        try:
+            cursor = await db.execute(f'''
+                SELECT document_id, field_name, original_value, corrected_value
+                FROM field_corrections
+                WHERE organization_id = ? AND document_id IN ({placeholders})
+            ''', [organization_id] + list(doc_ids))
+
+            by_document: Dict[int, List[Dict[str, Any]]] = {doc_id: [] for doc_id in doc_ids}
+            for row in await cursor.fetchall():
+                by_document[row['document_id']].append(dict(row))
+            return by_document
+        finally:
+            await db.close()
+
+    async def get_recent_field_corrections(
+        self,
+        organization_id: int,
+        field_names: List[str],
+        limit_per_field: int = 50
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get the most recent corrections for each of several fields in one query.
+
+        Returns:
+            Dict of field_name -> corrections (newest first)
+        """
+        if not field_names:
+            return {}
+        placeholders = ', '.join('?' for _ in field_names)
+        db = await get_db()
+        try:
+            cursor = await db.execute(f'''
+                SELECT field_name, corrected_value, original_value, original_confidence
+                FROM (
+                    SELECT field_name, corrected_value, original_value, original_confidence,
+                           ROW_NUMBER() OVER (PARTITION BY field_name ORDER BY created_at DESC) AS rank
+                    FROM field_corrections
+                    WHERE organization_id = ? AND field_name IN ({placeholders})
+                )
+                WHERE rank <= ?
+                ORDER BY field_name, rank
+            ''', [organization_id] + list(field_names) + [limit_per_field])
+
+            by_field: Dict[str, List[Dict[str, Any]]] = {name: [] for name in field_names}
+            for row in await cursor.fetchall():
+                by_field[row['field_name']].append(dict(row))
+            return by_field
+        finally:
+            await db.close()
+
+    async def get_error_prone_fields(self, organization_id: int, min_corrections: int) -> List[Dict[str, Any]]:
+        """Get fields corrected at least min_corrections times, most corrected first."""
+        db = await get_db()
+        try:
+            cursor = await db.execute('''
+                SELECT
+                    field_name,
+                    COUNT(*) as correction_count,
+                    AVG(original_confidence) as avg_confidence
+                FROM field_corrections
+                WHERE organization_id = ?
+                GROUP BY field_name
+                HAVING correction_count >= ?
+                ORDER BY correction_count DESC
+            ''', (organization_id, min_corrections))
+            return [dict(row) for row in await cursor.fetchall()]
+        finally:
+            await db.close()
+
+    async def get_correction_summary(self, organization_id: int) -> Dict[str, Any]:
+        """
+        Get correction totals for an organization.
+
+        Returns:
+            Dict with total_corrections, unique_fields and by_method counts
+        """
+        db = await get_db()
+        try:
+            cursor = await db.execute('''
+                SELECT COUNT(*) as total, COUNT(DISTINCT field_name) as unique_fields
+                FROM field_corrections
+                WHERE organization_id = ?
+            ''', (organization_id,))
+            totals = await cursor.fetchone()
+
+            cursor = await db.execute('''
+                SELECT correction_method, COUNT(*) as count
+                FROM field_corrections
+                WHERE organization_id = ?
+                GROUP BY correction_method
+            ''', (organization_id,))
+            by_method = {row['correction_method']: row['count'] for row in await cursor.fetchall()}
+
+            return {
+                'total_corrections': totals['total'],
+                'unique_fields': totals['unique_fields'],
+                'by_method': by_method
+            }
+        finally:
+            await db.close()
+
+    async def get_recently_corrected_documents(
+        self,
+        organization_id: int,
+        category: Optional[str] = None,
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Get the most recently corrected documents (for few-shot examples)."""
+        query = '''
+            SELECT d.id, d.filename, d.category, MAX(fc.created_at) AS last_corrected_at
+            FROM document_metadata d
+            INNER JOIN field_corrections fc ON fc.document_id = d.id
+            WHERE d.organization_id = ?
+                AND fc.organization_id = ?
+        '''
+        params: List[Any] = [organization_id, organization_id]
+        if category:
+            query += ' AND d.category = ?'
+            params.append(category)
+        query += ' GROUP BY d.id ORDER BY last_corrected_at DESC LIMIT ?'
+        params.append(limit)
+
+        db = await get_db()
+        try:
+            cursor = await db.execute(query, params)
+            return [dict(row) for row in await cursor.fetchall()]
+        finally:
+            await db.close()
+
+    # ========================================================================
+    # Helpers
+    # ========================================================================
+
+    _INSERT_CORRECTION = '''
+        INSERT INTO field_corrections
+        (organization_id, document_id, field_name, original_value,
+         corrected_value, original_confidence, correction_method, created_by)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    @staticmethod
+    def _correction_params(
+        organization_id: int,
+        doc_id: int,
+        correction: Dict[str, Any],
+        created_by: Optional[str]
+    ) -> Tuple[Any, ...]:
+        return (
+            organization_id,
+            doc_id,
+            correction['field_name'],
+            correction.get('original_value'),
+            correction['corrected_value'],
+            correction.get('original_confidence'),
+            correction.get('method', 'manual'),
+            created_by
+        )
+
+    async def _insert_corrections(
+        self,
+        db: Any,
+        organization_id: int,
+        doc_id: int,
+        corrections: List[Dict[str, Any]],
+        created_by: Optional[str]
+    ) -> None:
+        if corrections:
+            await db.executemany(
+                self._INSERT_CORRECTION,
+                [self._correction_params(organization_id, doc_id, c, created_by) for c in corrections]
+            )
+
+
+# Singleton instance
+_review_repository = None
+
+
+def get_review_repository() -> ReviewRepository:
+    """
+    Get singleton instance of the review repository.
+
+    Returns:
+        ReviewRepository instance
+    """
+    global _review_repository
+    if _review_repository is None:
+        _review_repository = ReviewRepository()
+    return _review_repository
@@ -12,7 +12,6 @@ import logging
 from pathlib import Path
 from datetime import datetime
 from fastapi.responses import RedirectResponse, HTMLResponse
-from google_auth_oauthlib.flow import Flow
 sys.path.append(str(Path(__file__).parent.parent))
 
 from models import (
@@ -21,9 +20,11 @@ from models import (
     FileCabinet,
     StorageDialog,
     IndexField,
-    ExtractedData
+    ExtractedData,
+    ConnectorType
 )
-from connectors.connector_manager import get_connector_manager
+from connectors.connector_manager import get_connector_manager, google_drive_credentials, LazyPlugin
+from connectors.google_drive_folder_cache import account_key
 from services.encryption_service import get_encryption_service
 from services.field_mapping_service import get_field_mapping_service
 from config import settings
@@ -31,18 +32,20 @@ from auth import get_current_user
 from database import (
     save_connector_config,
     get_active_connector_config,
-    delete_connector_config
+    delete_connector_config,
+    delete_google_drive_folders,
+    tenant_cache,
+    user_scope
 )
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/connectors", tags=["connectors"])
 
-# Service instances - use the SAME connector instance as upload routes
-# This prevents creating multiple authentication sessions
+# Service instances - use the SAME connector instances as upload routes
+# This prevents creating multiple authentication sessions. Connectors load on first use.
 connector_manager = get_connector_manager()
-docuware_connector = connector_manager.docuware_connector
-google_drive_connector = connector_manager.google_drive_connector
+docuware_connector = LazyPlugin(connector_manager, ConnectorType.DOCUWARE)
 encryption_service = get_encryption_service()
 field_mapping_service = get_field_mapping_service()
 
@@ -191,6 +194,45 @@ async def get_docuware_fields(request: DocuWareFieldsRequest):
         raise HTTPException(status_code=500, detail=f"Failed to get fields: {str(e)}")
 
 
+@router.post("/docuware/fields/refresh")
+async def refresh_docuware_fields(request: DocuWareFieldsRequest):
+    """
+    Rediscover index fields for a storage dialog, replacing the cached definitions.
+    Use after fields were added or changed in DocuWare.
+
+    Args:
+        request: Credentials, cabinet_id, and dialog_id
+
+    Returns:
+        Dictionary with fields list
+    """
+    try:
+        creds_dict = {
+            "server_url": request.server_url,
+            "username": request.username,
+            "password": request.password
+        }
+
+        fields = await docuware_connector.get_index_fields(
+            creds_dict,
+            request.cabinet_id,
+            request.dialog_id,
+            refresh=True
+        )
+
+        if not fields:
+            raise HTTPException(status_code=502, detail="Could not discover fields from DocuWare")
+
+        return {
+            "fields": [field.dict() for field in fields]
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to refresh fields: {str(e)}")
+
+
 # ============================================================================
 # Google Drive Connector Endpoints
 # ============================================================================
@@ -227,7 +269,8 @@ async def start_google_drive_oauth(current_user: dict = Depends(get_current_user
         # Redirect URI (must match what's configured in Google Cloud Console)
         redirect_uri = settings.google_oauth_redirect_uri
 
-        # Create OAuth flow
+        # Create OAuth flow (the OAuth library is only needed while connecting Drive)
+        from google_auth_oauthlib.flow import Flow
         flow = Flow.from_client_config(
             {
                 "web": {
@@ -302,7 +345,8 @@ async def google_drive_oauth_callback(code: str, state: str):
         client_secret = settings.google_oauth_client_secret
         redirect_uri = settings.google_oauth_redirect_uri
 
-        # Create OAuth flow
+        # Create OAuth flow (the OAuth library is only needed while connecting Drive)
+        from google_auth_oauthlib.flow import Flow
         flow = Flow.from_client_config(
             {
                 "web": {
@@ -350,7 +394,8 @@ async def google_drive_oauth_callback(code: str, state: str):
             "client_id": client_id,
             "client_secret": client_secret
         }
-        await google_drive_connector.authenticate(creds_dict)
+        connector_manager.google_drive_pool.invalidate(creds_dict)
+        await connector_manager.get_google_drive_connector(creds_dict)
 
         # Return success page that closes the window and notifies parent
         html_content = """
@@ -649,8 +694,7 @@ async def save_connector_configuration(
         # if connector_type_str == "docuware":
         #     docuware_connector.clear_cache()
         # elif connector_type_str == "google_drive":
-        #     google_drive_connector.root_folder_id = None
-        #     google_drive_connector.folder_cache = {}
+        #     connector_manager.google_drive_pool.invalidate(...)
 
         logger.info(f"Saved {config.connector_type} config {config_id} for user {current_user['email']}")
 
@@ -718,15 +762,28 @@ async def clear_connector_configuration(
         Success message
     """
     try:
+        # Look up the account before deleting so only its pooled session is dropped
+        docuware_account = None
+        google_drive_account = None
+        if connector_type == "docuware":
+            existing = await get_active_connector_config(current_user["id"], "docuware")
+            docuware_account = (existing or {}).get("docuware")
+        elif connector_type == "google_drive":
+            existing = await get_active_connector_config(current_user["id"], "google_drive")
+            google_drive_account = (existing or {}).get("google_drive")
+
         await delete_connector_config(current_user["id"], connector_type)
 
         # Clear connector cache when configuration is deleted
         if connector_type == "docuware":
-            docuware_connector.clear_cache()
+            if docuware_account and docuware_account.get("server_url") and docuware_account.get("username"):
+                docuware_connector.clear_cache(docuware_account["server_url"], docuware_account["username"])
             logger.info(f"Cleared DocuWare cache for user {current_user['email']}")
         elif connector_type == "google_drive":
-            google_drive_connector.root_folder_id = None
-            google_drive_connector.folder_cache = {}
+            if google_drive_account and google_drive_account.get("refresh_token"):
+                credentials = google_drive_credentials(google_drive_account)
+                connector_manager.google_drive_pool.invalidate(credentials)
+                await delete_google_drive_folders(account_key(credentials))
             logger.info(f"Cleared Google Drive cache for user {current_user['email']}")
 
         logger.info(f"Cleared {connector_type} config for user {current_user['email']}")
@@ -756,54 +813,68 @@ async def get_current_config_with_decrypted_password(user_id: int) -> Optional[t
         Tuple of (ConnectorConfig, decrypted_password) or None
     """
     try:
-        # Load from database
-        docuware_config = await get_active_connector_config(user_id, "docuware")
-        google_drive_config = await get_active_connector_config(user_id, "google_drive")
-
-        if not docuware_config and not google_drive_config:
-            return None
-
-        # Determine which connector is configured (only one should be active at a time)
-        # Check DocuWare first
-        if docuware_config:
-            dw_config_data = docuware_config.get("docuware")
-            # Validate that DocuWare has required fields
-            if dw_config_data and dw_config_data.get("server_url") and dw_config_data.get("username"):
-                # Decrypt password
-                encrypted_password = dw_config_data.get("encrypted_password")
-                decrypted_password = encryption_service.decrypt(encrypted_password) if encrypted_password else None
-
-                config = ConnectorConfig(
-                    connector_type="docuware",
-                    docuware=dw_config_data,
-                    google_drive=None,
-                    onedrive=None
-                )
-                logger.info(f"Using DocuWare connector for user {user_id}")
-                return (config, decrypted_password)
-            else:
-                logger.debug(f"DocuWare config exists but missing required fields for user {user_id}")
-
-        # Check Google Drive
-        if google_drive_config:
-            gd_config_data = google_drive_config.get("google_drive")
-            # Validate that Google Drive has required fields
-            if gd_config_data and (gd_config_data.get("credentials") or gd_config_data.get("refresh_token")):
-                config = ConnectorConfig(
-                    connector_type="google_drive",
-                    docuware=None,
-                    google_drive=gd_config_data,
-                    onedrive=None
-                )
-                logger.info(f"Using Google Drive connector for user {user_id}")
-                return (config, None)
-            else:
-                logger.debug(f"Google Drive config exists but missing required fields for user {user_id}")
-
-        # No valid connector found
-        logger.info(f"No valid connector configuration found for user {user_id}")
-        return None
+        # Decrypted credentials are held only in the in-memory tenant cache with
+        # the short secret TTL; save/delete_connector_config invalidate the entry.
+        return await tenant_cache.get_or_load(
+            "decrypted_connector_config",
+            user_id,
+            lambda: _load_config_with_decrypted_password(user_id),
+            (user_scope(user_id),),
+            secret=True
+        )
 
     except Exception as e:
         logger.error(f"Error loading connector config for user {user_id}: {str(e)}")
         return None
+
+
+async def _load_config_with_decrypted_password(user_id: int) -> Optional[tuple]:
+    """Load the active connector config for a user and decrypt its password."""
+    # Load from database
+    docuware_config = await get_active_connector_config(user_id, "docuware")
+    google_drive_config = await get_active_connector_config(user_id, "google_drive")
+
+    if not docuware_config and not google_drive_config:
+        return None
+
+    # Determine which connector is configured (only one should be active at a time)
+    # Check DocuWare first
+    if docuware_config:
+        dw_config_data = docuware_config.get("docuware")
+        # Validate that DocuWare has required fields
+        if dw_config_data and dw_config_data.get("server_url") and dw_config_data.get("username"):
+            # Decrypt password
+            encrypted_password = dw_config_data.get("encrypted_password")
+            decrypted_password = encryption_service.decrypt(encrypted_password) if encrypted_password else None
+
+            config = ConnectorConfig(
+                connector_type="docuware",
+                docuware=dw_config_data,
+                google_drive=None,
+                onedrive=None
+            )
+            logger.info(f"Using DocuWare connector for user {user_id}")
+            return (config, decrypted_password)
+        else:
+            logger.debug(f"DocuWare config exists but missing required fields for user {user_id}")
+
+    # Check Google Drive
+    if google_drive_config:
+        gd_config_data = google_drive_config.get("google_drive")
+        # Validate that Google Drive has required fields
+        if gd_config_data and (gd_config_data.get("credentials") or gd_config_data.get("refresh_token")):
+            config = ConnectorConfig(
+                connector_type="google_drive",
+                docuware=None,
+                google_drive=gd_config_data,
+                onedrive=None
+            )
+            logger.info(f"Using Google Drive connector for user {user_id}")
+            return (config, None)
+        else:
+            logger.debug(f"Google Drive config exists but missing required fields for user {user_id}")
+
+    # No valid connector found
+    logger.info(f"No valid connector configuration found for user {user_id}")
+    return None
+
@@ -3,12 +3,11 @@ Document routes for review workflow.
 Handles document viewing, field corrections, and approval.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Response
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 import json
-from datetime import datetime
 import os
 import logging
 
@@ -17,15 +16,21 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from auth import get_current_user
-from database import get_db_connection
+from config import settings
+from review_repository import get_review_repository, APPROVABLE_STATUSES
 from services.ai_learning_service import get_ai_learning_service
+from services.connector_service import get_decrypted_org_connector_config
+from services.batch_event_service import get_batch_event_bus, format_sse, upload_channel
+from upload_outbox import get_upload_outbox, UPLOAD_PENDING
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/documents", tags=["documents"])
 
-# Initialize AI learning service
+# Initialize AI learning service and review repository
 ai_learning_service = get_ai_learning_service()
+review_repository = get_review_repository()
+upload_outbox = get_upload_outbox()
 
 
 # Request/Response Models
@@ -41,6 +46,15 @@ class ApproveDocumentRequest(BaseModel):
     corrections: List[FieldCorrection] = []
 
 
+class BulkReviewItem(BaseModel):
+    document_id: int
+    corrections: List[FieldCorrection] = []
+
+
+class BulkReviewRequest(BaseModel):
+    documents: List[BulkReviewItem]
+
+
 class DocumentResponse(BaseModel):
     id: int
     filename: str
@@ -73,36 +87,52 @@ async def get_pending_documents(
     """
     Get all documents pending review for current organization.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    documents = await review_repository.list_pending_documents(current_user['organization_id'])
 
-    try:
-        cursor.execute('''
-            SELECT id, filename, category, confidence_score, created_at
-            FROM document_metadata
-            WHERE organization_id = ? AND status = 'pending_review'
-            ORDER BY created_at DESC
-        ''', (current_user['organization_id'],))
-
-        docs = cursor.fetchall()
-
-        documents = []
-        for doc in docs:
-            documents.append({
-                'id': doc['id'],
-                'filename': doc['filename'],
-                'category': doc['category'],
-                'confidence_score': doc['confidence_score'],
-                'created_at': doc['created_at']
-            })
+    return {
+        'documents': documents,
+        'count': len(documents)
+    }
 
-        return {
-            'documents': documents,
-            'count': len(documents)
-        }
 
-    finally:
-        conn.close()
+@router.get("/upload-events")
+async def stream_upload_events(
+    last_event_id: Optional[str] = Header(None),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Stream the organization's connector upload progress as Server-Sent Events.
+    One upload event per change (uploading, completed, retrying, failed) with document_id,
+    filename, batch_id, status and attempts. Sends heartbeat comments while idle and
+    resumes after Last-Event-ID.
+
+    Events are published by the uploader that runs the upload; with standalone workers,
+    poll GET /api/documents/{doc_id}/upload instead.
+    """
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
+
+    async def event_stream():
+        async for upload_event in get_batch_event_bus().subscribe(
+            upload_channel(current_user['organization_id']),
+            last_event_id=resume_from,
+            heartbeat_seconds=settings.batch_events_heartbeat_seconds
+        ):
+            if upload_event is None:
+                yield ": heartbeat\n\n"
+                continue
+            yield format_sse(upload_event.event, upload_event.data, upload_event.id)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering (nginx)
+        }
+    )
 
 
 @router.get("/")
@@ -115,66 +145,19 @@ async def get_all_documents(
     """
     Get all documents for current organization with optional filtering.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        # Build query
-        query = '''
-            SELECT id, filename, category, status, confidence_score,
-                   created_at, approved_at, connector_type
-            FROM document_metadata
-            WHERE organization_id = ?
-        '''
-        params = [current_user['organization_id']]
-
-        if status:
-            query += ' AND status = ?'
-            params.append(status)
-
-        query += ' ORDER BY created_at DESC LIMIT ? OFFSET ?'
-        params.extend([limit, offset])
-
-        cursor.execute(query, params)
-        docs = cursor.fetchall()
-
-        # Get total count
-        count_query = '''
-            SELECT COUNT(*) as count
-            FROM document_metadata
-            WHERE organization_id = ?
-        '''
-        count_params = [current_user['organization_id']]
-
-        if status:
-            count_query += ' AND status = ?'
-            count_params.append(status)
-
-        cursor.execute(count_query, count_params)
-        total = cursor.fetchone()['count']
-
-        documents = []
-        for doc in docs:
-            documents.append({
-                'id': doc['id'],
-                'filename': doc['filename'],
-                'category': doc['category'],
-                'status': doc['status'],
-                'confidence_score': doc['confidence_score'],
-                'created_at': doc['created_at'],
-                'approved_at': doc['approved_at'],
-                'connector_type': doc['connector_type']
-            })
-
-        return {
-            'documents': documents,
-            'total': total,
-            'limit': limit,
-            'offset': offset
-        }
-
-    finally:
-        conn.close()
+    documents, total = await review_repository.list_documents(
+        current_user['organization_id'],
+        status=status,
+        limit=limit,
+        offset=offset
+    )
+
+    return {
+        'documents': documents,
+        'total': total,
+        'limit': limit,
+        'offset': offset
+    }
 
 
 @router.get("/{doc_id}")
@@ -185,70 +168,52 @@ async def get_document(
     """
     Get document details with extracted data and confidence scores.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        # Get document
-        cursor.execute('''
-            SELECT * FROM document_metadata
-            WHERE id = ? AND organization_id = ?
-        ''', (doc_id, current_user['organization_id']))
-
-        doc = cursor.fetchone()
-        if not doc:
-            raise HTTPException(status_code=404, detail='Document not found')
-
-        # Get corrections for this document
-        cursor.execute('''
-            SELECT * FROM field_corrections
-            WHERE document_id = ?
-            ORDER BY created_at DESC
-        ''', (doc_id,))
-
-        corrections = cursor.fetchall()
-
-        # Parse extracted data
-        extracted_data = json.loads(doc['extracted_data']) if doc['extracted_data'] else {}
-
-        # Build corrections dict
-        corrections_dict = {}
-        for corr in corrections:
-            corrections_dict[corr['field_name']] = {
-                'original_value': corr['original_value'],
-                'corrected_value': corr['corrected_value'],
-                'original_confidence': corr['original_confidence'],
-                'method': corr['correction_method'],
-                'created_at': corr['created_at']
-            }
-
-        # Decrypt and parse connector config snapshot
-        connector_config = None
-        try:
-            if 'connector_config_snapshot' in doc.keys() and doc['connector_config_snapshot']:
-                from services.encryption_service import get_encryption_service
-                encryption_service = get_encryption_service()
-                decrypted_config = encryption_service.decrypt(doc['connector_config_snapshot'])
-                connector_config = json.loads(decrypted_config)
-        except Exception as e:
-            logger.warning(f"Failed to decrypt connector config for document {doc_id}: {e}")
-
-        return {
-            'id': doc['id'],
-            'filename': doc['filename'],
-            'file_path': doc['file_path'],
-            'category': doc['category'],
-            'status': doc['status'],
-            'confidence_score': doc['confidence_score'],
-            'extracted_data': extracted_data,
-            'corrections': corrections_dict,
-            'created_at': doc['created_at'],
-            'connector_type': doc['connector_type'],
-            'connector_config': connector_config  # Full config for field filtering
+    # Get document
+    doc = await review_repository.get_document(doc_id, current_user['organization_id'])
+    if not doc:
+        raise HTTPException(status_code=404, detail='Document not found')
+
+    # Get corrections for this document
+    corrections = await review_repository.get_corrections(doc_id, newest_first=True)
+
+    # Parse extracted data
+    extracted_data = json.loads(doc['extracted_data']) if doc['extracted_data'] else {}
+
+    # Build corrections dict
+    corrections_dict = {}
+    for corr in corrections:
+        corrections_dict[corr['field_name']] = {
+            'original_value': corr['original_value'],
+            'corrected_value': corr['corrected_value'],
+            'original_confidence': corr['original_confidence'],
+            'method': corr['correction_method'],
+            'created_at': corr['created_at']
         }
 
-    finally:
-        conn.close()
+    # Decrypt and parse connector config snapshot
+    connector_config = None
+    try:
+        if doc.get('connector_config_snapshot'):
+            from services.encryption_service import get_encryption_service
+            encryption_service = get_encryption_service()
+            decrypted_config = encryption_service.decrypt(doc['connector_config_snapshot'])
+            connector_config = json.loads(decrypted_config)
+    except Exception as e:
+        logger.warning(f"Failed to decrypt connector config for document {doc_id}: {e}")
+
+    return {
+        'id': doc['id'],
+        'filename': doc['filename'],
+        'file_path': doc['file_path'],
+        'category': doc['category'],
+        'status': doc['status'],
+        'confidence_score': doc['confidence_score'],
+        'extracted_data': extracted_data,
+        'corrections': corrections_dict,
+        'created_at': doc['created_at'],
+        'connector_type': doc['connector_type'],
+        'connector_config': connector_config  # Full config for field filtering
+    }
 
 
 @router.get("/{doc_id}/view")
@@ -259,34 +224,22 @@ async def view_document(
     """
     Serve PDF file for viewing in browser.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    doc = await review_repository.get_document(doc_id, current_user['organization_id'])
 
-    try:
-        cursor.execute('''
-            SELECT file_path FROM document_metadata
-            WHERE id = ? AND organization_id = ?
-        ''', (doc_id, current_user['organization_id']))
+    if not doc:
+        raise HTTPException(status_code=404, detail='Document not found')
 
-        doc = cursor.fetchone()
+    file_path = doc['file_path']
 
-        if not doc:
-            raise HTTPException(status_code=404, detail='Document not found')
-
-        file_path = doc['file_path']
+    # Check if file exists
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail='File not found on disk')
 
-        # Check if file exists
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=404, detail='File not found on disk')
-
-        return FileResponse(
-            file_path,
-            media_type='application/pdf',
-            filename=os.path.basename(file_path)
-        )
-
-    finally:
-        conn.close()
+    return FileResponse(
+        file_path,
+        media_type='application/pdf',
+        filename=os.path.basename(file_path)
+    )
 
 
 @router.get("/{doc_id}/ocr-data")
@@ -298,20 +251,12 @@ async def get_ocr_coordinates(
     Get OCR text coordinates for image or image-based PDF documents.
     Returns word-level bounding boxes for creating selectable text overlay.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        cursor.execute('''
-            SELECT file_path FROM document_metadata
-            WHERE id = ? AND organization_id = ?
-        ''', (doc_id, current_user['organization_id']))
-
-        doc = cursor.fetchone()
+    doc = await review_repository.get_document(doc_id, current_user['organization_id'])
 
-        if not doc:
-            raise HTTPException(status_code=404, detail='Document not found')
+    if not doc:
+        raise HTTPException(status_code=404, detail='Document not found')
 
+    try:
         file_path = doc['file_path']
 
         # Derive OCR coordinates file path
@@ -350,8 +295,6 @@ async def get_ocr_coordinates(
     except Exception as e:
         logger.error(f"Error loading OCR coordinates for document {doc_id}: {e}")
         raise HTTPException(status_code=500, detail='Failed to load OCR data')
-    finally:
-        conn.close()
 
 
 @router.post("/{doc_id}/correct-field")
@@ -363,51 +306,27 @@ async def correct_field(
     """
     Save a field correction.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        # Verify document belongs to user's organization
-        cursor.execute('''
-            SELECT id FROM document_metadata
-            WHERE id = ? AND organization_id = ?
-        ''', (doc_id, current_user['organization_id']))
-
-        if not cursor.fetchone():
-            raise HTTPException(status_code=404, detail='Document not found')
-
-        # Save correction
-        cursor.execute('''
-            INSERT INTO field_corrections
-            (organization_id, document_id, field_name, original_value,
-             corrected_value, original_confidence, correction_method, created_by)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            current_user['organization_id'],
-            doc_id,
-            correction.field_name,
-            correction.original_value,
-            correction.corrected_value,
-            correction.original_confidence,
-            correction.method,
-            current_user['email']
-        ))
-
-        conn.commit()
-        correction_id = cursor.lastrowid
-
-        # Log the correction for AI learning visibility
-        logger.info(f"[AI LEARNING] Saved correction #{correction_id} for doc {doc_id}: "
-                   f"{correction.field_name} = '{correction.corrected_value}' "
-                   f"(was: '{correction.original_value or 'null'}')")
-
-        return {
-            'success': True,
-            'correction_id': correction_id
-        }
-
-    finally:
-        conn.close()
+    # Verify document belongs to user's organization
+    if not await review_repository.get_document(doc_id, current_user['organization_id']):
+        raise HTTPException(status_code=404, detail='Document not found')
+
+    # Save correction
+    correction_id = await review_repository.add_correction(
+        current_user['organization_id'],
+        doc_id,
+        correction.dict(),
+        current_user['email']
+    )
+
+    # Log the correction for AI learning visibility
+    logger.info(f"[AI LEARNING] Saved correction #{correction_id} for doc {doc_id}: "
+               f"{correction.field_name} = '{correction.corrected_value}' "
+               f"(was: '{correction.original_value or 'null'}')")
+
+    return {
+        'success': True,
+        'correction_id': correction_id
+    }
 
 
 @router.post("/{doc_id}/approve")
@@ -417,109 +336,218 @@ async def approve_document(
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
-    Approve document and send to connector.
+    Approve document and queue it for upload to the connector.
+    Returns as soon as the approval is stored; follow the upload with
+    GET /api/documents/{doc_id}/upload or the upload-events stream.
+    Only documents pending review (or failed, to retry their upload) can be approved.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    organization_id = current_user['organization_id']
+
+    # Get document
+    doc = await review_repository.get_document(doc_id, organization_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail='Document not found')
+    if doc['status'] not in APPROVABLE_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Document is {doc['status']} and can't be approved")
+
+    # Apply corrections to extracted_data and save
+    extracted_data_dict = _corrected_data(doc['extracted_data'], request.corrections)
+
+    # Save pending corrections, mark approved and queue the upload in one transaction;
+    # the background uploader sends it to the connector (see upload_worker.py)
+    approved, queued = await review_repository.approve_document(
+        doc_id,
+        organization_id,
+        [correction.dict() for correction in request.corrections],
+        current_user['email'],
+        extracted_data_dict
+    )
+    if not approved:
+        # A concurrent approve or skip changed the status since it was checked above
+        raise HTTPException(status_code=409, detail="Document is no longer awaiting approval")
+
+    logger.info(f"Document {doc_id} approved, upload {'queued' if queued else 'already pending'}")
+
+    return {
+        'success': True,
+        'message': 'Document approved and queued for upload',
+        'status': 'approved',
+        'upload': await _upload_status(doc_id)
+    }
 
-    try:
-        # Get document
-        cursor.execute('''
-            SELECT * FROM document_metadata
-            WHERE id = ? AND organization_id = ?
-        ''', (doc_id, current_user['organization_id']))
 
-        doc = cursor.fetchone()
-        if not doc:
-            raise HTTPException(status_code=404, detail='Document not found')
+@router.get("/{doc_id}/upload")
+async def get_document_upload(
+    doc_id: int,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Get the status of an approved document's connector upload.
+    Upload status is pending, running, completed or dead (gave up; the document is failed).
+    Live updates are also streamed by /api/documents/upload-events.
+    """
+    doc = await review_repository.get_document(doc_id, current_user['organization_id'])
+    if not doc:
+        raise HTTPException(status_code=404, detail='Document not found')
+
+    return {
+        'document_id': doc_id,
+        'status': doc['status'],
+        'uploaded_to_connector': bool(doc['uploaded_to_connector']),
+        'connector_result': json.loads(doc['connector_result']) if doc['connector_result'] else None,
+        'error_message': doc['error_message'],
+        'upload': await _upload_status(doc_id)
+    }
 
-        # Save any pending corrections
-        for correction in request.corrections:
-            cursor.execute('''
-                INSERT INTO field_corrections
-                (organization_id, document_id, field_name, original_value,
-                 corrected_value, original_confidence, correction_method, created_by)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                current_user['organization_id'],
-                doc_id,
-                correction.field_name,
-                correction.original_value,
-                correction.corrected_value,
-                correction.original_confidence,
-                correction.method,
-                current_user['email']
-            ))
-
-        # Apply corrections to extracted_data and save
-        extracted_data_dict = json.loads(doc['extracted_data']) if doc['extracted_data'] else {}
 
-        # Apply all corrections to the extracted data
-        for correction in request.corrections:
-            if correction.field_name == '_line_items':
-                # Special handling for line items
-                try:
-                    extracted_data_dict['line_items'] = json.loads(correction.corrected_value)
-                except json.JSONDecodeError:
-                    logger.error(f"Failed to parse line_items correction")
-            elif 'other_data' in extracted_data_dict and correction.field_name in extracted_data_dict.get('other_data', {}):
-                extracted_data_dict['other_data'][correction.field_name] = correction.corrected_value
-            else:
-                extracted_data_dict[correction.field_name] = correction.corrected_value
+async def _upload_status(doc_id: int) -> Optional[Dict[str, Any]]:
+    """Outbox entry of a document's upload, as returned to the client."""
+    entry = await upload_outbox.get_document_upload(doc_id)
+    if entry is None:
+        return None
+    return {
+        'status': entry['status'],
+        'attempts': entry['attempts'],
+        'max_attempts': entry['max_attempts'],
+        'next_attempt_at': entry['run_after'] if entry['status'] == UPLOAD_PENDING else None,
+        'last_error': entry['last_error']
+    }
 
-        # Update document with corrected data and approved status
-        cursor.execute('''
-            UPDATE document_metadata
-            SET status = 'approved',
-                approved_at = ?,
-                extracted_data = ?
-            WHERE id = ?
-        ''', (datetime.utcnow(), json.dumps(extracted_data_dict), doc_id))
 
-        conn.commit()
+# ============================================================================
+# Bulk review
+# ============================================================================
 
-        # Upload to connector
-        try:
-            from services.connector_service import upload_document_to_connector
+@router.post("/bulk-approve")
+async def bulk_approve_documents(
+    request: BulkReviewRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Approve many documents and queue their connector uploads.
+    Corrections, status changes and upload queuing for all documents are written in one
+    transaction; the background uploaders then send them to the connector concurrently.
+    A document listed more than once gets the corrections of every entry. Only documents
+    pending review (or failed, to retry their upload) are approved.
 
-            result = await upload_document_to_connector(doc_id, current_user['organization_id'])
+    Returns:
+        Per-document outcomes: approved (with upload_queued, false if an upload was already
+        pending), invalid_status (completed, skipped, already approved, ...) or not_found
+    """
+    organization_id = current_user['organization_id']
+    corrections_by_document = _bulk_corrections(request)
+
+    docs = await review_repository.get_extracted_data_for_documents(organization_id, list(corrections_by_document))
+    approvals = [
+        {
+            'doc_id': doc_id,
+            'corrections': [correction.dict() for correction in corrections],
+            'extracted_data': _corrected_data(docs[doc_id], corrections)
+        }
+        for doc_id, corrections in corrections_by_document.items()
+        if doc_id in docs
+    ]
+
+    approved, queued = await review_repository.approve_documents(organization_id, approvals, current_user['email'])
+
+    logger.info(f"Bulk-approved {len(approved)} documents, {len(queued)} uploads queued")
+
+    results = [
+        {'document_id': doc_id, 'status': 'approved', 'upload_queued': doc_id in queued}
+        if doc_id in approved else
+        {'document_id': doc_id, 'status': 'invalid_status', 'error': 'Document is not awaiting approval'}
+        if doc_id in docs else
+        {'document_id': doc_id, 'status': 'not_found', 'error': 'Document not found'}
+        for doc_id in corrections_by_document
+    ]
+    return {
+        'success': len(approved) == len(results),
+        'approved': len(approved),
+        'failed': len(results) - len(approved),
+        'results': results
+    }
 
-            # Update status to completed
-            cursor.execute('''
-                UPDATE document_metadata
-                SET status = 'completed',
-                    uploaded_to_connector = 1
-                WHERE id = ?
-            ''', (doc_id,))
 
-            conn.commit()
+@router.post("/bulk-correct")
+async def bulk_correct_documents(
+    request: BulkReviewRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Save field corrections for many documents in one batched write.
 
-            logger.info(f"Document {doc_id} approved and uploaded successfully")
+    Returns:
+        Per-document outcomes: corrected (with the number of corrections saved) or not_found
+    """
+    organization_id = current_user['organization_id']
+    corrections_by_document = _bulk_corrections(request)
+
+    docs = await review_repository.get_extracted_data_for_documents(organization_id, list(corrections_by_document))
+    saved = await review_repository.add_corrections_for_documents(
+        organization_id,
+        {
+            doc_id: [correction.dict() for correction in corrections]
+            for doc_id, corrections in corrections_by_document.items()
+            if doc_id in docs
+        },
+        current_user['email']
+    )
+
+    logger.info(f"[AI LEARNING] Saved {saved} corrections for {len(docs)} documents")
+
+    results = [
+        {'document_id': doc_id, 'status': 'corrected', 'corrections': len(corrections)}
+        if doc_id in docs else
+        {'document_id': doc_id, 'status': 'not_found', 'error': 'Document not found'}
+        for doc_id, corrections in corrections_by_document.items()
+    ]
+    return {
+        'success': len(docs) == len(results),
+        'corrected': len(docs),
+        'failed': len(results) - len(docs),
+        'corrections': saved,
+        'results': results
+    }
 
-            return {
-                'success': True,
-                'message': result.get('message', 'Document approved and uploaded'),
-                'status': 'completed',
-                'upload_result': result
-            }
 
-        except Exception as e:
-            logger.error(f"Failed to upload document {doc_id}: {e}")
+def _bulk_corrections(request: BulkReviewRequest) -> Dict[int, List[FieldCorrection]]:
+    """
+    Group a bulk request's corrections by document, in request order.
+
+    Raises:
+        HTTPException: If the request lists no documents or more than review_bulk_max_documents
+    """
+    corrections_by_document: Dict[int, List[FieldCorrection]] = {}
+    for item in request.documents:
+        corrections_by_document.setdefault(item.document_id, []).extend(item.corrections)
+
+    if not corrections_by_document:
+        raise HTTPException(status_code=400, detail='No documents given')
+    if len(corrections_by_document) > settings.review_bulk_max_documents:
+        raise HTTPException(
+            status_code=400,
+            detail=f'At most {settings.review_bulk_max_documents} documents per request'
+        )
+    return corrections_by_document
 
-            # Update status to failed
-            cursor.execute('''
-                UPDATE document_metadata
-                SET status = 'failed',
-                    error_message = ?
-                WHERE id = ?
-            ''', (str(e), doc_id))
 
-            conn.commit()
+def _corrected_data(extracted_data: Optional[str], corrections: List[FieldCorrection]) -> Dict[str, Any]:
+    """Apply a reviewer's corrections to a document's stored (JSON) extracted data."""
+    extracted_data_dict = json.loads(extracted_data) if extracted_data else {}
 
-            raise HTTPException(status_code=500, detail=str(e))
+    for correction in corrections:
+        if correction.field_name == '_line_items':
+            # Special handling for line items
+            try:
+                extracted_data_dict['line_items'] = json.loads(correction.corrected_value)
+            except json.JSONDecodeError:
+                logger.error(f"Failed to parse line_items correction")
+        elif 'other_data' in extracted_data_dict and correction.field_name in extracted_data_dict.get('other_data', {}):
+            extracted_data_dict['other_data'][correction.field_name] = correction.corrected_value
+        else:
+            extracted_data_dict[correction.field_name] = correction.corrected_value
 
-    finally:
-        conn.close()
+    return extracted_data_dict
 
 
 @router.get("/ai-learning-stats")
@@ -534,10 +562,10 @@ async def get_ai_learning_statistics(
         organization_id = current_user['organization_id']
 
         # Get learning statistics
-        stats = ai_learning_service.get_learning_statistics(organization_id)
+        stats = await ai_learning_service.get_learning_statistics(organization_id)
 
         # Get error-prone fields (top 10)
-        error_prone = ai_learning_service.get_error_prone_fields(organization_id, min_corrections=3)
+        error_prone = await ai_learning_service.get_error_prone_fields(organization_id, min_corrections=3)
 
         return {
             'success': True,
@@ -568,40 +596,22 @@ async def get_folder_preview(
     Returns:
         Dict with folder_path, folder_levels, and connector_type
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     try:
         # Get document
-        cursor.execute('''
-            SELECT * FROM document_metadata
-            WHERE id = ? AND organization_id = ?
-        ''', (doc_id, current_user['organization_id']))
-
-        doc = cursor.fetchone()
+        doc = await review_repository.get_document(doc_id, current_user['organization_id'])
         if not doc:
             raise HTTPException(status_code=404, detail='Document not found')
 
-        # Get organization's active connector config
-        cursor.execute('''
-            SELECT connector_type, config_encrypted
-            FROM organization_settings
-            WHERE organization_id = ? AND is_active = 1
-            ORDER BY updated_at DESC
-            LIMIT 1
-        ''', (current_user['organization_id'],))
-
-        connector_config = cursor.fetchone()
-
-        if not connector_config:
+        # Get organization's active connector config (tenant cache)
+        try:
+            connector_type, config_dict = await get_decrypted_org_connector_config(current_user['organization_id'])
+        except ValueError:
             return {
                 'connector_type': None,
                 'folder_path': None,
                 'message': 'No active connector configured'
             }
 
-        connector_type = connector_config['connector_type']
-
         # Only Google Drive has dynamic folder structure
         if connector_type != 'google_drive':
             return {
@@ -610,8 +620,7 @@ async def get_folder_preview(
                 'message': f'{connector_type} does not use folder organization'
             }
 
-        # Parse config and extracted data
-        config_dict = json.loads(connector_config['config_encrypted'])
+        # Parse extracted data
         extracted_data_dict = json.loads(doc['extracted_data']) if doc['extracted_data'] else {}
 
         # Get Google Drive config
@@ -705,9 +714,6 @@ async def get_folder_preview(
         logger.error(f"Failed to generate folder preview: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-    finally:
-        conn.close()
-
 
 def _get_source_field_for_level(level_type: str) -> str:
     """Get the source field name that populates a folder level."""
@@ -740,17 +746,9 @@ async def dismiss_document(
     Returns:
         Success message
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     try:
         # Verify document exists and belongs to user's organization
-        cursor.execute('''
-            SELECT id, organization_id, status FROM document_metadata
-            WHERE id = ?
-        ''', (doc_id,))
-
-        doc = cursor.fetchone()
+        doc = await review_repository.get_document(doc_id)
 
         if not doc:
             raise HTTPException(status_code=404, detail="Document not found")
@@ -759,13 +757,7 @@ async def dismiss_document(
             raise HTTPException(status_code=403, detail="Access denied")
 
         # Update status to skipped
-        cursor.execute('''
-            UPDATE document_metadata
-            SET status = 'skipped', approved_at = ?
-            WHERE id = ?
-        ''', (datetime.utcnow(), doc_id))
-
-        conn.commit()
+        await review_repository.set_document_status(doc_id, 'skipped', approved=True)
 
         logger.info(f"Document {doc_id} dismissed by user {current_user['id']}")
 
@@ -780,8 +772,6 @@ async def dismiss_document(
     except Exception as e:
         logger.error(f"Failed to dismiss document {doc_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 
 @router.get("/{doc_id}/ocr-coordinates")
@@ -793,18 +783,9 @@ async def get_ocr_coordinates(doc_id: int, current_user: dict = Depends(get_curr
     This endpoint is used by the PDF viewer to enable text selection
     on image-based/scanned documents.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     try:
         # Get document metadata
-        cursor.execute('''
-            SELECT file_path, organization_id
-            FROM document_metadata
-            WHERE id = ?
-        ''', (doc_id,))
-
-        doc = cursor.fetchone()
+        doc = await review_repository.get_document(doc_id)
 
         if not doc:
             raise HTTPException(status_code=404, detail="Document not found")
@@ -843,5 +824,3 @@ async def get_ocr_coordinates(doc_id: int, current_user: dict = Depends(get_curr
     except Exception as e:
         logger.error(f"Failed to get OCR coordinates for document {doc_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
@@ -0,0 +1,96 @@
+"""
+Operational metrics routes for DocuFlow.
+Exposes in-process counters (cache hit rates, etc.) for monitoring,
+and the readiness probe used by load balancers.
+"""
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from typing import Dict, Any
+import logging
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import get_tenant_cache_stats, get_db_pool_stats
+from services.batch_event_service import get_batch_event_bus
+from services.scheduler_service import get_fair_share_scheduler
+from services.admission_service import get_admission_controller
+from services.llm_limiter import get_llm_limiter
+from connectors.connector_manager import get_connector_manager
+from connectors.docuware_schema_cache import get_docuware_schema_cache
+from models import ConnectorType
+from job_queue import get_job_queue
+from upload_outbox import get_upload_outbox
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+readiness_router = APIRouter(prefix="/api", tags=["health"])
+
+
+@router.get("")
+async def get_metrics(request: Request) -> Dict[str, Any]:
+    """
+    Get in-process metrics for this worker.
+    This is a public endpoint (no auth required), like /api/health.
+    Values are per worker process and reset on restart, except job_queue and upload_outbox
+    (read from the database).
+    pipeline is the embedded worker's per-stage metrics and uploader its uploads in flight
+    (both null when workers run standalone). startup is this process's startup profile.
+    Connector pools are null until their connector has been loaded.
+
+    Returns:
+        Dict of metric groups
+    """
+    worker = getattr(request.app.state, "worker", None)
+    uploader = getattr(request.app.state, "uploader", None)
+    startup_profile = getattr(request.app.state, "startup_profile", None)
+    connector_manager = get_connector_manager()
+    return {
+        "tenant_cache": get_tenant_cache_stats(),
+        "db_pool": get_db_pool_stats(),
+        "batch_events": get_batch_event_bus().stats(),
+        "job_queue": await get_job_queue().stats(),
+        "scheduler": get_fair_share_scheduler().stats(),
+        "pipeline": worker.stats() if worker is not None else None,
+        "upload_outbox": await get_upload_outbox().stats(),
+        "uploader": uploader.stats() if uploader is not None else None,
+        "llm": get_llm_limiter().stats(),
+        "admission": get_admission_controller().stats(),
+        "connectors": connector_manager.loaded_connectors(),
+        "docuware_sessions": _docuware_session_stats() if connector_manager.is_loaded(ConnectorType.DOCUWARE) else None,
+        "docuware_field_schemas": get_docuware_schema_cache().stats(),
+        "google_drive_clients": (
+            connector_manager.google_drive_pool.stats()
+            if connector_manager.is_loaded(ConnectorType.GOOGLE_DRIVE) else None
+        ),
+        "startup": startup_profile.report() if startup_profile is not None else None
+    }
+
+
+def _docuware_session_stats() -> Dict[str, Any]:
+    # Imported here: the session pool loads the DocuWare client library
+    from connectors.docuware_session_pool import get_docuware_session_pool
+    return get_docuware_session_pool().stats()
+
+
+@readiness_router.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe for load balancers (public, like /api/health).
+    Returns 503 with Retry-After while this instance would shed uploads (low disk,
+    too many uploads in progress, AI provider rate limiting). A full processing queue
+    is reported in the signals but doesn't make the instance unready.
+
+    Returns:
+        Dict with ready, reason, retry_after and the admission signals
+    """
+    readiness = await get_admission_controller().readiness()
+    if not readiness["ready"]:
+        return JSONResponse(
+            status_code=503,
+            content=readiness,
+            headers={"Retry-After": str(readiness["retry_after"])}
+        )
+    return readiness
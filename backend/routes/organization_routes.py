@@ -29,7 +29,9 @@ from database import (
     create_subscription,
     get_subscription,
     get_usage_stats,
-    log_usage
+    log_usage,
+    get_review_settings as get_review_settings_from_db,
+    update_review_settings as update_review_settings_in_db
 )
 from plan_config import (
     get_plan_config,
@@ -500,30 +502,12 @@ async def get_review_settings(current_user: Dict[str, Any] = Depends(get_current
     org_id = current_user["organization_id"]
 
     try:
-        from database import get_db_connection
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        review_settings = await get_review_settings_from_db(org_id)
 
-        try:
-            cursor.execute('''
-                SELECT review_mode, confidence_threshold, auto_upload_enabled
-                FROM organizations
-                WHERE id = ?
-            ''', (org_id,))
-
-            result = cursor.fetchone()
+        if not review_settings:
+            raise HTTPException(status_code=404, detail="Organization not found")
 
-            if not result:
-                raise HTTPException(status_code=404, detail="Organization not found")
-
-            return {
-                "review_mode": result["review_mode"] or "review_all",
-                "confidence_threshold": result["confidence_threshold"] or 0.90,
-                "auto_upload_enabled": bool(result["auto_upload_enabled"])
-            }
-
-        finally:
-            conn.close()
+        return review_settings
 
     except HTTPException:
         raise
@@ -590,60 +574,30 @@ async def update_review_settings(
             )
 
     try:
-        from database import get_db_connection
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        updated = await update_review_settings_in_db(
+            org_id,
+            review_mode=settings.review_mode,
+            confidence_threshold=settings.confidence_threshold
+        )
 
-        try:
-            # Build update query dynamically based on provided params
-            updates = []
-            params = []
-
-            if settings.review_mode is not None:
-                updates.append("review_mode = ?")
-                params.append(settings.review_mode)
-
-            if settings.confidence_threshold is not None:
-                updates.append("confidence_threshold = ?")
-                params.append(settings.confidence_threshold)
-
-            if not updates:
-                raise HTTPException(
-                    status_code=400,
-                    detail="No settings provided to update"
-                )
-
-            # Add org_id to params
-            params.append(org_id)
-
-            # Execute update
-            query = f"UPDATE organizations SET {', '.join(updates)} WHERE id = ?"
-            cursor.execute(query, params)
-            conn.commit()
-
-            logger.info(
-                f"Updated review settings for organization {org_id} by user {current_user['id']}: "
-                f"review_mode={settings.review_mode}, confidence_threshold={settings.confidence_threshold}"
+        if not updated:
+            raise HTTPException(
+                status_code=400,
+                detail="No settings provided to update"
             )
 
-            # Get and return updated settings
-            cursor.execute('''
-                SELECT review_mode, confidence_threshold, auto_upload_enabled
-                FROM organizations
-                WHERE id = ?
-            ''', (org_id,))
+        logger.info(
+            f"Updated review settings for organization {org_id} by user {current_user['id']}: "
+            f"review_mode={settings.review_mode}, confidence_threshold={settings.confidence_threshold}"
+        )
 
-            result = cursor.fetchone()
+        # Get and return updated settings
+        review_settings = await get_review_settings_from_db(org_id)
 
-            return {
-                "review_mode": result["review_mode"] or "review_all",
-                "confidence_threshold": result["confidence_threshold"] or 0.90,
-                "auto_upload_enabled": bool(result["auto_upload_enabled"]),
-                "success": True
-            }
-
-        finally:
-            conn.close()
+        return {
+            **review_settings,
+            "success": True
+        }
 
     except HTTPException:
         raise
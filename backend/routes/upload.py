@@ -2,10 +2,11 @@
 API routes for document upload and processing.
 Handles file uploads, background processing, status checking, and downloads.
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Depends
-from fastapi.responses import FileResponse
-from typing import List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import List, Optional, Tuple
 import os
+import shutil
 import uuid
 from datetime import datetime
 import asyncio
@@ -13,6 +14,7 @@ import time
 import logging
 import json
 from pathlib import Path
+from pydantic import BaseModel, Field
 
 import sys
 from pathlib import Path
@@ -21,28 +23,32 @@ sys.path.append(str(Path(__file__).parent.parent))
 from models import (
     BatchUploadResponse,
     BatchResultResponse,
+    BatchFileResponse,
+    BatchActionResponse,
     DocumentResult,
     ProcessingStatus,
     DocumentCategory,
     ConnectorType,
-    UploadResult
+    UploadResult,
+    TERMINAL_BATCH_STATUSES
 )
-from services.ocr_service import OCRService
-from services.ai_service import AIService
-from services.file_service import FileService
 from services.encryption_service import get_encryption_service
-from services.confidence_service import calculate_overall_confidence, add_confidence_to_extracted_data
-from services.auto_upload_service import process_document_for_review
-from services.ai_learning_service import get_ai_learning_service
+from services.batch_event_service import get_batch_event_bus, format_sse, EVENT_RESYNC, EVENT_RECEIVED, EVENT_STATE
+from services.preflight_service import get_preflight_service, PreflightError
+from services.admission_service import get_admission_controller
 from connectors.connector_manager import get_connector_manager
 from routes.connector_routes import get_current_config_with_decrypted_password
 from config import settings
 from auth import get_current_user
-from database import create_batch, update_batch, get_batch, get_subscription, get_usage_stats, log_usage, get_user_batches, get_db_connection, get_user_by_id
+from database import (
+    create_batch, finish_batch, get_batch, get_batch_with_results,
+    get_subscription, get_usage_stats, get_user_batches
+)
+from job_queue import get_job_queue
 
 # Import plan configuration
 sys.path.append(str(Path(__file__).parent.parent))
-from plan_config import check_usage_limit, is_trial_expired
+from plan_config import check_usage_limit, check_batch_pages, is_trial_expired
 
 logger = logging.getLogger(__name__)
 
@@ -50,114 +56,54 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-# ============================================================================
-# Helper Functions for Google Drive Folder Structure
-# ============================================================================
+# Initialize services (singleton pattern - create once, use throughout)
+encryption_service = get_encryption_service()
+connector_manager = get_connector_manager()
+batch_event_bus = get_batch_event_bus()
+job_queue = get_job_queue()
+preflight_service = get_preflight_service()
+admission_controller = get_admission_controller()
+
+
+class OpenBatchRequest(BaseModel):
+    """Request to open a batch whose files are uploaded one by one."""
+    total_files: int = Field(..., ge=1, le=100)
 
-def get_google_drive_fields_from_folder_config(google_drive_config) -> List[str]:
+
+async def _admit(file_count: int, include_backlog: bool = True) -> None:
     """
-    Extract field names needed based on Google Drive folder structure configuration.
-    Maps folder structure levels to field names that need to be extracted.
+    Shed the request if the system is overloaded.
 
     Args:
-        google_drive_config: GoogleDriveConfig object with folder structure settings
+        file_count: Documents the request would add
+        include_backlog: Apply the system-wide queue checks (off for files of an admitted batch)
 
-    Returns:
-        List of field names to extract (e.g., ['vendor', 'date', 'category'])
-    """
-    from models import FolderStructureLevel
-
-    fields_needed = []
-
-    # Map folder structure levels to field names
-    level_to_field_map = {
-        FolderStructureLevel.CATEGORY: 'category',
-        FolderStructureLevel.VENDOR: 'vendor',
-        FolderStructureLevel.CLIENT: 'client',
-        FolderStructureLevel.COMPANY: 'company',
-        FolderStructureLevel.YEAR: 'date',  # Need date to extract year
-        FolderStructureLevel.YEAR_MONTH: 'date',  # Need date to extract year-month
-        FolderStructureLevel.MONTH: 'date',  # Need date to extract month
-        FolderStructureLevel.QUARTER: 'date',  # Need date to extract quarter
-        FolderStructureLevel.DOCUMENT_TYPE: 'document_type',
-        FolderStructureLevel.DOCUMENT_NUMBER: 'document_number',
-        FolderStructureLevel.PERSON_NAME: 'person_name',
-        FolderStructureLevel.PROJECT: 'project',
-        FolderStructureLevel.CUSTOM: None,  # Will use custom field name
-        FolderStructureLevel.NONE: None  # Skip
-    }
-
-    # Check primary level
-    primary_value = google_drive_config.primary_level.value if hasattr(google_drive_config.primary_level, 'value') else google_drive_config.primary_level
-    if primary_value == 'custom':
-        if google_drive_config.primary_custom_field:
-            fields_needed.append(google_drive_config.primary_custom_field)
-    elif google_drive_config.primary_level in level_to_field_map:
-        field = level_to_field_map[google_drive_config.primary_level]
-        if field and field not in fields_needed:
-            fields_needed.append(field)
-
-    # Check secondary level
-    secondary_value = google_drive_config.secondary_level.value if hasattr(google_drive_config.secondary_level, 'value') else google_drive_config.secondary_level
-    if secondary_value == 'custom':
-        if google_drive_config.secondary_custom_field:
-            fields_needed.append(google_drive_config.secondary_custom_field)
-    elif google_drive_config.secondary_level in level_to_field_map:
-        field = level_to_field_map[google_drive_config.secondary_level]
-        if field and field not in fields_needed:
-            fields_needed.append(field)
-
-    # Check tertiary level
-    tertiary_value = google_drive_config.tertiary_level.value if hasattr(google_drive_config.tertiary_level, 'value') else google_drive_config.tertiary_level
-    if tertiary_value == 'custom':
-        if google_drive_config.tertiary_custom_field:
-            fields_needed.append(google_drive_config.tertiary_custom_field)
-    elif google_drive_config.tertiary_level in level_to_field_map:
-        field = level_to_field_map[google_drive_config.tertiary_level]
-        if field and field not in fields_needed:
-            fields_needed.append(field)
-
-    return fields_needed
-
-# Initialize services (singleton pattern - create once, use throughout)
-ocr_service = OCRService()
-ai_service = AIService()
-file_service = FileService()
-encryption_service = get_encryption_service()
-connector_manager = get_connector_manager()
-ai_learning_service = get_ai_learning_service()
+    Raises:
+        HTTPException: 429 (system backlogged) or 503 (this server overloaded) with Retry-After
+    """
+    decision = await admission_controller.check(file_count, include_backlog=include_backlog)
+    if not decision["allowed"]:
+        raise HTTPException(
+            status_code=decision["status_code"],
+            detail=f"{decision['reason']}. Please retry in {decision['retry_after']} seconds.",
+            headers={"Retry-After": str(decision["retry_after"])}
+        )
 
 
-@router.post("/upload", response_model=BatchUploadResponse)
-async def upload_documents(
-    background_tasks: BackgroundTasks,
-    files: List[UploadFile] = File(...),
-    current_user: dict = Depends(get_current_user)
-):
+async def _check_upload_allowed(current_user: dict, file_count: int) -> Tuple[int, str]:
     """
-    Upload multiple PDF documents for processing.
-    Processing happens in background, returns batch_id for status checking.
-    Requires authentication.
+    Check that the user's organization may process `file_count` more documents.
 
     Args:
-        background_tasks: FastAPI background tasks handler
-        files: List of uploaded PDF files
-        current_user: Authenticated user from JWT token
+        current_user: Authenticated user
+        file_count: Documents about to be uploaded
 
     Returns:
-        BatchUploadResponse with batch_id and initial status
+        Tuple of (organization ID, plan type)
 
     Raises:
-        HTTPException: If validation fails or file errors occur
+        HTTPException: 403 without organization/subscription, 402 if over plan limits
     """
-    # Validate files
-    if len(files) == 0:
-        raise HTTPException(status_code=400, detail="No files provided")
-
-    if len(files) > 100:
-        raise HTTPException(status_code=400, detail="Maximum 100 files per batch")
-
-    # Check organization and subscription limits
     org_id = current_user.get("organization_id")
     if not org_id:
         raise HTTPException(
@@ -192,15 +138,97 @@ async def upload_documents(
 
     # Check usage limits
     plan_type = subscription.get("plan_type", "trial")
-    limit_check = check_usage_limit(plan_type, current_usage, len(files))
+    limit_check = check_usage_limit(plan_type, current_usage, file_count)
 
     if not limit_check.get("allowed"):
         raise HTTPException(
             status_code=402,
             detail=limit_check.get("reason") +
-                   f" (Current: {current_usage}, Trying to add: {len(files)}, Limit: {limit_check.get('limit')})"
+                   f" (Current: {current_usage}, Trying to add: {file_count}, Limit: {limit_check.get('limit')})"
         )
 
+    return org_id, plan_type
+
+
+async def _save_upload(file: UploadFile, upload_folder: str) -> Tuple[str, dict]:
+    """
+    Validate and save one uploaded PDF, then preflight it (page count, text layer, DPI).
+
+    Args:
+        file: Uploaded file
+        upload_folder: Batch upload folder
+
+    Returns:
+        Tuple of (saved file path, preflight report)
+
+    Raises:
+        HTTPException: 400 if the file is not an acceptable PDF
+    """
+    # Validate file extension
+    if not file.filename.endswith('.pdf'):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type: {file.filename}. Only PDF files allowed."
+        )
+
+    file_path = os.path.join(upload_folder, file.filename)
+
+    # Save file and check size
+    content = await file.read()
+    if len(content) > settings.max_file_size * 1024 * 1024:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File {file.filename} exceeds maximum size of {settings.max_file_size}MB"
+        )
+    with open(file_path, 'wb') as f:
+        f.write(content)
+
+    try:
+        preflight = await asyncio.to_thread(preflight_service.inspect, file_path)
+    except PreflightError as e:
+        os.remove(file_path)
+        raise HTTPException(status_code=400, detail=f"Cannot process {file.filename}: {e}")
+
+    return file_path, preflight
+
+
+@router.post("/upload", response_model=BatchUploadResponse)
+async def upload_documents(
+    files: List[UploadFile] = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Upload multiple PDF documents for processing.
+    Each file is queued as a durable job for the processing workers; returns batch_id for status checking.
+    Requires authentication.
+
+    Processing starts once the whole request has arrived. To have files processed while
+    the rest are still uploading, use POST /batches, /batches/{id}/files and /batches/{id}/complete.
+
+    Args:
+        files: List of uploaded PDF files
+        current_user: Authenticated user from JWT token
+
+    Returns:
+        BatchUploadResponse with batch_id and initial status
+
+    Raises:
+        HTTPException: If validation fails or file errors occur, or 429/503 with
+            Retry-After when the system is overloaded
+    """
+    # Validate files
+    if len(files) == 0:
+        raise HTTPException(status_code=400, detail="No files provided")
+
+    if len(files) > 100:
+        raise HTTPException(status_code=400, detail="Maximum 100 files per batch")
+
+    # Shed load before writing anything to disk
+    await _admit(len(files))
+
+    # Check organization and subscription limits
+    org_id, plan_type = await _check_upload_allowed(current_user, len(files))
+
     # Create unique batch ID
     batch_id = str(uuid.uuid4())
     user_id = current_user["id"]
@@ -209,391 +237,371 @@ async def upload_documents(
     upload_folder = os.path.join(settings.upload_dir, str(user_id), batch_id)
     os.makedirs(upload_folder, exist_ok=True)
 
-    # Save uploaded files
+    # Save uploaded files and preflight them before any OCR
     file_paths = []
-    for file in files:
-        # Validate file extension
-        if not file.filename.endswith('.pdf'):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid file type: {file.filename}. Only PDF files allowed."
-            )
-
-        file_path = os.path.join(upload_folder, file.filename)
-
-        # Save file and check size
-        with open(file_path, 'wb') as f:
-            content = await file.read()
-            if len(content) > settings.max_file_size * 1024 * 1024:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"File {file.filename} exceeds maximum size of {settings.max_file_size}MB"
-                )
-            f.write(content)
-
-        file_paths.append(file_path)
+    preflights = []
+    try:
+        async with admission_controller.receiving(len(files)):
+            for file in files:
+                file_path, preflight = await _save_upload(file, upload_folder)
+                file_paths.append(file_path)
+                preflights.append(preflight)
+
+        # Reject batches over the plan's page limit before spending OCR on them
+        total_pages = sum(preflight['page_count'] for preflight in preflights)
+        page_check = check_batch_pages(plan_type, total_pages)
+        if not page_check.get("allowed"):
+            raise HTTPException(status_code=402, detail=page_check.get("reason"))
+
+    except HTTPException:
+        shutil.rmtree(upload_folder, ignore_errors=True)
+        raise
 
     # Create batch record in database
     await create_batch(batch_id, user_id, len(file_paths))
 
-    # Start background processing
-    background_tasks.add_task(process_batch, batch_id, user_id, file_paths)
+    # Queue one job per document; workers (embedded or standalone) pick them up
+    await job_queue.enqueue_documents(
+        batch_id, user_id, org_id, file_paths, plan_type=plan_type, preflights=preflights
+    )
+    logger.info(f"Queued batch {batch_id} ({len(file_paths)} files, {total_pages} pages) for user {user_id}")
+
+    estimate = await job_queue.estimate_batch(batch_id)
 
     return BatchUploadResponse(
         batch_id=batch_id,
         total_files=len(file_paths),
         status=ProcessingStatus.PENDING,
+        started_at=datetime.now(),
+        total_pages=total_pages,
+        eta_seconds=estimate["eta_seconds"]
+    )
+
+
+# ============================================================================
+# Incremental upload: files are processed while the rest of the batch uploads
+# ============================================================================
+
+@router.post("/batches", response_model=BatchUploadResponse)
+async def open_batch(
+    request: OpenBatchRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Open a batch whose files are uploaded one request at a time.
+    The batch stays "uploading" until POST /batches/{id}/complete; each file is
+    queued for processing as soon as it has been received and validated.
+
+    Args:
+        request: Number of files the client is about to upload
+        current_user: Authenticated user from JWT token
+
+    Returns:
+        BatchUploadResponse with status "uploading"
+
+    Raises:
+        HTTPException: If the organization can't process that many documents,
+            or 429/503 with Retry-After when the system is overloaded
+    """
+    await _admit(request.total_files)
+    await _check_upload_allowed(current_user, request.total_files)
+
+    batch_id = str(uuid.uuid4())
+    user_id = current_user["id"]
+
+    os.makedirs(os.path.join(settings.upload_dir, str(user_id), batch_id), exist_ok=True)
+    await create_batch(batch_id, user_id, request.total_files, status=ProcessingStatus.UPLOADING.value)
+    logger.info(f"Opened batch {batch_id} for {request.total_files} files (user {user_id})")
+
+    return BatchUploadResponse(
+        batch_id=batch_id,
+        total_files=request.total_files,
+        status=ProcessingStatus.UPLOADING,
         started_at=datetime.now()
     )
 
 
-async def process_batch(batch_id: str, user_id: int, file_paths: List[str]):
+@router.post("/batches/{batch_id}/files", response_model=BatchFileResponse)
+async def upload_batch_file(
+    batch_id: str,
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Process all documents in the batch (runs in background).
-    Orchestrates OCR, AI categorization, and file organization.
+    Add one file to an uploading batch and queue it for processing right away.
 
     Args:
-        batch_id: Unique identifier for this batch
-        user_id: User ID who owns this batch
-        file_paths: List of paths to uploaded PDF files
+        batch_id: Batch opened with POST /batches
+        file: Uploaded PDF file
+        current_user: Authenticated user from JWT token
+
+    Returns:
+        BatchFileResponse with the file's preflight and the batch's upload progress
+
+    Raises:
+        HTTPException: 404 unknown batch, 409 upload already completed, 400 invalid file
+            or too many files, 402 over the plan's page limit, 503 server overloaded
     """
-    print(f"\n{'='*60}")
-    print(f"📦 Starting batch processing: {batch_id} (User: {user_id})")
-    print(f"   Files to process: {len(file_paths)}")
-    print(f"{'='*60}\n")
-    logger.info(f"Starting batch processing: {batch_id} ({len(file_paths)} files) for user {user_id}")
-
-    # Get user's organization for review workflow
-    user = await get_user_by_id(user_id)
-    organization_id = user.get("organization_id") if user else None
-
-    # Process files with concurrency limit (avoid overwhelming system)
-    semaphore = asyncio.Semaphore(settings.max_concurrent_processing)
-    processed_results = []
-
-    async def process_with_semaphore(file_path):
-        """Wrapper to limit concurrent processing and update results incrementally"""
-        async with semaphore:
-            try:
-                result = await process_single_document(file_path, user_id)
-            except Exception as e:
-                # Create error result for failed document
-                result = DocumentResult(
-                    filename=os.path.basename(file_path),
-                    original_path=file_path,
-                    category=DocumentCategory.OTHER,
-                    confidence=0.0,
-                    extracted_text_preview="",
-                    extracted_data=None,
-                    connector_type=None,  # Failed before connector determination
-                    error=str(e),
-                    processing_time=0.0
-                )
+    user_id = current_user["id"]
+    batch = await get_batch(batch_id, user_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found or access denied")
+    if batch["status"] != ProcessingStatus.UPLOADING.value:
+        raise HTTPException(status_code=409, detail="Batch upload is already complete")
 
-            # Save to document_metadata and run review workflow
-            if organization_id and result.error is None and result.extracted_data:
-                try:
-                    # Convert Pydantic model to dict for confidence service
-                    extracted_data_dict = result.extracted_data.dict() if hasattr(result.extracted_data, 'dict') else result.extracted_data.model_dump()
-
-                    # Calculate confidence score
-                    confidence_score = calculate_overall_confidence(extracted_data_dict)
-
-                    # Add confidence to extracted data fields
-                    scored_data = add_confidence_to_extracted_data(extracted_data_dict)
-
-                    # Save to document_metadata table
-                    conn = get_db_connection()
-                    cursor = conn.cursor()
-                    try:
-                        cursor.execute('''
-                            INSERT INTO document_metadata
-                            (organization_id, batch_id, filename, file_path, category,
-                             extracted_data, status, confidence_score, connector_type, connector_config_snapshot, processed_at)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            organization_id,
-                            batch_id,
-                            result.filename,
-                            file_path,
-                            result.category.value if hasattr(result.category, 'value') else str(result.category),
-                            json.dumps(scored_data),  # Store as JSON string
-                            'pending_review',  # Initial status
-                            confidence_score,
-                            result.connector_type,  # Store which connector this document was processed with
-                            result.connector_config_snapshot,  # Store config snapshot for historical field display
-                            datetime.utcnow()
-                        ))
-                        conn.commit()
-                        doc_id = cursor.lastrowid
-
-                        # Set document ID on result for frontend (enables Review button)
-                        result.id = doc_id
-
-                        # Run review workflow to determine if should auto-upload
-                        review_result = await process_document_for_review(
-                            doc_id,
-                            organization_id,
-                            confidence_score
-                        )
-
-                        logger.info(
-                            f"Document {doc_id} ({result.filename}): "
-                            f"{review_result['status']} (confidence: {confidence_score:.2f})"
-                        )
-
-                    finally:
-                        conn.close()
-
-                except Exception as e:
-                    logger.error(f"Failed to save document metadata for {result.filename}: {e}")
-
-            # Update results incrementally so frontend can show progress
-            processed_results.append(result)
-
-            # Update database with current progress
-            await update_batch(
-                batch_id=batch_id,
-                status="processing",
-                processed_files=len(processed_results),
-                successful=0,
-                failed=0,
-                results=[r.dict() for r in processed_results]
-            )
-
-            return result
-
-    # Process all files concurrently (up to semaphore limit)
-    tasks = [process_with_semaphore(fp) for fp in file_paths]
-    await asyncio.gather(*tasks, return_exceptions=True)
-
-    # Organize files and create ZIP
-    try:
-        zip_path = await file_service.organize_documents(processed_results)
-        download_url = f"/api/download/{batch_id}"
-    except Exception as e:
-        logger.error(f"Failed to organize documents: {e}")
-        download_url = None
-
-    # NOTE: Connector upload is now handled by the review workflow
-    # Documents go through review (or auto-upload based on confidence)
-    # and are uploaded when approved via the document approval endpoint
-    # await upload_to_connector(processed_results, user_id)
-
-    # Calculate statistics
-    successful = sum(1 for r in processed_results if r.error is None)
-    failed = len(processed_results) - successful
-
-    # Calculate summary by category
-    category_summary = {}
-    for result in processed_results:
-        if result.error is None:
-            cat_name = result.category
-            category_summary[cat_name] = category_summary.get(cat_name, 0) + 1
-
-    # Update database with final results
-    await update_batch(
+    totals = await job_queue.batch_upload_totals(batch_id)
+    if totals["files"] >= batch["total_files"]:
+        raise HTTPException(status_code=400, detail=f"Batch already has its {batch['total_files']} files")
+
+    org_id = current_user.get("organization_id")
+    subscription = await get_subscription(org_id) if org_id else None
+    plan_type = subscription.get("plan_type", "trial") if subscription else "trial"
+
+    # The batch was admitted when opened; only this server's own limits apply per file
+    await _admit(1, include_backlog=False)
+
+    upload_folder = os.path.join(settings.upload_dir, str(user_id), batch_id)
+    async with admission_controller.receiving(1):
+        file_path, preflight = await _save_upload(file, upload_folder)
+
+    page_check = check_batch_pages(plan_type, totals["pages"] + preflight["page_count"])
+    if not page_check.get("allowed"):
+        os.remove(file_path)
+        raise HTTPException(status_code=402, detail=page_check.get("reason"))
+
+    # The checks above fail fast; this one holds against a concurrent complete, cancel or upload
+    received = await job_queue.enqueue_batch_file(
+        batch_id, user_id, org_id, file_path, plan_type=plan_type, preflight=preflight
+    )
+    if received is None:
+        os.remove(file_path)
+        raise HTTPException(status_code=409, detail="Batch upload is already complete or has all its files")
+
+    batch_event_bus.publish(batch_id, EVENT_RECEIVED, {
+        'filename': file.filename,
+        'received_files': received,
+        'total_files': batch["total_files"]
+    })
+
+    return BatchFileResponse(
         batch_id=batch_id,
-        status="completed",
-        processed_files=len(processed_results),
-        successful=successful,
-        failed=failed,
-        results=[r.dict() for r in processed_results],
-        processing_summary=category_summary,
-        download_url=download_url
+        filename=file.filename,
+        received_files=received,
+        total_files=batch["total_files"],
+        page_count=preflight["page_count"],
+        estimated_seconds=preflight["estimated_seconds"]
     )
 
-    # Log usage for successful documents (for billing)
-    if successful > 0:
-        try:
-            # Get user's organization from database
-            user = await get_user_by_id(user_id)
-            if user and user.get("organization_id"):
-                await log_usage(
-                    org_id=user["organization_id"],
-                    action_type="document_processed",
-                    document_count=successful,
-                    user_id=user_id,
-                    metadata={
-                        "batch_id": batch_id,
-                        "total_files": len(processed_results),
-                        "failed": failed,
-                        "categories": category_summary
-                    }
-                )
-                logger.info(f"Logged usage: {successful} documents for org {user['organization_id']}")
-        except Exception as e:
-            logger.error(f"Failed to log usage: {str(e)}")
 
-    print(f"\n{'='*60}")
-    print(f"✅ Batch processing completed: {batch_id}")
-    print(f"   ✓ Successful: {successful}")
-    print(f"   ✗ Failed: {failed}")
-    print(f"{'='*60}\n")
-    logger.info(f"Batch processing completed: {batch_id} ({successful} successful, {failed} failed)")
+@router.post("/batches/{batch_id}/complete", response_model=BatchUploadResponse)
+async def complete_batch_upload(
+    batch_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Mark an uploading batch's upload finished.
+    The batch moves to "processing" with the files received so far and completes
+    once the last of them is processed.
 
+    Args:
+        batch_id: Batch opened with POST /batches
+        current_user: Authenticated user from JWT token
 
-async def process_single_document(file_path: str, user_id: int) -> DocumentResult:
+    Returns:
+        BatchUploadResponse with the final file count, pages and ETA
+
+    Raises:
+        HTTPException: 404 unknown batch, 409 upload already completed, 400 no files received
     """
-    Process a single document through the full pipeline:
-    1. OCR text extraction
-    2. Quality validation
-    3. AI categorization with dynamic field extraction
+    user_id = current_user["id"]
+    batch = await get_batch(batch_id, user_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found or access denied")
+    if batch["status"] != ProcessingStatus.UPLOADING.value:
+        raise HTTPException(status_code=409, detail="Batch upload is already complete")
+
+    totals = await job_queue.batch_upload_totals(batch_id)
+    if totals["files"] == 0:
+        await finish_batch(batch_id, ProcessingStatus.FAILED.value)
+        batch_event_bus.publish(batch_id, EVENT_STATE, {'status': ProcessingStatus.FAILED.value, 'total_files': 0})
+        shutil.rmtree(os.path.join(settings.upload_dir, str(user_id), batch_id), ignore_errors=True)
+        raise HTTPException(status_code=400, detail="No files were uploaded")
+
+    org_id = current_user.get("organization_id")
+    subscription = await get_subscription(org_id) if org_id else None
+    plan_type = subscription.get("plan_type", "trial") if subscription else "trial"
+
+    total_files = await job_queue.seal_batch(batch_id, user_id, org_id, plan_type)
+    if total_files is None:
+        raise HTTPException(status_code=409, detail="Batch upload is already complete")
+
+    batch_event_bus.publish(batch_id, EVENT_STATE, {
+        'status': ProcessingStatus.PROCESSING.value,
+        'total_files': total_files
+    })
+    logger.info(f"Batch {batch_id} upload complete ({total_files} files, {totals['pages']} pages)")
+
+    estimate = await job_queue.estimate_batch(batch_id)
+
+    return BatchUploadResponse(
+        batch_id=batch_id,
+        total_files=total_files,
+        status=ProcessingStatus.PROCESSING,
+        started_at=datetime.now(),
+        total_pages=totals["pages"],
+        eta_seconds=estimate["eta_seconds"]
+    )
+
+
+# ============================================================================
+# Batch control: cancel, pause/resume and retry of failed documents
+# ============================================================================
+
+@router.post("/batches/{batch_id}/cancel", response_model=BatchActionResponse)
+async def cancel_batch(
+    batch_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Cancel an unfinished batch.
+    Queued documents are never processed and documents in progress are dropped at their
+    next stage, so no more OCR or AI calls are spent on the batch. Documents already
+    processed keep their results.
 
     Args:
-        file_path: Path to the PDF file
-        user_id: User ID for loading their connector configuration
+        batch_id: Batch to cancel
+        current_user: Authenticated user from JWT token
 
     Returns:
-        DocumentResult with categorization and metadata
+        BatchActionResponse with the number of documents cancelled
+
+    Raises:
+        HTTPException: 404 unknown batch, 409 batch already finished
     """
-    start_time = time.time()
-    filename = os.path.basename(file_path)
+    user_id = current_user["id"]
+    batch = await get_batch(batch_id, user_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found or access denied")
 
-    try:
-        print(f"⚙️  Processing: {filename}")
-        logger.info(f"Processing: {filename}")
-
-        # Step 1: Extract text from file (supports PDFs and images)
-        extraction_result = ocr_service.extract_text_from_file(file_path)
-        extracted_text = extraction_result.get('text', '')
-        extraction_method = extraction_result.get('method', 'unknown')
-        file_type = extraction_result.get('file_type', 'unknown')
-
-        logger.info(f"Text extraction: method={extraction_method}, file_type={file_type}, chars={len(extracted_text)}")
-
-        # Extract OCR coordinates for images and image-based PDFs
-        ocr_coordinates_path = None
-        if extraction_method in ['image_ocr', 'pdf_ocr']:
-            try:
-                logger.info(f"Extracting OCR coordinates for {filename}")
-                ocr_data = ocr_service.extract_text_with_coordinates(file_path)
-
-                # Save coordinates to JSON file
-                if ocr_data and ocr_data.get('words'):
-                    coords_filename = f"{os.path.splitext(filename)[0]}_ocr_coordinates.json"
-                    coords_dir = os.path.dirname(file_path)
-                    ocr_coordinates_path = os.path.join(coords_dir, coords_filename)
-
-                    with open(ocr_coordinates_path, 'w', encoding='utf-8') as f:
-                        json.dump(ocr_data, f, indent=2)
-
-                    logger.info(f"Saved OCR coordinates: {len(ocr_data['words'])} words -> {coords_filename}")
-            except Exception as e:
-                logger.warning(f"Failed to extract OCR coordinates for {filename}: {e}")
-
-        # Validate text quality
-        if not ocr_service.validate_ocr_quality(extracted_text):
-            raise Exception(f"Text quality check failed - insufficient text extracted (method: {extraction_method})")
-
-        # Get user's organization_id for few-shot learning
-        organization_id = None
-        user = await get_user_by_id(user_id)
-        if user and user.get('organization_id'):
-            organization_id = user['organization_id']
-
-        # Get selected fields from connector config (if configured)
-        selected_fields = None
-        selected_table_columns = None
-        connector_type = None
-        connector_config_json = None
-        config_tuple = await get_current_config_with_decrypted_password(user_id)
-        if config_tuple:
-            connector_config, _ = config_tuple
-            connector_type = connector_config.connector_type
-            # Save connector config snapshot for historical field display
-            connector_config_json = connector_config.model_dump_json() if hasattr(connector_config, 'model_dump_json') else connector_config.json()
-
-            # DocuWare: Extract user-selected fields
-            if connector_config.connector_type == "docuware" and connector_config.docuware:
-                selected_fields = connector_config.docuware.selected_fields
-                selected_table_columns = connector_config.docuware.selected_table_columns
-                logger.info(f"[UPLOAD DEBUG] Loaded DocuWare config - {len(selected_fields)} fields, table_columns: {list(selected_table_columns.keys()) if selected_table_columns else 'None'}")
-
-            # Google Drive: Extract fields based on folder structure configuration
-            elif connector_config.connector_type == "google_drive" and connector_config.google_drive:
-                selected_fields = get_google_drive_fields_from_folder_config(connector_config.google_drive)
-                logger.info(f"[Google Drive] Extracting fields for folder structure: {selected_fields}")
-
-        # Step 2: AI Categorization and Data Extraction (dynamic if fields selected, with few-shot learning)
-        category, confidence, extracted_data = await ai_service.categorize_document(
-            extracted_text,
-            filename,
-            selected_fields=selected_fields,
-            selected_table_columns=selected_table_columns,
-            organization_id=organization_id  # Phase 3: Few-shot learning
-        )
+    cancelled = await job_queue.cancel_batch(batch_id, user_id)
+    if cancelled is None:
+        raise HTTPException(status_code=409, detail=f"Batch is already {batch['status']}")
 
-        # Step 3: AI Learning - Apply learned suggestions and adjust confidence
-        try:
-            if organization_id:
-                # Convert ExtractedData model to dict for AI learning
-                extracted_data_dict = extracted_data.model_dump() if hasattr(extracted_data, 'model_dump') else (
-                    extracted_data.dict() if hasattr(extracted_data, 'dict') else extracted_data
-                )
+    batch_event_bus.publish(batch_id, EVENT_STATE, {'status': ProcessingStatus.CANCELLED.value})
+    return BatchActionResponse(batch_id=batch_id, status=ProcessingStatus.CANCELLED, affected_documents=cancelled)
 
-                # Apply learned suggestions based on correction history
-                enhanced_data, applied_suggestions = ai_learning_service.apply_learned_suggestions(
-                    extracted_data_dict,
-                    organization_id,
-                    category=category.value if category else None
-                )
 
-                if applied_suggestions:
-                    logger.info(f"[AI LEARNING] Applied {len(applied_suggestions)} learned suggestions: {', '.join(applied_suggestions)}")
-                    extracted_data_dict = enhanced_data
+@router.post("/batches/{batch_id}/pause", response_model=BatchActionResponse)
+async def pause_batch(
+    batch_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Pause a processing batch. Documents in progress stop after their current stage and
+    continue from it when the batch is resumed.
 
-                # Adjust confidence scores based on error-prone fields
-                extracted_data_dict = ai_learning_service.adjust_confidence_with_learning(
-                    extracted_data_dict,
-                    organization_id,
-                    category=category.value if category else None
-                )
+    Args:
+        batch_id: Batch to pause
+        current_user: Authenticated user from JWT token
 
-                # Convert the enhanced dict back to ExtractedData model
-                from services.connector_service import _build_extracted_data
-                extracted_data = _build_extracted_data(extracted_data_dict)
+    Returns:
+        BatchActionResponse with the number of documents paused
 
-        except Exception as e:
-            logger.warning(f"[AI LEARNING] Error applying learning: {e}")
-            # Continue processing even if learning fails
-
-        # Create preview (first 500 chars)
-        text_preview = extracted_text[:500] if extracted_text else ""
-
-        processing_time = time.time() - start_time
-
-        print(f"   ✅ {filename} -> {category.value} (confidence: {confidence:.2f}, time: {processing_time:.2f}s)")
-        logger.info(f"✓ {filename} -> {category.value} (confidence: {confidence:.2f}, time: {processing_time:.2f}s)")
-
-        return DocumentResult(
-            filename=filename,
-            original_path=file_path,
-            category=category,
-            confidence=confidence,
-            extracted_text_preview=text_preview,
-            extracted_data=extracted_data,
-            connector_type=connector_type,
-            connector_config_snapshot=connector_config_json,
-            error=None,
-            processing_time=processing_time
-        )
+    Raises:
+        HTTPException: 404 unknown batch, 409 batch isn't processing
+    """
+    user_id = current_user["id"]
+    batch = await get_batch(batch_id, user_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found or access denied")
 
-    except Exception as e:
-        processing_time = time.time() - start_time
-        print(f"   ❌ {filename} failed: {str(e)}")
-        logger.error(f"✗ {filename} failed: {str(e)}")
-
-        return DocumentResult(
-            filename=filename,
-            original_path=file_path,
-            category=DocumentCategory.OTHER,
-            confidence=0.0,
-            extracted_text_preview="",
-            extracted_data=None,
-            error=str(e),
-            processing_time=processing_time
-        )
+    paused = await job_queue.pause_batch(batch_id, user_id)
+    if paused is None:
+        raise HTTPException(status_code=409, detail=f"Only a processing batch can be paused (batch is {batch['status']})")
+
+    batch_event_bus.publish(batch_id, EVENT_STATE, {'status': ProcessingStatus.PAUSED.value})
+    return BatchActionResponse(batch_id=batch_id, status=ProcessingStatus.PAUSED, affected_documents=paused)
+
+
+@router.post("/batches/{batch_id}/resume", response_model=BatchActionResponse)
+async def resume_batch(
+    batch_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Resume a paused batch from where its documents stopped.
+
+    Args:
+        batch_id: Paused batch
+        current_user: Authenticated user from JWT token
+
+    Returns:
+        BatchActionResponse with the number of documents queued again
+
+    Raises:
+        HTTPException: 404 unknown batch, 409 batch isn't paused
+    """
+    user_id = current_user["id"]
+    batch = await get_batch(batch_id, user_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found or access denied")
+
+    org_id = current_user.get("organization_id")
+    subscription = await get_subscription(org_id) if org_id else None
+    plan_type = subscription.get("plan_type", "trial") if subscription else "trial"
+
+    resumed = await job_queue.resume_batch(batch_id, user_id, org_id, plan_type)
+    if resumed is None:
+        raise HTTPException(status_code=409, detail=f"Batch is not paused (batch is {batch['status']})")
+
+    batch_event_bus.publish(batch_id, EVENT_STATE, {'status': ProcessingStatus.PROCESSING.value})
+    return BatchActionResponse(batch_id=batch_id, status=ProcessingStatus.PROCESSING, affected_documents=resumed)
+
+
+@router.post("/batches/{batch_id}/retry-failed", response_model=BatchActionResponse)
+async def retry_failed_documents(
+    batch_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Reprocess only the failed documents of a finished batch, from their stored uploads.
+    Stages a document already completed before failing (e.g. OCR) are reused from its
+    checkpoint. The batch goes back to processing and is finalized again afterwards.
+
+    Args:
+        batch_id: Completed or failed batch
+        current_user: Authenticated user from JWT token
+
+    Returns:
+        BatchActionResponse with the number of documents requeued
+
+    Raises:
+        HTTPException: 404 unknown batch, 409 batch not finished, 400 no failed documents,
+            or 429/503 with Retry-After when the system is overloaded
+    """
+    user_id = current_user["id"]
+    batch = await get_batch(batch_id, user_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found or access denied")
+    if batch["status"] not in (ProcessingStatus.COMPLETED.value, ProcessingStatus.FAILED.value):
+        raise HTTPException(status_code=409, detail=f"Batch is still {batch['status']}")
+    if not batch["failed"]:
+        raise HTTPException(status_code=400, detail="Batch has no failed documents")
+
+    await _admit(batch["failed"])
+
+    requeued = await job_queue.retry_failed(batch_id, user_id)
+    if requeued is None:
+        raise HTTPException(status_code=409, detail="Batch is no longer finished")
+    if requeued == 0:
+        raise HTTPException(status_code=400, detail="Batch has no failed documents")
+
+    batch_event_bus.publish(batch_id, EVENT_STATE, {
+        'status': ProcessingStatus.PROCESSING.value,
+        'retried_files': requeued
+    })
+    logger.info(f"Batch {batch_id}: retrying {requeued} failed documents")
+    return BatchActionResponse(batch_id=batch_id, status=ProcessingStatus.PROCESSING, affected_documents=requeued)
 
 
 async def upload_to_connector(results: List[DocumentResult], user_id: int):
@@ -624,8 +632,8 @@ async def upload_to_connector(results: List[DocumentResult], user_id: int):
     print(f"{'='*60}\n")
     logger.info(f"Uploading documents to {config.connector_type}...")
 
-    # Upload each successfully processed document
-    upload_count = 0
+    # Upload successfully processed documents together (shared login, bounded concurrency)
+    to_upload = []
     for result in results:
         # Skip failed documents or documents without processed path
         if result.error is not None or result.processed_path is None:
@@ -637,35 +645,33 @@ async def upload_to_connector(results: List[DocumentResult], user_id: int):
             logger.debug(f"Skipping {result.filename} - no extracted data")
             continue
 
-        try:
-            # Upload to connector
-            upload_result = await connector_manager.upload_document(
-                file_path=result.processed_path,
-                extracted_data=result.extracted_data,
-                config=config,
-                decrypted_password=decrypted_password,
-                category=result.category  # Pass the AI-detected category for folder organization
-            )
-
-            # Store upload result
-            result.upload_result = upload_result
-
-            if upload_result.success:
-                upload_count += 1
-                print(f"   ✅ Uploaded: {result.filename}")
-                logger.info(f"✓ Uploaded {result.filename} to {config.connector_type}")
-            else:
-                print(f"   ❌ Upload failed: {result.filename} - {upload_result.error}")
-                logger.warning(f"✗ Failed to upload {result.filename}: {upload_result.error}")
+        to_upload.append(result)
+
+    upload_results = await connector_manager.upload_documents(
+        [
+            {
+                "file_path": result.processed_path,
+                "extracted_data": result.extracted_data,
+                "category": result.category  # AI-detected category for folder organization
+            }
+            for result in to_upload
+        ],
+        config=config,
+        decrypted_password=decrypted_password
+    )
 
-        except Exception as e:
-            print(f"   ❌ Upload error: {result.filename} - {str(e)}")
-            logger.error(f"✗ Upload error for {result.filename}: {str(e)}")
-            result.upload_result = UploadResult(
-                success=False,
-                message="Upload error",
-                error=str(e)
-            )
+    upload_count = 0
+    for result, upload_result in zip(to_upload, upload_results):
+        # Store upload result
+        result.upload_result = upload_result
+
+        if upload_result.success:
+            upload_count += 1
+            print(f"   ✅ Uploaded: {result.filename}")
+            logger.info(f"✓ Uploaded {result.filename} to {config.connector_type}")
+        else:
+            print(f"   ❌ Upload failed: {result.filename} - {upload_result.error}")
+            logger.warning(f"✗ Failed to upload {result.filename}: {upload_result.error}")
 
     print(f"\n{'='*60}")
     print(f"📊 Upload Summary")
@@ -677,6 +683,9 @@ async def upload_to_connector(results: List[DocumentResult], user_id: int):
 @router.get("/status/{batch_id}", response_model=BatchResultResponse)
 async def get_batch_status(
     batch_id: str,
+    response: Response,
+    since: int = 0,
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -684,48 +693,34 @@ async def get_batch_status(
     Frontend polls this endpoint to show progress.
     Requires authentication and enforces user isolation.
 
+    Pollers pass the previous response's `cursor` as `since` to receive only
+    new results, and its ETag as If-None-Match to get 304 when nothing changed.
+
     Args:
         batch_id: Unique batch identifier
+        response: Outgoing response (for ETag headers)
+        since: Only return results after this cursor (0 = all results)
+        if_none_match: ETag from the previous poll
         current_user: Authenticated user from JWT token
 
     Returns:
-        BatchResultResponse with current status and results
+        BatchResultResponse with current status and results, or 304 Not Modified
 
     Raises:
         HTTPException: If batch_id not found or access denied
     """
-    # Get batch from database (with user isolation)
-    batch = await get_batch(batch_id, current_user["id"])
+    # Batch counters plus new result rows in one query (with user isolation)
+    batch = await get_batch_with_results(batch_id, current_user["id"], since=since)
 
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found or access denied")
 
-    # Convert results from JSON strings back to DocumentResult objects
-    # and add document IDs by looking them up from the database
-    results = []
-    if batch.get("results"):
-        conn = get_db_connection()
-        cursor = conn.cursor()
+    etag = _batch_etag(batch, since)
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
 
-        try:
-            for result_dict in batch["results"]:
-                # Look up document ID by filename and batch_id
-                filename = result_dict.get('filename')
-
-                cursor.execute('''
-                    SELECT id FROM document_metadata
-                    WHERE filename = ? AND batch_id = ?
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                ''', (filename, batch_id))
-
-                doc_row = cursor.fetchone()
-                if doc_row:
-                    result_dict['id'] = doc_row['id']
-
-                results.append(DocumentResult(**result_dict))
-        finally:
-            conn.close()
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
 
     return BatchResultResponse(
         batch_id=batch_id,
@@ -734,9 +729,94 @@ async def get_batch_status(
         processed_files=batch["processed_files"],
         successful=batch.get("successful", 0),
         failed=batch.get("failed", 0),
-        results=results,
+        results=[DocumentResult(**result_dict) for result_dict in batch["results"]],
         processing_summary=batch.get("processing_summary", {}),
-        download_url=batch.get("download_url")
+        download_url=batch.get("download_url"),
+        cursor=batch["cursor"],
+        eta_seconds=(await job_queue.estimate_batch(batch_id))["eta_seconds"] if batch["status"] in ("uploading", "processing") else None
+    )
+
+
+def _batch_etag(batch: dict, since: int) -> str:
+    """Weak ETag for a batch status response; changes whenever a result arrives or the status changes."""
+    return (
+        f'W/"{batch["id"]}-{batch["status"]}-{batch["processed_files"]}-'
+        f'{batch["successful"]}-{batch["failed"]}-{since}"'
+    )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header (which may list several ETags) against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+@router.get("/batches/{batch_id}/events")
+async def stream_batch_events(
+    batch_id: str,
+    last_event_id: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Stream batch progress as Server-Sent Events.
+    Events: received (uploading batches, one per file), state (upload completed, paused,
+    resumed, cancelled, failed documents retried),
+    ocr_done, ai_done, saved, review, result (one per document) and completed.
+    Sends heartbeat comments while idle and resumes after Last-Event-ID.
+
+    Events are published in the process running the batch's jobs. If this process has none,
+    a resync event tells the client to fall back to polling /api/status.
+
+    Args:
+        batch_id: Unique batch identifier
+        last_event_id: Last-Event-ID header sent by the client on reconnect
+        current_user: Authenticated user from JWT token
+
+    Returns:
+        StreamingResponse (text/event-stream)
+
+    Raises:
+        HTTPException: If batch_id not found or access denied
+    """
+    batch = await get_batch(batch_id, current_user["id"])
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found or access denied")
+
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
+
+    async def event_stream():
+        # Finished or running elsewhere: nothing to stream from this process
+        if not batch_event_bus.has_events(batch_id) and batch["status"] in TERMINAL_BATCH_STATUSES:
+            yield format_sse(EVENT_RESYNC, {"status": batch["status"]})
+            return
+
+        async for batch_event in batch_event_bus.subscribe(
+            batch_id,
+            last_event_id=resume_from,
+            heartbeat_seconds=settings.batch_events_heartbeat_seconds
+        ):
+            if batch_event is None:
+                if not batch_event_bus.has_events(batch_id):
+                    # No progress published here (other worker, or restart)
+                    yield format_sse(EVENT_RESYNC, {})
+                    return
+                yield ": heartbeat\n\n"
+                continue
+
+            yield format_sse(batch_event.event, batch_event.data, batch_event.id)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering (nginx)
+        }
     )
 
 
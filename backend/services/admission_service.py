@@ -0,0 +1,178 @@
+"""
+Admission control for uploads.
+Decides whether new documents can be accepted given the queue backlog, uploads being
+saved by this process, free disk space and LLM limiter headroom (across every process
+making LLM calls, see services/llm_limiter.py), so overload is shed
+at the door (429/503 with Retry-After) instead of slowing every tenant down.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import logging
+import math
+import shutil
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from config import settings
+from job_queue import get_job_queue, JobQueue
+from services.llm_limiter import get_llm_limiter, LLMLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """
+    Overload checks for upload endpoints and the readiness probe.
+
+    503 means this instance can't take the upload (disk, local upload load, LLM cooldown)
+    and a load balancer may route elsewhere; 429 means the whole system is backlogged
+    and the client should slow down.
+    """
+
+    def __init__(self, queue: Optional[JobQueue] = None, limiter: Optional[LLMLimiter] = None):
+        self.queue = queue or get_job_queue()
+        self.limiter = limiter or get_llm_limiter()
+        self.uploads_in_flight = 0
+        self.rejected: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def receiving(self, file_count: int) -> AsyncIterator[None]:
+        """Count files as in flight while a request saves and queues them."""
+        self.uploads_in_flight += file_count
+        try:
+            yield
+        finally:
+            self.uploads_in_flight -= file_count
+
+    async def signals(self) -> Dict[str, Any]:
+        """
+        Collect the current load signals.
+
+        Returns:
+            Dict with queued/running documents, queued_seconds, uploads_in_flight,
+            free_disk_mb and the LLM limiters' combined headroom
+        """
+        backlog = await self.queue.backlog()
+        try:
+            free_disk_mb = shutil.disk_usage(settings.upload_dir).free // (1024 * 1024)
+        except OSError as e:
+            logger.warning(f"Could not read free disk space for {settings.upload_dir}: {e}")
+            free_disk_mb = None
+
+        return {
+            "queued_documents": backlog["queued"],
+            "running_documents": backlog["running"],
+            "queued_seconds": backlog["queued_seconds"],
+            "uploads_in_flight": self.uploads_in_flight,
+            "free_disk_mb": free_disk_mb,
+            "llm": await self.limiter.system_stats()
+        }
+
+    async def check(
+        self,
+        file_count: int,
+        include_backlog: bool = True,
+        signals: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Decide whether `file_count` more documents can be accepted now.
+
+        Args:
+            file_count: Documents the request would add
+            include_backlog: Apply the system-wide (429) checks; off for files of an already admitted batch
+            signals: Signals to decide on (collected if not given)
+
+        Returns:
+            Dict with allowed (bool), status_code (429/503 when rejected), reason,
+            retry_after (seconds) and signals
+        """
+        signals = signals or await self.signals()
+        decision = self._decide(file_count, include_backlog, signals)
+        decision["signals"] = signals
+
+        if not decision["allowed"]:
+            self.rejected[decision["code"]] = self.rejected.get(decision["code"], 0) + 1
+            logger.warning(f"Shedding upload of {file_count} files: {decision['reason']}")
+        return decision
+
+    def _decide(self, file_count: int, include_backlog: bool, signals: Dict[str, Any]) -> Dict[str, Any]:
+        floor = settings.admission_retry_after_seconds
+
+        # This instance is overloaded: 503 (another instance may have room)
+        free_disk_mb = signals["free_disk_mb"]
+        if free_disk_mb is not None and free_disk_mb < settings.admission_min_free_disk_mb:
+            return self._reject(503, "disk", f"Low disk space for uploads ({free_disk_mb} MB free)", floor)
+
+        if signals["uploads_in_flight"] + file_count > settings.admission_max_uploads_in_flight:
+            return self._reject(503, "uploads_in_flight", "Too many uploads in progress on this server", floor)
+
+        cooldown = signals["llm"]["cooldown_seconds"]
+        if cooldown > 0:
+            return self._reject(503, "llm_rate_limited", "AI provider is rate limiting requests", cooldown)
+
+        # The whole system is backlogged: 429
+        if include_backlog:
+            queued = signals["queued_documents"]
+            if queued + file_count > settings.admission_max_queued_documents:
+                # Time for the workers to drain the excess at their current pace
+                excess = queued + file_count - settings.admission_max_queued_documents
+                per_document = signals["queued_seconds"] / queued if queued else settings.preflight_base_seconds
+                drain = excess * per_document / max(1, signals["running_documents"])
+                return self._reject(429, "queue_depth", f"Processing queue is full ({queued} documents waiting)", drain)
+
+            if signals["llm"]["waiting"] > settings.admission_max_llm_waiting:
+                return self._reject(429, "llm_waiting", "AI extraction is saturated", floor)
+
+        return {"allowed": True, "status_code": None, "code": None, "reason": "Accepted", "retry_after": None}
+
+    def _reject(self, status_code: int, code: str, reason: str, retry_after: float) -> Dict[str, Any]:
+        retry_after = min(
+            max(math.ceil(retry_after), settings.admission_retry_after_seconds),
+            settings.admission_max_retry_after_seconds
+        )
+        return {"allowed": False, "status_code": status_code, "code": code, "reason": reason, "retry_after": retry_after}
+
+    async def readiness(self) -> Dict[str, Any]:
+        """
+        Readiness for a load balancer: not ready while this instance would answer uploads with 503.
+        A system-wide backlog (429) doesn't make an instance unready, since every instance shares it;
+        it still shows in the signals.
+
+        Returns:
+            Dict with ready (bool), reason, retry_after and signals
+        """
+        signals = await self.signals()
+        decision = self._decide(0, False, signals)
+        return {
+            "ready": decision["allowed"],
+            "reason": None if decision["allowed"] else decision["reason"],
+            "retry_after": decision["retry_after"],
+            "signals": signals
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Get rejection counts by reason for the metrics endpoint."""
+        return {
+            "uploads_in_flight": self.uploads_in_flight,
+            "rejected": dict(self.rejected)
+        }
+
+
+# Singleton instance
+_admission_controller = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """
+    Get singleton instance of the admission controller.
+
+    Returns:
+        AdmissionController instance
+    """
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+    return _admission_controller
@@ -12,7 +12,7 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from database import get_db_connection
+from review_repository import get_review_repository
 from typing import Dict, Any, List, Optional, Tuple
 import logging
 from collections import Counter
@@ -29,9 +29,10 @@ class AILearningService:
     def __init__(self):
         """Initialize the AI learning service."""
         self.min_corrections_for_learning = 3  # Minimum corrections needed to apply learning
+        self.repository = get_review_repository()
         logger.info("AI Learning Service initialized")
 
-    def get_correction_patterns(self, organization_id: int, field_name: str, limit: int = 50) -> Dict[str, Any]:
+    async def get_correction_patterns(self, organization_id: int, field_name: str, limit: int = 50) -> Dict[str, Any]:
         """
         Analyze correction patterns for a specific field across all documents.
 
@@ -51,62 +52,50 @@ class AILearningService:
                 'suggested_value': str or None
             }
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        try:
-            # Get recent corrections for this field
-            cursor.execute('''
-                SELECT corrected_value, original_value, original_confidence
-                FROM field_corrections
-                WHERE organization_id = ? AND field_name = ?
-                ORDER BY created_at DESC
-                LIMIT ?
-            ''', (organization_id, field_name, limit))
-
-            corrections = cursor.fetchall()
-
-            if not corrections:
-                return {
-                    'total_corrections': 0,
-                    'most_common_value': None,
-                    'value_frequency': {},
-                    'average_original_confidence': None,
-                    'correction_rate': 0.0,
-                    'suggested_value': None
-                }
-
-            # Analyze patterns
-            corrected_values = [c['corrected_value'] for c in corrections if c['corrected_value']]
-            value_counts = Counter(corrected_values)
-            most_common = value_counts.most_common(1)[0] if value_counts else (None, 0)
-
-            # Calculate average original confidence
-            confidences = [c['original_confidence'] for c in corrections if c['original_confidence'] is not None]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else None
-
-            # Determine if we should suggest a value
-            suggested_value = None
-            if most_common[0] and most_common[1] >= self.min_corrections_for_learning:
-                # If same value appears in 60%+ of corrections, suggest it
-                if most_common[1] / len(corrections) >= 0.6:
-                    suggested_value = most_common[0]
-                    logger.debug(f"[AI LEARNING] Suggesting '{suggested_value}' for {field_name} "
-                               f"(appears in {most_common[1]}/{len(corrections)} corrections)")
+        # Get recent corrections for this field
+        by_field = await self.repository.get_recent_field_corrections(organization_id, [field_name], limit)
+        return self._analyze_corrections(field_name, by_field[field_name], limit)
 
+    def _analyze_corrections(self, field_name: str, corrections: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+        """Summarize recent corrections for one field (see get_correction_patterns)."""
+        if not corrections:
             return {
-                'total_corrections': len(corrections),
-                'most_common_value': most_common[0],
-                'value_frequency': dict(value_counts),
-                'average_original_confidence': avg_confidence,
-                'correction_rate': len(corrections) / limit if limit > 0 else 0,
-                'suggested_value': suggested_value
+                'total_corrections': 0,
+                'most_common_value': None,
+                'value_frequency': {},
+                'average_original_confidence': None,
+                'correction_rate': 0.0,
+                'suggested_value': None
             }
 
-        finally:
-            conn.close()
-
-    def get_error_prone_fields(self, organization_id: int, min_corrections: int = 5) -> List[Dict[str, Any]]:
+        # Analyze patterns
+        corrected_values = [c['corrected_value'] for c in corrections if c['corrected_value']]
+        value_counts = Counter(corrected_values)
+        most_common = value_counts.most_common(1)[0] if value_counts else (None, 0)
+
+        # Calculate average original confidence
+        confidences = [c['original_confidence'] for c in corrections if c['original_confidence'] is not None]
+        avg_confidence = sum(confidences) / len(confidences) if confidences else None
+
+        # Determine if we should suggest a value
+        suggested_value = None
+        if most_common[0] and most_common[1] >= self.min_corrections_for_learning:
+            # If same value appears in 60%+ of corrections, suggest it
+            if most_common[1] / len(corrections) >= 0.6:
+                suggested_value = most_common[0]
+                logger.debug(f"[AI LEARNING] Suggesting '{suggested_value}' for {field_name} "
+                           f"(appears in {most_common[1]}/{len(corrections)} corrections)")
+
+        return {
+            'total_corrections': len(corrections),
+            'most_common_value': most_common[0],
+            'value_frequency': dict(value_counts),
+            'average_original_confidence': avg_confidence,
+            'correction_rate': len(corrections) / limit if limit > 0 else 0,
+            'suggested_value': suggested_value
+        }
+
+    async def get_error_prone_fields(self, organization_id: int, min_corrections: int = 5) -> List[Dict[str, Any]]:
         """
         Identify fields that are frequently corrected (error-prone).
 
@@ -117,32 +106,13 @@ class AILearningService:
         Returns:
             List of error-prone fields with statistics
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        fields = await self.repository.get_error_prone_fields(organization_id, min_corrections)
 
-        try:
-            cursor.execute('''
-                SELECT
-                    field_name,
-                    COUNT(*) as correction_count,
-                    AVG(original_confidence) as avg_confidence
-                FROM field_corrections
-                WHERE organization_id = ?
-                GROUP BY field_name
-                HAVING correction_count >= ?
-                ORDER BY correction_count DESC
-            ''', (organization_id, min_corrections))
+        logger.info(f"[AI LEARNING] Found {len(fields)} error-prone fields with {min_corrections}+ corrections")
 
-            fields = cursor.fetchall()
+        return fields
 
-            logger.info(f"[AI LEARNING] Found {len(fields)} error-prone fields with {min_corrections}+ corrections")
-
-            return [dict(field) for field in fields]
-
-        finally:
-            conn.close()
-
-    def adjust_confidence_with_learning(
+    async def adjust_confidence_with_learning(
         self,
         extracted_data: Dict[str, Any],
         organization_id: int,
@@ -161,7 +131,7 @@ class AILearningService:
             Extracted data with adjusted confidence scores
         """
         # Get error-prone fields
-        error_prone_fields = self.get_error_prone_fields(organization_id)
+        error_prone_fields = await self.get_error_prone_fields(organization_id)
         error_prone_map = {field['field_name']: field for field in error_prone_fields}
 
         adjusted_data = extracted_data.copy()
@@ -198,7 +168,7 @@ class AILearningService:
 
         return adjusted_data
 
-    def get_field_suggestions(
+    async def get_field_suggestions(
         self,
         extracted_data: Dict[str, Any],
         organization_id: int,
@@ -217,14 +187,21 @@ class AILearningService:
         """
         suggestions = {}
 
+        # Skip non-field data
+        field_names = [name for name in extracted_data if name not in ['line_items', 'raw_text']]
+
+        # Load recent corrections for every field in one query
+        limit = 50
+        corrections_by_field = await self.repository.get_recent_field_corrections(
+            organization_id, field_names, limit
+        )
+
         # Check each field in extracted data
-        for field_name, field_data in extracted_data.items():
-            # Skip non-field data
-            if field_name in ['line_items', 'raw_text']:
-                continue
+        for field_name in field_names:
+            field_data = extracted_data[field_name]
 
             # Get correction patterns for this field
-            patterns = self.get_correction_patterns(organization_id, field_name)
+            patterns = self._analyze_corrections(field_name, corrections_by_field[field_name], limit)
 
             # If we have a suggested value and current extraction is low confidence or empty
             if patterns['suggested_value']:
@@ -247,7 +224,7 @@ class AILearningService:
 
         return suggestions
 
-    def apply_learned_suggestions(
+    async def apply_learned_suggestions(
         self,
         extracted_data: Dict[str, Any],
         organization_id: int,
@@ -265,7 +242,7 @@ class AILearningService:
             Tuple of (enhanced_data, list_of_applied_suggestions)
         """
         # Get suggestions
-        suggestions = self.get_field_suggestions(extracted_data, organization_id, category)
+        suggestions = await self.get_field_suggestions(extracted_data, organization_id, category)
 
         if not suggestions:
             return extracted_data, []
@@ -293,7 +270,7 @@ class AILearningService:
 
         return enhanced_data, applied
 
-    def get_learning_statistics(self, organization_id: int) -> Dict[str, Any]:
+    async def get_learning_statistics(self, organization_id: int) -> Dict[str, Any]:
         """
         Get statistics about AI learning for an organization.
 
@@ -303,51 +280,22 @@ class AILearningService:
         Returns:
             Dictionary with learning statistics
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        try:
-            # Total corrections
-            cursor.execute('''
-                SELECT COUNT(*) as total
-                FROM field_corrections
-                WHERE organization_id = ?
-            ''', (organization_id,))
-            total_corrections = cursor.fetchone()['total']
-
-            # Unique fields corrected
-            cursor.execute('''
-                SELECT COUNT(DISTINCT field_name) as unique_fields
-                FROM field_corrections
-                WHERE organization_id = ?
-            ''', (organization_id,))
-            unique_fields = cursor.fetchone()['unique_fields']
-
-            # Corrections by method
-            cursor.execute('''
-                SELECT correction_method, COUNT(*) as count
-                FROM field_corrections
-                WHERE organization_id = ?
-                GROUP BY correction_method
-            ''', (organization_id,))
-            by_method = {row['correction_method']: row['count'] for row in cursor.fetchall()}
-
-            # Error-prone fields
-            error_prone = self.get_error_prone_fields(organization_id, min_corrections=3)
-
-            return {
-                'total_corrections': total_corrections,
-                'unique_fields_corrected': unique_fields,
-                'corrections_by_method': by_method,
-                'error_prone_fields_count': len(error_prone),
-                'top_error_prone_fields': error_prone[:5],
-                'learning_enabled': total_corrections >= self.min_corrections_for_learning
-            }
-
-        finally:
-            conn.close()
-
-    def get_few_shot_examples(
+        summary = await self.repository.get_correction_summary(organization_id)
+        total_corrections = summary['total_corrections']
+
+        # Error-prone fields
+        error_prone = await self.get_error_prone_fields(organization_id, min_corrections=3)
+
+        return {
+            'total_corrections': total_corrections,
+            'unique_fields_corrected': summary['unique_fields'],
+            'corrections_by_method': summary['by_method'],
+            'error_prone_fields_count': len(error_prone),
+            'top_error_prone_fields': error_prone[:5],
+            'learning_enabled': total_corrections >= self.min_corrections_for_learning
+        }
+
+    async def get_few_shot_examples(
         self,
         organization_id: int,
         selected_fields: Optional[List[str]] = None,
@@ -366,72 +314,36 @@ class AILearningService:
         Returns:
             List of example dictionaries with filename, category, and corrections
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        try:
-            # Query to get recent reviewed documents with corrections
-            query = '''
-                SELECT DISTINCT
-                    d.id,
-                    d.filename,
-                    d.category,
-                    d.extracted_text_preview
-                FROM documents d
-                INNER JOIN field_corrections fc ON fc.document_id = d.id
-                WHERE d.organization_id = ?
-                    AND fc.organization_id = ?
-            '''
-            params = [organization_id, organization_id]
-
-            # Filter by category if provided
-            if category:
-                query += ' AND d.category = ?'
-                params.append(category)
-
-            query += ' ORDER BY fc.created_at DESC LIMIT ?'
-            params.append(limit)
-
-            cursor.execute(query, params)
-            documents = cursor.fetchall()
-
-            examples = []
-            for doc in documents:
-                # Get all corrections for this document
-                cursor.execute('''
-                    SELECT
-                        field_name,
-                        original_value,
-                        corrected_value
-                    FROM field_corrections
-                    WHERE document_id = ? AND organization_id = ?
-                ''', (doc['id'], organization_id))
-
-                corrections = cursor.fetchall()
-
-                # Filter corrections by selected_fields if provided
-                if selected_fields:
-                    corrections = [c for c in corrections if c['field_name'] in selected_fields]
-
-                if corrections:
-                    examples.append({
-                        'filename': doc['filename'],
-                        'category': doc['category'],
-                        'text_preview': doc['extracted_text_preview'][:200] if doc['extracted_text_preview'] else '',
-                        'corrections': [
-                            {
-                                'field': c['field_name'],
-                                'corrected_value': c['corrected_value']
-                            }
-                            for c in corrections
-                        ]
-                    })
-
-            logger.info(f"[FEW-SHOT] Retrieved {len(examples)} examples for organization {organization_id}")
-            return examples
-
-        finally:
-            conn.close()
+        # Recent reviewed documents with corrections, then all their corrections in one query
+        documents = await self.repository.get_recently_corrected_documents(organization_id, category, limit)
+        corrections_by_doc = await self.repository.get_corrections_for_documents(
+            organization_id, [doc['id'] for doc in documents]
+        )
+
+        examples = []
+        for doc in documents:
+            corrections = corrections_by_doc[doc['id']]
+
+            # Filter corrections by selected_fields if provided
+            if selected_fields:
+                corrections = [c for c in corrections if c['field_name'] in selected_fields]
+
+            if corrections:
+                examples.append({
+                    'filename': doc['filename'],
+                    'category': doc['category'],
+                    'text_preview': '',
+                    'corrections': [
+                        {
+                            'field': c['field_name'],
+                            'corrected_value': c['corrected_value']
+                        }
+                        for c in corrections
+                    ]
+                })
+
+        logger.info(f"[FEW-SHOT] Retrieved {len(examples)} examples for organization {organization_id}")
+        return examples
 
     def format_few_shot_examples(self, examples: List[Dict[str, Any]]) -> str:
         """
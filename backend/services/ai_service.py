@@ -2,8 +2,9 @@
 AI Service for document categorization using Claude.
 Analyzes extracted text and assigns documents to appropriate categories.
 """
-from anthropic import Anthropic
+from anthropic import Anthropic, RateLimitError
 from typing import Tuple, Optional
+import asyncio
 import json
 import sys
 import logging
@@ -12,6 +13,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from models import DocumentCategory, ExtractedData
 from config import settings
+from services.llm_limiter import get_llm_limiter, retry_after_seconds
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +66,7 @@ class AIService:
             try:
                 from services.ai_learning_service import get_ai_learning_service
                 learning_service = get_ai_learning_service()
-                examples = learning_service.get_few_shot_examples(
+                examples = await learning_service.get_few_shot_examples(
                     organization_id=organization_id,
                     selected_fields=selected_fields,
                     limit=3
@@ -225,16 +227,28 @@ DO NOT include markdown code blocks or any other formatting. Output only the JSO
     async def _categorize_claude(self, prompt: str) -> str:
         """
         Get categorization and data extraction from Claude.
-        Uses synchronous API call (Anthropic Python SDK doesn't have async yet).
+        The synchronous SDK call runs in a thread, under the process-wide LLM limiter.
         """
-        message = self.client.messages.create(
-            model=self.model,
-            max_tokens=4096,  # Increased to 4096 to handle many line items (invoices can have 50+ items)
-            temperature=0.1,  # Low temperature for consistent, focused results
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        limiter = get_llm_limiter()
+        async with limiter.slot():
+            try:
+                message = await asyncio.to_thread(
+                    self.client.messages.create,
+                    model=self.model,
+                    max_tokens=4096,  # Increased to 4096 to handle many line items (invoices can have 50+ items)
+                    temperature=0.1,  # Low temperature for consistent, focused results
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ]
+                )
+            except RateLimitError as e:
+                limiter.record_rate_limit(retry_after_seconds(e))
+                try:
+                    # Admission control in the API process sees the cooldown too
+                    await limiter.publish()
+                except Exception as publish_error:
+                    logger.warning(f"Could not publish LLM cooldown: {publish_error}")
+                raise
 
         # Extract text from response
         return message.content[0].text
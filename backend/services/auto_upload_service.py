@@ -7,16 +7,16 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from database import get_db_connection
-from datetime import datetime
+from database import get_review_settings
+from review_repository import get_review_repository
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def get_organization_settings(organization_id):
+async def get_organization_settings(organization_id):
     """
-    Get review settings for an organization.
+    Get review settings for an organization (served from the tenant cache).
 
     Args:
         organization_id: Organization ID
@@ -24,34 +24,17 @@ def get_organization_settings(organization_id):
     Returns:
         Dict with review_mode, confidence_threshold, auto_upload_enabled
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        cursor.execute('''
-            SELECT review_mode, confidence_threshold, auto_upload_enabled
-            FROM organizations
-            WHERE id = ?
-        ''', (organization_id,))
-
-        result = cursor.fetchone()
-
-        if not result:
-            # Default settings
-            return {
-                'review_mode': 'review_all',
-                'confidence_threshold': 0.90,
-                'auto_upload_enabled': False
-            }
+    review_settings = await get_review_settings(organization_id)
 
+    if not review_settings:
+        # Default settings
         return {
-            'review_mode': result['review_mode'] or 'review_all',
-            'confidence_threshold': result['confidence_threshold'] or 0.90,
-            'auto_upload_enabled': result['auto_upload_enabled'] or False
+            'review_mode': 'review_all',
+            'confidence_threshold': 0.90,
+            'auto_upload_enabled': False
         }
 
-    finally:
-        conn.close()
+    return review_settings
 
 
 def should_auto_upload(org_settings, confidence_score):
@@ -94,81 +77,28 @@ def should_auto_upload(org_settings, confidence_score):
     return False
 
 
-async def approve_and_upload_document(doc_id, organization_id):
+async def approve_and_queue_upload(doc_id, organization_id):
     """
-    Auto-approve and upload document to connector.
-    Called when should_auto_upload returns True.
+    Auto-approve a document and queue its connector upload (one transaction).
+    Called when should_auto_upload returns True. The upload itself runs in the
+    background uploader (upload_worker.py), so processing never waits on the DMS.
 
     Args:
         doc_id: Document ID
         organization_id: Organization ID
 
     Returns:
-        Dict with success status and result
+        Dict with success status and whether an upload was queued
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        # Update status to approved
-        cursor.execute('''
-            UPDATE document_metadata
-            SET status = 'approved',
-                approved_at = ?
-            WHERE id = ? AND organization_id = ?
-        ''', (datetime.utcnow(), doc_id, organization_id))
+    queued = await get_review_repository().auto_approve_document(doc_id, organization_id)
 
-        conn.commit()
+    logger.info(f"Document {doc_id} auto-approved for organization {organization_id}, upload queued")
 
-        logger.info(f"Document {doc_id} auto-approved for organization {organization_id}")
-
-        # Upload to connector
-        try:
-            from services.connector_service import upload_document_to_connector
-
-            result = await upload_document_to_connector(doc_id, organization_id)
-
-            # Update status to completed
-            cursor.execute('''
-                UPDATE document_metadata
-                SET status = 'completed',
-                    uploaded_to_connector = 1
-                WHERE id = ?
-            ''', (doc_id,))
-
-            conn.commit()
-
-            logger.info(f"Document {doc_id} uploaded to connector successfully")
-
-            return {
-                'success': True,
-                'auto_uploaded': True,
-                'message': result.get('message', 'Document auto-approved and uploaded'),
-                'upload_result': result
-            }
-
-        except Exception as e:
-            logger.error(f"Failed to upload document {doc_id}: {e}")
-
-            # Update status to failed
-            cursor.execute('''
-                UPDATE document_metadata
-                SET status = 'failed',
-                    error_message = ?
-                WHERE id = ?
-            ''', (str(e), doc_id))
-
-            conn.commit()
-
-            raise e
-
-    except Exception as e:
-        conn.rollback()
-        logger.error(f"Failed to auto-approve document {doc_id}: {e}")
-        raise
-
-    finally:
-        conn.close()
+    return {
+        'success': True,
+        'upload_queued': queued,
+        'message': 'Document auto-approved and queued for upload'
+    }
 
 
 async def process_document_for_review(doc_id, organization_id, confidence_score):
@@ -185,20 +115,20 @@ async def process_document_for_review(doc_id, organization_id, confidence_score)
         Dict with status and action taken
     """
     # Get organization settings
-    org_settings = get_organization_settings(organization_id)
+    org_settings = await get_organization_settings(organization_id)
 
     # Determine if should auto-upload
     if should_auto_upload(org_settings, confidence_score):
-        # Auto-upload
+        # Auto-approve; the background uploader sends it to the connector
         try:
-            result = await approve_and_upload_document(doc_id, organization_id)
+            result = await approve_and_queue_upload(doc_id, organization_id)
             return {
-                'status': 'auto_uploaded',
+                'status': 'upload_queued',
                 'requires_review': False,
                 'result': result
             }
         except Exception as e:
-            logger.error(f"Auto-upload failed for document {doc_id}: {e}")
+            logger.error(f"Auto-approval failed for document {doc_id}: {e}")
             return {
                 'status': 'failed',
                 'requires_review': True,
@@ -213,7 +143,7 @@ async def process_document_for_review(doc_id, organization_id, confidence_score)
         }
 
 
-def get_review_stats(organization_id):
+async def get_review_stats(organization_id):
     """
     Get review statistics for an organization.
 
@@ -223,46 +153,6 @@ def get_review_stats(organization_id):
     Returns:
         Dict with review statistics
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        # Get counts by status
-        cursor.execute('''
-            SELECT
-                status,
-                COUNT(*) as count,
-                AVG(confidence_score) as avg_confidence
-            FROM document_metadata
-            WHERE organization_id = ?
-            GROUP BY status
-        ''', (organization_id,))
-
-        status_counts = {}
-        for row in cursor.fetchall():
-            status_counts[row['status']] = {
-                'count': row['count'],
-                'avg_confidence': round(row['avg_confidence'] or 0, 2)
-            }
-
-        # Get total auto-uploaded vs manual reviewed
-        cursor.execute('''
-            SELECT
-                COUNT(CASE WHEN status IN ('completed', 'approved')
-                           AND approved_at IS NOT NULL THEN 1 END) as total_approved,
-                COUNT(CASE WHEN status = 'pending_review' THEN 1 END) as pending_review
-            FROM document_metadata
-            WHERE organization_id = ?
-        ''', (organization_id,))
-
-        totals = cursor.fetchone()
-
-        return {
-            'by_status': status_counts,
-            'total_approved': totals['total_approved'],
-            'pending_review': totals['pending_review'],
-            'organization_id': organization_id
-        }
-
-    finally:
-        conn.close()
+    stats = await get_review_repository().get_review_stats(organization_id)
+    stats['organization_id'] = organization_id
+    return stats
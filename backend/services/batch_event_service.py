@@ -0,0 +1,236 @@
+"""
+In-process pub/sub for batch progress events.
+The document pipeline publishes stage events; the SSE endpoint streams them to the browser.
+Background uploaders publish connector upload events on a per-organization channel.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+
+from config import settings
+from models import TERMINAL_BATCH_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Event types
+EVENT_OCR_DONE = "ocr_done"
+EVENT_AI_DONE = "ai_done"
+EVENT_SAVED = "saved"
+EVENT_REVIEW = "review"
+EVENT_RESULT = "result"
+EVENT_COMPLETED = "completed"
+EVENT_RECEIVED = "received"  # A file of an uploading batch landed and was queued
+EVENT_STATE = "state"  # Batch lifecycle change (e.g. uploading -> processing)
+EVENT_RESYNC = "resync"  # History no longer covers Last-Event-ID; client should reload status
+EVENT_UPLOAD = "upload"  # Connector upload of an approved document started, finished, is retrying or failed
+
+UPLOAD_CHANNEL_PREFIX = "uploads:"
+
+
+def is_terminal_event(event: str, data: Dict[str, Any]) -> bool:
+    """Whether an event ends its batch: completed, or a state change to failed or cancelled."""
+    return event == EVENT_COMPLETED or (event == EVENT_STATE and data.get('status') in TERMINAL_BATCH_STATUSES)
+
+
+def upload_channel(organization_id: int) -> str:
+    """Channel carrying an organization's connector upload events (never completes)."""
+    return f"{UPLOAD_CHANNEL_PREFIX}{organization_id}"
+
+
+def format_sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """Format one Server-Sent Event frame."""
+    frame = ""
+    if event_id is not None:
+        frame += f"id: {event_id}\n"
+    frame += f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    return frame
+
+
+@dataclass
+class BatchEvent:
+    """A single progress event for a batch."""
+    id: int
+    event: str
+    data: Dict[str, Any]
+
+
+@dataclass
+class _BatchChannel:
+    """Event history and live subscribers for one batch."""
+    history: Deque[BatchEvent]
+    subscribers: Set[asyncio.Queue] = field(default_factory=set)
+    last_id: int = 0
+    finished_at: Optional[float] = None
+    last_event_at: Optional[float] = None
+
+
+class BatchEventBus:
+    """
+    Per-batch event fan-out with bounded history for Last-Event-ID resume.
+    Events only reach subscribers in the same process; SSE clients fall back
+    to the database status when they are connected to another worker.
+    """
+
+    def __init__(self, history_size: int = 1000, retention_seconds: int = 600):
+        self.history_size = history_size
+        self.retention_seconds = retention_seconds
+        self._channels: Dict[str, _BatchChannel] = {}
+
+    def _channel(self, batch_id: str) -> _BatchChannel:
+        channel = self._channels.get(batch_id)
+        if channel is None:
+            channel = _BatchChannel(history=deque(maxlen=self.history_size))
+            self._channels[batch_id] = channel
+        return channel
+
+    def publish(self, batch_id: str, event: str, data: Optional[Dict[str, Any]] = None) -> BatchEvent:
+        """
+        Publish an event to every subscriber of a batch.
+
+        Args:
+            batch_id: Batch ID
+            event: Event type (ocr_done, ai_done, saved, review, result, completed)
+            data: JSON-serializable payload
+
+        Returns:
+            The published event
+        """
+        self._prune()
+
+        channel = self._channel(batch_id)
+        channel.last_id += 1
+        batch_event = BatchEvent(id=channel.last_id, event=event, data=data or {})
+        channel.history.append(batch_event)
+        channel.last_event_at = time.monotonic()
+
+        if is_terminal_event(event, batch_event.data):
+            channel.finished_at = channel.last_event_at
+
+        for queue in channel.subscribers:
+            queue.put_nowait(batch_event)
+
+        return batch_event
+
+    def has_events(self, batch_id: str) -> bool:
+        """Check whether this process has published anything for a batch."""
+        channel = self._channels.get(batch_id)
+        return bool(channel and channel.history)
+
+    async def subscribe(
+        self,
+        batch_id: str,
+        last_event_id: Optional[int] = None,
+        heartbeat_seconds: Optional[float] = None
+    ) -> AsyncIterator[Optional[BatchEvent]]:
+        """
+        Stream events for a batch, replaying history after last_event_id first.
+        Yields None every heartbeat_seconds while idle. Ends after the batch's terminal
+        event (completed, or a failed/cancelled state change).
+
+        Args:
+            batch_id: Batch ID
+            last_event_id: Last event ID the client saw (from the Last-Event-ID header)
+            heartbeat_seconds: Idle interval between None yields (no heartbeats if None)
+        """
+        channel = self._channel(batch_id)
+        queue: asyncio.Queue = asyncio.Queue()
+        channel.subscribers.add(queue)
+
+        try:
+            # Replay missed events (or tell the client its position is gone)
+            replay = self._replay(channel, last_event_id)
+            for batch_event in replay:
+                yield batch_event
+                if is_terminal_event(batch_event.event, batch_event.data):
+                    return
+
+            last_sent = replay[-1].id if replay else (last_event_id or 0)
+
+            while True:
+                try:
+                    batch_event = await asyncio.wait_for(queue.get(), timeout=heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                if batch_event.id <= last_sent:
+                    continue  # Already delivered during replay
+                last_sent = batch_event.id
+
+                yield batch_event
+                if is_terminal_event(batch_event.event, batch_event.data):
+                    return
+        finally:
+            channel.subscribers.discard(queue)
+            if not channel.history and not channel.subscribers:
+                self._channels.pop(batch_id, None)
+
+    def _replay(self, channel: _BatchChannel, last_event_id: Optional[int]) -> List[BatchEvent]:
+        """Events the client hasn't seen yet, given its Last-Event-ID."""
+        history = list(channel.history)
+        if last_event_id is None:
+            return history
+
+        if last_event_id > channel.last_id:
+            # The channel was pruned while idle and started over; carry on from the client's ids
+            channel.last_id = last_event_id + 1
+            return [BatchEvent(id=channel.last_id, event=EVENT_RESYNC, data={})]
+
+        if history and last_event_id < history[0].id - 1:
+            # Older events were dropped from history; a resync marker keeps ids monotonic
+            return [BatchEvent(id=history[0].id - 1, event=EVENT_RESYNC, data={})] + history
+
+        return [batch_event for batch_event in history if batch_event.id > last_event_id]
+
+    def _prune(self) -> None:
+        """
+        Drop channels nobody is listening to once their retention has passed: batches
+        after they finished, upload channels (which never finish) after their last event.
+        """
+        now = time.monotonic()
+        expired = []
+        for batch_id, channel in self._channels.items():
+            if batch_id.startswith(UPLOAD_CHANNEL_PREFIX):
+                since = channel.last_event_at
+            else:
+                since = channel.finished_at
+            if since is not None and not channel.subscribers and now - since > self.retention_seconds:
+                expired.append(batch_id)
+        for batch_id in expired:
+            del self._channels[batch_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get bus statistics for the metrics endpoint."""
+        return {
+            "batches": len(self._channels),
+            "subscribers": sum(len(channel.subscribers) for channel in self._channels.values())
+        }
+
+
+# Singleton instance
+_batch_event_bus = None
+
+
+def get_batch_event_bus() -> BatchEventBus:
+    """
+    Get singleton instance of the batch event bus.
+
+    Returns:
+        BatchEventBus instance
+    """
+    global _batch_event_bus
+    if _batch_event_bus is None:
+        _batch_event_bus = BatchEventBus(
+            history_size=settings.batch_events_history_size,
+            retention_seconds=settings.batch_events_retention_seconds
+        )
+    return _batch_event_bus
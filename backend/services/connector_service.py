@@ -7,13 +7,15 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from database import get_db_connection
+from database import get_db, tenant_cache, org_scope
+from review_repository import get_review_repository
+from upload_outbox import upload_idempotency_key
 from connectors.connector_manager import get_connector_manager
 from services.encryption_service import get_encryption_service
 from models import ExtractedData, ConnectorConfig, ConnectorType, DocumentCategory, LineItem
 import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -79,117 +81,148 @@ def apply_corrections_to_extracted_data(extracted_data_dict: Dict[str, Any], cor
     return corrected_data
 
 
-async def upload_document_to_connector(doc_id: int, organization_id: int) -> Dict[str, Any]:
+async def get_decrypted_org_connector_config(organization_id: int) -> Tuple[str, Dict[str, Any]]:
     """
-    Upload document to configured connector with all corrections applied.
+    Get the active connector config for an organization with the DocuWare password decrypted.
+    Cached in memory only, with the tenant cache's short secret TTL.
 
     Args:
-        doc_id: Document ID
         organization_id: Organization ID
 
     Returns:
-        Dict with success status, message, and upload details
+        Tuple of (connector_type, config_dict)
 
     Raises:
-        Exception: If upload fails
+        ValueError: If no active connector is configured
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    config = await tenant_cache.get_or_load(
+        "decrypted_org_connector_config",
+        organization_id,
+        lambda: _load_decrypted_org_connector_config(organization_id),
+        (org_scope(organization_id),),
+        secret=True
+    )
+
+    if not config:
+        raise ValueError(f"No active connector configured for organization {organization_id}")
+
+    return config
 
+
+async def _load_decrypted_org_connector_config(organization_id: int) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Load and decrypt the active connector config for an organization."""
+    db = await get_db()
     try:
-        # 1. Get document metadata
-        cursor.execute('''
-            SELECT * FROM document_metadata
-            WHERE id = ? AND organization_id = ?
-        ''', (doc_id, organization_id))
+        cursor = await db.execute('''
+            SELECT connector_type, config_encrypted, is_active
+            FROM organization_settings
+            WHERE organization_id = ? AND is_active = 1
+            ORDER BY updated_at DESC
+            LIMIT 1
+        ''', (organization_id,))
 
-        doc = cursor.fetchone()
-        if not doc:
-            raise ValueError(f"Document {doc_id} not found")
+        connector_config = await cursor.fetchone()
+    finally:
+        await db.close()
 
-        # 2. Get all corrections for this document
-        cursor.execute('''
-            SELECT field_name, corrected_value, correction_method
-            FROM field_corrections
-            WHERE document_id = ?
-            ORDER BY created_at ASC
-        ''', (doc_id,))
+    if not connector_config:
+        return None
 
-        corrections = cursor.fetchall()
+    connector_type = connector_config['connector_type']
+    config_encrypted = connector_config['config_encrypted']
 
-        # 3. Load and apply corrections to extracted data
-        extracted_data_dict = json.loads(doc['extracted_data']) if doc['extracted_data'] else {}
+    # Decrypt configuration
+    config_dict = json.loads(config_encrypted)
+
+    # Decrypt password if present (for DocuWare)
+    # Check both root level and nested docuware object
+    if connector_type == 'docuware':
+        dw_config = config_dict.get('docuware', config_dict)
+        if 'encrypted_password' in dw_config:
+            try:
+                decrypted_pwd = encryption_service.decrypt(dw_config['encrypted_password'])
+                dw_config['decrypted_password'] = decrypted_pwd
+                # Also set at root level for compatibility
+                config_dict['decrypted_password'] = decrypted_pwd
+                logger.info(f"✓ Successfully decrypted password for DocuWare connector")
+            except Exception as e:
+                logger.error(f"✗ Failed to decrypt password: {e}")
+                dw_config['decrypted_password'] = None
+                config_dict['decrypted_password'] = None
+
+    return connector_type, config_dict
 
+
+async def upload_documents_to_connector(organization_id: int, doc_ids: List[int]) -> Dict[int, Any]:
+    """
+    Upload several of an organization's documents to its connector in one bulk call
+    (shared login and connections, bounded concurrency), with all corrections applied.
+
+    Args:
+        organization_id: Organization ID
+        doc_ids: Document IDs
+
+    Returns:
+        Dict of document ID to its upload details (success, message, document_id, url,
+        connector_type), or to the exception that failed it: ValueError if the document
+        is gone, Exception if the connector rejected or failed the upload
+
+    Raises:
+        ValueError: If the organization has no active connector
+    """
+    repository = get_review_repository()
+
+    # 1. Get decrypted connector configuration for organization (tenant cache)
+    connector_type, config_dict = await get_decrypted_org_connector_config(organization_id)
+    connector_config_obj = _build_connector_config(connector_type, config_dict)
+
+    # 2. Load each document with its corrections applied
+    results: Dict[int, Any] = {}
+    documents = []
+    for doc_id in doc_ids:
+        doc = await repository.get_document(doc_id, organization_id)
+        if not doc:
+            results[doc_id] = ValueError(f"Document {doc_id} not found")
+            continue
+
+        corrections = await repository.get_corrections(doc_id)
+        extracted_data_dict = json.loads(doc['extracted_data']) if doc['extracted_data'] else {}
         if corrections:
             logger.info(f"[AI LEARNING] Applying {len(corrections)} user corrections to document {doc_id}")
             for correction in corrections:
                 logger.debug(f"  - {correction['field_name']}: '{correction['corrected_value']}'")
             extracted_data_dict = apply_corrections_to_extracted_data(extracted_data_dict, corrections)
-            logger.info(f"[AI LEARNING] Corrections applied - document ready for upload with learned values")
-
-        # 4. Get connector configuration for organization
-        cursor.execute('''
-            SELECT connector_type, config_encrypted, is_active
-            FROM organization_settings
-            WHERE organization_id = ? AND is_active = 1
-            ORDER BY updated_at DESC
-            LIMIT 1
-        ''', (organization_id,))
 
-        connector_config = cursor.fetchone()
-
-        if not connector_config:
-            raise ValueError(f"No active connector configured for organization {organization_id}")
-
-        connector_type = connector_config['connector_type']
-        config_encrypted = connector_config['config_encrypted']
-
-        # 5. Decrypt configuration
-        config_dict = json.loads(config_encrypted)
-
-        # Decrypt password if present (for DocuWare)
-        # Check both root level and nested docuware object
-        if connector_type == 'docuware':
-            dw_config = config_dict.get('docuware', config_dict)
-            if 'encrypted_password' in dw_config:
-                try:
-                    decrypted_pwd = encryption_service.decrypt(dw_config['encrypted_password'])
-                    dw_config['decrypted_password'] = decrypted_pwd
-                    # Also set at root level for compatibility
-                    config_dict['decrypted_password'] = decrypted_pwd
-                    logger.info(f"✓ Successfully decrypted password for DocuWare connector")
-                except Exception as e:
-                    logger.error(f"✗ Failed to decrypt password: {e}")
-                    dw_config['decrypted_password'] = None
-                    config_dict['decrypted_password'] = None
-
-        # 6. Build ConnectorConfig model
-        connector_config_obj = _build_connector_config(connector_type, config_dict)
-
-        # 7. Build ExtractedData model
-        extracted_data_obj = _build_extracted_data(extracted_data_dict)
-
-        # 8. Get document category
-        category = DocumentCategory(doc['category']) if doc['category'] else DocumentCategory.OTHER
-
-        # 9. Upload to connector
-        logger.info(f"Uploading document {doc_id} to {connector_type}")
-
-        connector_manager = get_connector_manager()
-        upload_result = await connector_manager.upload_document(
-            file_path=doc['file_path'],
-            extracted_data=extracted_data_obj,
-            config=connector_config_obj,
-            decrypted_password=config_dict.get('decrypted_password'),
-            category=category
-        )
+        documents.append({
+            "doc_id": doc_id,
+            "file_path": doc['file_path'],
+            "extracted_data": _build_extracted_data(extracted_data_dict),
+            "category": DocumentCategory(doc['category']) if doc['category'] else DocumentCategory.OTHER,
+            "idempotency_key": upload_idempotency_key(doc_id)
+        })
+
+    if not documents:
+        return results
+
+    # 3. Upload them together
+    logger.info(f"Uploading {len(documents)} documents of organization {organization_id} to {connector_type}")
+    connector_manager = get_connector_manager()
+    upload_results = await connector_manager.upload_documents(
+        documents,
+        config=connector_config_obj,
+        decrypted_password=config_dict.get('decrypted_password'),
+        concurrency=len(documents)
+    )
 
+    for document, upload_result in zip(documents, upload_results):
+        doc_id = document['doc_id']
         if not upload_result.success:
-            raise Exception(f"Upload failed: {upload_result.error or upload_result.message}")
+            logger.error(f"Failed to upload document {doc_id}: {upload_result.error or upload_result.message}")
+            results[doc_id] = Exception(f"Upload failed: {upload_result.error or upload_result.message}")
+            continue
 
         logger.info(f"Document {doc_id} uploaded successfully. Document ID: {upload_result.document_id}")
-
-        return {
+        results[doc_id] = {
             'success': True,
             'message': upload_result.message,
             'document_id': upload_result.document_id,
@@ -197,12 +230,7 @@ async def upload_document_to_connector(doc_id: int, organization_id: int) -> Dic
             'connector_type': connector_type
         }
 
-    except Exception as e:
-        logger.error(f"Failed to upload document {doc_id}: {e}", exc_info=True)
-        raise
-
-    finally:
-        conn.close()
+    return results
 
 
 def _build_connector_config(connector_type: str, config_dict: Dict[str, Any]) -> ConnectorConfig:
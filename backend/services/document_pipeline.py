@@ -0,0 +1,599 @@
+"""
+Document processing pipeline run by queue workers.
+Each document job moves through uploaded -> ocr_done -> extracted -> learned -> saved -> routed,
+checkpointing after every stage so a retried job skips the stages it already finished.
+Workers run the stages concurrently with separate limits (see services/pipeline_stages.py).
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from models import DocumentResult, DocumentCategory
+from services.ocr_service import OCRService
+from services.ai_service import AIService
+from services.file_service import FileService
+from services.confidence_service import calculate_overall_confidence, add_confidence_to_extracted_data
+from services.auto_upload_service import process_document_for_review
+from services.ai_learning_service import get_ai_learning_service
+from services.batch_event_service import (
+    get_batch_event_bus, EVENT_OCR_DONE, EVENT_AI_DONE, EVENT_SAVED, EVENT_REVIEW,
+    EVENT_RESULT, EVENT_COMPLETED
+)
+from routes.connector_routes import get_current_config_with_decrypted_password
+from database import finish_batch, get_batch_with_results, get_batch_billed_documents, log_usage
+from review_repository import get_review_repository
+from job_queue import (
+    get_job_queue, PermanentJobError,
+    STAGES, STAGE_OCR_DONE, STAGE_EXTRACTED, STAGE_LEARNED, STAGE_SAVED, STAGE_ROUTED
+)
+from services.pipeline_stages import StageSpec
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Helper Functions for Google Drive Folder Structure
+# ============================================================================
+
+def get_google_drive_fields_from_folder_config(google_drive_config) -> List[str]:
+    """
+    Extract field names needed based on Google Drive folder structure configuration.
+    Maps folder structure levels to field names that need to be extracted.
+
+    Args:
+        google_drive_config: GoogleDriveConfig object with folder structure settings
+
+    Returns:
+        List of field names to extract (e.g., ['vendor', 'date', 'category'])
+    """
+    from models import FolderStructureLevel
+
+    fields_needed = []
+
+    # Map folder structure levels to field names
+    level_to_field_map = {
+        FolderStructureLevel.CATEGORY: 'category',
+        FolderStructureLevel.VENDOR: 'vendor',
+        FolderStructureLevel.CLIENT: 'client',
+        FolderStructureLevel.COMPANY: 'company',
+        FolderStructureLevel.YEAR: 'date',  # Need date to extract year
+        FolderStructureLevel.YEAR_MONTH: 'date',  # Need date to extract year-month
+        FolderStructureLevel.MONTH: 'date',  # Need date to extract month
+        FolderStructureLevel.QUARTER: 'date',  # Need date to extract quarter
+        FolderStructureLevel.DOCUMENT_TYPE: 'document_type',
+        FolderStructureLevel.DOCUMENT_NUMBER: 'document_number',
+        FolderStructureLevel.PERSON_NAME: 'person_name',
+        FolderStructureLevel.PROJECT: 'project',
+        FolderStructureLevel.CUSTOM: None,  # Will use custom field name
+        FolderStructureLevel.NONE: None  # Skip
+    }
+
+    # Check primary level
+    primary_value = google_drive_config.primary_level.value if hasattr(google_drive_config.primary_level, 'value') else google_drive_config.primary_level
+    if primary_value == 'custom':
+        if google_drive_config.primary_custom_field:
+            fields_needed.append(google_drive_config.primary_custom_field)
+    elif google_drive_config.primary_level in level_to_field_map:
+        field = level_to_field_map[google_drive_config.primary_level]
+        if field and field not in fields_needed:
+            fields_needed.append(field)
+
+    # Check secondary level
+    secondary_value = google_drive_config.secondary_level.value if hasattr(google_drive_config.secondary_level, 'value') else google_drive_config.secondary_level
+    if secondary_value == 'custom':
+        if google_drive_config.secondary_custom_field:
+            fields_needed.append(google_drive_config.secondary_custom_field)
+    elif google_drive_config.secondary_level in level_to_field_map:
+        field = level_to_field_map[google_drive_config.secondary_level]
+        if field and field not in fields_needed:
+            fields_needed.append(field)
+
+    # Check tertiary level
+    tertiary_value = google_drive_config.tertiary_level.value if hasattr(google_drive_config.tertiary_level, 'value') else google_drive_config.tertiary_level
+    if tertiary_value == 'custom':
+        if google_drive_config.tertiary_custom_field:
+            fields_needed.append(google_drive_config.tertiary_custom_field)
+    elif google_drive_config.tertiary_level in level_to_field_map:
+        field = level_to_field_map[google_drive_config.tertiary_level]
+        if field and field not in fields_needed:
+            fields_needed.append(field)
+
+    return fields_needed
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+
+class DocumentPipeline:
+    """
+    Runs document and finalize jobs claimed from the job queue.
+    Stage outputs are stored in the job's checkpoint; only the text preview of
+    the OCR output is kept once extraction is done, to keep job rows small.
+    """
+
+    def __init__(self):
+        self.queue = get_job_queue()
+        self.ocr_service = OCRService()
+        self.ai_service = AIService()
+        self.file_service = FileService()
+        self.ai_learning_service = get_ai_learning_service()
+        self.review_repository = get_review_repository()
+        self.events = get_batch_event_bus()
+
+    async def process_document(self, job: Dict[str, Any], worker_id: str) -> Dict[str, Any]:
+        """
+        Run the remaining stages of a document job and record its batch result.
+
+        Args:
+            job: Claimed document job (stage/checkpoint show where to resume)
+            worker_id: Worker holding the job's lease
+
+        Returns:
+            The DocumentResult dict appended to the batch
+
+        Raises:
+            PermanentJobError: If the document cannot be processed (no point retrying)
+            LeaseLostError: If another worker took over the job
+        """
+        for stage in self.stages():
+            if STAGES.index(job['stage']) >= STAGES.index(stage.reaches):
+                continue  # Finished by an earlier attempt
+            await self.run_stage(job, worker_id, stage.reaches, stage.handler)
+
+        return await self.complete_document(job, worker_id)
+
+    def stages(self) -> List[StageSpec]:
+        """
+        The document stages in order, with each stage's concurrency per worker.
+
+        Returns:
+            List of StageSpec (name, stage reached, handler, concurrency)
+        """
+        return [
+            StageSpec("ocr", STAGE_OCR_DONE, self._run_ocr, settings.pipeline_ocr_concurrency),
+            StageSpec("extract", STAGE_EXTRACTED, self._run_extraction, settings.max_concurrent_processing),
+            StageSpec("learn", STAGE_LEARNED, self._apply_learning, settings.pipeline_learn_concurrency),
+            StageSpec("persist", STAGE_SAVED, self._save_document, settings.pipeline_persist_concurrency),
+            StageSpec("route", STAGE_ROUTED, self._route_document, settings.pipeline_route_concurrency),
+        ]
+
+    async def run_stage(self, job: Dict[str, Any], worker_id: str, next_stage: str, handler) -> None:
+        """
+        Run one stage handler and checkpoint the job at `next_stage`.
+
+        Args:
+            job: Claimed document job; its stage and checkpoint are updated in place
+            worker_id: Worker holding the job's lease
+            next_stage: Stage the job reaches when the handler succeeds
+            handler: Stage coroutine taking (job, checkpoint)
+
+        Raises:
+            LeaseLostError: If another worker took over the job
+        """
+        checkpoint = dict(job['checkpoint'])
+
+        started = time.time()
+        await handler(job, checkpoint)
+        checkpoint['elapsed'] = checkpoint.get('elapsed', 0.0) + (time.time() - started)
+
+        await self.queue.save_checkpoint(job['id'], worker_id, next_stage, checkpoint)
+        job['stage'] = next_stage
+        job['checkpoint'] = checkpoint
+
+    async def complete_document(self, job: Dict[str, Any], worker_id: str) -> Dict[str, Any]:
+        """
+        Record the batch result of a job that went through every stage.
+
+        Returns:
+            The DocumentResult dict appended to the batch
+        """
+        checkpoint = job['checkpoint']
+        result = self.build_result(job, checkpoint)
+        return await self._finish(job, worker_id, result, checkpoint.get('document_id'))
+
+    async def fail_document(self, job: Dict[str, Any], worker_id: str, error: str) -> Dict[str, Any]:
+        """
+        Record a document that failed for good as an error result in its batch.
+
+        Returns:
+            The DocumentResult dict appended to the batch
+        """
+        print(f"   ❌ {job['filename']} failed: {error}")
+        logger.error(f"✗ {job['filename']} failed: {error}")
+
+        result = self.build_result(job, job['checkpoint'], error=error)
+        return await self._finish(job, worker_id, result, None)
+
+    def build_result(self, job: Dict[str, Any], checkpoint: Dict[str, Any], error: Optional[str] = None) -> DocumentResult:
+        """Build the DocumentResult for a job from its checkpoint."""
+        if error is not None or 'category' not in checkpoint:
+            return DocumentResult(
+                filename=job['filename'],
+                original_path=job['file_path'],
+                category=DocumentCategory.OTHER,
+                confidence=0.0,
+                extracted_text_preview="",
+                extracted_data=None,
+                error=error,
+                processing_time=checkpoint.get('elapsed', 0.0)
+            )
+
+        return DocumentResult(
+            id=checkpoint.get('document_id'),
+            filename=job['filename'],
+            original_path=job['file_path'],
+            category=checkpoint['category'],
+            confidence=checkpoint['confidence'],
+            extracted_text_preview=checkpoint.get('text_preview', ''),
+            extracted_data=checkpoint.get('extracted_data'),
+            connector_type=checkpoint.get('connector_type'),
+            connector_config_snapshot=checkpoint.get('connector_config_snapshot'),
+            error=None,
+            processing_time=checkpoint.get('elapsed', 0.0)
+        )
+
+    async def _finish(
+        self,
+        job: Dict[str, Any],
+        worker_id: str,
+        result: DocumentResult,
+        document_id: Optional[int]
+    ) -> Dict[str, Any]:
+        result_dict = result.dict()
+        position = await self.queue.finish_document(job, worker_id, result_dict, document_id)
+        estimate = await self.queue.estimate_batch(job['batch_id'])
+
+        self.events.publish(job['batch_id'], EVENT_RESULT, {
+            'seq': position['seq'],
+            'processed_files': position['processed_files'],
+            'total_files': position['total_files'],
+            'eta_seconds': estimate['eta_seconds'],
+            'result': result_dict
+        })
+        return result_dict
+
+    # ========================================================================
+    # Stages
+    # ========================================================================
+
+    async def _run_ocr(self, job: Dict[str, Any], checkpoint: Dict[str, Any]) -> None:
+        """uploaded -> ocr_done: extract text (and OCR coordinates for scanned files)."""
+        file_path = job['file_path']
+        filename = job['filename']
+
+        if not os.path.exists(file_path):
+            raise PermanentJobError(f"Uploaded file is missing: {filename}")
+
+        print(f"⚙️  Processing: {filename}")
+        logger.info(f"Processing: {filename}")
+
+        # Tesseract/PDF parsing is blocking; run it in a thread so other stages keep going
+        extracted_text, extraction_method = await asyncio.to_thread(self._ocr_file, file_path, filename)
+
+        # Validate text quality
+        if not self.ocr_service.validate_ocr_quality(extracted_text):
+            raise PermanentJobError(f"Text quality check failed - insufficient text extracted (method: {extraction_method})")
+
+        checkpoint['text'] = extracted_text
+        checkpoint['method'] = extraction_method
+
+        self.events.publish(job['batch_id'], EVENT_OCR_DONE, {
+            'filename': filename,
+            'method': extraction_method,
+            'chars': len(extracted_text)
+        })
+
+    def _ocr_file(self, file_path: str, filename: str) -> tuple:
+        """Extract text (and OCR coordinates for scanned files). Runs in a worker thread."""
+        # Extract text from file (supports PDFs and images)
+        extraction_result = self.ocr_service.extract_text_from_file(file_path)
+        extracted_text = extraction_result.get('text', '')
+        extraction_method = extraction_result.get('method', 'unknown')
+        file_type = extraction_result.get('file_type', 'unknown')
+
+        logger.info(f"Text extraction: method={extraction_method}, file_type={file_type}, chars={len(extracted_text)}")
+
+        # Extract OCR coordinates for images and image-based PDFs
+        if extraction_method in ['image_ocr', 'pdf_ocr']:
+            try:
+                logger.info(f"Extracting OCR coordinates for {filename}")
+                ocr_data = self.ocr_service.extract_text_with_coordinates(file_path)
+
+                # Save coordinates to JSON file
+                if ocr_data and ocr_data.get('words'):
+                    coords_filename = f"{os.path.splitext(filename)[0]}_ocr_coordinates.json"
+                    ocr_coordinates_path = os.path.join(os.path.dirname(file_path), coords_filename)
+
+                    with open(ocr_coordinates_path, 'w', encoding='utf-8') as f:
+                        json.dump(ocr_data, f, indent=2)
+
+                    logger.info(f"Saved OCR coordinates: {len(ocr_data['words'])} words -> {coords_filename}")
+            except Exception as e:
+                logger.warning(f"Failed to extract OCR coordinates for {filename}: {e}")
+
+        return extracted_text, extraction_method
+
+    async def _run_extraction(self, job: Dict[str, Any], checkpoint: Dict[str, Any]) -> None:
+        """ocr_done -> extracted: AI categorization and field extraction."""
+        filename = job['filename']
+        organization_id = job['organization_id']
+        extracted_text = checkpoint.get('text', '')
+
+        # Get selected fields from connector config (if configured)
+        selected_fields = None
+        selected_table_columns = None
+        connector_type = None
+        connector_config_json = None
+        config_tuple = await get_current_config_with_decrypted_password(job['user_id'])
+        if config_tuple:
+            connector_config, _ = config_tuple
+            connector_type = connector_config.connector_type
+            # Save connector config snapshot for historical field display
+            connector_config_json = connector_config.model_dump_json() if hasattr(connector_config, 'model_dump_json') else connector_config.json()
+
+            # DocuWare: Extract user-selected fields
+            if connector_config.connector_type == "docuware" and connector_config.docuware:
+                selected_fields = connector_config.docuware.selected_fields
+                selected_table_columns = connector_config.docuware.selected_table_columns
+                logger.info(f"[UPLOAD DEBUG] Loaded DocuWare config - {len(selected_fields)} fields, table_columns: {list(selected_table_columns.keys()) if selected_table_columns else 'None'}")
+
+            # Google Drive: Extract fields based on folder structure configuration
+            elif connector_config.connector_type == "google_drive" and connector_config.google_drive:
+                selected_fields = get_google_drive_fields_from_folder_config(connector_config.google_drive)
+                logger.info(f"[Google Drive] Extracting fields for folder structure: {selected_fields}")
+
+        # AI Categorization and Data Extraction (dynamic if fields selected, with few-shot learning)
+        category, confidence, extracted_data = await self.ai_service.categorize_document(
+            extracted_text,
+            filename,
+            selected_fields=selected_fields,
+            selected_table_columns=selected_table_columns,
+            organization_id=organization_id  # Phase 3: Few-shot learning
+        )
+
+        self.events.publish(job['batch_id'], EVENT_AI_DONE, {
+            'filename': filename,
+            'category': category.value,
+            'confidence': confidence
+        })
+
+        # Convert ExtractedData model to dict (checkpoints are JSON)
+        extracted_data_dict = extracted_data.model_dump() if hasattr(extracted_data, 'model_dump') else (
+            extracted_data.dict() if hasattr(extracted_data, 'dict') else extracted_data
+        )
+
+        print(f"   ✅ {filename} -> {category.value} (confidence: {confidence:.2f})")
+        logger.info(f"✓ {filename} -> {category.value} (confidence: {confidence:.2f})")
+
+        # Full text is no longer needed; keep the preview (first 500 chars) for the result
+        checkpoint['text_preview'] = extracted_text[:500] if extracted_text else ""
+        checkpoint.pop('text', None)
+        checkpoint['category'] = category.value
+        checkpoint['confidence'] = confidence
+        checkpoint['extracted_data'] = extracted_data_dict
+        checkpoint['connector_type'] = connector_type
+        checkpoint['connector_config_snapshot'] = connector_config_json
+
+    async def _apply_learning(self, job: Dict[str, Any], checkpoint: Dict[str, Any]) -> None:
+        """extracted -> learned: apply learned corrections and adjust field confidence."""
+        organization_id = job['organization_id']
+        extracted_data_dict = checkpoint.get('extracted_data')
+        category = checkpoint.get('category')
+
+        # AI Learning - Apply learned suggestions and adjust confidence
+        try:
+            if organization_id and extracted_data_dict:
+                # Apply learned suggestions based on correction history
+                enhanced_data, applied_suggestions = await self.ai_learning_service.apply_learned_suggestions(
+                    extracted_data_dict,
+                    organization_id,
+                    category=category
+                )
+
+                if applied_suggestions:
+                    logger.info(f"[AI LEARNING] Applied {len(applied_suggestions)} learned suggestions: {', '.join(applied_suggestions)}")
+                    extracted_data_dict = enhanced_data
+
+                # Adjust confidence scores based on error-prone fields
+                extracted_data_dict = await self.ai_learning_service.adjust_confidence_with_learning(
+                    extracted_data_dict,
+                    organization_id,
+                    category=category
+                )
+
+                # Normalize the enhanced dict back to the ExtractedData shape
+                from services.connector_service import _build_extracted_data
+                checkpoint['extracted_data'] = _build_extracted_data(extracted_data_dict).model_dump()
+
+        except Exception as e:
+            logger.warning(f"[AI LEARNING] Error applying learning: {e}")
+            # Continue processing even if learning fails
+
+    async def _save_document(self, job: Dict[str, Any], checkpoint: Dict[str, Any]) -> None:
+        """learned -> saved: store the document for the review workflow."""
+        organization_id = job['organization_id']
+        extracted_data = checkpoint.get('extracted_data')
+        if not organization_id or not extracted_data:
+            return
+
+        # A retry after a crash between insert and checkpoint reuses the existing row
+        doc_id = await self.review_repository.find_document_id(job['batch_id'], job['file_path'])
+        if doc_id is None:
+            # Calculate confidence score and add it to the extracted data fields
+            confidence_score = calculate_overall_confidence(extracted_data)
+            scored_data = add_confidence_to_extracted_data(extracted_data)
+
+            doc_id = await self.review_repository.create_document(
+                organization_id=organization_id,
+                batch_id=job['batch_id'],
+                filename=job['filename'],
+                file_path=job['file_path'],
+                category=checkpoint['category'],
+                extracted_data=scored_data,
+                confidence_score=confidence_score,
+                connector_type=checkpoint.get('connector_type'),  # Store which connector this document was processed with
+                connector_config_snapshot=checkpoint.get('connector_config_snapshot')  # Store config snapshot for historical field display
+            )
+            checkpoint['confidence_score'] = confidence_score
+
+        # Document ID on the result enables the Review button in the frontend
+        checkpoint['document_id'] = doc_id
+
+        self.events.publish(job['batch_id'], EVENT_SAVED, {
+            'filename': job['filename'],
+            'document_id': doc_id
+        })
+
+    async def _route_document(self, job: Dict[str, Any], checkpoint: Dict[str, Any]) -> None:
+        """saved -> routed: auto-upload confident documents, queue the rest for review."""
+        doc_id = checkpoint.get('document_id')
+        if doc_id is None:
+            return
+
+        confidence_score = checkpoint.get('confidence_score')
+        if confidence_score is None:
+            document = await self.review_repository.get_document(doc_id)
+            confidence_score = document['confidence_score'] if document else 0.0
+
+        review_result = await process_document_for_review(
+            doc_id,
+            job['organization_id'],
+            confidence_score
+        )
+
+        logger.info(
+            f"Document {doc_id} ({job['filename']}): "
+            f"{review_result['status']} (confidence: {confidence_score:.2f})"
+        )
+
+        checkpoint['review_status'] = review_result['status']
+
+        self.events.publish(job['batch_id'], EVENT_REVIEW, {
+            'filename': job['filename'],
+            'document_id': doc_id,
+            'status': review_result['status'],
+            'requires_review': review_result['requires_review']
+        })
+
+    # ========================================================================
+    # Batch finalization
+    # ========================================================================
+
+    async def finalize_batch(self, job: Dict[str, Any], worker_id: str) -> None:
+        """
+        Organize the batch's files into a ZIP, log usage and mark the batch completed.
+        Runs as its own job once every document job of the batch has finished.
+
+        Args:
+            job: Claimed finalize job
+            worker_id: Worker holding the job's lease
+        """
+        batch_id = job['batch_id']
+        user_id = job['user_id']
+
+        batch = await get_batch_with_results(batch_id, user_id)
+        if not batch:
+            await self.queue.finish(job, worker_id, error="Batch not found")
+            return
+
+        processed_results = [DocumentResult(**result_dict) for result_dict in batch['results']]
+
+        # Organize files and create ZIP
+        try:
+            await self.file_service.organize_documents(processed_results)
+            download_url = f"/api/download/{batch_id}"
+        except Exception as e:
+            logger.error(f"Failed to organize documents: {e}")
+            download_url = None
+
+        # NOTE: Connector upload is handled by the review workflow
+        # Documents go through review (or auto-upload based on confidence)
+        # and are uploaded when approved via the document approval endpoint
+
+        successful = batch['successful']
+        failed = batch['failed']
+
+        # Calculate summary by category
+        category_summary = {}
+        for result in processed_results:
+            if result.error is None:
+                cat_name = result.category
+                category_summary[cat_name] = category_summary.get(cat_name, 0) + 1
+
+        # Log usage for successful documents (for billing); a batch finalized again after
+        # retrying its failures only bills the documents that weren't billed before
+        if successful > 0 and job['organization_id']:
+            try:
+                billable = successful - await get_batch_billed_documents(job['organization_id'], batch_id)
+                if billable > 0:
+                    await log_usage(
+                        org_id=job['organization_id'],
+                        action_type="document_processed",
+                        document_count=billable,
+                        user_id=user_id,
+                        metadata={
+                            "batch_id": batch_id,
+                            "total_files": len(processed_results),
+                            "failed": failed,
+                            "categories": category_summary
+                        }
+                    )
+                    logger.info(f"Logged usage: {billable} documents for org {job['organization_id']}")
+            except Exception as e:
+                logger.error(f"Failed to log usage: {str(e)}")
+
+        # Mark batch completed (per-document rows and counters are already stored),
+        # unless it was cancelled while this job ran
+        finished = await finish_batch(
+            batch_id=batch_id,
+            status="completed",
+            processing_summary=category_summary,
+            download_url=download_url
+        )
+        await self.queue.finish(job, worker_id)
+        if not finished:
+            logger.info(f"Batch {batch_id} finished while it was being finalized; not marking it completed")
+            return
+
+        self.events.publish(batch_id, EVENT_COMPLETED, {
+            'status': 'completed',
+            'processed_files': batch['processed_files'],
+            'successful': successful,
+            'failed': failed,
+            'processing_summary': category_summary,
+            'download_url': download_url
+        })
+
+        print(f"\n{'='*60}")
+        print(f"✅ Batch processing completed: {batch_id}")
+        print(f"   ✓ Successful: {successful}")
+        print(f"   ✗ Failed: {failed}")
+        print(f"{'='*60}\n")
+        logger.info(f"Batch processing completed: {batch_id} ({successful} successful, {failed} failed)")
+
+
+# Singleton instance
+_document_pipeline = None
+
+
+def get_document_pipeline() -> DocumentPipeline:
+    """
+    Get singleton instance of the document pipeline.
+
+    Returns:
+        DocumentPipeline instance
+    """
+    global _document_pipeline
+    if _document_pipeline is None:
+        _document_pipeline = DocumentPipeline()
+    return _document_pipeline
@@ -0,0 +1,180 @@
+"""
+Process-wide limiter for Claude API calls.
+Caps concurrent requests and backs off for everyone after a rate-limit response,
+and reports its headroom to admission control.
+
+LLM calls run wherever the processing worker runs, which with standalone workers
+(EMBEDDED_WORKER=false) is not the API process. Each process therefore publishes its
+limiter state to the llm_limiter_state table (on every rate limit and worker heartbeat),
+and admission control adds up the other live processes' state to its own.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from config import settings
+from database import get_db
+
+logger = logging.getLogger(__name__)
+
+
+class LLMLimiter:
+    """
+    Concurrency cap plus shared cooldown for LLM requests.
+    A 429 from the API pauses new requests in this process until its Retry-After passes.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, process_id: Optional[str] = None):
+        self.capacity = max_concurrent or settings.llm_max_concurrent_requests
+        self.process_id = process_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._semaphore = asyncio.Semaphore(self.capacity)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rate_limited = 0
+        self._cooldown_until = 0.0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a free request slot (and for any rate-limit cooldown to pass)."""
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        try:
+            cooldown = self.cooldown_seconds()
+            if cooldown > 0:
+                await asyncio.sleep(cooldown)
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+        finally:
+            self._semaphore.release()
+
+    def record_rate_limit(self, retry_after: Optional[float] = None) -> None:
+        """
+        Pause new requests after the API answered 429.
+
+        Args:
+            retry_after: Seconds from the response's Retry-After header, if any
+        """
+        self.rate_limited += 1
+        delay = retry_after if retry_after is not None else settings.llm_rate_limit_cooldown_seconds
+        self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+        logger.warning(f"LLM rate limited; pausing requests for {delay:.0f}s")
+
+    def cooldown_seconds(self) -> float:
+        """Seconds left in the current rate-limit cooldown (0 if none)."""
+        return max(0.0, self._cooldown_until - time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get limiter headroom for admission control and the metrics endpoint.
+
+        Returns:
+            Dict with capacity, in_flight, waiting, rate_limited and cooldown_seconds
+        """
+        return {
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rate_limited": self.rate_limited,
+            "cooldown_seconds": round(self.cooldown_seconds(), 1)
+        }
+
+    async def publish(self) -> None:
+        """Store this process's limiter state for admission control in other processes."""
+        db = await get_db()
+        try:
+            await db.execute(
+                """INSERT INTO llm_limiter_state (process_id, in_flight, waiting, cooldown_until, updated_at)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(process_id) DO UPDATE SET
+                       in_flight = excluded.in_flight,
+                       waiting = excluded.waiting,
+                       cooldown_until = excluded.cooldown_until,
+                       updated_at = excluded.updated_at""",
+                (self.process_id, self.in_flight, self.waiting,
+                 time.time() + self.cooldown_seconds(), time.time())
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+    async def withdraw(self) -> None:
+        """Remove this process's published state (its worker is stopping)."""
+        db = await get_db()
+        try:
+            await db.execute("DELETE FROM llm_limiter_state WHERE process_id = ?", (self.process_id,))
+            await db.commit()
+        finally:
+            await db.close()
+
+    async def system_stats(self) -> Dict[str, Any]:
+        """
+        Get headroom across every process making LLM calls: this limiter's stats plus the
+        state other processes published within the last job_lease_seconds (older rows
+        belong to processes that died).
+
+        Returns:
+            Dict like stats(), with in_flight and waiting summed and the longest cooldown
+        """
+        stats = self.stats()
+        now = time.time()
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """SELECT COALESCE(SUM(in_flight), 0) AS in_flight,
+                          COALESCE(SUM(waiting), 0) AS waiting,
+                          COALESCE(MAX(cooldown_until), 0) AS cooldown_until
+                   FROM llm_limiter_state
+                   WHERE process_id != ? AND updated_at > ?""",
+                (self.process_id, now - settings.job_lease_seconds)
+            )
+            row = await cursor.fetchone()
+        finally:
+            await db.close()
+
+        stats["in_flight"] += row['in_flight']
+        stats["waiting"] += row['waiting']
+        stats["cooldown_seconds"] = max(stats["cooldown_seconds"], round(max(0.0, row['cooldown_until'] - now), 1))
+        return stats
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read Retry-After (seconds) from an API error's response, if present."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+# Singleton instance
+_llm_limiter = None
+
+
+def get_llm_limiter() -> LLMLimiter:
+    """
+    Get singleton instance of the LLM limiter.
+
+    Returns:
+        LLMLimiter instance
+    """
+    global _llm_limiter
+    if _llm_limiter is None:
+        _llm_limiter = LLMLimiter()
+    return _llm_limiter
@@ -0,0 +1,199 @@
+"""
+Staged execution of document jobs inside a worker.
+Each pipeline stage (OCR -> extract -> learn -> persist -> route) has its own pool of
+tasks and a bounded input queue, so a slow connector upload ties up a route slot
+instead of a slot OCR could use. When a stage's queue is full, the stage in front of
+it blocks, which pushes back all the way to claiming. Jobs whose lease was lost (e.g. their
+batch was paused or cancelled) are dropped before their next stage.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional
+
+from config import settings
+from job_queue import STAGES
+
+logger = logging.getLogger(__name__)
+
+
+class StageSpec(NamedTuple):
+    """One pipeline stage as declared by the document pipeline."""
+    name: str  # Metric name (ocr, extract, ...)
+    reaches: str  # Checkpoint stage recorded once the handler succeeds
+    handler: Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[None]]  # (job, checkpoint)
+    concurrency: int
+
+
+class PipelineStage:
+    """A stage's input queue, task pool and metrics."""
+
+    def __init__(self, spec: StageSpec, queue_size: int):
+        self.name = spec.name
+        self.reaches = spec.reaches
+        self.handler = spec.handler
+        self.concurrency = max(1, spec.concurrency)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.busy = 0
+        self.blocked = 0  # Tasks holding a finished job, waiting for room downstream
+        self.processed = 0
+        self.failed = 0
+        self.blocked_seconds = 0.0
+        self._latencies: Deque[float] = deque(maxlen=settings.pipeline_latency_sample_size)
+
+    def record(self, seconds: float) -> None:
+        self.processed += 1
+        self._latencies.append(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+        return {
+            "concurrency": self.concurrency,
+            "busy": self.busy,
+            "blocked": self.blocked,
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "processed": self.processed,
+            "failed": self.failed,
+            "latency_avg_seconds": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "latency_p95_seconds": round(latencies[min(len(latencies) - 1, math.ceil(len(latencies) * 0.95) - 1)], 3) if latencies else None,
+            "blocked_seconds": round(self.blocked_seconds, 3)
+        }
+
+
+class StagedPipeline:
+    """
+    Runs document jobs through the pipeline's stages with per-stage concurrency.
+
+    The pipeline object supplies stages() (list of StageSpec), run_stage() to run one
+    stage handler and checkpoint it, and complete_document() to record the result.
+    Jobs resumed from a checkpoint enter at the first stage they haven't finished.
+    """
+
+    def __init__(
+        self,
+        pipeline: Any,
+        worker_id: str,
+        on_done: Callable[[Dict[str, Any]], None],
+        on_failure: Callable[[Dict[str, Any], Exception], Awaitable[None]],
+        queue_size: Optional[int] = None
+    ):
+        """
+        Args:
+            pipeline: Document pipeline providing the stages
+            worker_id: Worker holding the jobs' leases
+            on_done: Called when a job leaves the pipeline (finished or failed)
+            on_failure: Records a job whose stage raised (retry or fail)
+            queue_size: Jobs allowed to wait in front of each stage
+        """
+        self.pipeline = pipeline
+        self.worker_id = worker_id
+        self.on_done = on_done
+        self.on_failure = on_failure
+        size = queue_size or settings.pipeline_queue_size
+        self.stages: List[PipelineStage] = [PipelineStage(spec, size) for spec in pipeline.stages()]
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def capacity(self) -> int:
+        """Jobs the stages can work on at once."""
+        return sum(stage.concurrency for stage in self.stages)
+
+    def start(self) -> None:
+        """Start every stage's task pool on the current event loop."""
+        if self._tasks:
+            return
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.concurrency):
+                self._tasks.append(asyncio.create_task(self._work(index), name=f"stage-{stage.name}-{n}"))
+
+    async def stop(self) -> None:
+        """Cancel the stage tasks. Jobs still in the pipeline are left to the caller to release."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, job: Dict[str, Any]) -> None:
+        """
+        Queue a claimed document job at the first stage it hasn't finished.
+        Waits while that stage's queue is full.
+
+        Args:
+            job: Claimed document job
+        """
+        await self.stages[self._entry_index(job)].queue.put(job)
+
+    def _entry_index(self, job: Dict[str, Any]) -> int:
+        done = STAGES.index(job['stage'])
+        for index, stage in enumerate(self.stages):
+            if STAGES.index(stage.reaches) > done:
+                return index
+        # Every stage finished but the result wasn't recorded: the last stage completes it
+        return len(self.stages) - 1
+
+    async def _work(self, index: int) -> None:
+        stage = self.stages[index]
+        is_last = index == len(self.stages) - 1
+
+        while True:
+            job = await stage.queue.get()
+            if job.get('lease_lost'):
+                # Paused, cancelled or taken over while waiting: don't spend work on it
+                logger.info(f"Dropping job {job['id']} before stage {stage.name}: lease lost")
+                stage.queue.task_done()
+                self.on_done(job)
+                continue
+
+            stage.busy += 1
+            started = time.monotonic()
+            try:
+                if STAGES.index(job['stage']) < STAGES.index(stage.reaches):
+                    await self.pipeline.run_stage(job, self.worker_id, stage.reaches, stage.handler)
+                if is_last:
+                    await self.pipeline.complete_document(job, self.worker_id)
+                stage.record(time.monotonic() - started)
+            except Exception as e:
+                stage.failed += 1
+                try:
+                    await self.on_failure(job, e)
+                finally:
+                    self.on_done(job)
+                continue
+            finally:
+                stage.busy -= 1
+                stage.queue.task_done()
+
+            if is_last:
+                self.on_done(job)
+                continue
+
+            # Hand off downstream; a full queue holds this task (and its slot) until there's room
+            next_queue = self.stages[index + 1].queue
+            if next_queue.full():
+                stage.blocked += 1
+                waited = time.monotonic()
+                try:
+                    await next_queue.put(job)
+                finally:
+                    stage.blocked -= 1
+                    stage.blocked_seconds += time.monotonic() - waited
+            else:
+                next_queue.put_nowait(job)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get per-stage metrics for the metrics endpoint.
+
+        Returns:
+            Dict keyed by stage name with concurrency, busy/blocked tasks, queue depth,
+            processed/failed counts and handler latency in seconds
+        """
+        return {stage.name: stage.stats() for stage in self.stages}
@@ -0,0 +1,159 @@
+"""
+Preflight inspection of uploaded files.
+Reads PDF structure with PyPDF2 (no rendering, no OCR) to learn page count,
+text-layer presence and scanned image resolution, and turns that into an
+expected processing time used for scheduling, batch ETAs and plan limits.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import logging
+from typing import Any, Dict, Optional
+
+import PyPDF2
+from PIL import Image
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# OCRService.extract_text_from_file only OCRs the first 5 pages of a PDF
+OCR_PAGE_LIMIT = 5
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.tiff', '.tif', '.bmp', '.gif']
+
+
+class PreflightError(Exception):
+    """The file can't be processed (corrupt, encrypted, empty)."""
+
+
+class PreflightService:
+    """
+    Cheap per-file inspection run at upload time, before any OCR is spent.
+    """
+
+    def inspect(self, file_path: str) -> Dict[str, Any]:
+        """
+        Inspect a file without rendering it.
+
+        Args:
+            file_path: Path to the uploaded PDF or image
+
+        Returns:
+            Dict with page_count, has_text_layer, image_dpi (None if no images found)
+            and estimated_seconds
+
+        Raises:
+            PreflightError: If the file can't be read
+        """
+        extension = Path(file_path).suffix.lower()
+        if extension in IMAGE_EXTENSIONS:
+            report = self._inspect_image(file_path)
+        else:
+            report = self._inspect_pdf(file_path)
+
+        report['estimated_seconds'] = self.estimate_seconds(report)
+        return report
+
+    def estimate_seconds(self, report: Dict[str, Any]) -> float:
+        """
+        Expected processing time for a file: one Claude call plus OCR of its first pages.
+        Scanned pages OCR slower than pages that already carry a text layer.
+
+        Args:
+            report: Preflight report (page_count, has_text_layer)
+
+        Returns:
+            Estimated seconds
+        """
+        ocr_pages = min(report.get('page_count') or 1, OCR_PAGE_LIMIT)
+        page_seconds = settings.preflight_page_seconds
+        if not report.get('has_text_layer'):
+            page_seconds *= settings.preflight_scanned_page_factor
+        return round(settings.preflight_base_seconds + ocr_pages * page_seconds, 2)
+
+    def _inspect_pdf(self, file_path: str) -> Dict[str, Any]:
+        try:
+            with open(file_path, 'rb') as file:
+                reader = PyPDF2.PdfReader(file)
+                if reader.is_encrypted and not reader.decrypt(''):
+                    raise PreflightError("PDF is password protected")
+
+                page_count = len(reader.pages)
+                if page_count == 0:
+                    raise PreflightError("PDF has no pages")
+
+                has_text_layer = False
+                image_dpi: Optional[int] = None
+                for page in reader.pages[:OCR_PAGE_LIMIT]:
+                    if not has_text_layer:
+                        has_text_layer = len((page.extract_text() or '').strip()) > 10
+                    page_dpi = self._page_image_dpi(page)
+                    if page_dpi and (image_dpi is None or page_dpi > image_dpi):
+                        image_dpi = page_dpi
+
+        except PreflightError:
+            raise
+        except Exception as e:
+            raise PreflightError(f"Unreadable PDF: {e}")
+
+        return {
+            'page_count': page_count,
+            'has_text_layer': has_text_layer,
+            'image_dpi': image_dpi
+        }
+
+    def _page_image_dpi(self, page: Any) -> Optional[int]:
+        """Effective DPI of the widest image on a page, assuming it spans the page width."""
+        try:
+            resources = page.get('/Resources')
+            xobjects = resources.get_object().get('/XObject') if resources else None
+            if not xobjects:
+                return None
+
+            page_width_inches = float(page.mediabox.width) / 72
+            if page_width_inches <= 0:
+                return None
+
+            widths = []
+            for xobject in xobjects.get_object().values():
+                xobject = xobject.get_object()
+                if xobject.get('/Subtype') == '/Image':
+                    widths.append(int(xobject.get('/Width', 0)))
+
+            return round(max(widths) / page_width_inches) if widths else None
+        except Exception as e:
+            logger.debug(f"Could not read page images: {e}")
+            return None
+
+    def _inspect_image(self, file_path: str) -> Dict[str, Any]:
+        try:
+            with Image.open(file_path) as image:
+                dpi = image.info.get('dpi')
+        except Exception as e:
+            raise PreflightError(f"Unreadable image: {e}")
+
+        return {
+            'page_count': 1,
+            'has_text_layer': False,
+            'image_dpi': round(dpi[0]) if dpi else None
+        }
+
+
+# Singleton instance
+_preflight_service = None
+
+
+def get_preflight_service() -> PreflightService:
+    """
+    Get singleton instance of the preflight service.
+
+    Returns:
+        PreflightService instance
+    """
+    global _preflight_service
+    if _preflight_service is None:
+        _preflight_service = PreflightService()
+    return _preflight_service
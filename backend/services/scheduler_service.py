@@ -0,0 +1,175 @@
+"""
+Fair-share scheduling of processing jobs across organizations.
+Workers ask the scheduler which organizations to claim jobs from, so one tenant's
+large batch can't starve everyone else's uploads.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from config import settings
+from job_queue import get_job_queue, JobQueue
+from plan_config import get_scheduling_weight
+
+logger = logging.getLogger(__name__)
+
+
+class FairShareScheduler:
+    """
+    Deficit round-robin over organizations with runnable jobs.
+
+    Each visit to an organization adds its plan's scheduling weight to its deficit,
+    and every job claimed for it costs 1. Over time each backlogged organization gets
+    capacity in proportion to its weight; an idle organization's deficit resets so
+    it can't bank credit. Round-robin state lives in this process, so with several
+    worker processes each one is fair on its own.
+    """
+
+    def __init__(self, queue: Optional[JobQueue] = None):
+        self.queue = queue or get_job_queue()
+        self._ring: Deque[int] = deque()  # Organizations in round-robin order
+        self._deficit: Dict[int, float] = {}
+        self._granted = False  # Whether the head of the ring already got this round's quantum
+        self._waits: Dict[int, Deque[float]] = {}
+        self._claimed: Dict[int, int] = {}
+
+    async def claim(self, worker_id: str, slots: int) -> List[Dict[str, Any]]:
+        """
+        Claim up to `slots` jobs, shared fairly between organizations.
+
+        Args:
+            worker_id: Claiming worker
+            slots: Free worker capacity
+
+        Returns:
+            Claimed jobs
+        """
+        if slots <= 0:
+            return []
+
+        backlog = await self.queue.runnable_by_organization()
+        if not backlog:
+            return []
+
+        weights = {row['organization_id']: get_scheduling_weight(row['plan_type']) for row in backlog}
+        runnable = {row['organization_id']: row['runnable'] for row in backlog}
+
+        jobs: List[Dict[str, Any]] = []
+        for organization_id, count in self.select(runnable, weights, slots).items():
+            jobs.extend(await self.queue.claim(worker_id, count, organization_id=organization_id))
+
+        now = time.time()
+        for job in jobs:
+            self._record_claim(job, now)
+        return jobs
+
+    def select(self, runnable: Dict[int, int], weights: Dict[int, int], slots: int) -> Dict[int, int]:
+        """
+        Decide how many jobs to take from each organization.
+
+        Args:
+            runnable: Claimable job count per organization
+            weights: Scheduling weight per organization
+            slots: Number of jobs to hand out
+
+        Returns:
+            Jobs to claim per organization
+        """
+        self._sync_ring(runnable)
+
+        remaining = dict(runnable)
+        picks: Dict[int, int] = {}
+
+        while slots > 0 and any(remaining.values()):
+            organization_id = self._ring[0]
+
+            if not self._granted:
+                self._deficit[organization_id] += weights.get(organization_id, 1)
+                self._granted = True
+
+            while slots > 0 and remaining[organization_id] > 0 and self._deficit[organization_id] >= 1:
+                picks[organization_id] = picks.get(organization_id, 0) + 1
+                remaining[organization_id] -= 1
+                self._deficit[organization_id] -= 1
+                slots -= 1
+
+            if slots == 0 and remaining[organization_id] > 0 and self._deficit[organization_id] >= 1:
+                break  # Out of slots mid-turn: this organization continues next time
+
+            if remaining[organization_id] == 0:
+                self._deficit[organization_id] = 0.0  # Queue drained: no banked credit
+            self._ring.rotate(-1)
+            self._granted = False
+
+        return picks
+
+    def _sync_ring(self, runnable: Dict[int, int]) -> None:
+        """Add newly backlogged organizations to the ring and drop idle ones."""
+        for organization_id in runnable:
+            if organization_id not in self._deficit:
+                self._ring.append(organization_id)
+                self._deficit[organization_id] = 0.0
+
+        for organization_id in list(self._ring):
+            if runnable.get(organization_id, 0) == 0:
+                if self._ring[0] == organization_id:
+                    self._granted = False
+                self._ring.remove(organization_id)
+                del self._deficit[organization_id]
+
+    def _record_claim(self, job: Dict[str, Any], now: float) -> None:
+        organization_id = job['organization_id'] or 0
+        self._claimed[organization_id] = self._claimed.get(organization_id, 0) + 1
+
+        # Queue wait is measured for first attempts (retries wait on purpose)
+        if job['attempts'] == 1:
+            waits = self._waits.get(organization_id)
+            if waits is None:
+                waits = self._waits[organization_id] = deque(maxlen=settings.scheduler_wait_sample_size)
+            waits.append(max(0.0, now - job['run_after']))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get per-organization queue wait metrics for the metrics endpoint.
+
+        Returns:
+            Dict keyed by organization ID (0 = no organization) with claims and wait times in seconds
+        """
+        organizations = {}
+        for organization_id, claimed in self._claimed.items():
+            waits = sorted(self._waits.get(organization_id, ()))
+            organizations[str(organization_id)] = {
+                "claimed": claimed,
+                "deficit": round(self._deficit.get(organization_id, 0.0), 2),
+                "wait_avg_seconds": round(sum(waits) / len(waits), 3) if waits else None,
+                "wait_p95_seconds": round(waits[min(len(waits) - 1, math.ceil(len(waits) * 0.95) - 1)], 3) if waits else None,
+                "wait_max_seconds": round(waits[-1], 3) if waits else None
+            }
+        return {
+            "backlogged_organizations": len(self._ring),
+            "organizations": organizations
+        }
+
+
+# Singleton instance
+_fair_share_scheduler = None
+
+
+def get_fair_share_scheduler() -> FairShareScheduler:
+    """
+    Get singleton instance of the fair-share scheduler.
+
+    Returns:
+        FairShareScheduler instance
+    """
+    global _fair_share_scheduler
+    if _fair_share_scheduler is None:
+        _fair_share_scheduler = FairShareScheduler()
+    return _fair_share_scheduler
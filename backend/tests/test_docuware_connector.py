@@ -9,6 +9,7 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from connectors.docuware_connector import DocuWareConnector
+from connectors.docuware_session_pool import DocuWareSessionPool
 from models import FileCabinet, StorageDialog, IndexField, TableColumn
 
 
@@ -18,57 +19,36 @@ class TestDocuWareConnectorInit:
     """Test DocuWare connector initialization."""
 
     def test_connector_initialization(self):
-        """Test that connector initializes with correct defaults."""
-        connector = DocuWareConnector()
-
-        assert connector.client is None
-        assert connector.session is None
-        assert connector.cabinet_cache == {}
-        assert connector.field_definitions_cache == {}
-        assert connector.current_credentials_key is None
-        assert connector.auth_failure_count == 0
-
-    def test_has_valid_session_false_initially(self):
-        """Test that has_valid_session returns False initially."""
-        connector = DocuWareConnector()
-        assert connector._has_valid_session() is False
-
-    def test_has_valid_session_true_with_session(self):
-        """Test that has_valid_session returns True when session exists."""
-        connector = DocuWareConnector()
-        connector.session = MagicMock()
-        connector.client = MagicMock()
+        """Test that connector initializes with its own session pool when given one."""
+        pool = DocuWareSessionPool()
+        connector = DocuWareConnector(session_pool=pool)
 
-        assert connector._has_valid_session() is True
+        assert connector.session_pool is pool
+        assert pool.stats()["sessions"] == 0
 
 
 @pytest.mark.unit
 @pytest.mark.docuware
+@pytest.mark.asyncio
 class TestDocuWareConnectorCache:
     """Test DocuWare connector caching functionality."""
 
-    def test_clear_cache_resets_all_data(self):
-        """Test that clear_cache resets all cached data."""
-        connector = DocuWareConnector()
+    async def test_clear_cache_for_one_account(self, sample_credentials):
+        """Test that clear_cache with an account drops only that account's session."""
+        pool = DocuWareSessionPool(login_func=lambda url, user, password: MagicMock())
+        connector = DocuWareConnector(session_pool=pool)
 
-        # Set some data
-        connector.cabinet_cache = {"test": "data"}
-        connector.field_definitions_cache = {"test": "fields"}
-        connector.current_credentials_key = "test_key"
-        connector.client = MagicMock()
-        connector.session = MagicMock()
-        connector.auth_failure_count = 3
+        session = await connector.authenticate(sample_credentials)
+        session.cabinet_cache = {"test": "data"}
+        await pool.acquire("https://other.docuware.cloud", "other@example.com", "pw")
 
-        # Clear cache
-        connector.clear_cache()
+        connector.clear_cache(sample_credentials["server_url"], sample_credentials["username"])
 
-        # Verify all cleared
-        assert connector.cabinet_cache == {}
-        assert connector.field_definitions_cache == {}
-        assert connector.current_credentials_key is None
-        assert connector.client is None
-        assert connector.session is None
-        assert connector.auth_failure_count == 0
+        assert pool.stats()["sessions"] == 1
+        assert pool.get("https://other.docuware.cloud", "other@example.com") is not None
+
+        connector.clear_cache()
+        assert pool.stats()["sessions"] == 0
 
 
 @pytest.mark.unit
@@ -153,46 +133,39 @@ class TestDocuWareConnectorAuthentication:
     """Test DocuWare authentication."""
 
     async def test_authenticate_success(self, sample_credentials):
-        """Test successful authentication."""
-        connector = DocuWareConnector()
+        """Test successful authentication returns a pooled session."""
+        login = MagicMock(return_value=MagicMock())
+        connector = DocuWareConnector(session_pool=DocuWareSessionPool(login_func=login))
 
-        with patch.object(connector, '_authenticate_sync', return_value=MagicMock()) as mock_auth:
-            with patch('asyncio.get_event_loop') as mock_loop:
-                mock_executor = AsyncMock(return_value=MagicMock())
-                mock_loop.return_value.run_in_executor = mock_executor
-
-                session = await connector.authenticate(sample_credentials)
+        session = await connector.authenticate(sample_credentials)
+        again = await connector.authenticate(sample_credentials)
 
-                assert session is not None
-                mock_auth.assert_called_once()
+        assert session is not None
+        assert again is session
+        login.assert_called_once()
 
     async def test_test_connection_success(self, sample_credentials):
         """Test successful connection test."""
-        connector = DocuWareConnector()
+        connector = DocuWareConnector(
+            session_pool=DocuWareSessionPool(login_func=lambda url, user, password: MagicMock())
+        )
 
-        with patch.object(connector, '_test_connection_sync', return_value=(True, "Connected")) as mock_test:
-            with patch('asyncio.get_event_loop') as mock_loop:
-                mock_executor = AsyncMock(return_value=(True, "Connected"))
-                mock_loop.return_value.run_in_executor = mock_executor
+        success, message = await connector.test_connection(sample_credentials)
 
-                success, message = await connector.test_connection(sample_credentials)
-
-                assert success is True
-                assert message == "Connected"
+        assert success is True
+        assert message == "Connected successfully"
 
     async def test_test_connection_invalid_credentials(self, sample_credentials):
         """Test connection test with invalid credentials."""
-        connector = DocuWareConnector()
+        def login(url, user, password):
+            raise Exception("401 Unauthorized")
 
-        with patch.object(connector, '_test_connection_sync', return_value=(False, "Invalid credentials")) as mock_test:
-            with patch('asyncio.get_event_loop') as mock_loop:
-                mock_executor = AsyncMock(return_value=(False, "Invalid credentials"))
-                mock_loop.return_value.run_in_executor = mock_executor
+        connector = DocuWareConnector(session_pool=DocuWareSessionPool(login_func=login))
 
-                success, message = await connector.test_connection(sample_credentials)
+        success, message = await connector.test_connection(sample_credentials)
 
-                assert success is False
-                assert "Invalid credentials" in message
+        assert success is False
+        assert "Invalid credentials" in message
 
 
 @pytest.mark.unit
@@ -204,8 +177,7 @@ class TestDocuWareConnectorCabinets:
     async def test_get_file_cabinets_success(self, sample_credentials, sample_file_cabinets):
         """Test successful retrieval of file cabinets."""
         connector = DocuWareConnector()
-        connector.session = MagicMock()
-        connector.client = MagicMock()
+        connector.authenticate = AsyncMock(return_value=MagicMock())
 
         with patch.object(connector, '_get_cabinets_sync', return_value=sample_file_cabinets):
             with patch('asyncio.get_event_loop') as mock_loop:
@@ -236,8 +208,7 @@ class TestDocuWareConnectorDialogs:
     async def test_get_storage_dialogs_success(self, sample_credentials, sample_storage_dialogs):
         """Test successful retrieval of storage dialogs."""
         connector = DocuWareConnector()
-        connector.session = MagicMock()
-        connector.client = MagicMock()
+        connector.authenticate = AsyncMock(return_value=MagicMock())
 
         with patch.object(connector, '_get_dialogs_sync', return_value=sample_storage_dialogs):
             with patch('asyncio.get_event_loop') as mock_loop:
@@ -265,19 +236,20 @@ class TestDocuWareConnectorFields:
     """Test DocuWare index field operations."""
 
     async def test_get_index_fields_success(self, sample_credentials, sample_index_fields):
-        """Test successful retrieval of index fields."""
-        connector = DocuWareConnector()
-        connector.session = MagicMock()
-        connector.client = MagicMock()
+        """Test successful discovery of index fields (nothing cached yet)."""
+        schema_cache = MagicMock(get=AsyncMock(return_value=None), peek=MagicMock(return_value=None), put=AsyncMock())
+        connector = DocuWareConnector(schema_cache=schema_cache)
+        connector.authenticate = AsyncMock(return_value=MagicMock())
 
         with patch.object(connector, '_get_fields_sync', return_value=sample_index_fields):
             with patch('asyncio.get_event_loop') as mock_loop:
                 mock_executor = AsyncMock(return_value=sample_index_fields)
                 mock_loop.return_value.run_in_executor = mock_executor
 
-                fields = await connector.get_index_fields("cab-001", "dialog-001", sample_credentials)
+                fields = await connector.get_index_fields(sample_credentials, "cab-001", "dialog-001")
 
                 assert len(fields) == 6
+                schema_cache.put.assert_awaited_once()
                 assert any(f.name == "VENDOR_NAME" for f in fields)
                 assert any(f.is_table_field for f in fields)
 
@@ -386,8 +358,6 @@ class TestDocuWareConnectorUpload:
     async def test_upload_document_success(self, sample_extracted_data, sample_docuware_config, sample_credentials):
         """Test successful document upload."""
         connector = DocuWareConnector()
-        connector.session = MagicMock()
-        connector.client = MagicMock()
 
         test_pdf_path = Path("/tmp/test.pdf")
 
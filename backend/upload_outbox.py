@@ -0,0 +1,435 @@
+"""
+Transactional outbox for connector uploads.
+Approving a document inserts its upload here in the same transaction as the status
+change, so an approval is never lost and never waits on DocuWare/Google Drive.
+Background uploaders (upload_worker.py) lease entries, retry them with backoff, and
+dead-letter them once their attempts run out.
+
+Uploads are at-least-once, so they are made idempotent: the connector result is stored
+on the entry before it is acked, and the entry's idempotency key is sent to the DMS,
+so a retry after a lost lease finds the earlier upload instead of creating a duplicate.
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from config import settings
+from database import get_db
+from job_queue import LeaseLostError
+
+logger = logging.getLogger(__name__)
+
+# Outbox statuses
+UPLOAD_PENDING = "pending"
+UPLOAD_RUNNING = "running"
+UPLOAD_COMPLETED = "completed"
+UPLOAD_DEAD = "dead"  # Out of attempts (or a permanent error); the document is marked failed
+
+# Connector type of documents processed without a connector
+CONNECTOR_NONE = "none"
+
+
+def upload_idempotency_key(document_id: int) -> str:
+    """
+    Idempotency key of a document's upload.
+    A document has at most one outbox entry; approving it again while its upload is
+    queued or done is a no-op. The key is also sent to the connector (a Drive app
+    property, or a DocuWare index field) so a repeated upload can be detected there.
+    """
+    return f"document:{document_id}"
+
+
+def upload_retry_delay(attempts: int) -> float:
+    """
+    Exponential backoff with jitter for the next try of an upload.
+
+    Args:
+        attempts: Number of attempts made so far (1 after the first failure)
+
+    Returns:
+        Delay in seconds
+    """
+    delay = min(settings.upload_retry_base_seconds * (2 ** max(attempts - 1, 0)), settings.upload_retry_max_seconds)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class UploadOutbox:
+    """
+    Connector uploads stored in the upload_outbox table.
+    Like the job queue, claims are a single UPDATE and every write by an uploader is
+    fenced on it still holding the entry's lease, so several processes can drain it.
+    """
+
+    def __init__(self):
+        # Wakes idle uploaders in this process when uploads are queued here
+        self._enqueued = asyncio.Event()
+
+    # ========================================================================
+    # Producers
+    # ========================================================================
+
+    async def add(self, db: Any, document_id: int, organization_id: int) -> bool:
+        """
+        Queue a document's upload. Runs in the caller's transaction (the one approving
+        the document); call notify() after it commits.
+        A dead upload of the document is queued again, with a fresh set of attempts; a
+        completed one is left alone, so the document is never uploaded twice.
+
+        Args:
+            db: Connection with the open transaction
+            document_id: Approved document
+            organization_id: Document's organization
+
+        Returns:
+            True if an upload was queued, False if one was already pending, running or completed
+        """
+        return document_id in await self.add_many(db, [document_id], organization_id)
+
+    async def add_many(self, db: Any, document_ids: List[int], organization_id: int) -> Set[int]:
+        """
+        Queue the uploads of several documents with one batched write, in the caller's
+        transaction (see add()).
+
+        Args:
+            db: Connection with the open transaction
+            document_ids: Approved documents
+            organization_id: Documents' organization (others' documents are skipped)
+
+        Returns:
+            IDs of the documents whose upload was queued (not already pending, running or completed)
+        """
+        if not document_ids:
+            return set()
+
+        placeholders = ",".join("?" for _ in document_ids)
+        cursor = await db.execute(
+            f"""SELECT id FROM document_metadata d
+                WHERE organization_id = ? AND id IN ({placeholders})
+                  AND NOT EXISTS (
+                      SELECT 1 FROM upload_outbox
+                      WHERE document_id = d.id AND status IN (?, ?, ?)
+                  )""",
+            (organization_id, *document_ids, UPLOAD_PENDING, UPLOAD_RUNNING, UPLOAD_COMPLETED)
+        )
+        queued = {row['id'] for row in await cursor.fetchall()}
+        if not queued:
+            return queued
+
+        now = time.time()
+        await db.executemany(
+            """INSERT INTO upload_outbox
+               (idempotency_key, document_id, organization_id, batch_id, filename,
+                connector_type, max_attempts, run_after)
+               SELECT ?, id, organization_id, batch_id, filename, COALESCE(connector_type, ?), ?, ?
+               FROM document_metadata WHERE id = ?
+               ON CONFLICT(idempotency_key) DO UPDATE
+               SET status = ?, attempts = 0, max_attempts = excluded.max_attempts,
+                   run_after = excluded.run_after, connector_type = excluded.connector_type,
+                   last_error = NULL, lease_owner = NULL, lease_expires_at = NULL,
+                   updated_at = CURRENT_TIMESTAMP
+               WHERE upload_outbox.status != ?""",
+            [
+                (upload_idempotency_key(document_id), CONNECTOR_NONE, settings.upload_max_attempts, now,
+                 document_id, UPLOAD_PENDING, UPLOAD_COMPLETED)
+                for document_id in sorted(queued)
+            ]
+        )
+        return queued
+
+    def notify(self) -> None:
+        """Wake this process's uploaders after a transaction that queued uploads committed."""
+        self._enqueued.set()
+
+    async def wait_for_uploads(self, timeout: float) -> None:
+        """
+        Sleep until uploads are queued in this process or the timeout passes.
+        Uploads queued by other processes are picked up on the next poll.
+        """
+        try:
+            await asyncio.wait_for(self._enqueued.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._enqueued.clear()
+
+    # ========================================================================
+    # Uploaders
+    # ========================================================================
+
+    async def claim(self, worker_id: str, free_slots: Dict[str, int], default_slots: int = 0) -> List[Dict[str, Any]]:
+        """
+        Lease runnable uploads, oldest first, within the uploader's free slots per connector
+        type: pending uploads whose backoff has passed, and running ones whose uploader
+        stopped renewing the lease.
+
+        Args:
+            worker_id: Unique ID of the claiming uploader
+            free_slots: Connector type -> uploads the uploader can start now
+            default_slots: Free slots for connector types not in free_slots
+
+        Returns:
+            Claimed entries (attempts already incremented)
+        """
+        now = time.time()
+        runnable = "((status = ? AND run_after <= ?) OR (status = ? AND lease_expires_at < ?))"
+        runnable_params = (UPLOAD_PENDING, now, UPLOAD_RUNNING, now)
+
+        db = await get_db()
+        try:
+            await db.execute("BEGIN IMMEDIATE")
+            cursor = await db.execute(
+                f"SELECT DISTINCT connector_type FROM upload_outbox WHERE {runnable}",
+                runnable_params
+            )
+            connector_types = [row['connector_type'] for row in await cursor.fetchall()]
+
+            rows = []
+            for connector_type in connector_types:
+                limit = free_slots.get(connector_type, default_slots)
+                if limit <= 0:
+                    continue
+                cursor = await db.execute(
+                    f"""UPDATE upload_outbox
+                        SET status = ?, lease_owner = ?, lease_expires_at = ?,
+                            attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                        WHERE id IN (
+                            SELECT id FROM upload_outbox
+                            WHERE {runnable} AND connector_type = ?
+                            ORDER BY run_after, id
+                            LIMIT ?
+                        )
+                        RETURNING *""",
+                    (UPLOAD_RUNNING, worker_id, now + settings.upload_lease_seconds,
+                     *runnable_params, connector_type, limit)
+                )
+                rows.extend(await cursor.fetchall())
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            await db.close()
+
+        return sorted((dict(row) for row in rows), key=lambda entry: entry['id'])
+
+    async def heartbeat(self, worker_id: str, entry_ids: List[int]) -> List[int]:
+        """
+        Extend the leases an uploader holds.
+
+        Returns:
+            IDs of entries whose lease was renewed (missing IDs were lost to another uploader)
+        """
+        if not entry_ids:
+            return []
+
+        placeholders = ",".join("?" for _ in entry_ids)
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                f"""UPDATE upload_outbox
+                    SET lease_expires_at = ?
+                    WHERE lease_owner = ? AND status = ? AND id IN ({placeholders})
+                    RETURNING id""",
+                (time.time() + settings.upload_lease_seconds, worker_id, UPLOAD_RUNNING, *entry_ids)
+            )
+            renewed = [row['id'] for row in await cursor.fetchall()]
+            await db.commit()
+            return renewed
+        finally:
+            await db.close()
+
+    async def record_upload(self, entry: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """
+        Store a successful upload's connector result on its entry, before complete().
+        Not fenced on the lease: the document is in the DMS either way, and whichever
+        uploader holds the entry next completes it with this result instead of
+        uploading again.
+
+        Args:
+            entry: Claimed entry
+            result: Connector upload result (DMS document ID, URL, ...)
+        """
+        db = await get_db()
+        try:
+            await db.execute(
+                "UPDATE upload_outbox SET upload_result = ? WHERE id = ? AND status != ?",
+                (json.dumps(result, default=str), entry['id'], UPLOAD_COMPLETED)
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+    async def complete(self, entry: Dict[str, Any], worker_id: str, result: Dict[str, Any]) -> None:
+        """
+        Record a successful upload and mark the document completed, in one transaction.
+
+        Args:
+            entry: Claimed entry
+            worker_id: Uploader holding the lease
+            result: Connector upload result (stored as the document's connector_result)
+
+        Raises:
+            LeaseLostError: If the uploader no longer holds the entry
+        """
+        db = await get_db()
+        try:
+            await self._finish(db, entry, worker_id, UPLOAD_COMPLETED, None)
+            await db.execute(
+                """UPDATE document_metadata
+                   SET status = 'completed', uploaded_to_connector = 1, connector_result = ?, error_message = NULL
+                   WHERE id = ?""",
+                (json.dumps(result, default=str), entry['document_id'])
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+    async def dead_letter(self, entry: Dict[str, Any], worker_id: str, error: str) -> None:
+        """
+        Give up on an upload and mark the document failed, in one transaction.
+        Approving the document again queues a new upload.
+
+        Raises:
+            LeaseLostError: If the uploader no longer holds the entry
+        """
+        db = await get_db()
+        try:
+            await self._finish(db, entry, worker_id, UPLOAD_DEAD, error)
+            await db.execute(
+                "UPDATE document_metadata SET status = 'failed', error_message = ? WHERE id = ?",
+                (error, entry['document_id'])
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+    async def _finish(self, db: Any, entry: Dict[str, Any], worker_id: str, status: str, error: Optional[str]) -> None:
+        cursor = await db.execute(
+            """UPDATE upload_outbox
+               SET status = ?, last_error = ?, lease_owner = NULL, lease_expires_at = NULL,
+                   updated_at = CURRENT_TIMESTAMP
+               WHERE id = ? AND lease_owner = ? AND status = ?""",
+            (status, error, entry['id'], worker_id, UPLOAD_RUNNING)
+        )
+        if cursor.rowcount == 0:
+            await db.rollback()
+            raise LeaseLostError(f"Upload {entry['id']} is no longer leased by {worker_id}")
+
+    async def retry(self, entry: Dict[str, Any], worker_id: str, error: str, delay: Optional[float] = None) -> bool:
+        """
+        Put a failed upload back in the outbox after a backoff delay.
+
+        Args:
+            entry: Claimed entry
+            worker_id: Uploader holding the lease
+            error: Error message of the failed attempt
+            delay: Seconds to wait before the next attempt (default: exponential backoff)
+
+        Returns:
+            True if requeued, False if the lease was already lost
+        """
+        if delay is None:
+            delay = upload_retry_delay(entry['attempts'])
+
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                """UPDATE upload_outbox
+                   SET status = ?, run_after = ?, last_error = ?, lease_owner = NULL,
+                       lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                   WHERE id = ? AND lease_owner = ? AND status = ?""",
+                (UPLOAD_PENDING, time.time() + delay, error, entry['id'], worker_id, UPLOAD_RUNNING)
+            )
+            await db.commit()
+            return cursor.rowcount == 1
+        finally:
+            await db.close()
+
+    async def release(self, worker_id: str, entry_ids: List[int]) -> int:
+        """
+        Hand leased uploads back on graceful shutdown, without counting the interrupted attempt.
+
+        Returns:
+            Number of uploads released
+        """
+        if not entry_ids:
+            return 0
+
+        placeholders = ",".join("?" for _ in entry_ids)
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                f"""UPDATE upload_outbox
+                    SET status = ?, run_after = ?, attempts = MAX(attempts - 1, 0),
+                        lease_owner = NULL, lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE lease_owner = ? AND status = ? AND id IN ({placeholders})""",
+                (UPLOAD_PENDING, time.time(), worker_id, UPLOAD_RUNNING, *entry_ids)
+            )
+            await db.commit()
+            return cursor.rowcount
+        finally:
+            await db.close()
+
+    # ========================================================================
+    # Introspection
+    # ========================================================================
+
+    async def get_document_upload(self, document_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the outbox entry of a document's latest upload.
+
+        Returns:
+            Entry dict, or None if the document was never queued for upload
+        """
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                "SELECT * FROM upload_outbox WHERE idempotency_key = ?",
+                (upload_idempotency_key(document_id),)
+            )
+            row = await cursor.fetchone()
+            return dict(row) if row else None
+        finally:
+            await db.close()
+
+    async def stats(self) -> Dict[str, Any]:
+        """Get upload counts by status for the metrics endpoint."""
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                "SELECT status, COUNT(*) AS count FROM upload_outbox GROUP BY status"
+            )
+            counts = {row['status']: row['count'] for row in await cursor.fetchall()}
+            cursor = await db.execute(
+                "SELECT MIN(created_at) AS oldest FROM upload_outbox WHERE status = ?",
+                (UPLOAD_PENDING,)
+            )
+            row = await cursor.fetchone()
+            return {
+                "pending": counts.get(UPLOAD_PENDING, 0),
+                "running": counts.get(UPLOAD_RUNNING, 0),
+                "completed": counts.get(UPLOAD_COMPLETED, 0),
+                "dead": counts.get(UPLOAD_DEAD, 0),
+                "oldest_pending_at": row['oldest'] if row else None
+            }
+        finally:
+            await db.close()
+
+
+# Singleton instance
+_upload_outbox = None
+
+
+def get_upload_outbox() -> UploadOutbox:
+    """
+    Get singleton instance of the upload outbox.
+
+    Returns:
+        UploadOutbox instance
+    """
+    global _upload_outbox
+    if _upload_outbox is None:
+        _upload_outbox = UploadOutbox()
+    return _upload_outbox
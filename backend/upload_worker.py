@@ -0,0 +1,301 @@
+"""
+Background uploader: drains the upload outbox (upload_outbox.py) into the connectors.
+
+Runs next to the processing worker, embedded in the API process or in each standalone
+worker process (python backend/worker.py). Uploads are limited per connector type, so a
+slow DocuWare server can't hold up Google Drive uploads, and each runs under a lease
+with heartbeats like processing jobs. Entries claimed together for one organization (and
+so one connector account) go to the connector as a single bulk upload. Failed uploads are
+retried with backoff and dead-lettered (document marked failed) once their attempts run out.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent))
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import settings
+from job_queue import LeaseLostError
+from upload_outbox import get_upload_outbox, UploadOutbox
+from services.batch_event_service import get_batch_event_bus, upload_channel, EVENT_UPLOAD
+
+logger = logging.getLogger(__name__)
+
+# (organization_id, document_ids) -> {document_id: upload details, or the exception that failed it}
+UploadFunc = Callable[[int, List[int]], Awaitable[Dict[int, Any]]]
+
+
+def make_uploader_id() -> str:
+    """Unique uploader identity used as the lease owner."""
+    return f"{socket.gethostname()}:{os.getpid()}:upload-{uuid.uuid4().hex[:8]}"
+
+
+def connector_limits() -> Dict[str, int]:
+    """Uploads in flight per uploader, by connector type (others use upload_default_concurrency)."""
+    return {
+        "docuware": settings.upload_docuware_concurrency,
+        "google_drive": settings.upload_google_drive_concurrency
+    }
+
+
+def is_permanent_upload_error(e: Exception) -> bool:
+    """
+    Whether retrying an upload can't help: the document is gone, the organization has no
+    connector, or its data doesn't validate (upload_documents_to_connector uses ValueError).
+    """
+    return isinstance(e, ValueError)
+
+
+class UploadWorker:
+    """
+    Claims outbox entries into free per-connector slots, uploads each organization's
+    entries together in one task, and records each outcome on its entry and document.
+    """
+
+    def __init__(
+        self,
+        outbox: Optional[UploadOutbox] = None,
+        upload: Optional[UploadFunc] = None,
+        worker_id: Optional[str] = None,
+        poll_interval: Optional[float] = None
+    ):
+        self.outbox = outbox or get_upload_outbox()
+        self._upload = upload
+        self.worker_id = worker_id or make_uploader_id()
+        self.poll_interval = poll_interval if poll_interval is not None else settings.job_poll_interval_seconds
+        self.limits = connector_limits()
+        self.events = get_batch_event_bus()
+        self._active: Dict[int, Dict[str, Any]] = {}  # Entries this uploader holds a lease on
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._slot_freed = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.uploaded = 0
+        self.retried = 0
+        self.dead = 0
+
+    @property
+    def upload(self) -> UploadFunc:
+        # Imported lazily: the connector service pulls in the DocuWare/Drive clients
+        if self._upload is None:
+            from services.connector_service import upload_documents_to_connector
+            self._upload = upload_documents_to_connector
+        return self._upload
+
+    # ========================================================================
+    # Lifecycle
+    # ========================================================================
+
+    def start(self) -> None:
+        """Run the uploader as a background task on the current event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop claiming, cancel in-flight uploads and hand their leases back."""
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def run(self) -> None:
+        """Claim and run uploads until stop() is called."""
+        heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        logger.info(f"Uploader {self.worker_id} started (limits: {self.limits}, others {settings.upload_default_concurrency})")
+        try:
+            while not self._stopping.is_set():
+                self._slot_freed.clear()
+                try:
+                    entries = await self.outbox.claim(
+                        self.worker_id, self._free_slots(), settings.upload_default_concurrency
+                    )
+                except Exception as e:
+                    logger.error(f"Uploader {self.worker_id} failed to claim uploads: {e}")
+                    entries = []
+
+                for group in self._group(entries):
+                    task = asyncio.create_task(self._run_uploads(group))
+                    for entry in group:
+                        self._active[entry['id']] = entry
+                        self._tasks[entry['id']] = task
+
+                if not entries:
+                    await self._wait()
+        finally:
+            heartbeat_task.cancel()
+            await self._shutdown()
+            logger.info(f"Uploader {self.worker_id} stopped")
+
+    def _group(self, entries: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Split claimed entries into one bulk upload per organization and connector type."""
+        groups: Dict[Tuple[int, str], List[Dict[str, Any]]] = defaultdict(list)
+        for entry in entries:
+            groups[(entry['organization_id'], entry['connector_type'])].append(entry)
+        return list(groups.values())
+
+    def _free_slots(self) -> Dict[str, int]:
+        """
+        Uploads this uploader can start now, per connector type. Types without a
+        configured limit that have uploads in flight get upload_default_concurrency.
+        """
+        running: Dict[str, int] = {}
+        for entry in self._active.values():
+            running[entry['connector_type']] = running.get(entry['connector_type'], 0) + 1
+        free = {connector_type: limit - running.get(connector_type, 0) for connector_type, limit in self.limits.items()}
+        for connector_type, count in running.items():
+            free.setdefault(connector_type, settings.upload_default_concurrency - count)
+        return free
+
+    async def _wait(self) -> None:
+        """Sleep until uploads may be available, a slot frees up, or stop() is called."""
+        waiters = [
+            asyncio.create_task(self.outbox.wait_for_uploads(self.poll_interval)),
+            asyncio.create_task(self._stopping.wait()),
+            asyncio.create_task(self._slot_freed.wait())
+        ]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _shutdown(self) -> None:
+        entry_ids = list(self._active)
+        tasks = set(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            released = await self.outbox.release(self.worker_id, entry_ids)
+            if released:
+                logger.info(f"Uploader {self.worker_id} released {released} in-flight uploads")
+        except Exception as e:
+            logger.warning(f"Uploader {self.worker_id} could not release uploads (leases will expire): {e}")
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.job_heartbeat_seconds)
+            entry_ids = list(self._active)
+            if not entry_ids:
+                continue
+            try:
+                renewed = await self.outbox.heartbeat(self.worker_id, entry_ids)
+                lost = set(entry_ids) - set(renewed)
+                if lost:
+                    logger.warning(f"Uploader {self.worker_id} lost leases on uploads {sorted(lost)}")
+            except Exception as e:
+                logger.warning(f"Uploader {self.worker_id} heartbeat failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get this uploader's in-flight uploads and outcome counters.
+
+        Returns:
+            Dict with worker_id, in_flight (by connector type), limits, uploaded, retried and dead
+        """
+        in_flight: Dict[str, int] = {}
+        for entry in self._active.values():
+            in_flight[entry['connector_type']] = in_flight.get(entry['connector_type'], 0) + 1
+        return {
+            "worker_id": self.worker_id,
+            "in_flight": in_flight,
+            "limits": self.limits,
+            "uploaded": self.uploaded,
+            "retried": self.retried,
+            "dead": self.dead
+        }
+
+    # ========================================================================
+    # Upload execution
+    # ========================================================================
+
+    async def _run_uploads(self, entries: List[Dict[str, Any]]) -> None:
+        try:
+            await self._process(entries)
+        finally:
+            for entry in entries:
+                self._active.pop(entry['id'], None)
+                self._tasks.pop(entry['id'], None)
+            self._slot_freed.set()
+
+    async def _process(self, entries: List[Dict[str, Any]]) -> None:
+        uploads = []
+        for entry in entries:
+            if entry.get('upload_result'):
+                # Uploaded by an attempt that lost its lease before acking: don't upload it again
+                await self._record(entry, self._outcome(entry, json.loads(entry['upload_result'])))
+            elif entry['attempts'] > entry['max_attempts']:
+                # Reclaimed after its uploaders kept dying mid-upload
+                error = f"Gave up after {entry['max_attempts']} attempts (last: {entry.get('last_error') or 'uploader lost'})"
+                await self._record(entry, self._dead_letter(entry, error))
+            else:
+                self._publish(entry, "uploading")
+                uploads.append(entry)
+        if not uploads:
+            return
+
+        try:
+            results = await self.upload(uploads[0]['organization_id'], [entry['document_id'] for entry in uploads])
+        except Exception as e:
+            # Nothing was uploaded (e.g. no connector configured): every entry failed with it
+            results = {entry['document_id']: e for entry in uploads}
+
+        for entry in uploads:
+            result = results.get(entry['document_id'], Exception("Connector returned no result"))
+            await self._record(entry, self._outcome(entry, result))
+
+    async def _record(self, entry: Dict[str, Any], outcome: Awaitable[None]) -> None:
+        """Record one entry's outcome without letting it affect the rest of its group."""
+        try:
+            await outcome
+        except LeaseLostError as e:
+            logger.warning(str(e))
+        except Exception as e:
+            # Lease expires and another attempt picks the upload up
+            logger.error(f"Could not record outcome of upload {entry['id']}: {e}")
+
+    async def _outcome(self, entry: Dict[str, Any], result: Any) -> None:
+        if isinstance(result, Exception):
+            error = str(result) or result.__class__.__name__
+            if is_permanent_upload_error(result) or entry['attempts'] >= entry['max_attempts']:
+                await self._dead_letter(entry, error)
+            else:
+                logger.warning(
+                    f"Upload of document {entry['document_id']} failed (attempt {entry['attempts']}), retrying: {error}"
+                )
+                if await self.outbox.retry(entry, self.worker_id, error):
+                    self.retried += 1
+                    self._publish(entry, "retrying", error=error)
+            return
+
+        # Stored first, so the DMS document isn't uploaded again if the ack is lost
+        await self.outbox.record_upload(entry, result)
+        await self.outbox.complete(entry, self.worker_id, result)
+        self.uploaded += 1
+        logger.info(f"Document {entry['document_id']} uploaded to {entry['connector_type']}")
+        self._publish(entry, "completed", url=result.get('url'))
+
+    async def _dead_letter(self, entry: Dict[str, Any], error: str) -> None:
+        await self.outbox.dead_letter(entry, self.worker_id, error)
+        self.dead += 1
+        logger.error(f"Upload of document {entry['document_id']} failed for good: {error}")
+        self._publish(entry, "failed", error=error)
+
+    def _publish(self, entry: Dict[str, Any], status: str, **extra: Any) -> None:
+        self.events.publish(upload_channel(entry['organization_id']), EVENT_UPLOAD, {
+            'document_id': entry['document_id'],
+            'filename': entry['filename'],
+            'batch_id': entry['batch_id'],
+            'status': status,
+            'attempts': entry['attempts'],
+            **extra
+        })
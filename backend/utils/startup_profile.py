@@ -0,0 +1,86 @@
+"""
+Startup profile: how long each part of starting the API took.
+
+main.py imports its heavy modules one at a time through time_imports() before the
+regular imports, so each module's cumulative import time (including whatever it pulls
+in that wasn't loaded yet) is attributed to it, and times the startup phases with
+phase(). The profile is printed at startup and served under "startup" in /api/metrics.
+
+For a full per-module breakdown (including third-party packages) run
+python -X importtime -c "import backend.main", or benchmarks/bench_startup.py --profile.
+"""
+import importlib
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+class StartupProfile:
+    """Import and phase timings of this process's startup."""
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self.imports: Dict[str, float] = {}
+        self.phases: Dict[str, float] = {}
+        self.ready_seconds: Optional[float] = None
+
+    def time_imports(self, module_names: Iterable[str]) -> None:
+        """
+        Import modules in order and record each one's cumulative import time.
+        Modules that are already imported are recorded with the time they took (~0).
+
+        Args:
+            module_names: Dotted module names
+        """
+        for name in module_names:
+            start = time.perf_counter()
+            importlib.import_module(name)
+            self.imports[name] = time.perf_counter() - start
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a startup phase (e.g. database initialization)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def mark_ready(self) -> None:
+        """Record that the application is ready to serve requests."""
+        self.ready_seconds = time.perf_counter() - self._started
+
+    def slowest_imports(self, count: int = 5) -> List[Dict[str, Any]]:
+        """
+        Get the modules that took longest to import.
+
+        Args:
+            count: Number of modules to return
+
+        Returns:
+            List of {"module", "seconds"}, slowest first
+        """
+        slowest = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)[:count]
+        return [{"module": name, "seconds": round(seconds, 4)} for name, seconds in slowest]
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Get the startup profile.
+
+        Returns:
+            Dict with imports and phases (seconds each), ready_seconds (from the profile's
+            creation until ready) and modules_loaded (size of sys.modules)
+        """
+        return {
+            "imports": {name: round(seconds, 4) for name, seconds in self.imports.items()},
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "ready_seconds": round(self.ready_seconds, 4) if self.ready_seconds is not None else None,
+            "modules_loaded": len(sys.modules)
+        }
+
+    def summary(self) -> str:
+        """One-line summary for the startup banner."""
+        ready = f"{self.ready_seconds:.2f}s" if self.ready_seconds is not None else "not ready"
+        slowest = ", ".join(f"{item['module']} {item['seconds']:.2f}s" for item in self.slowest_imports(3))
+        return f"{ready} (slowest imports: {slowest or 'none'})"
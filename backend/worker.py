@@ -0,0 +1,351 @@
+"""
+Processing worker: claims jobs from the durable queue and runs the document pipeline.
+
+Runs embedded in the API process by default. For more throughput, disable the
+embedded worker (EMBEDDED_WORKER=false) and start standalone workers instead:
+
+    python backend/worker.py --processes 4 --concurrency 5
+
+Every process leases jobs independently; a worker that dies stops heartbeating,
+and its jobs are picked up by another worker at their last checkpoint. Within a
+worker, document jobs flow through the pipeline stages (services/pipeline_stages.py),
+each with its own concurrency limit. Each process also runs an uploader
+(upload_worker.py) that sends approved documents to the connectors.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent))
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+from typing import Any, Dict, Optional
+
+from config import settings
+from database import init_database, close_db_pool, finish_batch
+from job_queue import (
+    get_job_queue, JobQueue, LeaseLostError, PermanentJobError, JOB_TYPE_FINALIZE
+)
+from services.scheduler_service import FairShareScheduler, get_fair_share_scheduler
+from services.pipeline_stages import StagedPipeline
+from services.batch_event_service import get_batch_event_bus, EVENT_STATE
+from services.llm_limiter import get_llm_limiter
+from upload_worker import UploadWorker
+
+logger = logging.getLogger(__name__)
+
+
+def make_worker_id() -> str:
+    """Unique worker identity used as the lease owner."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class JobWorker:
+    """
+    Claims jobs up to its in-flight limit, feeds document jobs to the staged pipeline,
+    runs finalize jobs directly, and keeps every held job's lease alive.
+    Which organizations' jobs to claim is left to the fair-share scheduler.
+    """
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        pipeline=None,
+        scheduler: Optional[FairShareScheduler] = None,
+        worker_id: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None
+    ):
+        self.queue = queue or get_job_queue()
+        self.scheduler = scheduler or (FairShareScheduler(queue) if queue else get_fair_share_scheduler())
+        self._pipeline = pipeline
+        self.worker_id = worker_id or make_worker_id()
+        self.concurrency = concurrency  # Jobs held at once; defaults to the stages' combined concurrency
+        self.poll_interval = poll_interval if poll_interval is not None else settings.job_poll_interval_seconds
+        self._active: Dict[int, Dict[str, Any]] = {}  # Jobs this worker holds a lease on
+        self._finalizers: Dict[int, asyncio.Task] = {}
+        self._stages: Optional[StagedPipeline] = None
+        self._slot_freed = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pipeline(self):
+        # Imported lazily: the pipeline pulls in OCR/AI clients
+        if self._pipeline is None:
+            from services.document_pipeline import get_document_pipeline
+            self._pipeline = get_document_pipeline()
+        return self._pipeline
+
+    # ========================================================================
+    # Lifecycle
+    # ========================================================================
+
+    def start(self) -> None:
+        """Run the worker as a background task on the current event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop claiming, cancel in-flight jobs and hand their leases back."""
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def run(self) -> None:
+        """Claim and run jobs until stop() is called."""
+        # Load the pipeline (OCR/AI clients) off the event loop so an embedded worker
+        # doesn't hold up the API's first requests while it imports them
+        pipeline = await asyncio.to_thread(lambda: self.pipeline)
+        self._stages = StagedPipeline(pipeline, self.worker_id, self._job_done, self._record_failure)
+        if self.concurrency is None:
+            self.concurrency = self._stages.capacity
+        self._stages.start()
+
+        heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        claim_task = asyncio.create_task(self._claim_loop())
+        stop_task = asyncio.create_task(self._stopping.wait())
+        logger.info(f"Worker {self.worker_id} started (up to {self.concurrency} jobs in flight)")
+
+        try:
+            # Claiming may be blocked on a full stage queue; stopping interrupts it
+            await asyncio.wait([claim_task, stop_task], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (claim_task, stop_task, heartbeat_task):
+                task.cancel()
+            await asyncio.gather(claim_task, stop_task, return_exceptions=True)
+            await self._shutdown()
+            logger.info(f"Worker {self.worker_id} stopped")
+
+    async def _claim_loop(self) -> None:
+        while not self._stopping.is_set():
+            self._slot_freed.clear()
+            try:
+                jobs = await self.scheduler.claim(self.worker_id, self.concurrency - len(self._active))
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} failed to claim jobs: {e}")
+                jobs = []
+
+            for job in jobs:
+                self._active[job['id']] = job
+            for job in jobs:
+                await self._dispatch(job)
+
+            if not jobs or len(self._active) >= self.concurrency:
+                await self._wait()
+
+    async def _wait(self) -> None:
+        """Sleep until new jobs may be available, a slot frees up, or stop() is called."""
+        waiters = [
+            asyncio.create_task(self.queue.wait_for_jobs(self.poll_interval)),
+            asyncio.create_task(self._stopping.wait())
+        ]
+        if len(self._active) >= self.concurrency:
+            waiters.append(asyncio.create_task(self._slot_freed.wait()))
+
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _shutdown(self) -> None:
+        job_ids = list(self._active)
+        for task in self._finalizers.values():
+            task.cancel()
+        await asyncio.gather(*self._finalizers.values(), return_exceptions=True)
+        if self._stages is not None:
+            await self._stages.stop()
+
+        try:
+            released = await self.queue.release(self.worker_id, job_ids)
+            if released:
+                logger.info(f"Worker {self.worker_id} released {released} in-flight jobs")
+        except Exception as e:
+            logger.warning(f"Worker {self.worker_id} could not release jobs (leases will expire): {e}")
+
+        try:
+            await get_llm_limiter().withdraw()
+        except Exception as e:
+            logger.warning(f"Worker {self.worker_id} could not withdraw LLM limiter state (it goes stale): {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get this worker's in-flight jobs and per-stage pipeline metrics.
+
+        Returns:
+            Dict with worker_id, in_flight, max_in_flight and stages
+        """
+        return {
+            "worker_id": self.worker_id,
+            "in_flight": len(self._active),
+            "max_in_flight": self.concurrency,
+            "stages": self._stages.stats() if self._stages else {}
+        }
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.job_heartbeat_seconds)
+            try:
+                # LLM calls run here, so admission control reads their headroom from the database
+                await get_llm_limiter().publish()
+            except Exception as e:
+                logger.warning(f"Worker {self.worker_id} could not publish LLM limiter state: {e}")
+
+            job_ids = list(self._active)
+            if not job_ids:
+                continue
+            try:
+                renewed = await self.queue.heartbeat(self.worker_id, job_ids)
+                lost = set(job_ids) - set(renewed)
+                if lost:
+                    # Taken over, or its batch was paused/cancelled: the stages drop it
+                    logger.warning(f"Worker {self.worker_id} lost leases on jobs {sorted(lost)}")
+                    for job_id in lost:
+                        if job_id in self._active:
+                            self._active[job_id]['lease_lost'] = True
+            except Exception as e:
+                logger.warning(f"Worker {self.worker_id} heartbeat failed: {e}")
+
+    # ========================================================================
+    # Job execution
+    # ========================================================================
+
+    async def _dispatch(self, job: Dict[str, Any]) -> None:
+        """Hand a claimed job to the stages (document) or run it directly (finalize)."""
+        if job['attempts'] > job['max_attempts']:
+            # Reclaimed after its workers kept dying mid-job
+            error = PermanentJobError(f"Gave up after {job['max_attempts']} attempts (last: {job.get('last_error') or 'worker lost'})")
+            try:
+                await self._record_failure(job, error)
+            finally:
+                self._job_done(job)
+            return
+
+        if job['job_type'] == JOB_TYPE_FINALIZE:
+            self._finalizers[job['id']] = asyncio.create_task(self._run_finalize(job))
+        else:
+            await self._stages.submit(job)
+
+    async def _run_finalize(self, job: Dict[str, Any]) -> None:
+        try:
+            await self.pipeline.finalize_batch(job, self.worker_id)
+        except Exception as e:
+            await self._record_failure(job, e)
+        self._job_done(job)
+
+    def _job_done(self, job: Dict[str, Any]) -> None:
+        """A job left this worker (finished, failed or retried later): free its slot."""
+        self._active.pop(job['id'], None)
+        self._finalizers.pop(job['id'], None)
+        self._slot_freed.set()
+
+    async def _record_failure(self, job: Dict[str, Any], e: Exception) -> None:
+        """Schedule a retry for a failed job, or record it as failed for good."""
+        if isinstance(e, LeaseLostError):
+            logger.warning(str(e))
+            return
+
+        is_finalize = job['job_type'] == JOB_TYPE_FINALIZE
+        error = str(e) or e.__class__.__name__
+        retryable = not isinstance(e, PermanentJobError) and job['attempts'] < job['max_attempts']
+
+        try:
+            if retryable:
+                logger.warning(f"Job {job['id']} failed after stage {job['stage']} (attempt {job['attempts']}), retrying: {error}")
+                await self.queue.retry(job, self.worker_id, error)
+            elif is_finalize:
+                logger.error(f"Finalize job for batch {job['batch_id']} failed: {error}")
+                if await finish_batch(job['batch_id'], "failed"):
+                    # Ends the batch's event streams
+                    get_batch_event_bus().publish(job['batch_id'], EVENT_STATE, {'status': 'failed', 'error': error})
+                await self.queue.finish(job, self.worker_id, error=error)
+            else:
+                await self.pipeline.fail_document(job, self.worker_id, error)
+        except LeaseLostError as lost:
+            logger.warning(str(lost))
+        except Exception as record_error:
+            # Lease expires and another attempt picks the job up
+            logger.error(f"Could not record failure of job {job['id']}: {record_error}")
+
+
+# ============================================================================
+# Standalone entry point
+# ============================================================================
+
+async def serve(concurrency: Optional[int] = None, worker_id: Optional[str] = None) -> None:
+    """
+    Run one worker and its uploader until SIGINT/SIGTERM.
+
+    Args:
+        concurrency: Jobs held at once (default: the pipeline stages' combined concurrency)
+        worker_id: Lease owner name (default: host:pid:random)
+    """
+    await init_database()
+    worker = JobWorker(worker_id=worker_id, concurrency=concurrency)
+    uploader = UploadWorker()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, lambda: asyncio.ensure_future(worker.stop()))
+        except NotImplementedError:
+            pass  # Windows: KeyboardInterrupt ends the process instead
+
+    uploader.start()
+    try:
+        await worker.run()
+    finally:
+        await uploader.stop()
+        await close_db_pool()
+
+
+def _run_process(concurrency: Optional[int]) -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(process)d - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%H:%M:%S'
+    )
+    try:
+        asyncio.run(serve(concurrency=concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DocuFlow document processing worker")
+    parser.add_argument("--processes", type=int, default=1, help="Number of worker processes to start")
+    parser.add_argument("--concurrency", type=int, default=None, help="Jobs held per process (default: the pipeline stages' combined concurrency)")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _run_process(args.concurrency)
+        return
+
+    import multiprocessing
+    processes = [
+        multiprocessing.Process(target=_run_process, args=(args.concurrency,), name=f"docuflow-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    print(f"Started {len(processes)} worker processes")
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark for approving a review queue one document at a time vs. in bulk.
+
+Seeds N pending documents in a temporary database, then approves them (each with a
+few field corrections) through the API in-process:
+
+  - single: one POST /api/documents/{id}/approve per document
+  - bulk:   POST /api/documents/bulk-approve in requests of --chunk documents
+
+Uploads are only queued in the outbox in both modes (no uploader runs), so the timings
+are the reviewer-facing request cost.
+
+Usage (from the repository root):
+    python benchmarks/bench_bulk_approve.py [--documents 500] [--chunk 250]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+sys.path.insert(0, str(root_dir / "backend"))
+
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+import database as db
+from auth import get_current_user
+from review_repository import get_review_repository
+from routes import document_routes
+
+CORRECTIONS = [
+    {"field_name": "vendor", "corrected_value": "Acme Inc"},
+    {"field_name": "document_number", "corrected_value": "INV-1"},
+    {"field_name": "PO", "corrected_value": "4711"},
+]
+
+
+async def seed(count: int) -> dict:
+    """Create an organization, a reviewer and `count` documents pending review."""
+    org_id = await db.create_organization(name="Bench Org", billing_email="bench@example.com")
+    user_id = await db.create_user("auth0|bench", "bench@example.com", "Bench User")
+    await db.update_user_organization(user_id, org_id, "owner")
+    user = await db.get_user_by_auth0_id("auth0|bench")
+
+    repository = get_review_repository()
+    doc_ids = [
+        await repository.create_document(
+            organization_id=org_id, batch_id="bench-batch", filename=f"doc{i}.pdf",
+            file_path=f"/tmp/doc{i}.pdf", category="invoice",
+            extracted_data={"vendor": "ACME", "other_data": {"PO": "1"}},
+            confidence_score=0.97, connector_type="docuware"
+        )
+        for i in range(count)
+    ]
+    return {"user": user, "doc_ids": doc_ids}
+
+
+async def approve_single(client: AsyncClient, doc_ids: list, chunk: int) -> int:
+    for doc_id in doc_ids:
+        response = await client.post(f"/api/documents/{doc_id}/approve", json={"corrections": CORRECTIONS})
+        response.raise_for_status()
+    return len(doc_ids)
+
+
+async def approve_bulk(client: AsyncClient, doc_ids: list, chunk: int) -> int:
+    requests = 0
+    for start in range(0, len(doc_ids), chunk):
+        response = await client.post("/api/documents/bulk-approve", json={"documents": [
+            {"document_id": doc_id, "corrections": CORRECTIONS} for doc_id in doc_ids[start:start + chunk]
+        ]})
+        response.raise_for_status()
+        requests += 1
+    return requests
+
+
+async def measure(name: str, count: int, chunk: int, approve) -> float:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        await db.close_db_pool()
+        db.DB_PATH = os.path.join(tmp_dir, "bench.db")
+        await db.init_database()
+        seeded = await seed(count)
+
+        app = FastAPI()
+        app.include_router(document_routes.router)
+        app.dependency_overrides[get_current_user] = lambda: seeded["user"]
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            start = time.perf_counter()
+            requests = await approve(client, seeded["doc_ids"], chunk)
+            elapsed = time.perf_counter() - start
+
+        await db.close_db_pool()
+
+    rate = count / elapsed
+    print(f"  {name:<8} {elapsed:>7.2f} s  {rate:>8.0f} docs/s  {requests:>5} requests")
+    return rate
+
+
+async def main(count: int, chunk: int) -> None:
+    print(f"Approving {count} documents with {len(CORRECTIONS)} corrections each")
+    single = await measure("single", count, chunk, approve_single)
+    bulk = await measure("bulk", count, chunk, approve_bulk)
+    print(f"\nSpeedup: {bulk / single:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark single vs bulk document approval")
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--chunk", type=int, default=250, help="Documents per bulk-approve request")
+    args = parser.parse_args()
+    asyncio.run(main(args.documents, args.chunk))
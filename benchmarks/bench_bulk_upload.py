@@ -0,0 +1,195 @@
+"""
+Benchmark for bulk uploads to DocuWare and Google Drive.
+
+Starts the local mock DMS (benchmarks/mock_dms_server.py) with a simulated network
+round trip, then uploads the same set of small PDFs:
+
+  - one at a time through upload_document (how auto-upload and approval worked)
+  - through upload_documents at several concurrency levels
+
+and prints documents per second plus how many TCP connections each run opened.
+
+Usage (from the repository root):
+    python benchmarks/bench_bulk_upload.py [--documents 40] [--latency-ms 20] [--concurrency 1 2 4 8 16]
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+sys.path.insert(0, str(root_dir / "backend"))
+sys.path.insert(0, str(root_dir / "benchmarks"))
+
+import json
+
+import httpx
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+from connectors.docuware_connector import DocuWareConnector
+from connectors.docuware_schema_cache import DocuWareSchemaCache
+from connectors.docuware_session_pool import DocuWareSessionPool
+from connectors.google_drive_connector import GoogleDriveConnector
+from mock_dms_server import MockDMSServer
+from models import DocumentCategory, ExtractedData, IndexField
+
+CABINET_ID = "bench-cabinet"
+DIALOG_ID = "bench-dialog"
+
+
+def make_pdfs(directory: Path, count: int, size_kb: int) -> list:
+    body = b"%PDF-1.4\n" + b"0" * (size_kb * 1024) + b"\n%%EOF\n"
+    paths = []
+    for i in range(count):
+        path = directory / f"bench-{i}.pdf"
+        path.write_bytes(body)
+        paths.append(path)
+    return paths
+
+
+# ==================== DocuWare ====================
+
+def docuware_connector(server: MockDMSServer) -> tuple:
+    """Connector whose login returns a client pointed at the mock server."""
+    documents_url = f"/DocuWare/Platform/FileCabinets/{CABINET_ID}/Documents"
+
+    def login(server_url, username, password):
+        cabinet = SimpleNamespace(id=CABINET_ID, name="Bench", endpoints={"documents": documents_url})
+        return SimpleNamespace(
+            conn=SimpleNamespace(session=httpx.Client(), base_url=server.url),
+            organizations=[SimpleNamespace(file_cabinets=[cabinet])]
+        )
+
+    connector = DocuWareConnector(session_pool=DocuWareSessionPool(login_func=login), schema_cache=DocuWareSchemaCache())
+    credentials = {"server_url": server.url, "username": "bench", "password": "bench"}
+
+    # Field definitions are already known, as they are after the first upload
+    key = (connector._normalize_server_url(server.url), CABINET_ID, DIALOG_ID)
+    connector.schema_cache._memory[key] = {
+        "fields": [IndexField(name="VENDOR", type="String", required=False)],
+        "discovered_at": datetime.utcnow()
+    }
+    return connector, credentials
+
+
+async def bench_docuware(server: MockDMSServer, pdfs: list, levels: list) -> None:
+    storage_config = {"cabinet_id": CABINET_ID, "dialog_id": DIALOG_ID, "selected_fields": ["VENDOR"]}
+    documents = [{"file_path": str(path), "metadata": {"VENDOR": f"Vendor {i}"}} for i, path in enumerate(pdfs)]
+
+    print("\nDocuWare")
+
+    connector, credentials = docuware_connector(server)
+    await measure(server, "upload_document loop", len(documents), lambda: sequential_docuware(
+        connector, documents, credentials, storage_config
+    ))
+
+    for level in levels:
+        connector, credentials = docuware_connector(server)
+        await measure(server, f"upload_documents x{level}", len(documents), lambda: connector.upload_documents(
+            documents, credentials, storage_config, concurrency=level
+        ))
+
+
+async def sequential_docuware(connector, documents, credentials, storage_config) -> list:
+    return [
+        await connector.upload_document(document["file_path"], document["metadata"], credentials, storage_config)
+        for document in documents
+    ]
+
+
+# ==================== Google Drive ====================
+
+def drive_connector(server: MockDMSServer) -> GoogleDriveConnector:
+    """Connector with a Drive service whose API and upload URLs point at the mock server."""
+    discovery = json.loads(get_static_doc("drive", "v3"))
+    discovery["rootUrl"] = f"{server.url}/"  # Media uploads are built from rootUrl, not api_endpoint
+
+    connector = GoogleDriveConnector()
+    connector.credentials = AnonymousCredentials()
+    connector.service = build_from_document(discovery, credentials=connector.credentials)
+    return connector
+
+
+def drive_storage_config(run: str) -> dict:
+    # A root folder per run, so earlier runs' files don't turn into duplicate-name lookups
+    return {"root_folder_name": f"DocuFlow {run}", "primary_level": "category"}
+
+
+async def bench_drive(server: MockDMSServer, pdfs: list, levels: list) -> None:
+    documents = [
+        {
+            "pdf_path": path,
+            "extracted_data": ExtractedData(vendor="Acme", document_number=f"INV-{i}", date="2025-01-31"),
+            "category": DocumentCategory.INVOICE
+        }
+        for i, path in enumerate(pdfs)
+    ]
+
+    print("\nGoogle Drive")
+
+    connector = drive_connector(server)
+    await measure(server, "upload_document loop", len(documents), lambda: sequential_drive(
+        connector, documents, drive_storage_config("loop")
+    ))
+
+    for level in levels:
+        connector = drive_connector(server)
+        await measure(server, f"upload_documents x{level}", len(documents), lambda: connector.upload_documents(
+            documents, drive_storage_config(f"x{level}"), concurrency=level
+        ))
+
+
+async def sequential_drive(connector, documents, storage_config) -> list:
+    results = []
+    for document in documents:
+        result = await connector.upload_document(
+            document["pdf_path"], document["extracted_data"], document["category"], storage_config
+        )
+        results.append({"success": result is not None})
+    return results
+
+
+# ==================== Runner ====================
+
+async def measure(server: MockDMSServer, name: str, count: int, run) -> float:
+    before = server.state.stats()
+    start = time.perf_counter()
+    results = await run()
+    elapsed = time.perf_counter() - start
+    after = server.state.stats()
+
+    failed = sum(1 for result in results if not result.get("success"))
+    rate = count / elapsed
+    print(
+        f"  {name:<26} {rate:>8.1f} docs/s"
+        f"  {after['requests'] - before['requests']:>5} requests"
+        f"  {after['connections'] - before['connections']:>4} connections"
+        + (f"  {failed} FAILED" if failed else "")
+    )
+    return rate
+
+
+async def main(documents: int, latency_ms: float, size_kb: int, levels: list) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir, MockDMSServer(latency=latency_ms / 1000) as server:
+        pdfs = make_pdfs(Path(tmp_dir), documents, size_kb)
+        print(f"{documents} documents of {size_kb} KB, {latency_ms:.0f} ms per request ({server.url})")
+
+        await bench_docuware(server, pdfs, levels)
+        await bench_drive(server, pdfs, levels)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bulk uploads against a local mock DMS")
+    parser.add_argument("--documents", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--size-kb", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+    asyncio.run(main(args.documents, args.latency_ms, args.size_kb, args.concurrency))
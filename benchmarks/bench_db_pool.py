@@ -0,0 +1,97 @@
+"""
+Micro-benchmark for the SQLite connection pool.
+
+Measures queries per second for the hot lookups (user by Auth0 id, user by id,
+batch status, sync document lookup) with pooling disabled (max_idle=0, a new
+connection per call as before) and enabled.
+
+Usage (from the repository root):
+    python benchmarks/bench_db_pool.py [--iterations 2000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+sys.path.insert(0, str(root_dir / "backend"))
+
+import backend.database as db
+
+
+async def seed() -> dict:
+    """Create one organization, user and batch to look up."""
+    org_id = await db.create_organization(name="Bench Org", billing_email="bench@example.com")
+    user_id = await db.create_user("auth0|bench", "bench@example.com", "Bench User")
+    await db.update_user_organization(user_id, org_id, "owner")
+    await db.create_batch("bench-batch", user_id, 10)
+    return {"org_id": org_id, "user_id": user_id}
+
+
+def sync_lookup(user_id: int) -> None:
+    conn = db.get_db_connection()
+    try:
+        conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+    finally:
+        conn.close()
+
+
+async def measure(name: str, iterations: int, call) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = call()
+        if asyncio.iscoroutine(result):
+            await result
+    elapsed = time.perf_counter() - start
+    qps = iterations / elapsed
+    print(f"  {name:<28} {qps:>10.0f} q/s")
+    return qps
+
+
+async def run_mode(label: str, max_idle: int, iterations: int, ids: dict) -> dict:
+    await db.close_db_pool()
+    db.db_pool = db.ConnectionPool(max_idle=max_idle)
+    print(f"\n{label} (max_idle={max_idle})")
+
+    results = {
+        "get_user_by_auth0_id": await measure(
+            "get_user_by_auth0_id", iterations, lambda: db.get_user_by_auth0_id("auth0|bench")
+        ),
+        "get_user_by_id": await measure(
+            "get_user_by_id", iterations, lambda: db.get_user_by_id(ids["user_id"])
+        ),
+        "get_batch": await measure(
+            "get_batch", iterations, lambda: db.get_batch("bench-batch", ids["user_id"])
+        ),
+        "sync users lookup": await measure(
+            "sync users lookup", iterations, lambda: sync_lookup(ids["user_id"])
+        ),
+    }
+    print(f"  pool stats: {db.get_db_pool_stats()}")
+    return results
+
+
+async def main(iterations: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db.DB_PATH = os.path.join(tmp_dir, "bench.db")
+        await db.init_database()
+        ids = await seed()
+
+        before = await run_mode("Unpooled", 0, iterations, ids)
+        after = await run_mode("Pooled", db.DB_POOL_MAX_IDLE, iterations, ids)
+        await db.close_db_pool()
+
+    print("\nSpeedup")
+    for name in before:
+        print(f"  {name:<28} {after[name] / before[name]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs unpooled SQLite lookups")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -0,0 +1,101 @@
+"""
+Benchmark for resumable chunked uploads to Google Drive.
+
+Starts the local mock DMS (benchmarks/mock_dms_server.py) with a simulated round trip
+and upload bandwidth, then uploads one large PDF through GoogleDriveConnector at several
+chunk sizes ("whole" = one request, how uploads worked before chunking):
+
+  - clean: no failures
+  - blip:  the request carrying the last chunk fails once with a 503
+
+and prints throughput, requests, and how many bytes went over the wire (a failed
+single-request upload sends the whole file again; a chunked one only resends a chunk).
+
+Usage (from the repository root):
+    python benchmarks/bench_resumable_upload.py [--size-mb 40] [--bandwidth-mbps 400] [--latency-ms 20]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+sys.path.insert(0, str(root_dir / "backend"))
+sys.path.insert(0, str(root_dir / "benchmarks"))
+
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+from config import settings
+from connectors.google_drive_connector import GoogleDriveConnector, upload_chunk_size
+from mock_dms_server import FOLDER_MIME, MockDMSServer
+
+FOLDER = "bench-folder"
+MB = 1024 * 1024
+
+
+def drive_connector(server: MockDMSServer) -> GoogleDriveConnector:
+    """Connector with a Drive service whose API and upload URLs point at the mock server."""
+    discovery = json.loads(get_static_doc("drive", "v3"))
+    discovery["rootUrl"] = f"{server.url}/"  # Media uploads are built from rootUrl, not api_endpoint
+
+    connector = GoogleDriveConnector()
+    connector.credentials = AnonymousCredentials()
+    connector.service = build_from_document(discovery, credentials=connector.credentials)
+    return connector
+
+
+async def measure(server: MockDMSServer, pdf: Path, size: int, name: str, chunk_size: int, fail_last: bool) -> None:
+    settings.google_drive_upload_chunk_size = chunk_size
+    chunks = -(-size // upload_chunk_size())
+    server.state.fail_chunks = [0] * (chunks - 1) + [503] if fail_last else []
+
+    before = server.state.stats()
+    start = time.perf_counter()
+    await drive_connector(server)._create_file(pdf, {
+        "name": pdf.name, "parents": [FOLDER], "appProperties": {"category": "Other"}
+    })
+    elapsed = time.perf_counter() - start
+    after = server.state.stats()
+
+    wire = (after["upload_bytes"] - before["upload_bytes"]) + (
+        after["rejected_upload_bytes"] - before["rejected_upload_bytes"]
+    )
+    print(
+        f"  {name:<8} {'blip' if fail_last else 'clean':<6} {size / MB / elapsed:>8.1f} MB/s"
+        f"  {after['requests'] - before['requests']:>4} requests"
+        f"  {wire / MB:>7.1f} MB sent"
+    )
+
+
+async def main(size_mb: int, bandwidth_mbps: float, latency_ms: float, chunk_sizes_mb: list) -> None:
+    size = size_mb * MB
+    settings.google_drive_upload_retry_base_seconds = 0.1  # Keep backoff from dominating the timings
+
+    with tempfile.TemporaryDirectory() as tmp_dir, MockDMSServer(
+        latency=latency_ms / 1000, bandwidth=bandwidth_mbps * 125000
+    ) as server:
+        pdf = Path(tmp_dir) / "scan.pdf"
+        pdf.write_bytes(b"%PDF-1.4\n" + b"0" * (size - 9))
+        server.state.files[FOLDER] = {"name": "Bench", "parent": None, "mimeType": FOLDER_MIME}
+
+        print(f"{size_mb} MB file, {bandwidth_mbps:.0f} Mbit/s, {latency_ms:.0f} ms per request ({server.url})")
+        sizes = [(f"{mb} MB", mb * MB) for mb in chunk_sizes_mb] + [("whole", size + MB)]
+        for name, chunk_size in sizes:
+            for fail_last in (False, True):
+                await measure(server, pdf, size, name, chunk_size, fail_last)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark resumable chunked uploads against a local mock Drive")
+    parser.add_argument("--size-mb", type=int, default=40)
+    parser.add_argument("--bandwidth-mbps", type=float, default=400.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--chunk-mb", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+    asyncio.run(main(args.size_mb, args.bandwidth_mbps, args.latency_ms, args.chunk_mb))
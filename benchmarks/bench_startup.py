@@ -0,0 +1,126 @@
+"""
+Benchmark for API cold start: process launch to the first served request.
+
+Starts the API (uvicorn backend.main:app) in a fresh Python process, polls
+GET /api/ready until it answers (200, or 503 when the instance would shed uploads)
+and stops the server, --runs times per mode:
+
+  - lazy:  the API as shipped; connector plugins load on first use
+  - eager: the connector plugins (DocuWare and Google Drive clients, Google OAuth
+           flow) and the processing pipeline (OCR/AI clients) are imported before the
+           app starts serving, as it used to
+
+Each server uses its own temporary database. --profile also prints the slowest
+modules of `python -X importtime -c "import backend.main"` (cumulative time).
+
+Usage (from the repository root):
+    python benchmarks/bench_startup.py [--runs 5] [--profile]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+
+EAGER_IMPORTS = [
+    "connectors.docuware_connector",
+    "connectors.google_drive_client_pool",
+    "google_auth_oauthlib.flow",
+    "services.document_pipeline",
+]
+
+SERVER = """
+import sys
+sys.path[:0] = [{root!r}, {backend!r}]
+for name in {eager!r}:
+    __import__(name)
+import database, backend.database
+database.DB_PATH = backend.database.DB_PATH = {db_path!r}
+import uvicorn
+uvicorn.run("backend.main:app", host="127.0.0.1", port={port}, log_level="warning")
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def cold_start(eager: bool, timeout: float = 60.0) -> float:
+    """Seconds from launching the server process until it answers GET /api/ready."""
+    port = free_port()
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        code = SERVER.format(
+            root=str(root_dir), backend=str(root_dir / "backend"), eager=EAGER_IMPORTS if eager else [],
+            db_path=os.path.join(tmp_dir, "bench.db"), port=port
+        )
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-c", code], cwd=tmp_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            while time.perf_counter() - start < timeout:
+                if server.poll() is not None:
+                    raise RuntimeError(f"Server exited with code {server.returncode}")
+                try:
+                    with opener.open(f"http://127.0.0.1:{port}/api/ready", timeout=1):
+                        return time.perf_counter() - start
+                except urllib.error.HTTPError:
+                    # 503 (not ready to take uploads) is still a served request
+                    return time.perf_counter() - start
+                except OSError:
+                    time.sleep(0.01)
+            raise RuntimeError(f"Server did not answer within {timeout} s")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def import_profile(count: int) -> None:
+    """Print the slowest modules imported by backend.main (cumulative microseconds)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         f"import sys; sys.path[:0] = [{str(root_dir)!r}, {str(root_dir / 'backend')!r}]; import backend.main"],
+        cwd=root_dir, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), module.strip()))
+    print(f"\nSlowest imports of backend.main ({len(rows)} modules):")
+    for cumulative_us, self_us, module in sorted(rows, reverse=True)[:count]:
+        print(f"  {cumulative_us / 1000:>8.1f} ms  (self {self_us / 1000:>6.1f} ms)  {module}")
+
+
+def main(runs: int, profile: bool) -> None:
+    print(f"Cold start to first GET /api/ready, {runs} runs per mode")
+    medians = {}
+    for mode in ("eager", "lazy"):
+        timings = [cold_start(eager=mode == "eager") for _ in range(runs)]
+        medians[mode] = statistics.median(timings)
+        print(f"  {mode:<6} median {medians[mode]:>6.2f} s  (min {min(timings):.2f} s, max {max(timings):.2f} s)")
+    print(f"\nSaved: {medians['eager'] - medians['lazy']:.2f} s ({medians['eager'] / medians['lazy']:.2f}x faster)")
+
+    if profile:
+        import_profile(15)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark API cold start time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--profile", action="store_true", help="Also print the slowest imports")
+    args = parser.parse_args()
+    main(args.runs, args.profile)
@@ -0,0 +1,354 @@
+"""
+Local mock of the DocuWare and Google Drive endpoints used for document uploads.
+
+Only the calls DocuFlow makes on the upload path are implemented:
+
+DocuWare (under /DocuWare/Platform):
+    POST FileCabinets/{cabinet}/Documents               upload a file, returns <Document Id="..."/>
+    PUT  FileCabinets/{cabinet}/Documents/{id}/Fields   update index fields
+
+Google Drive (v3):
+    GET  /drive/v3/files?q=...                          list folders/files by name (or name prefix), parent
+                                                        or app property
+    GET  /drive/v3/files/{id}                           check a folder exists
+    POST /drive/v3/files                                create a folder
+    DELETE /drive/v3/files/{id}                         delete a file or folder
+    POST /upload/drive/v3/files?uploadType=resumable    start an upload session
+    PUT  /upload/drive/v3/files?...&upload_id={id}      send the file body, whole or in Content-Range
+                                                        chunks (308 + Range until the last one);
+                                                        "bytes */size" asks how much has arrived
+
+Creating a file or folder under a parent that doesn't exist fails with 404, as
+Drive does; `state.delete_file` removes a folder as if a user deleted it in Drive.
+`state.fail_chunks` holds HTTP statuses returned (in order) instead of accepting the
+next upload chunks, to exercise retries; 0 accepts that chunk.
+
+Every request waits `latency` seconds to stand in for the network round trip, plus
+body size / `bandwidth` (bytes per second) when a bandwidth is set. The server speaks HTTP/1.1, so clients can keep connections alive; `stats` counts
+requests and TCP connections to show whether they do.
+
+Run standalone (from the repository root):
+    python benchmarks/mock_dms_server.py [--port 8765] [--latency-ms 20] [--bandwidth-mbps 0]
+"""
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FOLDER_MIME = "application/vnd.google-apps.folder"
+
+
+class MockDMSState:
+    """Documents, folders and counters shared by all request handlers."""
+
+    def __init__(self, latency: float = 0.0, bandwidth: float = 0.0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.documents = {}  # DocuWare document id -> {"cabinet", "size", "fields"}
+        self.files = {}  # Drive file id -> {"name", "parent", "mimeType", "appProperties"}
+        self.upload_sessions = {}  # Drive upload id -> {"metadata", "received"}
+        self.fail_chunks = []  # Statuses to answer the next upload chunks with (e.g. [0, 503]; 0 accepts)
+        self.upload_bytes = 0  # File bytes accepted by upload PUTs, including resent ones
+        self.rejected_upload_bytes = 0  # File bytes sent in chunks answered with fail_chunks
+        self.requests = 0
+        self.connections = 0
+        self.folder_calls = 0  # Folder lookups, existence checks and creations
+        self.list_calls = 0  # files().list requests of any kind
+
+    def next_id(self) -> str:
+        with self.lock:
+            return str(next(self.ids))
+
+    def delete_file(self, file_id: str) -> None:
+        """Delete a file or folder and everything below it."""
+        with self.lock:
+            doomed = {file_id}
+            while True:
+                children = {fid for fid, f in self.files.items() if f["parent"] in doomed} - doomed
+                if not children:
+                    break
+                doomed |= children
+            for fid in doomed:
+                self.files.pop(fid, None)
+
+    def count_folder_call(self) -> None:
+        with self.lock:
+            self.folder_calls += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "folder_calls": self.folder_calls,
+                "list_calls": self.list_calls,
+                "upload_bytes": self.upload_bytes,
+                "rejected_upload_bytes": self.rejected_upload_bytes,
+                "docuware_documents": len(self.documents),
+                "drive_files": sum(1 for f in self.files.values() if f["mimeType"] != FOLDER_MIME)
+            }
+
+
+class MockDMSHandler(BaseHTTPRequestHandler):
+    """Request handler; one instance per client connection."""
+
+    protocol_version = "HTTP/1.1"
+    state: MockDMSState = None
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output readable
+
+    # ==================== Plumbing ====================
+
+    def _begin(self) -> bytes:
+        with self.state.lock:
+            self.state.requests += 1
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        delay = self.state.latency + (len(body) / self.state.bandwidth if self.state.bandwidth else 0)
+        if delay:
+            time.sleep(delay)
+        return body
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "application/json", headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, payload: dict, headers: dict = None):
+        self._send(status, json.dumps(payload).encode(), headers=headers)
+
+    # ==================== Routing ====================
+
+    def do_GET(self):
+        self._begin()
+        url = urlparse(self.path)
+
+        if url.path == "/drive/v3/files":
+            with self.state.lock:
+                self.state.list_calls += 1
+            return self._json(200, {"files": self._drive_list(parse_qs(url.query).get("q", [""])[0])})
+
+        match = re.fullmatch(r"/drive/v3/files/([^/]+)", url.path)
+        if match:
+            self.state.count_folder_call()
+            file = self.state.files.get(match.group(1))
+            if file is None:
+                return self._json(404, {"error": {"code": 404, "message": "File not found"}})
+            return self._json(200, {"id": match.group(1), **file})
+
+        if url.path == "/drive/v3/about":
+            return self._json(200, {"user": {"emailAddress": "bench@example.com"}})
+
+        self._json(404, {"error": "not found"})
+
+    def do_POST(self):
+        body = self._begin()
+        url = urlparse(self.path)
+
+        match = re.fullmatch(r"/DocuWare/Platform/FileCabinets/([^/]+)/Documents", url.path)
+        if match:
+            doc_id = self.state.next_id()
+            self.state.documents[doc_id] = {"cabinet": match.group(1), "size": len(body), "fields": None}
+            return self._send(200, f'<Document Id="{doc_id}" />'.encode(), content_type="application/xml")
+
+        if url.path == "/drive/v3/files":
+            metadata = json.loads(body or b"{}")
+            if metadata.get("mimeType") == FOLDER_MIME:
+                self.state.count_folder_call()
+            if not self._parent_exists(metadata):
+                return self._parent_not_found(metadata)
+            file_id = self.state.next_id()
+            self.state.files[file_id] = {
+                "name": metadata.get("name"),
+                "parent": (metadata.get("parents") or [None])[0],
+                "mimeType": metadata.get("mimeType", "application/octet-stream")
+            }
+            return self._json(200, {"id": file_id, "name": metadata.get("name")})
+
+        if url.path == "/upload/drive/v3/files":
+            metadata = json.loads(body or b"{}")
+            if not self._parent_exists(metadata):
+                return self._parent_not_found(metadata)
+            upload_id = self.state.next_id()
+            self.state.upload_sessions[upload_id] = {"metadata": metadata, "received": bytearray()}
+            location = f"http://{self.headers['Host']}/upload/drive/v3/files?uploadType=resumable&upload_id={upload_id}"
+            return self._send(200, headers={"Location": location})
+
+        self._json(404, {"error": "not found"})
+
+    def do_PUT(self):
+        body = self._begin()
+        url = urlparse(self.path)
+
+        match = re.fullmatch(r"/DocuWare/Platform/FileCabinets/([^/]+)/Documents/([^/]+)/Fields", url.path)
+        if match:
+            document = self.state.documents.get(match.group(2))
+            if document is None:
+                return self._json(404, {"Message": "Document not found"})
+            document["fields"] = json.loads(body or b"{}")
+            return self._json(200, document["fields"])
+
+        if url.path == "/upload/drive/v3/files":
+            return self._upload_chunk(parse_qs(url.query).get("upload_id", [""])[0], body)
+
+        self._json(404, {"error": "not found"})
+
+    def do_DELETE(self):
+        self._begin()
+        url = urlparse(self.path)
+
+        match = re.fullmatch(r"/drive/v3/files/([^/]+)", url.path)
+        if match:
+            if match.group(1) not in self.state.files:
+                return self._json(404, {"error": {"code": 404, "message": "File not found"}})
+            self.state.delete_file(match.group(1))
+            return self._send(204)
+
+        self._json(404, {"error": "not found"})
+
+    def _upload_chunk(self, upload_id: str, body: bytes):
+        """Accept a resumable upload chunk or status query (Content-Range: bytes start-end/total or */total)."""
+        session = self.state.upload_sessions.get(upload_id)
+        if session is None:
+            return self._json(404, {"error": {"code": 404, "message": "Upload session not found"}})
+
+        received = session["received"]
+        match = re.fullmatch(r"bytes (\d+)-(\d+)/(\d+|\*)|bytes \*/(\d+)", self.headers.get("Content-Range", ""))
+        if match and match.group(4) is not None:
+            total = int(match.group(4))  # Status query: how much has arrived?
+        else:
+            with self.state.lock:
+                failure = self.state.fail_chunks.pop(0) if self.state.fail_chunks else None
+            if failure:
+                with self.state.lock:
+                    self.state.rejected_upload_bytes += len(body)
+                return self._json(failure, {"error": {"code": failure, "message": "Injected failure"}},
+                                  headers={"Retry-After": "0"} if failure == 429 else None)
+            start = int(match.group(1)) if match else 0
+            total = int(match.group(3)) if match and match.group(3) != "*" else None
+            if start > len(received):
+                return self._json(400, {"error": {"code": 400, "message": "Chunk starts past received bytes"}})
+            del received[start:]
+            received.extend(body)
+            with self.state.lock:
+                self.state.upload_bytes += len(body)
+            if total is None:
+                total = len(received)
+
+        if len(received) < total:
+            headers = {"Range": f"bytes=0-{len(received) - 1}"} if received else None
+            return self._send(308, headers=headers)
+
+        del self.state.upload_sessions[upload_id]
+        metadata = session["metadata"]
+        file_id = self.state.next_id()
+        self.state.files[file_id] = {
+            "name": metadata.get("name"),
+            "parent": (metadata.get("parents") or [None])[0],
+            "mimeType": "application/pdf",
+            "appProperties": metadata.get("appProperties") or {},
+            "size": len(received)
+        }
+        return self._json(200, {
+            "id": file_id,
+            "name": metadata.get("name"),
+            "webViewLink": f"http://{self.headers['Host']}/file/d/{file_id}/view"
+        })
+
+    def _parent_exists(self, metadata: dict) -> bool:
+        parents = metadata.get("parents") or []
+        return all(parent in self.state.files for parent in parents)
+
+    def _parent_not_found(self, metadata: dict):
+        return self._json(404, {"error": {"code": 404, "message": f"File not found: {metadata['parents'][0]}"}})
+
+    def _drive_list(self, query: str) -> list:
+        """Answer the name/parent/app property queries the connector sends."""
+        name = re.search(r"name='((?:[^'\\]|\\.)*)'", query)
+        app_property = re.search(r"appProperties has \{ key='([^']+)' and value='((?:[^'\\]|\\.)*)' \}", query)
+        prefix = re.search(r"name contains '((?:[^'\\]|\\.)*)'", query)
+        parent = re.search(r"'([^']+)' in parents", query)
+        folders_only = FOLDER_MIME in query
+        if folders_only:
+            self.state.count_folder_call()
+        matches = []
+        for file_id, file in list(self.state.files.items()):
+            if name and file["name"] != name.group(1).replace("\\'", "'"):
+                continue
+            if prefix and not file["name"].startswith(prefix.group(1).replace("\\'", "'")):
+                continue
+            if parent and file["parent"] != parent.group(1):
+                continue
+            if folders_only and file["mimeType"] != FOLDER_MIME:
+                continue
+            if app_property and file.get("appProperties", {}).get(app_property.group(1)) != app_property.group(2).replace("\\'", "'"):
+                continue
+            matches.append({"id": file_id, "name": file["name"], "appProperties": file.get("appProperties", {})})
+        return matches
+
+
+class MockDMSServer:
+    """
+    Mock DocuWare/Drive server running in a background thread.
+
+    Usage:
+        with MockDMSServer(latency=0.02) as server:
+            ...  # point clients at server.url
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, bandwidth: float = 0.0):
+        self.state = MockDMSState(latency, bandwidth)
+        handler = type("BoundMockDMSHandler", (MockDMSHandler,), {"state": self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockDMSServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockDMSServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the mock DocuWare/Google Drive server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--bandwidth-mbps", type=float, default=0.0, help="Simulated upload bandwidth (0 = unlimited)")
+    args = parser.parse_args()
+
+    server = MockDMSServer(port=args.port, latency=args.latency_ms / 1000, bandwidth=args.bandwidth_mbps * 125000)
+    print(f"Mock DMS listening on {server.url} (latency {args.latency_ms:.0f} ms)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
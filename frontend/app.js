@@ -16,7 +16,7 @@ let usageStats = null;
 let uploadSection, uploadBox, fileInput, browseBtn, fileList, uploadControls;
 let uploadBtn, clearBtn, processingSection, progressFill, processingStatus;
 let processingDetails, resultsSection, resultsSummary, resultsDetails;
-let downloadBtn, newBatchBtn;
+let downloadBtn, newBatchBtn, retryFailedBtn, pauseBatchBtn, cancelBatchBtn;
 
 // ============================================================================
 // Initialization
@@ -45,6 +45,9 @@ function initializeApp() {
     resultsDetails = document.getElementById('resultsDetails');
     downloadBtn = document.getElementById('downloadBtn');
     newBatchBtn = document.getElementById('newBatchBtn');
+    retryFailedBtn = document.getElementById('retryFailedBtn');
+    pauseBatchBtn = document.getElementById('pauseBatchBtn');
+    cancelBatchBtn = document.getElementById('cancelBatchBtn');
 
     // Attach event listeners only if elements exist
     if (browseBtn) browseBtn.addEventListener('click', () => fileInput.click());
@@ -64,6 +67,9 @@ function initializeApp() {
     if (clearBtn) clearBtn.addEventListener('click', clearFiles);
     if (downloadBtn) downloadBtn.addEventListener('click', downloadResults);
     if (newBatchBtn) newBatchBtn.addEventListener('click', resetApp);
+    if (retryFailedBtn) retryFailedBtn.addEventListener('click', retryFailedDocuments);
+    if (pauseBatchBtn) pauseBatchBtn.addEventListener('click', togglePauseBatch);
+    if (cancelBatchBtn) cancelBatchBtn.addEventListener('click', cancelBatch);
 
     console.log('[App] Initialized with upload button:', uploadBtn ? 'Found' : 'Not found');
 }
@@ -163,6 +169,12 @@ function clearFiles() {
     renderFileList();
 }
 
+function formatEta(seconds) {
+    if (seconds == null) return '';
+    if (seconds < 60) return ` (about ${Math.max(1, Math.round(seconds))}s left)`;
+    return ` (about ${Math.round(seconds / 60)} min left)`;
+}
+
 function formatFileSize(bytes) {
     if (bytes < 1024) return bytes + ' B';
     if (bytes < 1024 * 1024) return (bytes / 1024).toFixed(1) + ' KB';
@@ -206,40 +218,45 @@ async function uploadDocuments() {
     }
 
     try {
-        // Create FormData with files
-        const formData = new FormData();
-        selectedFiles.forEach(file => {
-            formData.append('files', file);
-            console.log('[Upload] Added file:', file.name, file.size);
-        });
-
-        // Upload files
-        console.log('[Upload] Starting upload...');
+        // Open the batch, then send files one by one: the server processes each file
+        // as soon as it lands, while the rest are still uploading
+        console.log('[Upload] Opening batch...');
         if (processingStatus) processingStatus.textContent = 'Uploading files...';
-        if (progressFill) progressFill.style.width = '10%';
+        if (progressFill) progressFill.style.width = '5%';
 
-        const response = await authenticatedFetch(`${API_BASE}/upload`, {
+        const openResponse = await authenticatedFetch(`${API_BASE}/batches`, {
             method: 'POST',
-            body: formData
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ total_files: selectedFiles.length })
         });
 
-        console.log('[Upload] Response status:', response.status);
-
-        if (!response.ok) {
-            const error = await response.json();
+        if (!openResponse.ok) {
+            const error = await openResponse.json();
             console.error('[Upload] Server error:', error);
             throw new Error(error.detail || 'Upload failed');
         }
 
-        const data = await response.json();
-        currentBatchId = data.batch_id;
-        console.log('[Upload] Batch created:', currentBatchId);
+        currentBatchId = (await openResponse.json()).batch_id;
+        console.log('[Upload] Batch opened:', currentBatchId);
+
+        // Stream progress while uploading (falls back to polling)
+        const progress = watchBatchProgress();
+
+        await uploadBatchFiles(selectedFiles);
+
+        const completeResponse = await authenticatedFetch(`${API_BASE}/batches/${currentBatchId}/complete`, {
+            method: 'POST'
+        });
+        if (!completeResponse.ok) {
+            const error = await completeResponse.json();
+            throw new Error(error.detail || 'Upload failed');
+        }
 
-        if (processingStatus) processingStatus.textContent = 'Upload complete! Processing documents...';
-        if (progressFill) progressFill.style.width = '20%';
+        const data = await completeResponse.json();
+        console.log('[Upload] Upload complete:', data);
+        if (processingStatus) processingStatus.textContent = 'Upload complete! Processing documents...' + formatEta(data.eta_seconds);
 
-        // Poll for results
-        await pollBatchStatus();
+        await progress;
 
     } catch (error) {
         console.error('[Upload] Upload error:', error);
@@ -248,9 +265,183 @@ async function uploadDocuments() {
     }
 }
 
-async function pollBatchStatus() {
+/**
+ * Upload the files of the current batch, a few at a time.
+ * A file the server rejects is logged and skipped; the rest of the batch continues.
+ */
+async function uploadBatchFiles(files) {
+    const parallelUploads = 3;
+    let next = 0;
+    let uploaded = 0;
+
+    const uploadNext = async () => {
+        while (next < files.length) {
+            const file = files[next++];
+            const formData = new FormData();
+            formData.append('file', file);
+
+            try {
+                let response;
+                for (let attempt = 1; ; attempt++) {
+                    response = await authenticatedFetch(`${API_BASE}/batches/${currentBatchId}/files`, {
+                        method: 'POST',
+                        body: formData
+                    });
+                    // Server overloaded: wait as told, then try again
+                    if ((response.status === 503 || response.status === 429) && attempt < 4) {
+                        const retryAfter = parseInt(response.headers.get('Retry-After') || '10', 10);
+                        addProcessingLog(`⏳ Server busy, retrying ${file.name} in ${retryAfter}s`, 'info');
+                        await new Promise(resolve => setTimeout(resolve, Math.min(retryAfter, 120) * 1000));
+                        continue;
+                    }
+                    break;
+                }
+                if (!response.ok) {
+                    const error = await response.json();
+                    throw new Error(error.detail || response.status);
+                }
+            } catch (error) {
+                console.error('[Upload] File rejected:', file.name, error);
+                addProcessingLog(`❌ ${file.name} - Upload failed: ${error.message}`, 'error');
+            }
+
+            uploaded++;
+            if (processingStatus && uploaded < files.length) {
+                processingStatus.textContent = `Uploading: ${uploaded} of ${files.length} files (processing has started)...`;
+            }
+        }
+    };
+
+    await Promise.all(Array.from({ length: Math.min(parallelUploads, files.length) }, uploadNext));
+}
+
+/**
+ * Follow batch progress over Server-Sent Events.
+ * Falls back to polling /status if the stream is unavailable or asks for a resync.
+ */
+async function watchBatchProgress() {
+    const maxReconnects = 3;
+    let lastEventId = null;
+    let reconnects = 0;
+    let processed = 0;
+
+    addProcessingLog(`🚀 Starting batch processing: ${selectedFiles.length} files`, 'info');
+
+    const handleEvent = async (event, data) => {
+        switch (event) {
+            case 'received':
+                addProcessingLog(`⬆️ ${data.filename} uploaded (${data.received_files}/${data.total_files}), processing...`, 'info');
+                break;
+            case 'state':
+                if (data.status === 'failed') {
+                    addProcessingLog('❌ No files could be uploaded', 'error');
+                    return 'done';
+                }
+                if (data.status === 'cancelled') {
+                    const response = await authenticatedFetch(`${API_BASE}/status/${currentBatchId}`);
+                    if (response.ok) showResults(await response.json());
+                    return 'done';
+                }
+                setPausedState(data.status === 'paused');
+                if (data.total_files) {
+                    addProcessingLog(`📥 All ${data.total_files} files uploaded`, 'info');
+                }
+                break;
+            case 'ocr_done':
+                addProcessingLog(`📄 ${data.filename} - text extracted (${data.chars} chars)`, 'info');
+                break;
+            case 'ai_done':
+                addProcessingLog(`🤖 ${data.filename} → ${data.category}`, 'info');
+                break;
+            case 'review':
+                addProcessingLog(`📋 ${data.filename} - ${data.requires_review ? 'needs review' : data.status}`, 'info');
+                break;
+            case 'result': {
+                const result = data.result;
+                processed = Math.max(processed, data.processed_files ?? data.seq);
+                progressFill.style.width = (20 + (processed / data.total_files) * 70) + '%';
+                processingStatus.textContent = `Processing: ${processed} of ${data.total_files} documents...` + formatEta(data.eta_seconds);
+                if (result.error) {
+                    addProcessingLog(`❌ ${result.filename} - Error: ${result.error}`, 'error');
+                } else {
+                    addProcessingLog(`✓ ${result.filename} → ${result.category} (confidence: ${(result.confidence * 100).toFixed(0)}%, time: ${result.processing_time.toFixed(2)}s)`, 'success');
+                }
+                break;
+            }
+            case 'completed': {
+                addProcessingLog('📦 Organizing files and creating ZIP...', 'info');
+                if (progressFill) progressFill.style.width = '100%';
+                const response = await authenticatedFetch(`${API_BASE}/status/${currentBatchId}`);
+                if (!response.ok) {
+                    throw new Error('Failed to fetch final status');
+                }
+                addProcessingLog('✅ Processing complete!', 'success');
+                showResults(await response.json());
+                return 'done';
+            }
+            case 'resync':
+                return 'resync';
+        }
+        return null;
+    };
+
+    while (reconnects <= maxReconnects) {
+        try {
+            const headers = lastEventId ? { 'Last-Event-ID': lastEventId } : {};
+            const response = await authenticatedFetch(`${API_BASE}/batches/${currentBatchId}/events`, { headers });
+            if (!response.ok || !response.body) {
+                throw new Error(`Event stream unavailable (${response.status})`);
+            }
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                // Frames are separated by a blank line
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const frame = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+
+                    let event = 'message';
+                    let data = '';
+                    for (const line of frame.split('\n')) {
+                        if (line.startsWith('id: ')) lastEventId = line.slice(4);
+                        else if (line.startsWith('event: ')) event = line.slice(7);
+                        else if (line.startsWith('data: ')) data += line.slice(6);
+                    }
+                    if (!data) continue; // Heartbeat comment
+
+                    const outcome = await handleEvent(event, JSON.parse(data));
+                    if (outcome === 'done') return;
+                    if (outcome === 'resync') {
+                        console.log('[Events] Resync requested, falling back to polling');
+                        return pollBatchStatus(false);
+                    }
+                }
+            }
+        } catch (error) {
+            console.warn('[Events] Stream error:', error);
+        }
+
+        reconnects++;
+        await new Promise(resolve => setTimeout(resolve, 1000));
+    }
+
+    console.log('[Events] Stream unavailable, falling back to polling');
+    return pollBatchStatus(false);
+}
+
+async function pollBatchStatus(logStart = true) {
     const pollInterval = 500; // Poll every 0.5 seconds for faster updates
-    let lastProcessedCount = 0;
+    let cursor = 0;           // Last result sequence number received (server sends only newer results)
+    let etag = null;          // ETag of the last response (server answers 304 if nothing changed)
+    const allResults = [];
 
     console.log('[Poll] Starting to poll batch status for:', currentBatchId);
     console.log('[Poll] processingDetails exists?', !!processingDetails);
@@ -258,7 +449,9 @@ async function pollBatchStatus() {
     console.log('[Poll] processingStatus exists?', !!processingStatus);
 
     // Add initial message
-    addProcessingLog(`🚀 Starting batch processing: ${selectedFiles.length} files`, 'info');
+    if (logStart) {
+        addProcessingLog(`🚀 Starting batch processing: ${selectedFiles.length} files`, 'info');
+    }
 
     let pollCount = 0;
     while (true) {
@@ -266,13 +459,21 @@ async function pollBatchStatus() {
         console.log(`[Poll] Poll attempt #${pollCount}`);
 
         try {
-            const response = await authenticatedFetch(`${API_BASE}/status/${currentBatchId}`);
+            const headers = etag ? { 'If-None-Match': etag } : {};
+            const response = await authenticatedFetch(`${API_BASE}/status/${currentBatchId}?since=${cursor}`, { headers });
             console.log(`[Poll] Response status: ${response.status}`);
 
+            // Nothing changed since the last poll
+            if (response.status === 304) {
+                await new Promise(resolve => setTimeout(resolve, pollInterval));
+                continue;
+            }
+
             if (!response.ok) {
                 throw new Error('Failed to fetch status');
             }
 
+            etag = response.headers.get('ETag');
             const data = await response.json();
             console.log(`[Poll] Batch status:`, data.status, `Processed: ${data.processed_files}/${data.total_files}`);
 
@@ -282,19 +483,35 @@ async function pollBatchStatus() {
             progressFill.style.width = totalProgress + '%';
 
             // Update status text
-            processingStatus.textContent = `Processing: ${data.processed_files} of ${data.total_files} documents...`;
+            processingStatus.textContent = `Processing: ${data.processed_files} of ${data.total_files} documents...` + formatEta(data.eta_seconds);
 
-            // Show newly processed files as console output
-            if (data.results && data.results.length > lastProcessedCount) {
-                const newResults = data.results.slice(lastProcessedCount);
-                newResults.forEach(result => {
+            // Show newly processed files as console output (response only has results after `since`)
+            if (data.results && data.results.length > 0) {
+                data.results.forEach(result => {
                     if (result.error) {
                         addProcessingLog(`❌ ${result.filename} - Error: ${result.error}`, 'error');
                     } else {
                         addProcessingLog(`✓ ${result.filename} → ${result.category} (confidence: ${(result.confidence * 100).toFixed(0)}%, time: ${result.processing_time.toFixed(2)}s)`, 'success');
                     }
                 });
-                lastProcessedCount = data.results.length;
+                allResults.push(...data.results);
+            }
+            cursor = data.cursor || cursor;
+
+            if (data.status === 'failed') {
+                addProcessingLog('❌ Batch failed', 'error');
+                break;
+            }
+
+            if (data.status === 'cancelled') {
+                data.results = allResults;
+                showResults(data);
+                break;
+            }
+
+            setPausedState(data.status === 'paused');
+            if (data.status === 'paused') {
+                processingStatus.textContent = `Paused: ${data.processed_files} of ${data.total_files} documents processed`;
             }
 
             // Check if completed
@@ -308,6 +525,7 @@ async function pollBatchStatus() {
                 await new Promise(resolve => setTimeout(resolve, 500));
 
                 addProcessingLog('✅ Processing complete!', 'success');
+                data.results = allResults;
                 console.log('[Poll] Calling showResults with data:', data);
                 showResults(data);
                 console.log('[Poll] showResults completed, breaking poll loop');
@@ -360,6 +578,10 @@ function showResults(data) {
     // Scroll to top of results section
     resultsSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
 
+    // No ZIP for cancelled batches; failed documents can be retried once the batch finished
+    if (downloadBtn) downloadBtn.classList.toggle('hidden', !data.download_url);
+    if (retryFailedBtn) retryFailedBtn.classList.toggle('hidden', !(data.failed > 0 && data.status !== 'cancelled'));
+
     // Display summary statistics
     resultsSummary.innerHTML = `
         <div class="stat-card">
@@ -716,6 +938,65 @@ window.toggleExtractedData = function(docId) {
     }
 }
 
+// ============================================================================
+// Batch Control
+// ============================================================================
+
+async function batchAction(action) {
+    const response = await authenticatedFetch(`${API_BASE}/batches/${currentBatchId}/${action}`, { method: 'POST' });
+    const data = await response.json().catch(() => ({}));
+    if (!response.ok) {
+        throw new Error(data.detail || `Could not ${action} batch`);
+    }
+    return data;
+}
+
+function setPausedState(paused) {
+    if (!pauseBatchBtn) return;
+    pauseBatchBtn.dataset.paused = paused ? 'true' : 'false';
+    pauseBatchBtn.textContent = paused ? 'Resume' : 'Pause';
+}
+
+async function togglePauseBatch() {
+    if (!currentBatchId) return;
+    const resuming = pauseBatchBtn.dataset.paused === 'true';
+    try {
+        const data = await batchAction(resuming ? 'resume' : 'pause');
+        setPausedState(!resuming);
+        addProcessingLog(resuming
+            ? `▶️ Resumed (${data.affected_documents} documents left)`
+            : `⏸️ Paused (${data.affected_documents} documents waiting)`, 'info');
+    } catch (error) {
+        addProcessingLog(`❌ ${error.message}`, 'error');
+    }
+}
+
+async function cancelBatch() {
+    if (!currentBatchId || !confirm('Cancel this batch? Documents that are not processed yet will be skipped.')) return;
+    try {
+        const data = await batchAction('cancel');
+        addProcessingLog(`⏹️ Batch cancelled (${data.affected_documents} documents skipped)`, 'error');
+    } catch (error) {
+        addProcessingLog(`❌ ${error.message}`, 'error');
+    }
+}
+
+async function retryFailedDocuments() {
+    if (!currentBatchId) return;
+    try {
+        const data = await batchAction('retry-failed');
+        resultsSection.classList.add('hidden');
+        processingSection.classList.remove('hidden');
+        processingDetails.innerHTML = '';
+        progressFill.style.width = '20%';
+        setPausedState(false);
+        addProcessingLog(`🔁 Retrying ${data.affected_documents} failed documents...`, 'info');
+        await pollBatchStatus(false);
+    } catch (error) {
+        alert(error.message);
+    }
+}
+
 function downloadResults() {
     // Trigger download
     window.location.href = `${API_BASE}/download/${currentBatchId}`;
@@ -738,6 +1019,7 @@ function resetApp() {
     renderFileList();
     progressFill.style.width = '0%';
     processingDetails.innerHTML = '';
+    setPausedState(false);
 
     // Scroll to top of page
     window.scrollTo({ top: 0, behavior: 'smooth' });
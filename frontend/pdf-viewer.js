@@ -700,8 +700,16 @@ async function approveDocument() {
             throw new Error(error.detail || 'Failed to approve document');
         }
 
-        const result = await response.json();
-        showToast('Document approved successfully!', 'success');
+        // Approval returns right away; the upload to the connector runs in the background
+        showToast('Document approved - uploading to connector...', 'success');
+        const upload = await waitForUpload(token);
+        if (upload && upload.status === 'completed') {
+            showToast('Document uploaded to connector', 'success');
+        } else if (upload && upload.status === 'failed') {
+            showToast('Upload failed: ' + (upload.error_message || 'unknown error'), 'error');
+        } else {
+            showToast('Upload still in progress - check the dashboard for its status', 'success');
+        }
 
         // Redirect to dashboard after 2 seconds
         setTimeout(() => {
@@ -714,6 +722,30 @@ async function approveDocument() {
     }
 }
 
+/**
+ * Poll the approved document's upload until it completes or fails (or we stop waiting)
+ */
+async function waitForUpload(token, timeoutMs = 15000) {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+        try {
+            const response = await fetch(`/api/documents/${docId}/upload`, {
+                headers: { 'Authorization': `Bearer ${token}` }
+            });
+            if (response.ok) {
+                const upload = await response.json();
+                if (upload.status === 'completed' || upload.status === 'failed') {
+                    return upload;
+                }
+            }
+        } catch (error) {
+            console.warn('Error checking upload status:', error);
+        }
+        await new Promise(resolve => setTimeout(resolve, 1000));
+    }
+    return null;
+}
+
 /**
  * Reject document (set status to failed/rejected)
  */
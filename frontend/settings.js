@@ -73,7 +73,8 @@ function setupEventListeners() {
     document.getElementById('dw-dialog').addEventListener('change', handleDialogChange);
 
     // Load fields
-    document.getElementById('load-fields-btn').addEventListener('click', loadIndexFields);
+    document.getElementById('load-fields-btn').addEventListener('click', () => loadIndexFields());
+    document.getElementById('refresh-fields-btn').addEventListener('click', () => loadIndexFields(true));
 
     // Save configuration
     document.getElementById('save-config-btn').addEventListener('click', saveConfiguration);
@@ -370,13 +371,16 @@ function handleDialogChange(event) {
 // Index Fields
 // ============================================================================
 
-async function loadIndexFields() {
-    const btn = document.getElementById('load-fields-btn');
+async function loadIndexFields(refresh = false) {
+    // Field definitions are cached on the server; refresh rediscovers them from DocuWare
+    const btn = document.getElementById(refresh ? 'refresh-fields-btn' : 'load-fields-btn');
+    const label = btn.innerHTML;
     btn.disabled = true;
     btn.innerHTML = '<span class="btn-icon">⏳</span> Loading...';
 
     try {
-        const response = await authenticatedFetch('/api/connectors/docuware/fields', {
+        const url = refresh ? '/api/connectors/docuware/fields/refresh' : '/api/connectors/docuware/fields';
+        const response = await authenticatedFetch(url, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
@@ -389,6 +393,9 @@ async function loadIndexFields() {
         });
 
         const result = await response.json();
+        if (!response.ok) {
+            throw new Error(result.detail || 'Failed to load index fields');
+        }
         state.indexFields = result.fields || [];
 
         // Get smart field suggestions with confidence scores
@@ -414,7 +421,7 @@ async function loadIndexFields() {
         showAlert('connection-status', 'error', 'Failed to load index fields');
     } finally {
         btn.disabled = false;
-        btn.innerHTML = '<span class="btn-icon">🏷️</span> Load Index Fields';
+        btn.innerHTML = label;
     }
 }
 
@@ -98,7 +98,7 @@ async def test_few_shot_enabled():
 
     # Test fetching examples
     print("\n1. Testing example retrieval from database...")
-    examples = learning_service.get_few_shot_examples(
+    examples = await learning_service.get_few_shot_examples(
         organization_id=1,
         selected_fields=None,
         category=None,
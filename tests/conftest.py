@@ -40,26 +40,49 @@ async def test_db():
     Create a fresh test database for each test.
     Automatically cleaned up after test.
     """
+    import backend.database as db_module
+
+    # Pooled connections must not outlive the database file they point at
+    await db_module.close_db_pool()
+
     # Remove existing test database
     if os.path.exists(TEST_DB_PATH):
         os.remove(TEST_DB_PATH)
 
     # Temporarily override DB_PATH
-    import backend.database as db_module
     original_db_path = db_module.DB_PATH
     db_module.DB_PATH = TEST_DB_PATH
 
+    # Tenant cache is process-wide; don't leak rows between test databases
+    db_module.tenant_cache.clear()
+
     # Initialize test database
     await init_database()
 
     yield TEST_DB_PATH
 
     # Cleanup
+    await db_module.close_db_pool()
     db_module.DB_PATH = original_db_path
+    db_module.tenant_cache.clear()
     if os.path.exists(TEST_DB_PATH):
         os.remove(TEST_DB_PATH)
 
 
+@pytest.fixture
+async def app_db(test_db, monkeypatch):
+    """
+    Point the app-side database module at the test DB.
+    Routes and services import `database` (not `backend.database`), which is a separate module instance.
+    """
+    import database as app_database
+    monkeypatch.setattr(app_database, "DB_PATH", test_db)
+    app_database.tenant_cache.clear()
+    yield app_database
+    app_database.tenant_cache.clear()
+    await app_database.close_db_pool()
+
+
 @pytest.fixture
 def mock_auth0_token():
     """Generate a mock Auth0 JWT token for testing."""
@@ -247,3 +270,72 @@ def sample_usage_log():
             "category": "invoices"
         }
     }
+
+
+# ============================================================================
+# Mock DMS server (benchmarks/mock_dms_server.py)
+# ============================================================================
+
+@pytest.fixture
+def dms_latency():
+    """Seconds each mock DMS request waits; override in a test module to change it."""
+    return 0.01
+
+
+@pytest.fixture
+def drive_seed_folders():
+    """Drive folders (ID -> name, at the top level) that exist before the test; override to seed some."""
+    return {}
+
+
+@pytest.fixture
+def server(dms_latency, drive_seed_folders):
+    """Local mock DocuWare/Google Drive server."""
+    from benchmarks.mock_dms_server import FOLDER_MIME, MockDMSServer
+
+    with MockDMSServer(latency=dms_latency) as server:
+        for folder_id, name in drive_seed_folders.items():
+            server.state.files[folder_id] = {"name": name, "parent": None, "mimeType": FOLDER_MIME}
+        yield server
+
+
+@pytest.fixture
+def pdf_size():
+    """Size in bytes of the `pdf` fixture's file; override to change it."""
+    return 1024
+
+
+@pytest.fixture
+def pdf(tmp_path, pdf_size):
+    """A PDF file of pdf_size bytes."""
+    path = tmp_path / "scan.pdf"
+    path.write_bytes(b"%PDF-1.4\n" + b"0" * (pdf_size - 9))
+    return path
+
+
+@pytest.fixture
+def drive_connector(server):
+    """
+    Factory of Google Drive connectors whose service points at the mock server.
+    Pass an account key to enable the stored folder cache and upload sessions, and
+    credentials to use instead of anonymous ones.
+    """
+    import json
+    from google.auth.credentials import AnonymousCredentials
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.discovery_cache import get_static_doc
+    from connectors.google_drive_connector import GoogleDriveConnector
+    from connectors.google_drive_folder_cache import GoogleDriveFolderCache
+
+    discovery = json.loads(get_static_doc("drive", "v3"))
+    discovery["rootUrl"] = f"{server.url}/"
+
+    def make(account=None, credentials=None):
+        connector = GoogleDriveConnector()
+        connector.credentials = credentials or AnonymousCredentials()
+        connector.service = build_from_document(discovery, credentials=connector.credentials)
+        connector.account_key = account
+        connector.folder_tree = GoogleDriveFolderCache(account)
+        return connector
+
+    return make
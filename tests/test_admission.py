@@ -0,0 +1,208 @@
+"""
+Tests for upload admission control and the LLM limiter.
+Tests 429/503 decisions with Retry-After (including LLM state published by worker processes),
+the readiness probe and limiter concurrency/cooldown.
+"""
+import asyncio
+from unittest.mock import AsyncMock
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from backend.database import create_batch
+from job_queue import JobQueue
+from services.admission_service import AdmissionController
+from services.llm_limiter import LLMLimiter
+
+
+@pytest.fixture
+def controller(app_db, tmp_path, monkeypatch):
+    from config import settings
+
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "admission_min_free_disk_mb", 0)
+    return AdmissionController(queue=JobQueue(), limiter=LLMLimiter(max_concurrent=2))
+
+
+async def _queue_documents(queue, user, count, seconds=10):
+    await create_batch("batch-1", user["id"], count)
+    await queue.enqueue_documents(
+        "batch-1", user["id"], None, [f"/tmp/doc{i}.pdf" for i in range(count)],
+        preflights=[{"estimated_seconds": seconds} for _ in range(count)]
+    )
+
+
+class TestAdmissionDecisions:
+    """Test the overload checks."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_full_queue_sheds_with_429(self, controller, created_user, monkeypatch):
+        """A batch that would push the queue past its limit gets 429 and a drain-based Retry-After."""
+        from config import settings
+
+        monkeypatch.setattr(settings, "admission_max_queued_documents", 10)
+        monkeypatch.setattr(settings, "admission_retry_after_seconds", 5)
+        await _queue_documents(controller.queue, created_user, 8)
+
+        assert (await controller.check(2))["allowed"]
+
+        decision = await controller.check(12)
+        assert (decision["allowed"], decision["status_code"]) == (False, 429)
+        assert decision["retry_after"] == 100  # 10 excess documents x 10s, nothing running yet
+        assert controller.stats()["rejected"] == {"queue_depth": 1}
+
+        # Files of an already admitted batch aren't held to the queue limit
+        assert (await controller.check(12, include_backlog=False))["allowed"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_low_disk_sheds_with_503(self, controller, monkeypatch):
+        """Uploads are refused when the upload volume is nearly full."""
+        from config import settings
+
+        monkeypatch.setattr(settings, "admission_min_free_disk_mb", 10 ** 12)
+        decision = await controller.check(1)
+        assert (decision["status_code"], decision["code"]) == (503, "disk")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_uploads_in_flight_limit(self, controller, monkeypatch):
+        """This server refuses new files while too many are already being saved."""
+        from config import settings
+
+        monkeypatch.setattr(settings, "admission_max_uploads_in_flight", 5)
+        async with controller.receiving(4):
+            assert (await controller.check(2))["status_code"] == 503
+        assert (await controller.check(2))["allowed"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_llm_cooldown_sets_retry_after(self, controller):
+        """After the AI provider rate limits us, uploads get 503 until the cooldown passes."""
+        controller.limiter.record_rate_limit(45)
+
+        decision = await controller.check(1)
+        assert (decision["status_code"], decision["code"]) == (503, "llm_rate_limited")
+        assert 44 <= decision["retry_after"] <= 45
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_worker_processes_llm_state_counts(self, controller, monkeypatch):
+        """Waiting requests and cooldowns published by standalone workers count here, until they go stale."""
+        from config import settings
+
+        monkeypatch.setattr(settings, "admission_max_llm_waiting", 5)
+        busy = LLMLimiter(process_id="worker-host:1")
+        busy.waiting = 6
+        await busy.publish()
+
+        decision = await controller.check(1)
+        assert decision["code"] == "llm_waiting"
+        assert decision["signals"]["llm"]["waiting"] == 6
+
+        limited = LLMLimiter(process_id="worker-host:2")
+        limited.record_rate_limit(45)
+        await limited.publish()
+        assert (await controller.check(1))["code"] == "llm_rate_limited"
+
+        # Workers that stopped heartbeating (or withdrew) are ignored
+        await limited.withdraw()
+        monkeypatch.setattr(settings, "job_lease_seconds", 0)
+        assert (await controller.check(1))["allowed"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_readiness_ignores_shared_backlog(self, controller, created_user, monkeypatch):
+        """A full queue is visible in readiness signals but doesn't take the instance out."""
+        from config import settings
+
+        monkeypatch.setattr(settings, "admission_max_queued_documents", 1)
+        await _queue_documents(controller.queue, created_user, 3)
+
+        readiness = await controller.readiness()
+        assert readiness["ready"] is True
+        assert readiness["signals"]["queued_documents"] == 3
+
+        monkeypatch.setattr(settings, "admission_min_free_disk_mb", 10 ** 12)
+        assert (await controller.readiness())["ready"] is False
+        assert controller.stats()["rejected"] == {}
+
+
+class TestLLMLimiter:
+    """Test the Claude request limiter."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrency_cap(self):
+        """No more than `capacity` requests run at once; the rest wait."""
+        limiter = LLMLimiter(max_concurrent=2)
+        peak = 0
+        release = asyncio.Event()
+
+        async def call():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await release.wait()
+
+        tasks = [asyncio.create_task(call()) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        assert (limiter.in_flight, limiter.waiting) == (2, 3)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert peak == 2
+        assert limiter.stats()["in_flight"] == 0
+
+
+class TestAdmissionEndpoints:
+    """Test shedding on the upload routes and the readiness probe."""
+
+    @pytest.fixture
+    async def client(self, app_db, user_with_organization, tmp_path, monkeypatch):
+        from config import settings
+        from routes import upload, metrics_routes
+        from auth import get_current_user
+
+        monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+        monkeypatch.setattr(settings, "admission_min_free_disk_mb", 0)
+        controller = AdmissionController(queue=JobQueue(), limiter=LLMLimiter())
+        monkeypatch.setattr(upload, "admission_controller", controller)
+        monkeypatch.setattr(metrics_routes, "get_admission_controller", lambda: controller)
+        monkeypatch.setattr(upload, "get_subscription", AsyncMock(return_value={"plan_type": "trial"}))
+
+        app = FastAPI()
+        app.include_router(upload.router, prefix="/api")
+        app.include_router(metrics_routes.readiness_router)
+        app.dependency_overrides[get_current_user] = lambda: user_with_organization["user"]
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            yield client
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_overloaded_upload_gets_retry_after(self, client, monkeypatch):
+        """Opening a batch while rate limited returns 503 with Retry-After."""
+        from routes import upload
+
+        upload.admission_controller.limiter.record_rate_limit(60)
+        response = await client.post("/api/batches", json={"total_files": 3})
+
+        assert response.status_code == 503
+        assert 59 <= int(response.headers["Retry-After"]) <= 60
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_ready_endpoint(self, client, monkeypatch):
+        """The readiness probe answers 200 normally and 503 with Retry-After when overloaded."""
+        from config import settings
+
+        response = await client.get("/api/ready")
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+        assert "free_disk_mb" in response.json()["signals"]
+
+        monkeypatch.setattr(settings, "admission_min_free_disk_mb", 10 ** 12)
+        response = await client.get("/api/ready")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(settings.admission_retry_after_seconds)
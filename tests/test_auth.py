@@ -149,10 +149,11 @@ class TestTokenValidation:
         assert "aud" in payload
 
     @pytest.mark.unit
-    def test_invalid_token_raises_error(self):
+    @pytest.mark.asyncio
+    async def test_invalid_token_raises_error(self):
         """Test that invalid token raises AuthError."""
         with pytest.raises(Exception):  # Will raise JWTError
-            verify_token("invalid.token.here")
+            await verify_token("invalid.token.here")
 
 
 class TestAuthenticationFlow:
@@ -215,3 +216,174 @@ class TestAuthenticationFlow:
         needs_onboarding = user["organization_id"] is None
 
         assert needs_onboarding is False
+
+
+class TestUserContextCache:
+    """Test the verified-token -> user context cache in get_current_user."""
+
+    @staticmethod
+    def _payload(auth0_user_id, email):
+        return {
+            "sub": auth0_user_id,
+            "email": email,
+            "exp": (datetime.utcnow() + timedelta(hours=1)).timestamp()
+        }
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_repeat_calls_skip_verification(self, app_db, created_user, monkeypatch):
+        """Second call with the same token is served from the cache."""
+        from fastapi.security import HTTPAuthorizationCredentials
+        import backend.auth as auth_module
+
+        calls = []
+
+        async def fake_verify(token):
+            calls.append(token)
+            return self._payload(created_user["auth0_user_id"], created_user["email"])
+
+        monkeypatch.setattr(auth_module, "verify_token", fake_verify)
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="token-abc")
+
+        first = await auth_module.get_current_user(credentials)
+        second = await auth_module.get_current_user(credentials)
+
+        assert first["id"] == second["id"] == created_user["id"]
+        assert calls == ["token-abc"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_user_organization_change_invalidates(self, app_db, created_user, created_organization, monkeypatch):
+        """Joining an organization drops the cached context for the user's tokens."""
+        from fastapi.security import HTTPAuthorizationCredentials
+        import backend.auth as auth_module
+
+        async def fake_verify(token):
+            return self._payload(created_user["auth0_user_id"], created_user["email"])
+
+        monkeypatch.setattr(auth_module, "verify_token", fake_verify)
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="token-onboarding")
+
+        user = await auth_module.get_current_user(credentials)
+        assert user["organization"] is None
+
+        await app_db.update_user_organization(created_user["id"], created_organization["id"], "owner")
+
+        user = await auth_module.get_current_user(credentials)
+        assert user["organization_id"] == created_organization["id"]
+        assert user["organization"]["name"] == "Test Organization"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_change_during_load_is_not_cached(self, app_db, created_user, created_organization, monkeypatch):
+        """A context loaded while the user joins an organization is returned once, not cached."""
+        from fastapi.security import HTTPAuthorizationCredentials
+        import backend.auth as auth_module
+
+        async def fake_verify(token):
+            return self._payload(created_user["auth0_user_id"], created_user["email"])
+
+        load_user_context = auth_module._load_user_context
+
+        async def racing_load(token, payload):
+            user = await load_user_context(token, payload)
+            await app_db.update_user_organization(created_user["id"], created_organization["id"], "owner")
+            return user
+
+        monkeypatch.setattr(auth_module, "verify_token", fake_verify)
+        monkeypatch.setattr(auth_module, "_load_user_context", racing_load)
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="token-racing")
+
+        user = await auth_module.get_current_user(credentials)
+        assert user["organization"] is None
+
+        monkeypatch.setattr(auth_module, "_load_user_context", load_user_context)
+        user = await auth_module.get_current_user(credentials)
+        assert user["organization_id"] == created_organization["id"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_last_login_writes_are_coalesced(self, app_db, created_user, monkeypatch):
+        """last_login is written at most once per interval per user."""
+        import backend.auth as auth_module
+
+        writes = []
+
+        async def fake_update_last_login(user_id):
+            writes.append(user_id)
+
+        monkeypatch.setattr(auth_module, "update_last_login", fake_update_last_login)
+        monkeypatch.setattr(auth_module, "_last_login_writes", {})
+
+        await auth_module._touch_last_login(created_user["id"])
+        await auth_module._touch_last_login(created_user["id"])
+
+        assert writes == [created_user["id"]]
+
+
+def _rsa_jwk(kid):
+    """Build a public RSA JWK dict for JWKS manager tests."""
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from jose import jwk
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_jwk = jwk.RSAKey(private_key.public_key(), "RS256").to_dict()
+    return {**public_jwk, "kid": kid, "use": "sig"}
+
+
+class TestJWKSManager:
+    """Test JWKS caching, rotation refresh and rate limiting."""
+
+    @staticmethod
+    def _manager(monkeypatch, key_sets):
+        """JWKSManager whose fetches return successive key sets and are counted."""
+        from backend.auth import JWKSManager
+        import asyncio
+
+        manager = JWKSManager(ttl_seconds=3600, min_refresh_interval_seconds=30)
+        fetches = []
+
+        async def fake_fetch():
+            fetches.append(1)
+            await asyncio.sleep(0.01)
+            return {"keys": key_sets[min(len(fetches), len(key_sets)) - 1]}
+
+        monkeypatch.setattr(manager, "_fetch_jwks", fake_fetch)
+        return manager, fetches
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_keys_are_parsed_once_and_cached(self, monkeypatch):
+        """Known kids are served from the cache without refetching."""
+        manager, fetches = self._manager(monkeypatch, [[_rsa_jwk("k1")]])
+
+        first = await manager.get_signing_key("k1")
+        second = await manager.get_signing_key("k1")
+
+        assert first is second
+        assert len(fetches) == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refreshes_single_flight(self, monkeypatch):
+        """A rotated kid triggers one refresh shared by concurrent requests."""
+        import asyncio
+
+        manager, fetches = self._manager(monkeypatch, [[_rsa_jwk("k1")], [_rsa_jwk("k2")]])
+        await manager.get_signing_key("k1")
+
+        keys = await asyncio.gather(*[manager.get_signing_key("k2") for _ in range(5)])
+
+        assert all(key is not None for key in keys)
+        assert len(fetches) == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refresh_is_rate_limited(self, monkeypatch):
+        """Repeated unknown kids don't refetch within the minimum interval."""
+        manager, fetches = self._manager(monkeypatch, [[_rsa_jwk("k1")]])
+        await manager.get_signing_key("k1")
+
+        assert await manager.get_signing_key("bogus-1") is None
+        assert await manager.get_signing_key("bogus-2") is None
+        assert len(fetches) == 2
@@ -0,0 +1,228 @@
+"""
+Tests for batch cancellation, pause/resume and retry of failed documents.
+Tests that queued and in-flight work stops, that resumed and retried jobs keep their
+checkpoints, and that a retried batch is finalized (and billed) again.
+"""
+from unittest.mock import AsyncMock
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from backend.database import create_batch, finish_batch, get_batch, get_batch_with_results
+from job_queue import (
+    JobQueue, LeaseLostError, JOB_PAUSED, JOB_CANCELLED, JOB_TYPE_FINALIZE, STAGE_OCR_DONE
+)
+
+
+@pytest.fixture
+def queue(app_db):
+    """Job queue bound to the test database."""
+    return JobQueue()
+
+
+async def _queue_batch(queue, user, count=3, batch_id="batch-1"):
+    await create_batch(batch_id, user["id"], count)
+    await queue.enqueue_documents(batch_id, user["id"], None, [f"/tmp/doc{i}.pdf" for i in range(count)])
+
+
+def _result(job, error=None):
+    return {
+        "filename": job["filename"],
+        "original_path": job["file_path"],
+        "category": "Invoice",
+        "confidence": 0.9,
+        "extracted_text_preview": "",
+        "error": error,
+        "processing_time": 0.1
+    }
+
+
+async def _finalize_jobs(queue, batch_id="batch-1"):
+    return [job for job in await queue.get_batch_jobs(batch_id) if job["job_type"] == JOB_TYPE_FINALIZE]
+
+
+class TestCancelAndPause:
+    """Test stopping queued and in-flight work."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cancel_stops_queued_and_running_jobs(self, queue, created_user):
+        """Cancelled jobs are never claimed, and a worker mid-job is fenced out."""
+        await _queue_batch(queue, created_user)
+        [running] = await queue.claim("worker-a")
+
+        assert await queue.cancel_batch("batch-1", created_user["id"]) == 3
+        assert await queue.claim("worker-b") == []
+
+        with pytest.raises(LeaseLostError):
+            await queue.save_checkpoint(running["id"], "worker-a", STAGE_OCR_DONE, {"text": "x"})
+        with pytest.raises(LeaseLostError):
+            await queue.finish_document(running, "worker-a", _result(running))
+
+        assert {job["status"] for job in await queue.get_batch_jobs("batch-1")} == {JOB_CANCELLED}
+        assert await _finalize_jobs(queue) == []
+        assert (await get_batch("batch-1", created_user["id"]))["status"] == "cancelled"
+
+        # Finished batches can't be cancelled
+        assert await queue.cancel_batch("batch-1", created_user["id"]) is None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_pause_and_resume_from_checkpoint(self, queue, created_user):
+        """A paused in-flight job resumes at its last checkpoint without losing an attempt."""
+        await _queue_batch(queue, created_user, count=2)
+        [job] = await queue.claim("worker-a")
+        await queue.save_checkpoint(job["id"], "worker-a", STAGE_OCR_DONE, {"text": "invoice text"})
+
+        assert await queue.pause_batch("batch-1", created_user["id"]) == 2
+        assert {j["status"] for j in await queue.get_batch_jobs("batch-1")} == {JOB_PAUSED}
+        assert await queue.claim("worker-b") == []
+        assert await queue.pause_batch("batch-1", created_user["id"]) is None
+
+        assert await queue.resume_batch("batch-1", created_user["id"], None) == 2
+        resumed = {j["id"]: j for j in await queue.claim("worker-b", limit=2)}
+        assert resumed[job["id"]]["stage"] == STAGE_OCR_DONE
+        assert resumed[job["id"]]["checkpoint"] == {"text": "invoice text"}
+        assert resumed[job["id"]]["attempts"] == 1
+
+
+class TestRetryFailed:
+    """Test requeuing only the failed documents of a finished batch."""
+
+    async def _finished_batch(self, queue, user, failing="doc1.pdf"):
+        """Batch of 3 documents where one (doc1) failed after OCR, finalized as completed."""
+        await _queue_batch(queue, user)
+        for job in await queue.claim("worker-a", limit=3):
+            if job["filename"] == failing:
+                await queue.save_checkpoint(job["id"], "worker-a", STAGE_OCR_DONE, {"text": "invoice text"})
+                await queue.finish_document(job, "worker-a", _result(job, error="Claude API overloaded"))
+            else:
+                await queue.finish_document(job, "worker-a", _result(job))
+
+        [finalize] = await queue.claim("worker-a")
+        await finish_batch("batch-1", "completed")
+        await queue.finish(finalize, "worker-a")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_retry_requeues_only_failed_documents(self, queue, created_user):
+        """Only the failed job runs again, from its checkpoint, and its old result is replaced."""
+        await self._finished_batch(queue, created_user)
+
+        assert await queue.retry_failed("batch-1", created_user["id"]) == 1
+
+        batch = await get_batch("batch-1", created_user["id"])
+        assert (batch["status"], batch["processed_files"], batch["successful"], batch["failed"]) == ("processing", 2, 2, 0)
+        assert await _finalize_jobs(queue) == []
+
+        [job] = await queue.claim("worker-b", limit=3)
+        assert (job["filename"], job["stage"], job["attempts"]) == ("doc1.pdf", STAGE_OCR_DONE, 1)
+        assert job["checkpoint"] == {"text": "invoice text"}
+
+        position = await queue.finish_document(job, "worker-b", _result(job))
+        assert position["seq"] == 4  # After the rows pollers have already seen
+        assert (position["processed_files"], position["total_files"]) == (3, 3)
+        assert len(await _finalize_jobs(queue)) == 1
+
+        batch = await get_batch_with_results("batch-1", created_user["id"])
+        assert [r["filename"] for r in batch["results"]] == ["doc0.pdf", "doc2.pdf", "doc1.pdf"]
+        assert all(r["error"] is None for r in batch["results"])
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_retried_last_document_is_after_polling_cursor(self, queue, created_user):
+        """Retrying the newest result doesn't reuse its seq, so a poller's cursor still sees the rerun."""
+        await self._finished_batch(queue, created_user, failing="doc2.pdf")
+        cursor = (await get_batch_with_results("batch-1", created_user["id"]))["cursor"]
+
+        assert await queue.retry_failed("batch-1", created_user["id"]) == 1
+        [job] = await queue.claim("worker-b", limit=3)
+        await queue.finish_document(job, "worker-b", _result(job))
+
+        batch = await get_batch_with_results("batch-1", created_user["id"], since=cursor)
+        assert [r["filename"] for r in batch["results"]] == ["doc2.pdf"]
+        assert batch["results"][0]["error"] is None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_retry_requires_finished_batch_with_failures(self, queue, created_user):
+        """Batches still processing can't be retried; batches without failures requeue nothing."""
+        await _queue_batch(queue, created_user, count=1)
+        assert await queue.retry_failed("batch-1", created_user["id"]) is None
+
+        [job] = await queue.claim("worker-a")
+        await queue.finish_document(job, "worker-a", _result(job))
+        await finish_batch("batch-1", "completed")
+        assert await queue.retry_failed("batch-1", created_user["id"]) == 0
+        assert (await get_batch("batch-1", created_user["id"]))["status"] == "completed"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_billed_documents_counted_per_batch(self, app_db, user_with_organization):
+        """Finalizing again only bills documents that weren't billed before."""
+        org_id = user_with_organization["organization"]["id"]
+        await app_db.log_usage(org_id, "document_processed", document_count=2, metadata={"batch_id": "batch-1"})
+        await app_db.log_usage(org_id, "document_processed", document_count=5, metadata={"batch_id": "batch-2"})
+
+        assert await app_db.get_batch_billed_documents(org_id, "batch-1") == 2
+        assert await app_db.get_batch_billed_documents(org_id, "batch-3") == 0
+
+
+class TestBatchControlEndpoints:
+    """Test the cancel, pause, resume and retry-failed routes."""
+
+    @pytest.fixture
+    async def client(self, app_db, user_with_organization, monkeypatch):
+        from routes import upload
+        from auth import get_current_user
+
+        monkeypatch.setattr(upload, "job_queue", JobQueue())
+        monkeypatch.setattr(upload, "get_subscription", AsyncMock(return_value={"plan_type": "trial"}))
+
+        app = FastAPI()
+        app.include_router(upload.router, prefix="/api")
+        app.dependency_overrides[get_current_user] = lambda: user_with_organization["user"]
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            yield client
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_pause_resume_cancel(self, client, user_with_organization):
+        """Pause, resume and cancel report the affected documents; finished batches answer 409."""
+        from routes import upload
+        user = user_with_organization["user"]
+        await _queue_batch(upload.job_queue, user, count=2)
+
+        response = await client.post("/api/batches/batch-1/pause")
+        assert response.status_code == 200
+        assert response.json() == {"batch_id": "batch-1", "status": "paused", "affected_documents": 2}
+
+        response = await client.post("/api/batches/batch-1/resume")
+        assert (response.status_code, response.json()["status"]) == (200, "processing")
+
+        response = await client.post("/api/batches/batch-1/cancel")
+        assert (response.status_code, response.json()["affected_documents"]) == (200, 2)
+
+        assert (await client.post("/api/batches/batch-1/cancel")).status_code == 409
+        assert (await client.post("/api/batches/batch-1/pause")).status_code == 409
+        assert (await client.post("/api/batches/missing/cancel")).status_code == 404
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_retry_failed_endpoint(self, client, user_with_organization):
+        """Retry is refused while processing and requeues the failed documents once finished."""
+        from routes import upload
+        queue = upload.job_queue
+        user = user_with_organization["user"]
+        await _queue_batch(queue, user, count=2)
+
+        assert (await client.post("/api/batches/batch-1/retry-failed")).status_code == 409
+
+        for job in await queue.claim("worker-a", limit=2):
+            await queue.finish_document(job, "worker-a", _result(job, error="timeout"))
+        await finish_batch("batch-1", "completed")
+
+        response = await client.post("/api/batches/batch-1/retry-failed")
+        assert response.status_code == 200
+        assert response.json() == {"batch_id": "batch-1", "status": "processing", "affected_documents": 2}
+        assert len(await queue.claim("worker-b", limit=5)) == 2
@@ -0,0 +1,159 @@
+"""
+Tests for per-document batch result rows.
+Tests atomic counters, arrival ordering, the status/history projection, delta polling and legacy results fallback.
+"""
+import asyncio
+import json
+import pytest
+import aiosqlite
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from backend.database import (
+    create_batch,
+    add_batch_document,
+    finish_batch,
+    get_batch,
+    get_batch_with_results,
+    get_user_batches
+)
+
+
+def _result(filename, error=None, doc_id=None):
+    return {
+        "id": doc_id,
+        "filename": filename,
+        "original_path": f"/tmp/{filename}",
+        "category": "Invoice",
+        "confidence": 0.9,
+        "extracted_text_preview": "",
+        "error": error,
+        "processing_time": 0.1
+    }
+
+
+class TestBatchDocuments:
+    """Test appending results and maintaining counters."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_appends_keep_counters_consistent(self, test_db, created_user):
+        """Concurrent documents get unique sequence numbers and exact counters."""
+        await create_batch("batch-1", created_user["id"], 20)
+
+        seqs = await asyncio.gather(*[
+            add_batch_document("batch-1", _result(f"doc{i}.pdf", error="bad" if i % 4 == 0 else None))
+            for i in range(20)
+        ])
+
+        assert sorted(seqs) == list(range(1, 21))
+
+        batch = await get_batch("batch-1", created_user["id"])
+        assert batch["processed_files"] == 20
+        assert batch["successful"] == 15
+        assert batch["failed"] == 5
+        assert batch["status"] == "processing"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_results_in_arrival_order_with_document_ids(self, test_db, created_user):
+        """Results come back in arrival order with stored document IDs."""
+        await create_batch("batch-1", created_user["id"], 2)
+        await add_batch_document("batch-1", _result("b.pdf", doc_id=7), document_id=7)
+        await add_batch_document("batch-1", _result("a.pdf", error="OCR failed"))
+
+        batch = await get_batch_with_results("batch-1", created_user["id"])
+        results = batch["results"]
+        assert [r["filename"] for r in results] == ["b.pdf", "a.pdf"]
+        assert results[0]["id"] == 7
+        assert results[1]["id"] is None
+        assert batch["cursor"] == 2
+
+        # Results after the cursor only
+        batch = await get_batch_with_results("batch-1", created_user["id"], since=1)
+        assert [r["filename"] for r in batch["results"]] == ["a.pdf"]
+
+        batch = await get_batch_with_results("batch-1", created_user["id"], since=2)
+        assert batch["results"] == []
+        assert batch["cursor"] == 2
+        assert batch["processed_files"] == 2
+
+        assert await get_batch_with_results("batch-1", created_user["id"] + 1) is None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_projection_excludes_results(self, test_db, created_user):
+        """Batch status/history reads never carry the results blob."""
+        await create_batch("batch-1", created_user["id"], 1)
+        await add_batch_document("batch-1", _result("a.pdf"))
+        await finish_batch("batch-1", "completed", processing_summary={"invoice": 1}, download_url="/api/download/batch-1")
+
+        batch = await get_batch("batch-1", created_user["id"])
+        assert batch["status"] == "completed"
+        assert batch["completed_at"] is not None
+        assert batch["processing_summary"] == {"invoice": 1}
+        assert "results" not in batch and "results_json" not in batch
+
+        batches = await get_user_batches(created_user["id"])
+        assert [b["id"] for b in batches] == ["batch-1"]
+        assert "results_json" not in batches[0]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_legacy_results_json_fallback(self, test_db, created_user):
+        """Batches written before batch_documents still return their results."""
+        await create_batch("legacy", created_user["id"], 1)
+        async with aiosqlite.connect(test_db) as db:
+            await db.execute(
+                "UPDATE batches SET results_json = ?, processed_files = 1 WHERE id = ?",
+                (json.dumps([_result("old.pdf")]), "legacy")
+            )
+            await db.commit()
+
+        batch = await get_batch_with_results("legacy", created_user["id"])
+        assert [r["filename"] for r in batch["results"]] == ["old.pdf"]
+        assert batch["cursor"] == 1
+
+
+class TestBatchStatusEndpoint:
+    """Test delta polling and conditional requests on /api/status/{batch_id}."""
+
+    @pytest.fixture
+    def client(self, app_db, created_user):
+        from routes import upload
+        from auth import get_current_user
+
+        app = FastAPI()
+        app.include_router(upload.router, prefix="/api")
+        app.dependency_overrides[get_current_user] = lambda: created_user
+        return AsyncClient(app=app, base_url="http://test")
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_since_cursor_and_etag(self, client, created_user):
+        """Pollers get only new results, and 304 when nothing changed."""
+        await create_batch("batch-1", created_user["id"], 2)
+        await add_batch_document("batch-1", _result("a.pdf"))
+
+        async with client:
+            response = await client.get("/api/status/batch-1")
+            assert response.status_code == 200
+            data = response.json()
+            assert [r["filename"] for r in data["results"]] == ["a.pdf"]
+            assert data["cursor"] == 1
+            etag = response.headers["ETag"]
+
+            response = await client.get("/api/status/batch-1", headers={"If-None-Match": etag})
+            assert response.status_code == 304
+            assert response.content == b""
+
+            await add_batch_document("batch-1", _result("b.pdf"))
+
+            response = await client.get(
+                "/api/status/batch-1?since=1", headers={"If-None-Match": etag}
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert [r["filename"] for r in data["results"]] == ["b.pdf"]
+            assert data["processed_files"] == 2
+            assert data["cursor"] == 2
@@ -0,0 +1,185 @@
+"""
+Tests for batch progress events.
+Tests the in-process event bus (fan-out, Last-Event-ID replay, heartbeats, pruning) and the SSE endpoint.
+"""
+import asyncio
+from contextlib import aclosing
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from backend.database import create_batch, finish_batch, get_batch
+from services.batch_event_service import (
+    BatchEventBus, EVENT_COMPLETED, EVENT_RESYNC, EVENT_STATE, EVENT_UPLOAD, upload_channel
+)
+
+
+async def _collect(iterator, limit=20):
+    events = []
+    async with aclosing(iterator):
+        async for event in iterator:
+            events.append(event)
+            if len(events) >= limit:
+                break
+    return events
+
+
+class TestBatchEventBus:
+    """Test publish/subscribe behaviour."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_live_subscriber_receives_events_until_completed(self):
+        """Subscribers get events in order and the stream ends on completed."""
+        bus = BatchEventBus()
+        subscriber = asyncio.create_task(_collect(bus.subscribe("b1")))
+        await asyncio.sleep(0)
+
+        bus.publish("b1", "ocr_done", {"filename": "a.pdf"})
+        bus.publish("b2", "ocr_done", {"filename": "other.pdf"})
+        bus.publish("b1", EVENT_COMPLETED, {"status": "completed"})
+
+        events = await asyncio.wait_for(subscriber, timeout=1)
+        assert [(e.id, e.event) for e in events] == [(1, "ocr_done"), (2, EVENT_COMPLETED)]
+        assert bus.stats()["subscribers"] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cancelled_or_failed_batch_ends_stream(self):
+        """A state change to cancelled or failed ends subscribers and lets the channel be pruned."""
+        bus = BatchEventBus(retention_seconds=0)
+        subscriber = asyncio.create_task(_collect(bus.subscribe("b1")))
+        await asyncio.sleep(0)
+
+        bus.publish("b1", EVENT_STATE, {"status": "paused"})
+        bus.publish("b1", EVENT_STATE, {"status": "cancelled"})
+        bus.publish("b2", EVENT_STATE, {"status": "failed"})
+
+        events = await asyncio.wait_for(subscriber, timeout=1)
+        assert [e.data["status"] for e in events] == ["paused", "cancelled"]
+        assert [e.event for e in await _collect(bus.subscribe("b2"))] == [EVENT_STATE]
+
+        await asyncio.sleep(0.01)
+        bus.publish("b3", "ocr_done")
+        assert set(bus._channels) == {"b3"}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_last_event_id_resume(self):
+        """Reconnecting clients only get events after Last-Event-ID."""
+        bus = BatchEventBus()
+        for i in range(3):
+            bus.publish("b1", "result", {"seq": i + 1})
+        bus.publish("b1", EVENT_COMPLETED)
+
+        events = await _collect(bus.subscribe("b1", last_event_id=2))
+        assert [e.id for e in events] == [3, 4]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_resync_when_history_truncated(self):
+        """A Last-Event-ID older than the kept history yields a resync marker first."""
+        bus = BatchEventBus(history_size=2)
+        for i in range(4):
+            bus.publish("b1", "result", {"seq": i + 1})
+
+        events = await _collect(bus.subscribe("b1", last_event_id=1), limit=3)
+        assert [e.event for e in events] == [EVENT_RESYNC, "result", "result"]
+        assert [e.id for e in events] == [2, 3, 4]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_idle_upload_channel_pruned(self):
+        """Upload channels never finish: they are dropped once idle, and resumed clients resync."""
+        bus = BatchEventBus(retention_seconds=0)
+        bus.publish(upload_channel(1), EVENT_UPLOAD, {"status": "completed"})
+        bus.publish(upload_channel(1), EVENT_UPLOAD, {"status": "completed"})
+        bus.publish("b1", "ocr_done")
+
+        await asyncio.sleep(0.01)
+        bus.publish("b2", "ocr_done")
+        assert set(bus._channels) == {"b1", "b2"}
+
+        subscriber = asyncio.create_task(_collect(bus.subscribe(upload_channel(1), last_event_id=2), limit=2))
+        await asyncio.sleep(0)
+        bus.publish(upload_channel(1), EVENT_UPLOAD, {"status": "uploading"})
+
+        events = await asyncio.wait_for(subscriber, timeout=1)
+        assert [e.event for e in events] == [EVENT_RESYNC, EVENT_UPLOAD]
+        assert [e.id for e in events] == [3, 4]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_heartbeat_while_idle(self):
+        """Idle subscriptions yield None at the heartbeat interval."""
+        bus = BatchEventBus()
+        events = await _collect(bus.subscribe("b1", heartbeat_seconds=0.01), limit=2)
+        assert events == [None, None]
+
+        # Empty channels created by a subscriber are dropped again
+        assert bus.stats()["batches"] == 0
+
+
+class TestBatchEventsEndpoint:
+    """Test the SSE endpoint."""
+
+    @pytest.fixture
+    def client(self, app_db, created_user):
+        from routes import upload
+        from auth import get_current_user
+
+        app = FastAPI()
+        app.include_router(upload.router, prefix="/api")
+        app.dependency_overrides[get_current_user] = lambda: created_user
+        return AsyncClient(app=app, base_url="http://test")
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_stream_replays_from_last_event_id(self, client, created_user):
+        """The stream frames events as SSE and honours Last-Event-ID."""
+        from routes import upload
+
+        await create_batch("sse-batch", created_user["id"], 1)
+        upload.batch_event_bus.publish("sse-batch", "ocr_done", {"filename": "a.pdf"})
+        upload.batch_event_bus.publish("sse-batch", "result", {"seq": 1})
+        upload.batch_event_bus.publish("sse-batch", EVENT_COMPLETED, {"status": "completed"})
+
+        async with client:
+            response = await client.get(
+                "/api/batches/sse-batch/events", headers={"Last-Event-ID": "1"}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text == (
+            'id: 2\nevent: result\ndata: {"seq": 1}\n\n'
+            'id: 3\nevent: completed\ndata: {"status": "completed"}\n\n'
+        )
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_finished_batch_without_events_resyncs(self, client, created_user):
+        """Reconnecting to a cancelled batch this process has no events for ends right away."""
+        await create_batch("cancelled-batch", created_user["id"], 1, status="cancelled")
+
+        async with client:
+            response = await client.get("/api/batches/cancelled-batch/events")
+
+        assert response.text == 'event: resync\ndata: {"status": "cancelled"}\n\n'
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_finish_batch_keeps_cancelled_status(self, app_db, created_user):
+        """Finalizing a batch that was cancelled meanwhile doesn't mark it completed."""
+        await create_batch("batch-1", created_user["id"], 1, status="cancelled")
+
+        assert await finish_batch("batch-1", "completed") is False
+        assert (await get_batch("batch-1", created_user["id"]))["status"] == "cancelled"
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_unknown_batch_returns_404(self, client):
+        """Streams are only available for the user's own batches."""
+        async with client:
+            response = await client.get("/api/batches/missing/events")
+        assert response.status_code == 404
@@ -0,0 +1,146 @@
+"""
+Tests for the bulk review endpoints.
+Tests that bulk approval writes every document's corrections, data and queued upload,
+reports per-document outcomes (including other organizations' documents and documents
+no longer awaiting approval), that a single approval losing a race with a status change
+is rejected, and that bulk corrections are saved in one batch.
+"""
+import json
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from config import settings
+from review_repository import ReviewRepository
+from upload_outbox import UploadOutbox, UPLOAD_PENDING
+
+
+async def _create_document(org_id, filename):
+    return await ReviewRepository().create_document(
+        organization_id=org_id,
+        batch_id="batch-1",
+        filename=filename,
+        file_path=f"/tmp/{filename}",
+        category="invoice",
+        extracted_data={"vendor": "ACME", "other_data": {"PO": "1"}},
+        confidence_score=0.97,
+        connector_type="google_drive"
+    )
+
+
+class TestBulkReviewEndpoints:
+    """Test /api/documents/bulk-approve and /api/documents/bulk-correct."""
+
+    @pytest.fixture
+    async def client(self, app_db, user_with_organization):
+        from routes import document_routes
+        from auth import get_current_user
+
+        app = FastAPI()
+        app.include_router(document_routes.router)
+        app.dependency_overrides[get_current_user] = lambda: user_with_organization["user"]
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            yield client
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_bulk_approve(self, client, user_with_organization):
+        """Every found document is approved with its corrections and queued once; others are reported."""
+        org_id = user_with_organization["organization"]["id"]
+        first = await _create_document(org_id, "a.pdf")
+        second = await _create_document(org_id, "b.pdf")
+
+        response = await client.post("/api/documents/bulk-approve", json={"documents": [
+            {"document_id": first, "corrections": [{"field_name": "PO", "corrected_value": "42"}]},
+            {"document_id": second},
+            {"document_id": 999999}
+        ]})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["approved"], body["failed"], body["success"]) == (2, 1, False)
+        assert [result["status"] for result in body["results"]] == ["approved", "approved", "not_found"]
+        assert all(result["upload_queued"] for result in body["results"][:2])
+
+        repository = ReviewRepository()
+        doc = await repository.get_document(first)
+        assert doc["status"] == "approved"
+        assert json.loads(doc["extracted_data"])["other_data"]["PO"] == "42"
+        assert [c["corrected_value"] for c in await repository.get_corrections(first)] == ["42"]
+
+        outbox = UploadOutbox()
+        for doc_id in (first, second):
+            entry = await outbox.get_document_upload(doc_id)
+            assert (entry["status"], entry["connector_type"]) == (UPLOAD_PENDING, "google_drive")
+
+        # Documents no longer awaiting approval aren't approved or uploaded again
+        await repository.set_document_status(second, "completed")
+        response = await client.post("/api/documents/bulk-approve", json={"documents": [
+            {"document_id": first}, {"document_id": second}
+        ]})
+        body = response.json()
+        assert (body["approved"], body["failed"]) == (0, 2)
+        assert [result["status"] for result in body["results"]] == ["invalid_status", "invalid_status"]
+        assert (await repository.get_document(second))["status"] == "completed"
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_approve_conflicts_when_status_changes_first(self, client, user_with_organization, monkeypatch):
+        """A document skipped between the status check and the approval is not approved: 409, nothing written."""
+        from routes import document_routes
+
+        org_id = user_with_organization["organization"]["id"]
+        doc_id = await _create_document(org_id, "a.pdf")
+        repository = ReviewRepository()
+        get_document = document_routes.review_repository.get_document
+
+        async def read_then_skip(*args, **kwargs):
+            doc = await get_document(*args, **kwargs)
+            await repository.set_document_status(doc_id, "skipped")
+            return doc
+
+        monkeypatch.setattr(document_routes.review_repository, "get_document", read_then_skip)
+        response = await client.post(f"/api/documents/{doc_id}/approve", json={
+            "corrections": [{"field_name": "PO", "corrected_value": "42"}]
+        })
+
+        assert response.status_code == 409
+        assert (await repository.get_document(doc_id))["status"] == "skipped"
+        assert await repository.get_corrections(doc_id) == []
+        assert await UploadOutbox().get_document_upload(doc_id) is None
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_bulk_correct(self, client, user_with_organization):
+        """Corrections for several documents (one listed twice) are saved together."""
+        org_id = user_with_organization["organization"]["id"]
+        first = await _create_document(org_id, "a.pdf")
+        second = await _create_document(org_id, "b.pdf")
+
+        response = await client.post("/api/documents/bulk-correct", json={"documents": [
+            {"document_id": first, "corrections": [{"field_name": "vendor", "corrected_value": "Acme Inc"}]},
+            {"document_id": second, "corrections": [{"field_name": "vendor", "corrected_value": "Globex"}]},
+            {"document_id": first, "corrections": [{"field_name": "PO", "corrected_value": "7"}]}
+        ]})
+
+        body = response.json()
+        assert (body["corrected"], body["corrections"], body["success"]) == (2, 3, True)
+        assert body["results"][0] == {"document_id": first, "status": "corrected", "corrections": 2}
+
+        repository = ReviewRepository()
+        assert [c["field_name"] for c in await repository.get_corrections(first)] == ["vendor", "PO"]
+        assert (await repository.get_document(first))["status"] == "pending_review"
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_request_size_is_limited(self, client, monkeypatch):
+        """Empty requests and requests over review_bulk_max_documents are rejected."""
+        monkeypatch.setattr(settings, "review_bulk_max_documents", 2)
+
+        response = await client.post("/api/documents/bulk-approve", json={"documents": [
+            {"document_id": doc_id} for doc_id in (1, 2, 3)
+        ]})
+        assert response.status_code == 400
+
+        response = await client.post("/api/documents/bulk-correct", json={"documents": []})
+        assert response.status_code == 400
@@ -0,0 +1,233 @@
+"""
+Tests for bulk uploads (upload_documents) on the connectors and the connector manager.
+Tests bounded concurrency, per-document results with partial failures, that a batch
+shares one login and keep-alive connections, and that a retried Drive upload finds the
+file it already created, against the local mock DMS server.
+"""
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+import httpx
+import pytest
+
+from connectors.base_connector import BaseConnector
+from connectors.connector_manager import ConnectorManager
+from connectors.docuware_connector import DocuWareConnector
+from connectors.docuware_schema_cache import DocuWareSchemaCache
+from connectors.docuware_session_pool import DocuWareSessionPool
+from connectors.google_drive_connector import GoogleDriveConnector
+from models import ConnectorConfig, ConnectorType, DocumentCategory, DocuWareConfig, ExtractedData, IndexField
+
+CABINET_ID = "cab-1"
+DIALOG_ID = "dlg-1"
+
+
+@pytest.fixture
+def pdfs(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"doc-{i}.pdf"
+        path.write_bytes(b"%PDF-1.4\n" + bytes([i]) * 2048)
+        paths.append(path)
+    return paths
+
+
+class FakeConnector(BaseConnector):
+    """Connector using the default upload_documents; fails documents named 'bad'."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def test_connection(self, credentials):
+        return True, "ok"
+
+    async def get_storage_locations(self, credentials):
+        return []
+
+    async def validate_metadata(self, metadata, storage_config, credentials=None):
+        return True, []
+
+    async def upload_document(self, file_path, metadata, credentials, storage_config):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if file_path == "bad":
+                raise RuntimeError("connection reset")
+            return {"success": True, "document_id": file_path}
+        finally:
+            self.in_flight -= 1
+
+
+def docuware_connector(server, logins):
+    """DocuWare connector whose login returns a client pointed at the mock server."""
+    def login(server_url, username, password):
+        logins.append(username)
+        cabinet = SimpleNamespace(
+            id=CABINET_ID, endpoints={"documents": f"/DocuWare/Platform/FileCabinets/{CABINET_ID}/Documents"}
+        )
+        return SimpleNamespace(
+            conn=SimpleNamespace(session=httpx.Client(), base_url=server.url),
+            organizations=[SimpleNamespace(file_cabinets=[cabinet])]
+        )
+
+    connector = DocuWareConnector(session_pool=DocuWareSessionPool(login_func=login), schema_cache=DocuWareSchemaCache())
+    connector.schema_cache._memory[(connector._normalize_server_url(server.url), CABINET_ID, DIALOG_ID)] = {
+        "fields": [IndexField(name="AMOUNT", type="Decimal", required=False)],
+        "discovered_at": datetime.utcnow()
+    }
+    return connector
+
+
+class TestDefaultBulkUpload:
+    """Test BaseConnector.upload_documents."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_bounded_with_partial_failures(self):
+        """Uploads stay under the limit, results keep document order, and one failure doesn't stop the rest."""
+        connector = FakeConnector()
+        documents = [{"file_path": name, "metadata": {}} for name in ["a", "bad", "c", "d", "e", "f"]]
+
+        results = await connector.upload_documents(documents, {}, {}, concurrency=2)
+
+        assert connector.max_in_flight == 2
+        assert [r["success"] for r in results] == [True, False, True, True, True, True]
+        assert results[0]["document_id"] == "a"
+        assert "connection reset" in results[1]["error"]
+
+
+class TestDocuWareBulkUpload:
+    """Test DocuWareConnector.upload_documents against the mock server."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_one_login_shared_connections(self, server, pdfs):
+        """The batch logs in once, reuses keep-alive connections and indexes every document."""
+        logins = []
+        connector = docuware_connector(server, logins)
+        credentials = {"server_url": server.url, "username": "org-a", "password": "pw"}
+        storage_config = {"cabinet_id": CABINET_ID, "dialog_id": DIALOG_ID, "selected_fields": ["AMOUNT"]}
+        documents = [{"file_path": str(path), "metadata": {"AMOUNT": "$1,200.50"}} for path in pdfs]
+
+        results = await connector.upload_documents(documents, credentials, storage_config, concurrency=3)
+
+        assert all(result["success"] for result in results)
+        assert len({result["document_id"] for result in results}) == len(pdfs)
+        assert logins == ["org-a"]
+        stats = server.state.stats()
+        assert stats["docuware_documents"] == len(pdfs)
+        assert stats["connections"] <= 3  # Two requests per document over at most one connection per slot
+        fields = server.state.documents[results[0]["document_id"]]["fields"]
+        assert fields["Field"][0] == {"FieldName": "AMOUNT", "Item": "1200.50", "ItemElementName": "String"}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failed_document_does_not_fail_batch(self, server, pdfs):
+        """A missing file fails on its own; the other documents upload."""
+        connector = docuware_connector(server, [])
+        credentials = {"server_url": server.url, "username": "org-a", "password": "pw"}
+        storage_config = {"cabinet_id": CABINET_ID, "dialog_id": DIALOG_ID, "selected_fields": []}
+        documents = [
+            {"file_path": str(pdfs[0]), "metadata": {}},
+            {"file_path": str(pdfs[0].parent / "missing.pdf"), "metadata": {}},
+            {"file_path": str(pdfs[1]), "metadata": {}}
+        ]
+
+        results = await connector.upload_documents(documents, credentials, storage_config)
+
+        assert [result["success"] for result in results] == [True, False, True]
+        assert server.state.stats()["docuware_documents"] == 2
+
+
+class TestGoogleDriveBulkUpload:
+    """Test GoogleDriveConnector.upload_documents against the mock server."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_uploads_into_one_folder_with_unique_names(self, server, pdfs, drive_connector):
+        """Same-named documents uploaded together get distinct names; the folder is created once."""
+        connector = drive_connector()
+        extracted = ExtractedData(vendor="Acme", document_number="INV-1", date="2025-01-31")
+        documents = [
+            {"pdf_path": path, "extracted_data": extracted, "category": DocumentCategory.INVOICE}
+            for path in pdfs[:3]
+        ]
+
+        results = await connector.upload_documents(
+            documents, {"root_folder_name": "DocuFlow", "primary_level": "category"}, concurrency=3
+        )
+
+        assert all(result["success"] for result in results)
+        names = [result["filename"] for result in results]
+        assert len(set(names)) == 3
+        folders = [f for f in server.state.files.values() if f["mimeType"].endswith("folder")]
+        assert sorted(f["name"] for f in folders) == ["DocuFlow", "Invoices"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_retried_upload_finds_earlier_file(self, server, pdfs, drive_connector):
+        """A document uploaded again with the same idempotency key gets the file created the first time."""
+        connector = drive_connector()
+        document = {
+            "pdf_path": pdfs[0], "extracted_data": ExtractedData(vendor="Acme"),
+            "category": DocumentCategory.INVOICE, "idempotency_key": "document:7"
+        }
+        storage_config = {"root_folder_name": "DocuFlow", "primary_level": "category"}
+
+        [first] = await connector.upload_documents([document], storage_config)
+        [retried] = await connector.upload_documents([document], storage_config)
+
+        assert first["success"] and retried["success"]
+        assert retried["file_id"] == first["file_id"]
+        assert retried["folder_path"] == "/DocuFlow/Invoices/"
+        assert server.state.stats()["drive_files"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_not_authenticated(self, pdfs):
+        """Without a service every document fails with a result instead of an exception."""
+        results = await GoogleDriveConnector().upload_documents(
+            [{"pdf_path": pdfs[0], "extracted_data": ExtractedData(), "category": "invoice"}], {}
+        )
+        assert results[0]["success"] is False
+
+
+class TestConnectorManagerBulkUpload:
+    """Test ConnectorManager.upload_documents."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_docuware_validation_failures_are_per_document(self):
+        """Documents failing validation are reported; the rest go to the connector in one batch."""
+        manager = ConnectorManager()
+        manager.docuware_connector = AsyncMock()
+        manager.docuware_connector.validate_metadata.side_effect = [(True, []), (False, ["VENDOR"]), (True, [])]
+        manager.docuware_connector.upload_documents.return_value = [
+            {"success": True, "document_id": "1", "message": "ok"},
+            {"success": False, "message": "Upload failed", "error": "500"}
+        ]
+        config = ConnectorConfig(
+            connector_type=ConnectorType.DOCUWARE,
+            docuware=DocuWareConfig(
+                server_url="https://acme.docuware.cloud", username="u", encrypted_password="x",
+                cabinet_id=CABINET_ID, cabinet_name="c", dialog_id=DIALOG_ID, dialog_name="d",
+                selected_fields=["VENDOR"]
+            )
+        )
+        documents = [
+            {"file_path": f"/tmp/{i}.pdf", "extracted_data": ExtractedData(other_data={"VENDOR": "Acme"})}
+            for i in range(3)
+        ]
+
+        results = await manager.upload_documents(documents, config, "pw", concurrency=2)
+
+        assert [result.success for result in results] == [True, False, False]
+        assert results[1].message == "Validation failed"
+        assert results[2].error == "500"
+        uploaded, credentials, storage_config, concurrency = manager.docuware_connector.upload_documents.call_args.args
+        assert [d["file_path"] for d in uploaded] == ["/tmp/0.pdf", "/tmp/2.pdf"]
+        assert credentials["password"] == "pw"
+        assert concurrency == 2
@@ -0,0 +1,122 @@
+"""
+Tests for the pooled SQLite connection manager.
+Tests connection reuse, PRAGMAs, transaction cleanup and stale-file detection.
+"""
+import os
+import pytest
+
+import backend.database as db_module
+from backend.database import ConnectionPool, get_db, get_db_connection, get_user_by_id
+
+
+class TestAsyncPool:
+    """Test pooled aiosqlite connections."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, test_db, created_user):
+        """Sequential queries reuse one pooled connection."""
+        before = db_module.get_db_pool_stats()
+
+        for _ in range(5):
+            await get_user_by_id(created_user["id"])
+
+        after = db_module.get_db_pool_stats()
+        assert after["async_opened"] - before["async_opened"] <= 1
+        assert after["async_reused"] - before["async_reused"] >= 4
+        assert after["async_in_use"] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_pragmas_applied(self, test_db):
+        """Pooled connections carry the tuned PRAGMAs."""
+        db = await get_db()
+        try:
+            cursor = await db.execute("PRAGMA synchronous")
+            assert (await cursor.fetchone())[0] == 1  # NORMAL
+            cursor = await db.execute("PRAGMA foreign_keys")
+            assert (await cursor.fetchone())[0] == 1
+            cursor = await db.execute("PRAGMA temp_store")
+            assert (await cursor.fetchone())[0] == 2  # MEMORY
+        finally:
+            await db.close()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_uncommitted_work_rolled_back_on_release(self, test_db, created_user):
+        """A connection returned mid-transaction doesn't leak its writes."""
+        db = await get_db()
+        await db.execute("UPDATE users SET name = ? WHERE id = ?", ("Uncommitted", created_user["id"]))
+        await db.close()
+
+        user = await get_user_by_id(created_user["id"])
+        assert user["name"] == created_user["name"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_replaced_file_discards_idle_connections(self, tmp_path):
+        """Idle connections to a deleted/recreated database file are not reused."""
+        pool = ConnectionPool(max_idle=2)
+        path = str(tmp_path / "pool.db")
+
+        db = await pool.acquire_async(path)
+        await db.execute("CREATE TABLE t (x INTEGER)")
+        await db.commit()
+        await db.close()
+
+        os.rename(path, path + ".old")
+        db = await pool.acquire_async(path)
+        cursor = await db.execute("SELECT name FROM sqlite_master WHERE name = 't'")
+        assert await cursor.fetchone() is None
+        await db.close()
+
+        assert pool.stats()["discarded"] == 1
+        await pool.close_all()
+
+
+class TestSyncPool:
+    """Test pooled sqlite3 connections."""
+
+    @pytest.mark.unit
+    def test_sync_connections_are_reused(self, tmp_path):
+        """get_db_connection-style checkouts reuse connections and keep Row factory."""
+        pool = ConnectionPool(max_idle=2)
+        path = str(tmp_path / "pool.db")
+
+        for _ in range(3):
+            conn = pool.acquire_sync(path)
+            row = conn.execute("SELECT 1 AS one").fetchone()
+            assert row["one"] == 1
+            conn.close()
+
+        stats = pool.stats()
+        assert stats["sync_opened"] == 1
+        assert stats["sync_reused"] == 2
+        assert stats["sync_idle"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_max_idle_zero_disables_pooling(self, tmp_path):
+        """With max_idle=0 every connection is closed on release."""
+        pool = ConnectionPool(max_idle=0)
+        path = str(tmp_path / "pool.db")
+
+        for _ in range(2):
+            db = await pool.acquire_async(path)
+            await db.close()
+
+        assert pool.stats()["async_opened"] == 2
+        assert pool.stats()["async_idle"] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_module_sync_connection_uses_pool(self, test_db):
+        """get_db_connection returns pooled connections."""
+        before = db_module.get_db_pool_stats()["sync_reused"]
+
+        for _ in range(2):
+            conn = get_db_connection()
+            conn.execute("SELECT COUNT(*) FROM users").fetchone()
+            conn.close()
+
+        assert db_module.get_db_pool_stats()["sync_reused"] >= before + 1
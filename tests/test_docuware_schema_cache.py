@@ -0,0 +1,199 @@
+"""
+Tests for the DocuWare field-schema cache and field discovery.
+Tests persistence across processes, TTL expiry, explicit refresh, shared discoveries,
+uploads never waiting on discovery, backoff after failed discoveries, and concurrent
+document probes.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+import pytest
+
+from connectors.docuware_connector import DocuWareConnector
+from connectors.docuware_schema_cache import DocuWareSchemaCache
+from connectors.docuware_session_pool import DocuWareSessionPool
+from models import IndexField
+
+SERVER = "https://acme.docuware.cloud"
+CREDENTIALS = {"server_url": "acme.docuware.cloud", "username": "org-a", "password": "pw"}
+FIELDS = [
+    IndexField(name="VENDOR", type="String", required=True),
+    IndexField(name="AMOUNT", type="Decimal", required=False)
+]
+
+
+@pytest.fixture
+def connector(app_db):
+    """Connector with its own pool (fake login) and schema cache, discovery stubbed out."""
+    connector = DocuWareConnector(
+        session_pool=DocuWareSessionPool(login_func=lambda url, user, password: MagicMock()),
+        schema_cache=DocuWareSchemaCache()
+    )
+    connector.discovery_calls = 0
+
+    def discover(session, cabinet_id, dialog_id):
+        connector.discovery_calls += 1
+        return list(FIELDS)
+
+    connector._get_fields_sync = discover
+    return connector
+
+
+class TestSchemaCache:
+    """Test the memory + SQLite cache."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_definitions_survive_restart(self, app_db):
+        """A new process reads definitions another one stored."""
+        await DocuWareSchemaCache().put(SERVER, "cab-1", "dlg-1", FIELDS)
+
+        entry = await DocuWareSchemaCache().get(SERVER, "cab-1", "dlg-1")
+        assert [field.name for field in entry["fields"]] == ["VENDOR", "AMOUNT"]
+        assert entry["fields"][0].required is True
+        assert entry["expired"] is False
+        assert await DocuWareSchemaCache().get(SERVER, "cab-1", "other") is None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_expired_definitions_are_flagged(self, app_db, monkeypatch):
+        """Entries past the TTL are still returned, marked expired."""
+        from config import settings
+
+        cache = DocuWareSchemaCache()
+        await cache.put(SERVER, "cab-1", "dlg-1", FIELDS)
+        cache._memory[(SERVER, "cab-1", "dlg-1")]["discovered_at"] -= timedelta(seconds=120)
+        monkeypatch.setattr(settings, "docuware_field_schema_ttl_seconds", 60)
+
+        # The database copy is newer than the one in memory
+        entry = await cache.get(SERVER, "cab-1", "dlg-1")
+        assert entry["expired"] is False
+
+        await app_db.save_docuware_field_schema(
+            SERVER, "cab-1", "dlg-1", [f.dict() for f in FIELDS], datetime.utcnow() - timedelta(seconds=120)
+        )
+        entry = await DocuWareSchemaCache().get(SERVER, "cab-1", "dlg-1")
+        assert entry["expired"] is True
+
+
+class TestFieldDiscovery:
+    """Test when the connector discovers fields."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cached_until_refresh(self, connector):
+        """Fields are discovered once, then served from the cache until an explicit refresh."""
+        assert len(await connector.get_index_fields(CREDENTIALS, "cab-1", "dlg-1")) == 2
+        assert len(await connector.get_index_fields(CREDENTIALS, "cab-1", "dlg-1")) == 2
+        assert connector.discovery_calls == 1
+
+        await connector.get_index_fields(CREDENTIALS, "cab-1", "dlg-1", refresh=True)
+        assert connector.discovery_calls == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_discovery(self, connector):
+        """Several callers asking for the same dialog wait on one discovery."""
+        results = await asyncio.gather(*[
+            connector.get_index_fields(CREDENTIALS, "cab-1", "dlg-1") for _ in range(4)
+        ])
+
+        assert connector.discovery_calls == 1
+        assert all(len(fields) == 2 for fields in results)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_validation_never_waits_on_discovery(self, connector):
+        """Without cached fields, validation proceeds at once and discovery runs in the background."""
+        release = threading.Event()
+
+        def slow_discover(session, cabinet_id, dialog_id):
+            release.wait(5)
+            return list(FIELDS)
+
+        connector._get_fields_sync = slow_discover
+        storage_config = {"cabinet_id": "cab-1", "dialog_id": "dlg-1", "selected_fields": ["VENDOR"]}
+
+        is_valid, errors = await asyncio.wait_for(
+            connector.validate_metadata({}, storage_config, CREDENTIALS), timeout=1
+        )
+        assert (is_valid, errors) == (True, [])
+
+        # Once discovered, the required field is enforced
+        release.set()
+        await connector._discoveries[(SERVER, "cab-1", "dlg-1")]
+        is_valid, errors = await connector.validate_metadata({}, storage_config, CREDENTIALS)
+        assert is_valid is False
+        assert "VENDOR" in errors[0]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failed_discovery_backs_off(self, connector, monkeypatch):
+        """Uploads don't start another discovery until the retry interval after a failure."""
+        from config import settings
+
+        def empty_cabinet(session, cabinet_id, dialog_id):
+            connector.discovery_calls += 1
+            return []
+
+        connector._get_fields_sync = empty_cabinet
+
+        for _ in range(3):
+            assert await connector._cached_index_fields(CREDENTIALS, "cab-1", "dlg-1") == []
+            if (SERVER, "cab-1", "dlg-1") in connector._discoveries:
+                await connector._discoveries[(SERVER, "cab-1", "dlg-1")]
+        assert connector.discovery_calls == 1
+
+        monkeypatch.setattr(settings, "docuware_field_discovery_retry_seconds", 0)
+        await connector._cached_index_fields(CREDENTIALS, "cab-1", "dlg-1")
+        await connector._discoveries[(SERVER, "cab-1", "dlg-1")]
+        assert connector.discovery_calls == 2
+
+
+class TestDocumentProbes:
+    """Test the concurrent sample-document probes."""
+
+    def _conn(self, documents):
+        conn = MagicMock()
+        conn.calls = []
+
+        def get(url, headers=None):
+            doc_id = int(url.rsplit("/", 1)[1])
+            conn.calls.append(doc_id)
+            time.sleep(0.02)  # Network round trip
+            response = MagicMock()
+            response.status_code = 200 if doc_id in documents else 404
+            response.json.return_value = documents.get(doc_id)
+            return response
+
+        conn.session.get = get
+        return conn
+
+    @pytest.mark.unit
+    def test_first_document_with_table_data_wins(self, monkeypatch):
+        """The probe returns a document with table rows and stops issuing requests."""
+        from config import settings
+
+        monkeypatch.setattr(settings, "docuware_field_probe_concurrency", 1)
+        table_doc = {"Fields": [{"ItemElementName": "Table", "Item": {"$type": "DocumentIndexFieldTable", "Row": [{}]}}]}
+        conn = self._conn({2: {"Fields": []}, 3: table_doc, 7: table_doc})
+
+        result = DocuWareConnector(session_pool=MagicMock(), schema_cache=MagicMock())._probe_documents(
+            conn, "https://x/Documents", list(range(1, 11))
+        )
+
+        assert result is table_doc
+        assert len(conn.calls) <= 4  # Probes queued behind the hit never ran
+
+    @pytest.mark.unit
+    def test_falls_back_to_earliest_document(self):
+        """Without table data anywhere, the earliest document found is used."""
+        conn = self._conn({4: {"Fields": [{"FieldName": "A"}]}, 9: {"Fields": [{"FieldName": "B"}]}})
+
+        result = DocuWareConnector(session_pool=MagicMock(), schema_cache=MagicMock())._probe_documents(
+            conn, "https://x/Documents", list(range(1, 11))
+        )
+
+        assert result == {"Fields": [{"FieldName": "A"}]}
@@ -0,0 +1,183 @@
+"""
+Tests for the DocuWare session pool.
+Tests per-account reuse, shared logins under concurrency, LRU eviction, early refresh,
+login throttling on the event loop and the lockout after repeated failures.
+"""
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+import pytest
+
+from connectors.docuware_session_pool import DocuWareSessionPool, DocuWareLoginBlocked
+
+SERVER = "https://acme.docuware.cloud"
+
+
+class FakeLogin:
+    """Login callable that counts calls per account and can be told to fail."""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, server_url, username, password):
+        self.calls.append(username)
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise Exception("401 Unauthorized")
+        return MagicMock(name=f"client-{username}")
+
+
+@pytest.fixture
+def fast_settings(monkeypatch):
+    from config import settings
+
+    monkeypatch.setattr(settings, "docuware_min_login_interval_seconds", 0)
+    return settings
+
+
+class TestSessionReuse:
+    """Test that logins are shared per account."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_sessions_are_kept_per_account(self, fast_settings):
+        """Alternating accounts reuse their own sessions instead of logging each other out."""
+        login = FakeLogin()
+        pool = DocuWareSessionPool(login_func=login)
+
+        for _ in range(3):
+            a = await pool.acquire(SERVER, "org-a", "pw-a")
+            b = await pool.acquire(SERVER, "org-b", "pw-b")
+
+        assert login.calls == ["org-a", "org-b"]
+        assert a is not b and a.client is not b.client
+        assert pool.stats()["reused"] == 4
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_acquire_logs_in_once(self, fast_settings):
+        """Uploads racing for the same account wait for one login."""
+        login = FakeLogin(delay=0.05)
+        pool = DocuWareSessionPool(login_func=login)
+
+        sessions = await asyncio.gather(*[pool.acquire(SERVER, "org-a", "pw") for _ in range(5)])
+
+        assert login.calls == ["org-a"]
+        assert len({id(session) for session in sessions}) == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_changed_password_logs_in_again(self, fast_settings):
+        """New credentials for the same account replace the login and its cabinet objects."""
+        login = FakeLogin()
+        pool = DocuWareSessionPool(login_func=login)
+
+        session = await pool.acquire(SERVER, "org-a", "old")
+        session.cabinet_cache["cab-1"] = object()
+
+        assert await pool.acquire(SERVER, "org-a", "new") is session
+        assert len(login.calls) == 2
+        assert session.cabinet_cache == {}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self, fast_settings):
+        """The least recently used account is dropped when the pool is full."""
+        pool = DocuWareSessionPool(max_sessions=2, login_func=FakeLogin())
+
+        await pool.acquire(SERVER, "org-a", "pw")
+        await pool.acquire(SERVER, "org-b", "pw")
+        await pool.acquire(SERVER, "org-a", "pw")  # org-b is now least recently used
+        await pool.acquire(SERVER, "org-c", "pw")
+
+        assert pool.get(SERVER, "org-b") is None
+        assert pool.get(SERVER, "org-a") is not None
+        assert pool.stats()["evicted"] == 1
+
+
+class TestRefreshAndThrottling:
+    """Test early refresh, throttling and lockout."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_refresh_before_expiry(self, fast_settings, monkeypatch):
+        """A login inside the refresh margin is renewed; a failed renewal keeps the valid login."""
+        monkeypatch.setattr(fast_settings, "docuware_session_ttl_seconds", 100)
+        monkeypatch.setattr(fast_settings, "docuware_session_refresh_margin_seconds", 10)
+        login = FakeLogin()
+        pool = DocuWareSessionPool(login_func=login)
+
+        session = await pool.acquire(SERVER, "org-a", "pw")
+        first_client = session.client
+        session.logged_in_at -= 95  # 5s left before the TTL
+
+        await pool.acquire(SERVER, "org-a", "pw")
+        assert session.client is not first_client
+        assert pool.stats()["refreshed"] == 1
+
+        session.logged_in_at -= 95
+        login.fail = True
+        assert await pool.acquire(SERVER, "org-a", "pw") is session
+        assert session.is_logged_in
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_throttle_waits_on_event_loop(self, monkeypatch):
+        """Back-to-back logins wait with asyncio.sleep, never on the login thread."""
+        from config import settings
+
+        monkeypatch.setattr(settings, "docuware_min_login_interval_seconds", 0.2)
+        login_threads = []
+
+        def login(server_url, username, password):
+            login_threads.append(threading.current_thread())
+            return MagicMock()
+
+        pool = DocuWareSessionPool(login_func=login)
+        await pool.acquire(SERVER, "org-a", "pw")
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        started = time.monotonic()
+        await pool.acquire(SERVER, "org-a", "pw", force_login=True)
+        elapsed = time.monotonic() - started
+        task.cancel()
+
+        assert elapsed >= 0.15
+        assert ticks >= 10  # The loop kept running while the login waited
+        assert pool.stats()["throttled_seconds"] > 0
+        assert threading.main_thread() not in login_threads
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_lockout_after_repeated_failures(self, fast_settings, monkeypatch):
+        """After max failures the account isn't tried again until the lockout passes or it is cleared."""
+        monkeypatch.setattr(fast_settings, "docuware_max_login_failures", 2)
+        login = FakeLogin(fail=True)
+        pool = DocuWareSessionPool(login_func=login)
+
+        for _ in range(2):
+            with pytest.raises(Exception, match="401"):
+                await pool.acquire(SERVER, "org-a", "wrong")
+
+        with pytest.raises(DocuWareLoginBlocked):
+            await pool.acquire(SERVER, "org-a", "wrong")
+        assert len(login.calls) == 2
+
+        # Other accounts are unaffected; clearing the config lifts the block
+        login.fail = False
+        await pool.acquire(SERVER, "org-b", "pw")
+        assert pool.invalidate(SERVER, "org-a") is True
+        await pool.acquire(SERVER, "org-a", "right")
+        assert pool.stats()["failed_logins"] == 2
@@ -0,0 +1,169 @@
+"""
+Tests for per-account Google Drive connectors.
+Tests that API calls run off the event loop against a local fake Drive server, that
+tokens are refreshed once under concurrency, and that the client pool keeps one
+authenticated connector per account with LRU eviction.
+"""
+import asyncio
+import time
+import pytest
+from google.auth.credentials import Credentials
+
+from connectors.connector_manager import ConnectorManager
+from connectors.google_drive_client_pool import GoogleDriveClientPool
+from connectors.google_drive_connector import GoogleDriveConnector
+from models import DocumentCategory
+
+ACCOUNT_A = {"refresh_token": "token-a", "client_id": "client", "client_secret": "secret"}
+ACCOUNT_B = {"refresh_token": "token-b", "client_id": "client", "client_secret": "secret"}
+
+
+class CountingCredentials(Credentials):
+    """Credentials with no token yet whose refresh is slow and counted."""
+
+    def __init__(self):
+        super().__init__()
+        self.refreshes = 0
+
+    def refresh(self, request):
+        time.sleep(0.05)
+        self.refreshes += 1
+        self.token = f"access-{self.refreshes}"
+
+
+class FakeAuthConnector(GoogleDriveConnector):
+    """Connector whose authentication is counted instead of calling Google."""
+
+    logins = []
+
+    async def authenticate(self, credentials_dict):
+        self.logins.append(credentials_dict["refresh_token"])
+        await asyncio.sleep(0.02)
+        if credentials_dict["refresh_token"] == "revoked":
+            return False
+        self.service = object()
+        return True
+
+
+@pytest.fixture
+def dms_latency():
+    return 0.1
+
+
+@pytest.fixture
+def fake_auth():
+    FakeAuthConnector.logins = []
+    return FakeAuthConnector
+
+
+class TestNonBlockingCalls:
+    """Test that Drive API calls leave the event loop free."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_calls_run_in_parallel_off_the_loop(self, drive_connector):
+        """Eight 100ms lookups finish in about one round trip while the loop keeps ticking."""
+        connector = drive_connector()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        started = time.monotonic()
+        results = await asyncio.gather(*[
+            connector._execute(connector.service.files().list(q=f"name='f{i}'")) for i in range(8)
+        ])
+        elapsed = time.monotonic() - started
+        task.cancel()
+
+        assert all(result == {"files": []} for result in results)
+        assert elapsed < 0.5
+        assert ticks >= 5
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_folder_creation_against_fake_drive(self, server, drive_connector):
+        """Root and category folders are created once and then found again."""
+        connector = drive_connector()
+
+        root_id = await connector.get_or_create_root_folder("DocuFlow")
+        assert root_id == await drive_connector().get_or_create_root_folder("DocuFlow")
+        assert await connector.get_or_create_category_folder(DocumentCategory.INVOICE) is not None
+        assert sorted(f["name"] for f in server.state.files.values()) == ["DocuFlow", "Invoices"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_token_refreshed_once_for_concurrent_calls(self, drive_connector):
+        """Threads starting with an expired token share one refresh."""
+        credentials = CountingCredentials()
+        connector = drive_connector(credentials=credentials)
+
+        await asyncio.gather(*[
+            connector._execute(connector.service.files().list(q="name='x'")) for _ in range(6)
+        ])
+
+        assert credentials.refreshes == 1
+
+
+class TestClientPool:
+    """Test GoogleDriveClientPool."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_one_connector_per_account(self, fake_auth):
+        """Accounts get their own connectors; concurrent requests for one account authenticate once."""
+        pool = GoogleDriveClientPool(connector_factory=fake_auth)
+
+        a1, a2, b = await asyncio.gather(pool.acquire(ACCOUNT_A), pool.acquire(ACCOUNT_A), pool.acquire(ACCOUNT_B))
+
+        assert a1 is a2
+        assert a1 is not b
+        assert sorted(fake_auth.logins) == ["token-a", "token-b"]
+        assert pool.stats()["reused"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failed_authentication_is_not_pooled(self, fake_auth):
+        """A rejected account returns None and is tried again next time."""
+        pool = GoogleDriveClientPool(connector_factory=fake_auth)
+        revoked = dict(ACCOUNT_A, refresh_token="revoked")
+
+        assert await pool.acquire(revoked) is None
+        assert await pool.acquire(revoked) is None
+        assert fake_auth.logins == ["revoked", "revoked"]
+        assert pool.stats()["failed"] == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_lru_eviction_and_invalidate(self, fake_auth):
+        """The least recently used account is dropped when full; invalidate drops one account."""
+        pool = GoogleDriveClientPool(max_clients=2, connector_factory=fake_auth)
+        account_c = dict(ACCOUNT_A, refresh_token="token-c")
+
+        await pool.acquire(ACCOUNT_A)
+        await pool.acquire(ACCOUNT_B)
+        await pool.acquire(ACCOUNT_A)  # B is now least recently used
+        await pool.acquire(account_c)
+
+        assert pool.get(ACCOUNT_B) is None
+        assert pool.get(ACCOUNT_A) is not None
+        assert pool.stats()["evicted"] == 1
+
+        assert pool.invalidate(ACCOUNT_A) is True
+        assert pool.get(ACCOUNT_A) is None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_manager_uses_each_organizations_account(self, fake_auth):
+        """Two organizations' configs never share the first one's Drive service."""
+        manager = ConnectorManager(google_drive_pool=GoogleDriveClientPool(connector_factory=fake_auth))
+
+        org_a = await manager.get_google_drive_connector(ACCOUNT_A)
+        org_b = await manager.get_google_drive_connector(ACCOUNT_B)
+
+        assert org_a is not org_b
+        assert fake_auth.logins == ["token-a", "token-b"]
@@ -0,0 +1,77 @@
+"""
+Tests for Google Drive duplicate filename resolution.
+Tests that existing numbered copies are found with one listing, that concurrent uploads
+into one folder share the listing and get distinct names, and that a failed upload
+gives its reserved name back, against the local mock DMS server.
+"""
+import asyncio
+import pytest
+
+from models import DocumentCategory, ExtractedData
+
+FOLDER = "folder-1"
+
+
+@pytest.fixture
+def dms_latency():
+    return 0.02
+
+
+@pytest.fixture
+def drive_seed_folders():
+    return {FOLDER: "Invoices"}
+
+
+def add_files(server, *names):
+    for i, name in enumerate(names):
+        server.state.files[f"existing-{name}-{i}"] = {"name": name, "parent": FOLDER, "mimeType": "application/pdf"}
+
+
+class TestDuplicateFilenames:
+    """Test GoogleDriveConnector._handle_duplicate_filename."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_next_free_number_from_one_listing(self, server, drive_connector):
+        """Five existing copies cost one list call, not six."""
+        add_files(server, "O'Brien.pdf", *[f"O'Brien ({n}).pdf" for n in range(1, 5)], "Other.pdf")
+        connector = drive_connector()
+
+        name = await connector._handle_duplicate_filename("O'Brien.pdf", FOLDER)
+
+        assert name == "O'Brien (5).pdf"
+        assert server.state.stats()["list_calls"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_names_share_one_listing(self, server, drive_connector):
+        """Uploads racing into one folder get distinct names; later ones need no listing."""
+        add_files(server, "invoice.pdf")
+        connector = drive_connector()
+
+        names = await asyncio.gather(*[
+            connector._handle_duplicate_filename("invoice.pdf", FOLDER) for _ in range(4)
+        ])
+        later = await connector._handle_duplicate_filename("invoice.pdf", FOLDER)
+
+        assert sorted(names) == [f"invoice ({n}).pdf" for n in range(1, 5)]
+        assert later == "invoice (5).pdf"
+        assert server.state.stats()["list_calls"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failed_upload_releases_its_name(self, tmp_path, drive_connector):
+        """A name reserved by an upload that failed is given to the next upload."""
+        connector = drive_connector()
+        extracted = ExtractedData(vendor="Acme", document_number="INV-1", date="2025-01-31")
+        storage_config = {"root_folder_name": "DocuFlow", "primary_level": "category"}
+        pdf = tmp_path / "scan.pdf"
+        pdf.write_bytes(b"%PDF-1.4\n")
+
+        failed = await connector.upload_document(
+            tmp_path / "missing.pdf", extracted, DocumentCategory.INVOICE, storage_config
+        )
+        uploaded = await connector.upload_document(pdf, extracted, DocumentCategory.INVOICE, storage_config)
+
+        assert failed is None
+        assert uploaded["filename"] == "2025-01-31_Acme_INV-1.pdf"
@@ -0,0 +1,140 @@
+"""
+Tests for the Google Drive folder-tree cache.
+Tests that warm folder paths cost no API calls, that folder IDs survive a new connector
+(restart), that a folder deleted in Drive is recreated after the upload is rejected, and
+that concurrent uploads, in one process or several, create each folder once, against the
+local mock DMS server.
+"""
+import asyncio
+import pytest
+
+from benchmarks.mock_dms_server import FOLDER_MIME
+from connectors.google_drive_folder_cache import GoogleDriveFolderCache
+from models import DocumentCategory, ExtractedData
+
+ACCOUNT = "account-a"
+STORAGE_CONFIG = {"root_folder_name": "DocuFlow", "primary_level": "category", "secondary_level": "vendor"}
+
+
+def folders(server):
+    return sorted(f["name"] for f in server.state.files.values() if f["mimeType"] == FOLDER_MIME)
+
+
+async def upload(connector, pdf, vendor="Acme"):
+    return await connector.upload_document(
+        pdf, ExtractedData(vendor=vendor, date="2025-01-31"), DocumentCategory.INVOICE, STORAGE_CONFIG
+    )
+
+
+class TestWarmFolderPath:
+    """Test that cached folder IDs are trusted without API calls."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_warm_path_makes_no_folder_calls(self, server, pdf, drive_connector):
+        """The second upload to the same 3-level path doesn't look up or check any folder."""
+        connector = drive_connector()
+
+        first = await upload(connector, pdf)
+        calls = server.state.stats()["folder_calls"]
+        second = await upload(connector, pdf)
+
+        assert first is not None and second is not None
+        assert server.state.stats()["folder_calls"] == calls
+        assert folders(server) == ["Acme", "DocuFlow", "Invoices"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_folders_survive_a_new_connector(self, server, pdf, app_db, drive_connector):
+        """A connector for the same account (e.g. after a restart) starts from the stored folder IDs."""
+        await upload(drive_connector(ACCOUNT), pdf)
+        calls = server.state.stats()["folder_calls"]
+
+        restarted = drive_connector(ACCOUNT)
+        assert await upload(restarted, pdf) is not None
+
+        assert server.state.stats()["folder_calls"] == calls
+        assert len(await app_db.get_google_drive_folders(ACCOUNT)) == 3
+        assert await app_db.get_google_drive_folders("account-b") == {}
+
+
+class TestStaleFolders:
+    """Test recovery when a cached folder was deleted in Drive."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_deleted_folder_is_recreated(self, server, pdf, app_db, drive_connector):
+        """The rejected upload re-validates the path, recreates the folder and is retried once."""
+        connector = drive_connector(ACCOUNT)
+        await upload(connector, pdf)
+        invoices_id = connector.folder_tree.peek("DocuFlow/Invoices")
+        server.state.delete_file(invoices_id)
+
+        result = await upload(connector, pdf)
+
+        assert result is not None
+        assert folders(server) == ["Acme", "DocuFlow", "Invoices"]
+        stored = await app_db.get_google_drive_folders(ACCOUNT)
+        assert stored["DocuFlow/Invoices"] != invoices_id
+        assert stored["DocuFlow/Invoices/Acme"] == connector.folder_tree.peek("DocuFlow/Invoices/Acme")
+        assert server.state.files[stored["DocuFlow/Invoices/Acme"]]["parent"] == stored["DocuFlow/Invoices"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_evict_removes_only_that_subtree(self, app_db):
+        """Evicting a path drops its descendants but not siblings sharing a name prefix."""
+        cache = GoogleDriveFolderCache(ACCOUNT)
+        for path, folder_id in [("DocuFlow", "1"), ("DocuFlow/Tax", "2"), ("DocuFlow/Tax/2025", "3"),
+                                ("DocuFlow/Tax Documents", "4")]:
+            await cache.put(path, folder_id)
+
+        await cache.evict("DocuFlow/Tax")
+
+        assert await app_db.get_google_drive_folders(ACCOUNT) == {"DocuFlow": "1", "DocuFlow/Tax Documents": "4"}
+        assert cache.peek("DocuFlow/Tax/2025") is None
+        assert cache.stats()["evictions"] == 2
+
+
+class TestConcurrentFolderCreation:
+    """Test single-flight folder creation within and across worker processes."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_parallel_uploads_create_each_folder_once(self, server, pdf, drive_connector):
+        """Uploads racing on a cold path share one lookup/creation per folder."""
+        connector = drive_connector()
+
+        results = await asyncio.gather(*[
+            upload(connector, pdf, vendor="Acme" if i % 2 else "Globex") for i in range(6)
+        ])
+
+        assert all(result is not None for result in results)
+        assert folders(server) == ["Acme", "DocuFlow", "Globex", "Invoices"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_worker_processes_share_each_folder(self, server, pdf, app_db, drive_connector):
+        """Connectors of one account in different processes end up with one folder per path."""
+        workers = [drive_connector(ACCOUNT) for _ in range(3)]
+
+        results = await asyncio.gather(*[upload(worker, pdf) for worker in workers])
+
+        assert all(result is not None for result in results)
+        assert folders(server) == ["Acme", "DocuFlow", "Invoices"]
+        stored = await app_db.get_google_drive_folders(ACCOUNT)
+        for worker in workers:
+            assert worker.folder_tree.peek("DocuFlow/Invoices/Acme") == stored["DocuFlow/Invoices/Acme"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_miss_rereads_folders_stored_since_load(self, server, pdf, app_db, drive_connector):
+        """A folder another process stored after this connector loaded its map is reused, not looked up."""
+        connector = drive_connector(ACCOUNT)
+        await connector.folder_tree.load()
+        await upload(drive_connector(ACCOUNT), pdf)
+        calls = server.state.stats()["folder_calls"]
+
+        assert await upload(connector, pdf) is not None
+
+        assert server.state.stats()["folder_calls"] == calls
+        assert folders(server) == ["Acme", "DocuFlow", "Invoices"]
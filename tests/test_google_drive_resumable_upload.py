@@ -0,0 +1,122 @@
+"""
+Tests for resumable chunked uploads to Google Drive.
+Tests chunking, retries with backoff on 5xx/429 that don't resend acknowledged bytes,
+resuming a stored session from a new connector (worker restart), and starting over when
+the stored session has expired, against the local mock DMS server.
+"""
+import pytest
+from googleapiclient.errors import HttpError
+
+from config import settings
+from connectors.google_drive_connector import upload_chunk_size
+
+FOLDER = "folder-1"
+CHUNK = 256 * 1024
+SIZE = 4 * CHUNK + 100  # Five chunks, the last one short
+METADATA = {"name": "scan.pdf", "parents": [FOLDER], "appProperties": {"category": "Invoice"}}
+
+
+@pytest.fixture
+def dms_latency():
+    return 0.0
+
+
+@pytest.fixture
+def drive_seed_folders():
+    return {FOLDER: "Invoices"}
+
+
+@pytest.fixture
+def pdf_size():
+    return SIZE
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "google_drive_upload_chunk_size", CHUNK)
+    monkeypatch.setattr(settings, "google_drive_upload_retry_base_seconds", 0.01)
+
+
+def uploaded_file(server, result):
+    return server.state.files[result["file_id"]]
+
+
+class TestChunkedUpload:
+    """Test chunking and retries within one upload."""
+
+    @pytest.mark.unit
+    def test_chunk_size_rounded_to_drive_granularity(self, monkeypatch):
+        """Drive needs multiples of 256 KiB; smaller settings still send 256 KiB."""
+        monkeypatch.setattr(settings, "google_drive_upload_chunk_size", 3 * CHUNK + 1000)
+        assert upload_chunk_size() == 3 * CHUNK
+        monkeypatch.setattr(settings, "google_drive_upload_chunk_size", 1)
+        assert upload_chunk_size() == CHUNK
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_file_sent_in_chunks(self, server, pdf, drive_connector):
+        """One session start plus one PUT per chunk."""
+        result = await drive_connector()._create_file(pdf, dict(METADATA))
+
+        assert uploaded_file(server, result)["size"] == SIZE
+        assert server.state.stats()["requests"] == 1 + 5
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_retries_5xx_and_429_without_resending(self, server, pdf, drive_connector):
+        """Failed chunks are retried from the last acknowledged byte."""
+        server.state.fail_chunks = [0, 503, 429, 0, 500]
+
+        result = await drive_connector()._create_file(pdf, dict(METADATA))
+
+        assert uploaded_file(server, result)["size"] == SIZE
+        assert server.state.stats()["upload_bytes"] == SIZE
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, server, pdf, monkeypatch, drive_connector):
+        """A chunk failing more than google_drive_upload_max_retries times fails the upload."""
+        monkeypatch.setattr(settings, "google_drive_upload_max_retries", 2)
+        server.state.fail_chunks = [503, 503, 503]
+
+        with pytest.raises(HttpError):
+            await drive_connector()._create_file(pdf, dict(METADATA))
+
+
+class TestStoredSessions:
+    """Test resuming uploads across connectors (worker restarts)."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_restart_resumes_from_last_acknowledged_byte(self, server, pdf, app_db, monkeypatch, drive_connector):
+        """A new connector for the same account finishes the upload without resending earlier chunks."""
+        monkeypatch.setattr(settings, "google_drive_upload_max_retries", 0)
+        server.state.fail_chunks = [0, 0, 503]
+        with pytest.raises(HttpError):
+            await drive_connector("account-a")._create_file(pdf, dict(METADATA))
+
+        result = await drive_connector("account-a")._create_file(pdf, dict(METADATA))
+
+        assert uploaded_file(server, result)["size"] == SIZE
+        assert server.state.stats()["upload_bytes"] == SIZE
+        db = await app_db.get_db()
+        try:
+            cursor = await db.execute("SELECT COUNT(*) FROM google_drive_upload_sessions")
+            assert (await cursor.fetchone())[0] == 0
+        finally:
+            await db.close()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_expired_session_starts_over(self, server, pdf, app_db, monkeypatch, drive_connector):
+        """If Drive no longer knows the stored session, the upload starts a new one."""
+        monkeypatch.setattr(settings, "google_drive_upload_max_retries", 0)
+        server.state.fail_chunks = [0, 503]
+        with pytest.raises(HttpError):
+            await drive_connector("account-a")._create_file(pdf, dict(METADATA))
+        server.state.upload_sessions.clear()
+
+        result = await drive_connector("account-a")._create_file(pdf, dict(METADATA))
+
+        assert uploaded_file(server, result)["size"] == SIZE
+        assert server.state.stats()["upload_bytes"] == SIZE + CHUNK
@@ -0,0 +1,225 @@
+"""
+Tests for incremental batch uploads.
+Tests that files are queued as they arrive, that the batch only finalizes after the upload
+is completed, and the uploading batch lifecycle state.
+"""
+import os
+from unittest.mock import AsyncMock
+import pytest
+import PyPDF2
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from backend.database import get_batch
+from job_queue import JobQueue, JOB_TYPE_DOCUMENT, JOB_TYPE_FINALIZE
+
+
+def _pdf_bytes(tmp_path, name="doc.pdf", pages=1):
+    writer = PyPDF2.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    path = tmp_path / name
+    with open(path, "wb") as file:
+        writer.write(file)
+    return path.read_bytes()
+
+
+def _result(job):
+    return {
+        "filename": job["filename"],
+        "original_path": job["file_path"],
+        "category": "Invoice",
+        "confidence": 0.9,
+        "extracted_text_preview": "",
+        "error": None,
+        "processing_time": 0.1
+    }
+
+
+@pytest.fixture
+async def client(app_db, user_with_organization, tmp_path, monkeypatch):
+    from config import settings
+    from routes import upload
+    from auth import get_current_user
+
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path / "uploads"))
+    monkeypatch.setattr(upload, "job_queue", JobQueue())
+    monkeypatch.setattr(upload, "get_subscription", AsyncMock(return_value={"plan_type": "trial"}))
+
+    app = FastAPI()
+    app.include_router(upload.router, prefix="/api")
+    app.dependency_overrides[get_current_user] = lambda: user_with_organization["user"]
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+async def _open(client, total_files):
+    response = await client.post("/api/batches", json={"total_files": total_files})
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestIncrementalUpload:
+    """Test the open / add file / complete flow."""
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_files_queued_as_they_arrive(self, client, tmp_path):
+        """Each file is claimable right after its own upload, before the batch is complete."""
+        from routes import upload
+
+        batch = await _open(client, 2)
+        assert batch["status"] == "uploading"
+
+        response = await client.post(
+            f"/api/batches/{batch['batch_id']}/files",
+            files={"file": ("a.pdf", _pdf_bytes(tmp_path, pages=2), "application/pdf")}
+        )
+        assert response.status_code == 200
+        assert response.json()["received_files"] == 1
+        assert response.json()["page_count"] == 2
+
+        [job] = await upload.job_queue.claim("worker-a")
+        assert job["filename"] == "a.pdf"
+
+        status = await client.get(f"/api/status/{batch['batch_id']}")
+        assert status.json()["status"] == "uploading"
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_finalize_waits_for_complete(self, client, tmp_path, user_with_organization):
+        """Processing every received file doesn't finalize the batch until the upload is completed."""
+        from routes import upload
+        queue = upload.job_queue
+
+        batch = await _open(client, 3)
+        batch_id = batch["batch_id"]
+        for name in ("a.pdf", "b.pdf"):
+            await client.post(f"/api/batches/{batch_id}/files",
+                              files={"file": (name, _pdf_bytes(tmp_path), "application/pdf")})
+
+        for job in await queue.claim("worker-a", limit=2):
+            await queue.finish_document(job, "worker-a", _result(job))
+        assert not any(j["job_type"] == JOB_TYPE_FINALIZE for j in await queue.get_batch_jobs(batch_id))
+
+        # The client gives up on the third file and completes with two
+        response = await client.post(f"/api/batches/{batch_id}/complete")
+        assert response.status_code == 200
+        assert response.json()["status"] == "processing"
+        assert response.json()["total_files"] == 2
+
+        jobs = await queue.get_batch_jobs(batch_id)
+        assert [j["job_type"] for j in jobs].count(JOB_TYPE_FINALIZE) == 1
+
+        stored = await get_batch(batch_id, user_with_organization["user"]["id"])
+        assert (stored["status"], stored["total_files"], stored["processed_files"]) == ("processing", 2, 2)
+
+        # Completing twice or adding files afterwards is rejected
+        assert (await client.post(f"/api/batches/{batch_id}/complete")).status_code == 409
+        late = await client.post(f"/api/batches/{batch_id}/files",
+                                 files={"file": ("c.pdf", _pdf_bytes(tmp_path), "application/pdf")})
+        assert late.status_code == 409
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_complete_before_processing_finishes(self, client, tmp_path):
+        """A batch completed while files are still queued finalizes after its last document."""
+        from routes import upload
+        queue = upload.job_queue
+
+        batch = await _open(client, 1)
+        batch_id = batch["batch_id"]
+        await client.post(f"/api/batches/{batch_id}/files",
+                          files={"file": ("a.pdf", _pdf_bytes(tmp_path), "application/pdf")})
+        await client.post(f"/api/batches/{batch_id}/complete")
+        assert not any(j["job_type"] == JOB_TYPE_FINALIZE for j in await queue.get_batch_jobs(batch_id))
+
+        [job] = await queue.claim("worker-a")
+        await queue.finish_document(job, "worker-a", _result(job))
+        assert [j["job_type"] for j in await queue.get_batch_jobs(batch_id)] == [JOB_TYPE_DOCUMENT, JOB_TYPE_FINALIZE]
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_upload_limits(self, client, tmp_path):
+        """Files beyond the announced count and invalid PDFs are rejected per file."""
+        batch = await _open(client, 1)
+        batch_id = batch["batch_id"]
+
+        broken = await client.post(f"/api/batches/{batch_id}/files",
+                                   files={"file": ("bad.pdf", b"not a pdf", "application/pdf")})
+        assert broken.status_code == 400
+
+        ok = await client.post(f"/api/batches/{batch_id}/files",
+                               files={"file": ("a.pdf", _pdf_bytes(tmp_path), "application/pdf")})
+        assert ok.status_code == 200
+
+        extra = await client.post(f"/api/batches/{batch_id}/files",
+                                  files={"file": ("b.pdf", _pdf_bytes(tmp_path), "application/pdf")})
+        assert extra.status_code == 400
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_complete_without_files_fails_batch(self, client, user_with_organization):
+        """Completing an upload that received nothing marks the batch failed."""
+        batch = await _open(client, 2)
+
+        response = await client.post(f"/api/batches/{batch['batch_id']}/complete")
+        assert response.status_code == 400
+
+        stored = await get_batch(batch["batch_id"], user_with_organization["user"]["id"])
+        assert stored["status"] == "failed"
+
+    @pytest.mark.api
+    @pytest.mark.asyncio
+    async def test_complete_while_file_is_saved(self, client, tmp_path, user_with_organization, monkeypatch):
+        """A file whose batch is completed while it's being saved is rejected and deleted."""
+        from routes import upload
+        queue = upload.job_queue
+        user_id = user_with_organization["user"]["id"]
+
+        batch = await _open(client, 3)
+        batch_id = batch["batch_id"]
+        await client.post(f"/api/batches/{batch_id}/files",
+                          files={"file": ("a.pdf", _pdf_bytes(tmp_path), "application/pdf")})
+
+        save_upload = upload._save_upload
+        saved = []
+
+        async def save_then_complete(file, upload_folder):
+            file_path, preflight = await save_upload(file, upload_folder)
+            saved.append(file_path)
+            await queue.seal_batch(batch_id, user_id, None)
+            return file_path, preflight
+
+        monkeypatch.setattr(upload, "_save_upload", save_then_complete)
+        late = await client.post(f"/api/batches/{batch_id}/files",
+                                 files={"file": ("b.pdf", _pdf_bytes(tmp_path), "application/pdf")})
+
+        assert late.status_code == 409
+        assert not os.path.exists(saved[0])
+        jobs = await queue.get_batch_jobs(batch_id)
+        assert [job["filename"] for job in jobs if job["job_type"] == JOB_TYPE_DOCUMENT] == ["a.pdf"]
+        stored = await get_batch(batch_id, user_id)
+        assert stored["total_files"] == 1
+
+
+class TestBatchFileQueue:
+    """Test the guarded insert of an uploading batch's files."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_enqueue_only_into_open_batch_with_room(self, app_db, user_with_organization):
+        """Files past total_files, or for a sealed or cancelled batch, aren't queued."""
+        from backend.database import create_batch
+        queue = JobQueue()
+        user_id = user_with_organization["user"]["id"]
+
+        await create_batch("batch-a", user_id, 2, status="uploading")
+        assert await queue.enqueue_batch_file("batch-a", user_id, None, "/tmp/a.pdf") == 1
+        assert await queue.enqueue_batch_file("batch-a", user_id, None, "/tmp/b.pdf") == 2
+        assert await queue.enqueue_batch_file("batch-a", user_id, None, "/tmp/c.pdf") is None
+
+        await create_batch("batch-b", user_id, 2, status="uploading")
+        await queue.cancel_batch("batch-b", user_id)
+        assert await queue.enqueue_batch_file("batch-b", user_id, None, "/tmp/a.pdf") is None
+        assert await queue.get_batch_jobs("batch-b") == []
@@ -0,0 +1,236 @@
+"""
+Tests for the durable processing job queue and workers.
+Tests leasing, lease expiry and fencing, retry backoff, checkpoint resume and batch finalization.
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from backend.database import create_batch, get_batch, get_batch_with_results
+from job_queue import (
+    JobQueue, LeaseLostError, PermanentJobError,
+    JOB_QUEUED, JOB_RUNNING, JOB_COMPLETED, JOB_FAILED, JOB_TYPE_FINALIZE,
+    STAGE_OCR_DONE, STAGE_ROUTED
+)
+
+
+@pytest.fixture
+def queue(app_db):
+    """Job queue bound to the test database."""
+    return JobQueue()
+
+
+async def _queue_batch(queue, user, count=2, batch_id="batch-1"):
+    await create_batch(batch_id, user["id"], count)
+    await queue.enqueue_documents(batch_id, user["id"], None, [f"/tmp/doc{i}.pdf" for i in range(count)])
+
+
+def _result(job, error=None):
+    return {
+        "filename": job["filename"],
+        "original_path": job["file_path"],
+        "category": "Invoice",
+        "confidence": 0.9,
+        "extracted_text_preview": "",
+        "error": error,
+        "processing_time": 0.1
+    }
+
+
+class TestJobLeasing:
+    """Test claims, heartbeats and lease fencing."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_claims_never_share_a_job(self, queue, created_user):
+        """Each job is leased by exactly one worker."""
+        await _queue_batch(queue, created_user, count=6)
+
+        claims = await asyncio.gather(*[queue.claim(f"worker-{i}", limit=2) for i in range(5)])
+        claimed_ids = [job["id"] for jobs in claims for job in jobs]
+
+        assert len(claimed_ids) == 6
+        assert len(set(claimed_ids)) == 6
+        assert all(job["status"] == JOB_RUNNING and job["attempts"] == 1 for jobs in claims for job in jobs)
+        assert await queue.claim("worker-late") == []
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_reclaimed_and_old_owner_fenced(self, queue, created_user, monkeypatch):
+        """A worker that stops heartbeating loses its job, and can no longer write to it."""
+        from config import settings
+
+        await _queue_batch(queue, created_user, count=1)
+        monkeypatch.setattr(settings, "job_lease_seconds", 0.05)
+
+        [job] = await queue.claim("worker-a")
+        await queue.save_checkpoint(job["id"], "worker-a", STAGE_OCR_DONE, {"text": "hello"})
+        assert await queue.heartbeat("worker-a", [job["id"]]) == [job["id"]]
+
+        await asyncio.sleep(0.1)
+        [reclaimed] = await queue.claim("worker-b")
+        assert reclaimed["id"] == job["id"]
+        assert reclaimed["attempts"] == 2
+        assert reclaimed["stage"] == STAGE_OCR_DONE
+        assert reclaimed["checkpoint"] == {"text": "hello"}
+
+        assert await queue.heartbeat("worker-a", [job["id"]]) == []
+        with pytest.raises(LeaseLostError):
+            await queue.save_checkpoint(job["id"], "worker-a", STAGE_ROUTED, {})
+        with pytest.raises(LeaseLostError):
+            await queue.finish_document(job, "worker-a", _result(job))
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_retry_waits_for_backoff(self, queue, created_user):
+        """A retried job keeps its checkpoint and is not claimable until its delay passes."""
+        await _queue_batch(queue, created_user, count=1)
+
+        [job] = await queue.claim("worker-a")
+        await queue.save_checkpoint(job["id"], "worker-a", STAGE_OCR_DONE, {"text": "hello"})
+        assert await queue.retry(job, "worker-a", "API timeout", delay=0.2)
+
+        assert await queue.claim("worker-b") == []
+        await asyncio.sleep(0.25)
+
+        [retried] = await queue.claim("worker-b")
+        assert retried["stage"] == STAGE_OCR_DONE
+        assert retried["last_error"] == "API timeout"
+        assert retried["attempts"] == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_release_does_not_count_attempt(self, queue, created_user):
+        """Jobs handed back on shutdown are immediately claimable without burning an attempt."""
+        await _queue_batch(queue, created_user, count=1)
+
+        [job] = await queue.claim("worker-a")
+        assert await queue.release("worker-a", [job["id"]]) == 1
+
+        [job] = await queue.claim("worker-b")
+        assert job["attempts"] == 1
+
+
+class TestBatchCompletion:
+    """Test result recording and the finalize hand-off."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_finalize_job_queued_after_last_document(self, queue, created_user):
+        """Results are appended with the job, and the batch gets exactly one finalize job."""
+        await _queue_batch(queue, created_user, count=2)
+        first, second = await queue.claim("worker-a", limit=2)
+
+        position = await queue.finish_document(first, "worker-a", _result(first))
+        assert position == {"seq": 1, "processed_files": 1, "total_files": 2}
+        assert not any(j["job_type"] == JOB_TYPE_FINALIZE for j in await queue.get_batch_jobs("batch-1"))
+
+        await queue.finish_document(second, "worker-a", _result(second, error="OCR failed"))
+
+        jobs = await queue.get_batch_jobs("batch-1")
+        assert [j["status"] for j in jobs if j["job_type"] != JOB_TYPE_FINALIZE] == [JOB_COMPLETED, JOB_FAILED]
+        assert [j["status"] for j in jobs if j["job_type"] == JOB_TYPE_FINALIZE] == [JOB_QUEUED]
+
+        batch = await get_batch("batch-1", created_user["id"])
+        assert (batch["processed_files"], batch["successful"], batch["failed"]) == (2, 1, 1)
+
+
+class TestPipelineResume:
+    """Test that resumed jobs skip finished stages."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_resume_skips_ocr(self, queue, created_user):
+        """A job checkpointed after OCR goes straight to extraction."""
+        from models import DocumentCategory, ExtractedData
+        from services.document_pipeline import DocumentPipeline
+
+        await _queue_batch(queue, created_user, count=1)
+        [job] = await queue.claim("worker-a")
+        await queue.save_checkpoint(job["id"], "worker-a", STAGE_OCR_DONE, {"text": "Invoice from ACME", "elapsed": 2.0})
+        await queue.retry(job, "worker-a", "Claude overloaded", delay=0)
+        [job] = await queue.claim("worker-b")
+
+        pipeline = DocumentPipeline()
+        pipeline.queue = queue
+        pipeline.ocr_service = Mock()
+        pipeline.ai_service = Mock()
+        pipeline.ai_service.categorize_document = AsyncMock(
+            return_value=(DocumentCategory.INVOICE, 0.9, ExtractedData(vendor="ACME"))
+        )
+
+        with patch("services.document_pipeline.get_current_config_with_decrypted_password", AsyncMock(return_value=None)):
+            result = await pipeline.process_document(job, "worker-b")
+
+        pipeline.ocr_service.extract_text_from_file.assert_not_called()
+        pipeline.ai_service.categorize_document.assert_awaited_once()
+        assert result["category"] == "Invoice"
+        assert result["extracted_text_preview"] == "Invoice from ACME"
+        assert result["processing_time"] >= 2.0
+
+        [job] = [j for j in await queue.get_batch_jobs("batch-1") if j["id"] == job["id"]]
+        assert job["stage"] == STAGE_ROUTED
+        assert job["status"] == JOB_COMPLETED
+        assert "text" not in job["checkpoint"]
+
+
+class TestJobWorker:
+    """Test the worker loop end to end with a stub pipeline."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_worker_retries_and_finalizes(self, queue, created_user, monkeypatch):
+        """Transient failures are retried, permanent ones recorded, and the batch finalized."""
+        from config import settings
+        from database import finish_batch
+        from services.pipeline_stages import StageSpec
+        from worker import JobWorker
+
+        monkeypatch.setattr(settings, "job_retry_base_seconds", 0.01)
+        await _queue_batch(queue, created_user, count=3)
+
+        calls = {}
+
+        class StubPipeline:
+            def stages(self):
+                return [StageSpec("process", STAGE_ROUTED, self.process, 1)]
+
+            async def process(self, job, checkpoint):
+                calls[job["filename"]] = calls.get(job["filename"], 0) + 1
+                if job["filename"] == "doc0.pdf" and job["attempts"] == 1:
+                    raise RuntimeError("Claude overloaded")
+                if job["filename"] == "doc1.pdf":
+                    raise PermanentJobError("Text quality check failed")
+
+            async def run_stage(self, job, worker_id, next_stage, handler):
+                await handler(job, job["checkpoint"])
+                job["stage"] = next_stage
+
+            async def complete_document(self, job, worker_id):
+                await queue.finish_document(job, worker_id, _result(job))
+
+            async def fail_document(self, job, worker_id, error):
+                await queue.finish_document(job, worker_id, _result(job, error=error))
+
+            async def finalize_batch(self, job, worker_id):
+                await finish_batch(job["batch_id"], "completed")
+                await queue.finish(job, worker_id)
+
+        worker = JobWorker(queue=queue, pipeline=StubPipeline(), worker_id="worker-a", concurrency=2, poll_interval=0.01)
+        worker.start()
+        try:
+            deadline = time.monotonic() + 5
+            while (await get_batch("batch-1", created_user["id"]))["status"] != "completed":
+                assert time.monotonic() < deadline, "batch did not complete"
+                await asyncio.sleep(0.02)
+        finally:
+            await worker.stop()
+
+        assert calls == {"doc0.pdf": 2, "doc1.pdf": 1, "doc2.pdf": 1}
+
+        batch = await get_batch_with_results("batch-1", created_user["id"])
+        assert (batch["successful"], batch["failed"]) == (2, 1)
+        errors = {r["filename"]: r["error"] for r in batch["results"]}
+        assert errors["doc1.pdf"] == "Text quality check failed"
+        assert all(j["status"] != JOB_RUNNING for j in await queue.get_batch_jobs("batch-1"))
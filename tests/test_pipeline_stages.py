@@ -0,0 +1,157 @@
+"""
+Tests for staged execution of document jobs.
+Tests per-stage concurrency, backpressure between stages, resume entry points and stage metrics.
+"""
+import asyncio
+import pytest
+
+from job_queue import STAGE_UPLOADED, STAGE_OCR_DONE, STAGE_EXTRACTED, STAGE_ROUTED
+from services.pipeline_stages import StageSpec, StagedPipeline
+
+
+class StubPipeline:
+    """Two-stage pipeline whose route stage can be held open."""
+
+    def __init__(self):
+        self.ocr_calls = []
+        self.route_calls = []
+        self.completed = []
+        self.route_open = asyncio.Event()
+
+    def stages(self):
+        return [
+            StageSpec("ocr", STAGE_OCR_DONE, self.ocr, 1),
+            StageSpec("route", STAGE_ROUTED, self.route, 1),
+        ]
+
+    async def ocr(self, job, checkpoint):
+        self.ocr_calls.append(job["id"])
+
+    async def route(self, job, checkpoint):
+        self.route_calls.append(job["id"])
+        await self.route_open.wait()
+
+    async def run_stage(self, job, worker_id, next_stage, handler):
+        await handler(job, job["checkpoint"])
+        job["stage"] = next_stage
+
+    async def complete_document(self, job, worker_id):
+        self.completed.append(job["id"])
+
+
+def _job(job_id, stage=STAGE_UPLOADED):
+    return {"id": job_id, "stage": stage, "checkpoint": {}}
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+class TestStagedPipeline:
+    """Test stage pools, queues and metrics."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_slow_route_does_not_hold_ocr(self):
+        """OCR keeps working while route is stuck, until the route queue pushes back."""
+        pipeline = StubPipeline()
+        done = []
+        stages = StagedPipeline(pipeline, "worker-a", lambda job: done.append(job["id"]), None, queue_size=1)
+        stages.start()
+        try:
+            for job_id in range(1, 4):
+                await stages.submit(_job(job_id))
+            await _settle()
+
+            # Job 1 is in route, job 2 waits in the route queue, job 3 is OCR'd but blocked
+            assert pipeline.ocr_calls == [1, 2, 3]
+            assert pipeline.route_calls == [1]
+            stats = stages.stats()
+            assert stats["route"]["busy"] == 1
+            assert stats["route"]["queue_depth"] == 1
+            assert stats["ocr"]["blocked"] == 1
+
+            pipeline.route_open.set()
+            await _settle()
+            assert pipeline.completed == [1, 2, 3]
+            assert done == [1, 2, 3]
+            assert stages.stats()["route"]["processed"] == 3
+        finally:
+            await stages.stop()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_resumed_job_skips_finished_stages(self):
+        """A job checkpointed past OCR enters at the route stage."""
+        pipeline = StubPipeline()
+        pipeline.route_open.set()
+        stages = StagedPipeline(pipeline, "worker-a", lambda job: None, None)
+        stages.start()
+        try:
+            await stages.submit(_job(1, stage=STAGE_EXTRACTED))
+            await stages.submit(_job(2, stage=STAGE_ROUTED))
+            await _settle()
+
+            assert pipeline.ocr_calls == []
+            assert pipeline.route_calls == [1]
+            assert pipeline.completed == [1, 2]
+        finally:
+            await stages.stop()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_stage_failure_handed_to_worker(self):
+        """A raising stage reports the job as failed and frees it without running later stages."""
+        pipeline = StubPipeline()
+
+        async def broken_ocr(job, checkpoint):
+            raise RuntimeError("Tesseract crashed")
+        pipeline.ocr = broken_ocr
+
+        failures, done = [], []
+
+        async def on_failure(job, error):
+            failures.append((job["id"], str(error)))
+
+        stages = StagedPipeline(pipeline, "worker-a", lambda job: done.append(job["id"]), on_failure)
+        stages.start()
+        try:
+            await stages.submit(_job(1))
+            await _settle()
+
+            assert failures == [(1, "Tesseract crashed")]
+            assert done == [1]
+            assert pipeline.route_calls == []
+            assert stages.stats()["ocr"]["failed"] == 1
+        finally:
+            await stages.stop()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_job_with_lost_lease_is_dropped(self):
+        """A job whose batch was paused or cancelled while it waited skips its remaining stages."""
+        pipeline = StubPipeline()
+        pipeline.route_open.set()
+        done = []
+        stages = StagedPipeline(pipeline, "worker-a", lambda job: done.append(job["id"]), None)
+        stages.start()
+        try:
+            job = _job(1)
+            job["lease_lost"] = True
+            await stages.submit(job)
+            await _settle()
+
+            assert pipeline.ocr_calls == []
+            assert pipeline.completed == []
+            assert done == [1]
+        finally:
+            await stages.stop()
+
+    @pytest.mark.unit
+    def test_document_pipeline_stage_order(self):
+        """The document pipeline declares OCR -> extract -> learn -> persist -> route."""
+        from services.document_pipeline import DocumentPipeline
+
+        names = [stage.name for stage in DocumentPipeline().stages()]
+        assert names == ["ocr", "extract", "learn", "persist", "route"]
@@ -0,0 +1,151 @@
+"""
+Tests for upload preflight and shortest-job-first scheduling.
+Tests PDF inspection, time estimates, plan page limits, SJF claim order with aging and batch ETAs.
+"""
+import time
+import pytest
+import PyPDF2
+from PIL import Image
+
+from backend.database import create_batch, get_db
+from job_queue import JobQueue
+from plan_config import check_batch_pages
+from services.preflight_service import PreflightService, PreflightError, OCR_PAGE_LIMIT
+
+
+def _blank_pdf(path, pages):
+    writer = PyPDF2.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    with open(path, "wb") as file:
+        writer.write(file)
+    return str(path)
+
+
+class TestPreflightInspection:
+    """Test file inspection and estimates."""
+
+    @pytest.mark.unit
+    def test_blank_pdf_counts_pages_as_scanned(self, tmp_path):
+        """Pages are counted and a PDF without text is treated as scanned."""
+        report = PreflightService().inspect(_blank_pdf(tmp_path / "blank.pdf", 3))
+
+        assert report["page_count"] == 3
+        assert report["has_text_layer"] is False
+        assert report["image_dpi"] is None
+        assert report["estimated_seconds"] > 0
+
+    @pytest.mark.unit
+    def test_scanned_image_pdf_dpi(self, tmp_path):
+        """Image resolution is derived from the embedded image width over the page width."""
+        path = tmp_path / "scan.pdf"
+        Image.new("RGB", (1700, 2200), "white").save(path, resolution=200)
+
+        report = PreflightService().inspect(str(path))
+        assert report["page_count"] == 1
+        assert report["image_dpi"] == 200
+
+    @pytest.mark.unit
+    def test_estimate_caps_ocr_pages_and_penalizes_scans(self):
+        """Only the pages OCR actually reads count, and scanned pages cost more."""
+        service = PreflightService()
+
+        long_doc = service.estimate_seconds({"page_count": 50, "has_text_layer": True})
+        capped_doc = service.estimate_seconds({"page_count": OCR_PAGE_LIMIT, "has_text_layer": True})
+        scanned_doc = service.estimate_seconds({"page_count": OCR_PAGE_LIMIT, "has_text_layer": False})
+
+        assert long_doc == capped_doc
+        assert scanned_doc > capped_doc
+
+    @pytest.mark.unit
+    def test_corrupt_pdf_rejected(self, tmp_path):
+        """Files that aren't readable PDFs fail preflight."""
+        path = tmp_path / "broken.pdf"
+        path.write_bytes(b"%PDF-1.4 not really a pdf")
+
+        with pytest.raises(PreflightError):
+            PreflightService().inspect(str(path))
+
+    @pytest.mark.unit
+    def test_encrypted_pdf_rejected(self, tmp_path):
+        """Password-protected PDFs fail preflight instead of failing in OCR."""
+        writer = PyPDF2.PdfWriter()
+        writer.add_blank_page(width=612, height=792)
+        writer.encrypt("secret")
+        path = tmp_path / "locked.pdf"
+        with open(path, "wb") as file:
+            writer.write(file)
+
+        with pytest.raises(PreflightError):
+            PreflightService().inspect(str(path))
+
+
+class TestPlanPageLimits:
+    """Test per-plan page caps."""
+
+    @pytest.mark.unit
+    def test_page_limit_by_plan(self):
+        """Trial batches are capped, enterprise batches are not."""
+        assert check_batch_pages("trial", 100)["allowed"]
+        assert not check_batch_pages("trial", 101)["allowed"]
+        assert check_batch_pages("enterprise", 100000)["allowed"]
+
+
+class TestShortestJobFirst:
+    """Test claim order and ETAs from preflight estimates."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_short_jobs_claimed_first(self, app_db, created_user):
+        """Within an organization, jobs with smaller estimates are claimed first."""
+        queue = JobQueue()
+        await create_batch("batch-1", created_user["id"], 3)
+        await queue.enqueue_documents(
+            "batch-1", created_user["id"], None, ["/tmp/long.pdf", "/tmp/short.pdf", "/tmp/mid.pdf"],
+            preflights=[{"estimated_seconds": 30}, {"estimated_seconds": 5}, {"estimated_seconds": 10}]
+        )
+
+        order = [(await queue.claim("worker-a"))[0]["filename"] for _ in range(3)]
+        assert order == ["short.pdf", "mid.pdf", "long.pdf"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_long_job_ages_ahead(self, app_db, created_user):
+        """A long job that has waited long enough is claimed before a newer short one."""
+        queue = JobQueue()
+        await create_batch("batch-1", created_user["id"], 2)
+        await queue.enqueue_documents(
+            "batch-1", created_user["id"], None, ["/tmp/long.pdf", "/tmp/short.pdf"],
+            preflights=[{"estimated_seconds": 30}, {"estimated_seconds": 5}]
+        )
+
+        db = await get_db()
+        try:
+            await db.execute("UPDATE processing_jobs SET run_after = ? WHERE filename = ?",
+                             (time.time() - 600, "long.pdf"))
+            await db.commit()
+        finally:
+            await db.close()
+
+        [job] = await queue.claim("worker-a")
+        assert job["filename"] == "long.pdf"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_batch_eta(self, app_db, created_user, monkeypatch):
+        """The ETA spreads the remaining estimates over the available parallelism."""
+        from config import settings
+
+        monkeypatch.setattr(settings, "max_concurrent_processing", 2)
+        queue = JobQueue()
+        await create_batch("batch-1", created_user["id"], 4)
+        await queue.enqueue_documents(
+            "batch-1", created_user["id"], None, [f"/tmp/doc{i}.pdf" for i in range(4)],
+            preflights=[{"estimated_seconds": 10} for _ in range(4)]
+        )
+
+        assert await queue.estimate_batch("batch-1") == {"remaining_seconds": 40.0, "eta_seconds": 20.0}
+
+        [job] = await queue.claim("worker-a")
+        await queue.finish(job, "worker-a")
+        assert (await queue.estimate_batch("batch-1"))["remaining_seconds"] == 30.0
@@ -0,0 +1,95 @@
+"""
+Tests for the fair-share job scheduler.
+Tests weighted deficit round-robin, starvation freedom, the global running cap and queue wait metrics.
+"""
+import pytest
+
+from backend.database import create_batch
+from job_queue import JobQueue
+from services.scheduler_service import FairShareScheduler
+
+
+def _take(scheduler, runnable, weights, calls, slots=1):
+    """Run `calls` selections, consuming picked jobs, and total the picks per organization."""
+    totals = {org: 0 for org in runnable}
+    for _ in range(calls):
+        for org, count in scheduler.select(runnable, weights, slots).items():
+            totals[org] += count
+            runnable[org] -= count
+    return totals
+
+
+class TestDeficitRoundRobin:
+    """Test the selection policy without a database."""
+
+    @pytest.mark.unit
+    def test_capacity_shared_by_weight(self):
+        """Backlogged organizations get capacity in proportion to their plan weights."""
+        scheduler = FairShareScheduler(queue=object())
+        totals = _take(scheduler, {1: 100, 2: 100}, {1: 1, 2: 3}, calls=40)
+        assert totals == {1: 10, 2: 30}
+
+    @pytest.mark.unit
+    def test_small_tenant_not_starved(self):
+        """A tenant arriving behind a large batch is served within one round."""
+        scheduler = FairShareScheduler(queue=object())
+        runnable = {1: 100}
+        _take(scheduler, runnable, {1: 1, 2: 1}, calls=5)
+
+        runnable[2] = 2
+        picks = [scheduler.select(runnable, {1: 1, 2: 1}, 1) for _ in range(2)]
+        assert {2: 1} in picks
+
+    @pytest.mark.unit
+    def test_idle_tenant_does_not_bank_credit(self):
+        """Drained organizations leave the ring and restart with no deficit."""
+        scheduler = FairShareScheduler(queue=object())
+        scheduler.select({1: 1, 2: 5}, {1: 8, 2: 1}, 2)
+
+        assert scheduler.select({2: 4}, {1: 8, 2: 1}, 1) == {2: 1}
+        assert 1 not in scheduler._deficit
+
+
+class TestSchedulerClaims:
+    """Test claiming through the scheduler against the job queue."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_claims_follow_plan_weights(self, app_db, created_user):
+        """An enterprise org gets more of the workers than a trial org, and waits are recorded."""
+        queue = JobQueue()
+        await create_batch("trial-batch", created_user["id"], 20)
+        await create_batch("enterprise-batch", created_user["id"], 20)
+        await queue.enqueue_documents("trial-batch", created_user["id"], 1, [f"/tmp/t{i}.pdf" for i in range(20)], plan_type="trial")
+        await queue.enqueue_documents("enterprise-batch", created_user["id"], 2, [f"/tmp/e{i}.pdf" for i in range(20)], plan_type="enterprise")
+
+        scheduler = FairShareScheduler(queue)
+        jobs = await scheduler.claim("worker-a", 9)
+
+        by_org = {1: 0, 2: 0}
+        for job in jobs:
+            by_org[job["organization_id"]] += 1
+        assert by_org == {1: 1, 2: 8}
+
+        stats = scheduler.stats()
+        assert stats["organizations"]["2"]["claimed"] == 8
+        assert stats["organizations"]["2"]["wait_max_seconds"] >= 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_global_running_cap(self, app_db, created_user, monkeypatch):
+        """Claims across workers never exceed the global running limit."""
+        from config import settings
+
+        monkeypatch.setattr(settings, "max_global_running_jobs", 3)
+        queue = JobQueue()
+        await create_batch("batch-1", created_user["id"], 10)
+        await queue.enqueue_documents("batch-1", created_user["id"], 1, [f"/tmp/d{i}.pdf" for i in range(10)])
+
+        first = await queue.claim("worker-a", 2)
+        second = await queue.claim("worker-b", 5)
+        assert (len(first), len(second)) == (2, 1)
+        assert await queue.claim("worker-c", 5) == []
+
+        await queue.finish(first[0], "worker-a")
+        assert len(await queue.claim("worker-c", 5)) == 1
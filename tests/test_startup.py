@@ -0,0 +1,72 @@
+"""
+Tests for fast application startup.
+Tests that importing the app loads no connector plugin, that ConnectorManager imports
+a plugin on first use and keeps it, and the startup profile report.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from connectors.connector_manager import ConnectorManager
+from models import ConnectorType
+from utils.startup_profile import StartupProfile
+
+root_dir = Path(__file__).parent.parent
+
+
+class TestLazyConnectors:
+    """Test connector plugins loading on first use."""
+
+    @pytest.mark.unit
+    def test_app_import_loads_no_connector(self):
+        """A fresh process importing the app doesn't import the DocuWare or Google client libraries."""
+        code = (
+            f"import sys; sys.path[:0] = [{str(root_dir)!r}, {str(root_dir / 'backend')!r}]; import backend.main; "
+            "print(sorted(name for name in ('docuware', 'googleapiclient', 'google_auth_oauthlib', "
+            "'connectors.docuware_connector', 'connectors.google_drive_connector', 'services.document_pipeline') "
+            "if name in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=root_dir, capture_output=True, text=True)
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().splitlines()[-1] == "[]"
+
+    @pytest.mark.unit
+    def test_plugin_created_on_first_use(self):
+        """Each plugin is created once, when first asked for."""
+        manager = ConnectorManager()
+        assert manager.loaded_connectors() == []
+
+        connector = manager.docuware_connector
+
+        assert manager.loaded_connectors() == ["docuware"]
+        assert manager.get_plugin(ConnectorType.DOCUWARE) is connector
+        assert not manager.is_loaded(ConnectorType.GOOGLE_DRIVE)
+
+    @pytest.mark.unit
+    def test_unregistered_connector_type(self):
+        """Connector types without a plugin raise ValueError."""
+        with pytest.raises(ValueError):
+            ConnectorManager().get_plugin(ConnectorType.ONEDRIVE)
+
+
+class TestStartupProfile:
+    """Test the startup profile report."""
+
+    @pytest.mark.unit
+    def test_report(self):
+        """Imports and phases are timed and the slowest imports come first."""
+        profile = StartupProfile()
+        profile.time_imports(["json", "email.mime.text"])
+        with profile.phase("init_database"):
+            pass
+        profile.mark_ready()
+
+        report = profile.report()
+        assert list(report["imports"]) == ["json", "email.mime.text"]
+        assert list(report["phases"]) == ["init_database"]
+        assert report["ready_seconds"] >= report["phases"]["init_database"]
+        assert profile.slowest_imports(1)[0]["seconds"] == max(report["imports"].values())
+        assert "slowest imports" in profile.summary()
@@ -0,0 +1,132 @@
+"""
+Tests for the process-wide tenant cache.
+Tests hits/misses, write-path invalidation (including loads racing it), TTL expiry and cross-worker version sync.
+"""
+import pytest
+import aiosqlite
+
+import backend.database as db_module
+from backend.database import (
+    TenantCache,
+    get_organization,
+    update_organization,
+    save_organization_setting,
+    get_organization_setting,
+    delete_organization_setting,
+    bump_cache_versions,
+    org_scope,
+    get_tenant_cache_stats
+)
+
+
+class TestTenantCacheReads:
+    """Test cached reads and write-path invalidation."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_repeated_reads_hit_cache(self, test_db, created_organization):
+        """Second read of the same organization is served from the cache."""
+        org_id = created_organization["id"]
+        hits_before = get_tenant_cache_stats()["hits"]
+
+        await get_organization(org_id)
+        await get_organization(org_id)
+
+        assert get_tenant_cache_stats()["hits"] >= hits_before + 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cached_value_is_a_copy(self, test_db, created_organization):
+        """Mutating a returned dict doesn't corrupt the cache."""
+        org_id = created_organization["id"]
+
+        org = await get_organization(org_id)
+        org["name"] = "Mutated"
+
+        org = await get_organization(org_id)
+        assert org["name"] == "Test Organization"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_update_organization_invalidates(self, test_db, created_organization):
+        """update_organization drops the cached row."""
+        org_id = created_organization["id"]
+        await get_organization(org_id)
+
+        await update_organization(org_id=org_id, name="Renamed Org")
+
+        org = await get_organization(org_id)
+        assert org["name"] == "Renamed Org"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_organization_setting_invalidation(self, test_db, created_organization):
+        """Missing settings are cached, and saving/deleting a setting invalidates them."""
+        org_id = created_organization["id"]
+
+        assert await get_organization_setting(org_id, "docuware") is None
+
+        await save_organization_setting(org_id, "docuware", '{"server_url": "https://a"}')
+        setting = await get_organization_setting(org_id, "docuware")
+        assert setting["config_encrypted"] == '{"server_url": "https://a"}'
+
+        await delete_organization_setting(org_id, "docuware")
+        assert await get_organization_setting(org_id, "docuware") is None
+
+
+class TestTenantCacheVersions:
+    """Test cross-worker invalidation through the cache_versions table."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_remote_write_invalidates_after_sync(self, test_db, created_organization):
+        """A write from another worker is picked up on the next version sync."""
+        org_id = created_organization["id"]
+        await get_organization(org_id)
+
+        # Simulate another worker: update the row and bump the version directly
+        async with aiosqlite.connect(test_db) as db:
+            await db.execute("UPDATE organizations SET name = ? WHERE id = ?", ("Remote Name", org_id))
+            await bump_cache_versions(db, org_scope(org_id))
+            await db.commit()
+
+        # Still cached until this worker syncs
+        assert (await get_organization(org_id))["name"] == "Test Organization"
+
+        await db_module.tenant_cache.sync_versions(force=True)
+
+        assert (await get_organization(org_id))["name"] == "Remote Name"
+
+    @pytest.mark.unit
+    def test_ttl_expiry_and_eviction(self):
+        """Entries expire after their TTL and the oldest are evicted past max_entries."""
+        cache = TenantCache(ttl_seconds=0, max_entries=2)
+        cache.set("organization", 1, {"id": 1}, (org_scope(1),))
+        assert cache.get("organization", 1) == (False, None)
+
+        cache = TenantCache(ttl_seconds=60, max_entries=2)
+        for org_id in (1, 2, 3):
+            cache.set("organization", org_id, {"id": org_id}, (org_scope(org_id),))
+
+        assert cache.get("organization", 1) == (False, None)
+        assert cache.get("organization", 3) == (True, {"id": 3})
+        assert cache.stats()["evictions"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_load_racing_invalidation_not_cached(self):
+        """A value loaded while its scope was invalidated is returned but not cached."""
+        cache = TenantCache(sync_interval_seconds=3600)
+        cache._last_sync = float("inf")  # No cache_versions table here
+
+        async def stale_loader():
+            # A write commits and invalidates while the old row is being read
+            cache.invalidate(org_scope(1))
+            return {"name": "Old"}
+
+        async def fresh_loader():
+            return {"name": "New"}
+
+        assert await cache.get_or_load("organization", 1, stale_loader, (org_scope(1),)) == {"name": "Old"}
+        assert await cache.get_or_load("organization", 1, fresh_loader, (org_scope(1),)) == {"name": "New"}
+        assert cache.get("organization", 1) == (True, {"name": "New"})
@@ -0,0 +1,259 @@
+"""
+Tests for the connector upload outbox and background uploader.
+Tests that approval queues the upload in its own transaction, that re-approving is
+idempotent and never requeues a completed upload, per-connector claim limits, bulk
+uploads, retries with backoff, dead-lettering, that a recorded upload isn't repeated,
+and the upload events the uploader publishes.
+"""
+import asyncio
+import pytest
+
+from config import settings
+from review_repository import ReviewRepository
+from services.batch_event_service import get_batch_event_bus, upload_channel, EVENT_UPLOAD
+from upload_outbox import UploadOutbox, UPLOAD_COMPLETED, UPLOAD_DEAD, UPLOAD_PENDING, UPLOAD_RUNNING
+from upload_worker import UploadWorker
+
+
+@pytest.fixture
+def repository(app_db):
+    """Review repository bound to the test database."""
+    return ReviewRepository()
+
+
+@pytest.fixture
+def outbox(app_db):
+    """Upload outbox bound to the test database."""
+    return UploadOutbox()
+
+
+async def _approved_document(repository, org_id, filename="invoice.pdf", connector_type="docuware"):
+    doc_id = await repository.create_document(
+        organization_id=org_id,
+        batch_id="batch-1",
+        filename=filename,
+        file_path=f"/tmp/{filename}",
+        category="invoice",
+        extracted_data={"vendor": "ACME"},
+        confidence_score=0.9,
+        connector_type=connector_type
+    )
+    await repository.approve_document(doc_id, org_id, [], "a@b.com", {"vendor": "ACME"})
+    return doc_id
+
+
+async def _drain(uploader, outbox, document_ids, statuses=(UPLOAD_COMPLETED, UPLOAD_DEAD)):
+    """Run the uploader until every document's upload reached one of statuses."""
+    uploader.start()
+    try:
+        for _ in range(200):
+            entries = [await outbox.get_document_upload(doc_id) for doc_id in document_ids]
+            if all(entry["status"] in statuses for entry in entries):
+                return entries
+            await asyncio.sleep(0.02)
+        raise AssertionError(f"Uploads did not finish: {entries}")
+    finally:
+        await uploader.stop()
+
+
+class TestApprovalOutbox:
+    """Test queuing uploads with the approval."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_approval_queues_upload_atomically(self, repository, outbox, created_organization):
+        """A failed approval leaves no upload behind; a successful one queues exactly one."""
+        org_id = created_organization["id"]
+        doc_id = await repository.create_document(
+            organization_id=org_id, batch_id="batch-1", filename="invoice.pdf", file_path="/tmp/invoice.pdf",
+            category="invoice", extracted_data={}, confidence_score=0.9, connector_type="docuware"
+        )
+
+        with pytest.raises(KeyError):
+            await repository.approve_document(doc_id, org_id, [{"field_name": "vendor"}], "a@b.com", {})
+        assert await outbox.get_document_upload(doc_id) is None
+
+        assert await repository.approve_document(doc_id, org_id, [], "a@b.com", {}) == (True, True)
+        assert await repository.approve_document(doc_id, org_id, [], "a@b.com", {}) == (False, False)
+
+        entry = await outbox.get_document_upload(doc_id)
+        assert entry["status"] == UPLOAD_PENDING
+        assert entry["connector_type"] == "docuware"
+        assert (await outbox.stats())["pending"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_auto_approval_only_once(self, repository, outbox, created_organization):
+        """A retried processing job doesn't queue a second upload of an auto-approved document."""
+        org_id = created_organization["id"]
+        doc_id = await repository.create_document(
+            organization_id=org_id, batch_id="batch-1", filename="invoice.pdf", file_path="/tmp/invoice.pdf",
+            category="invoice", extracted_data={}, confidence_score=0.99
+        )
+
+        assert await repository.auto_approve_document(doc_id, org_id) is True
+        assert await repository.auto_approve_document(doc_id, org_id) is False
+
+        assert (await repository.get_document(doc_id))["status"] == "approved"
+        assert (await outbox.get_document_upload(doc_id))["connector_type"] == "none"
+
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_completed_upload_is_not_queued_again(self, repository, outbox, created_organization):
+        """Queuing a document whose upload completed leaves the entry completed."""
+        org_id = created_organization["id"]
+        doc_id = await _approved_document(repository, org_id)
+        [entry] = await outbox.claim("uploader-a", {"docuware": 1})
+        await outbox.complete(entry, "uploader-a", {"success": True})
+
+        async with repository.transaction() as db:
+            assert await outbox.add(db, doc_id, org_id) is False
+
+        assert (await outbox.get_document_upload(doc_id))["status"] == UPLOAD_COMPLETED
+
+
+class TestOutboxClaims:
+    """Test per-connector claim limits."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_claim_respects_per_connector_slots(self, repository, outbox, created_organization):
+        """Each connector type fills only its own free slots; unknown types use the default."""
+        org_id = created_organization["id"]
+        for i in range(3):
+            await _approved_document(repository, org_id, f"dw{i}.pdf", "docuware")
+            await _approved_document(repository, org_id, f"gd{i}.pdf", "google_drive")
+        await _approved_document(repository, org_id, "other.pdf", None)
+
+        claimed = await outbox.claim("uploader-a", {"docuware": 1, "google_drive": 2}, default_slots=0)
+
+        by_type = sorted(entry["connector_type"] for entry in claimed)
+        assert by_type == ["docuware", "google_drive", "google_drive"]
+        assert all(entry["status"] == UPLOAD_RUNNING and entry["attempts"] == 1 for entry in claimed)
+
+        rest = await outbox.claim("uploader-b", {"docuware": 5, "google_drive": 5}, default_slots=1)
+        assert len(rest) == 4
+        assert not {entry["id"] for entry in claimed} & {entry["id"] for entry in rest}
+
+
+class TestUploadWorker:
+    """Test the background uploader end to end."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_upload_completes_document(self, repository, outbox, created_organization):
+        """A successful upload completes the entry and the document, and publishes events."""
+        org_id = created_organization["id"]
+        doc_id = await _approved_document(repository, org_id)
+        bus = get_batch_event_bus()
+        channel = upload_channel(org_id)
+
+        async def upload(organization_id, document_ids):
+            return {document_id: {"success": True, "document_id": "dms-1", "url": "https://dms/1"}
+                    for document_id in document_ids}
+
+        await _drain(UploadWorker(outbox=outbox, upload=upload, poll_interval=0.01), outbox, [doc_id])
+
+        doc = await repository.get_document(doc_id)
+        assert doc["status"] == "completed"
+        assert doc["uploaded_to_connector"] == 1
+        assert '"dms-1"' in doc["connector_result"]
+
+        statuses = [event.data["status"] for event in bus._channels[channel].history
+                    if event.event == EVENT_UPLOAD and event.data["document_id"] == doc_id]
+        assert statuses == ["uploading", "completed"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failures_retry_then_dead_letter(self, repository, outbox, created_organization, monkeypatch):
+        """A flaky upload is retried after backoff; one that keeps failing is dead-lettered."""
+        monkeypatch.setattr(settings, "upload_retry_base_seconds", 0.01)
+        monkeypatch.setattr(settings, "upload_max_attempts", 3)
+        org_id = created_organization["id"]
+        flaky = await _approved_document(repository, org_id, "flaky.pdf")
+        broken = await _approved_document(repository, org_id, "broken.pdf")
+        calls = {flaky: 0, broken: 0}
+
+        async def upload(organization_id, document_ids):
+            results = {}
+            for document_id in document_ids:
+                calls[document_id] += 1
+                if document_id == broken or calls[document_id] == 1:
+                    results[document_id] = ConnectionError("DMS unavailable")
+                else:
+                    results[document_id] = {"success": True}
+            return results
+
+        flaky_entry, broken_entry = await _drain(
+            UploadWorker(outbox=outbox, upload=upload, poll_interval=0.01), outbox, [flaky, broken]
+        )
+
+        assert flaky_entry["status"] == UPLOAD_COMPLETED and calls[flaky] == 2
+        assert broken_entry["status"] == UPLOAD_DEAD and calls[broken] == 3
+        doc = await repository.get_document(broken)
+        assert doc["status"] == "failed"
+        assert doc["error_message"] == "DMS unavailable"
+
+        # Approving again gives the dead upload a fresh set of attempts
+        assert await repository.approve_document(broken, org_id, [], "a@b.com", {}) == (True, True)
+        entry = await outbox.get_document_upload(broken)
+        assert entry["status"] == UPLOAD_PENDING and entry["attempts"] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_permanent_error_is_not_retried(self, repository, outbox, created_organization):
+        """A missing connector config (ValueError) dead-letters on the first attempt."""
+        org_id = created_organization["id"]
+        doc_id = await _approved_document(repository, org_id)
+        calls = []
+
+        async def upload(organization_id, document_ids):
+            calls.extend(document_ids)
+            raise ValueError("No active connector configured")
+
+        [entry] = await _drain(UploadWorker(outbox=outbox, upload=upload, poll_interval=0.01), outbox, [doc_id])
+
+        assert entry["status"] == UPLOAD_DEAD
+        assert calls == [doc_id]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_claimed_entries_upload_in_one_bulk_call(self, repository, outbox, created_organization):
+        """An organization's claimed entries go to the connector together; each gets its own outcome."""
+        org_id = created_organization["id"]
+        doc_ids = [await _approved_document(repository, org_id, f"doc{i}.pdf") for i in range(3)]
+        calls = []
+
+        async def upload(organization_id, document_ids):
+            calls.append(sorted(document_ids))
+            return {
+                document_id: ValueError("Invalid index data") if document_id == doc_ids[1] else {"success": True}
+                for document_id in document_ids
+            }
+
+        entries = await _drain(UploadWorker(outbox=outbox, upload=upload, poll_interval=0.01), outbox, doc_ids)
+
+        assert calls == [sorted(doc_ids)]
+        assert [entry["status"] for entry in entries] == [UPLOAD_COMPLETED, UPLOAD_DEAD, UPLOAD_COMPLETED]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_recorded_upload_is_not_repeated(self, repository, outbox, created_organization):
+        """An upload whose uploader lost the entry after the DMS took it completes without uploading again."""
+        org_id = created_organization["id"]
+        doc_id = await _approved_document(repository, org_id)
+        [entry] = await outbox.claim("uploader-a", {"docuware": 1})
+        await outbox.record_upload(entry, {"success": True, "document_id": "dms-1"})
+        await outbox.release("uploader-a", [entry["id"]])
+        calls = []
+
+        async def upload(organization_id, document_ids):
+            calls.extend(document_ids)
+            return {}
+
+        [entry] = await _drain(UploadWorker(outbox=outbox, upload=upload, poll_interval=0.01), outbox, [doc_id])
+
+        assert entry["status"] == UPLOAD_COMPLETED
+        assert calls == []
+        assert '"dms-1"' in (await repository.get_document(doc_id))["connector_result"]